@@ -0,0 +1,70 @@
+"""
+Fixtures for the offline ETL tests: a temporary SQLite database and the
+FakeProApi (services/fake_tushare.py) in place of Tushare
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+import update_data
+from models import create_tables, get_session
+from services import fake_tushare, rate_limiter, resilience
+from services.fake_tushare import FakeProApi, FakeTimeoutError
+from services.rate_limiter import RateLimiter
+from services.resilience import RetryPolicy, CircuitBreakers
+
+# Size of the synthetic ticker universe the tests load
+TEST_TICKERS = 12
+
+
+class FlakyProApi(FakeProApi):
+    """FakeProApi whose calls for the tickers or trading days in `failing` time out"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.failing = set()
+
+    def query(self, api_name, **params):
+        if self.failing & {params.get('ts_code'), params.get('trade_date'), params.get('ex_date')}:
+            with self.lock:
+                self.calls[api_name] += 1
+            raise FakeTimeoutError(f"Read timed out calling {api_name}")
+        return super().query(api_name, **params)
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """A fresh database with every table and migration, as DATABASE_URL"""
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'test.db'}")
+    return create_tables()
+
+
+@pytest.fixture
+def fake_api(database, monkeypatch):
+    """
+    TUSHARE_API=fake on a small universe, without throttling or retry
+    sleeps, and with update_data's options reset to their defaults
+    """
+    fake = FlakyProApi(tickers=TEST_TICKERS)
+    monkeypatch.setenv('TUSHARE_API', 'fake')
+    monkeypatch.delenv('TUSHARE_CACHE_DIR', raising=False)
+    monkeypatch.setattr(fake_tushare, '_shared_fake', fake)
+    monkeypatch.setattr(rate_limiter, '_shared_limiter', RateLimiter(1_000_000))
+    monkeypatch.setattr(resilience, '_shared_policy', RetryPolicy(max_retries=0))
+    monkeypatch.setattr(resilience, '_shared_breakers', CircuitBreakers(failure_threshold=1_000))
+    monkeypatch.setattr(update_data, 'ETL_OPTIONS', dict(update_data.ETL_OPTIONS, days=30))
+    return fake
+
+
+@pytest.fixture
+def tickers(fake_api):
+    """The fake universe loaded into tickers; returns the listed ts_codes"""
+    success, message = update_data.update_tickers_data()
+    assert success, message
+    session = get_session()
+    try:
+        return [row.ts_code for row in update_data.listed_tickers(session)]
+    finally:
+        session.close()
@@ -1,7 +1,7 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, Date, DateTime, Text, ForeignKey
+from sqlalchemy import create_engine, Column, Integer, String, Float, Date, DateTime, Text, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
-from sqlalchemy import text
+from sqlalchemy import text, inspect, event
 from datetime import datetime
 import os
 from dotenv import load_dotenv
@@ -24,12 +24,21 @@ load_dotenv('.env')
 13. adj_factor - Adjust factors for stock prices
 14. dividend - Dividend data
 15. index_daily -  Index daily data
+16. sync_watermarks - High-water marks for incremental syncs
+17. etl_checkpoints - Units of work finished by the current ETL run of each table
+18. etl_failures - Units whose fetch still failed after retries
+19. etl_runs - One row per update_data.py run
+20. etl_run_metrics - Duration, API calls, throttling, rows and memory of each table update
+21. schema_version - Schema migrations applied to the database
+22. ticker_holder_summary - Per-ticker holder counts, materialized from top_holders
+23. holder_ticker_counts - Tickers held by each individual holder, materialized from top_holders
 """
 
 Base = declarative_base()
 
 class Ticker(Base):
     __tablename__ = 'tickers'
+    __table_args__ = (Index('uq_tickers_ts_code', 'ts_code', unique=True),)
     
     id = Column(Integer, primary_key=True)
     ts_code = Column(String(20), nullable=False)  # TS代码
@@ -38,7 +47,10 @@ class Ticker(Base):
     area = Column(String(50))  # 地域
     industry = Column(String(50))  # 所属行业
     list_date = Column(String(10))  # 上市日期
+    list_status = Column(String(1))  # 上市状态 L上市 D退市 P暂停上市
+    delist_date = Column(String(10))  # 退市日期
     updated_date = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    row_hash = Column(String(16))  # content hash of the fetched fields, for skipping unchanged rewrites
 
     # Relationship
     top_holders = relationship("TopHolder", back_populates="ticker")
@@ -55,6 +67,7 @@ class Ticker(Base):
     
 class TopHolder(Base):
     __tablename__ = 'top_holders'
+    __table_args__ = (Index('uq_top_holders_natural_key', 'ts_code', 'end_date', 'ann_date', 'holder_name', unique=True),)
     
     id = Column(Integer, primary_key=True)
     ts_code = Column(String(20), ForeignKey('tickers.ts_code'), nullable=False)
@@ -66,6 +79,7 @@ class TopHolder(Base):
     holder_type = Column(String(10))  # G=个人, C=机构, P=私募, E=信托, O=其他
     hold_change = Column(Float)  # 持股变动数量
     updated_date = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    row_hash = Column(String(16))  # content hash of the fetched fields, for skipping unchanged rewrites
     
     # Relationship
     ticker = relationship("Ticker", back_populates="top_holders")
@@ -87,18 +101,21 @@ class UpdateLog(Base):
 
 class HmList(Base):
     __tablename__ = 'hm_list'
+    __table_args__ = (Index('uq_hm_list_name', 'name', unique=True),)
     
     id = Column(Integer, primary_key=True)
     name = Column(String(100), nullable=False)
     desc = Column(String(200), nullable=True)
     orgs = Column(String(200), nullable=False)
     updated_date = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    row_hash = Column(String(16))  # content hash of the fetched fields, for skipping unchanged rewrites
     
     # Relationships
     #transactions = relationship("PlayerTransaction", back_populates="player")
 
 class HmDetail(Base):
     __tablename__ = 'hm_detail'
+    __table_args__ = (Index('uq_hm_detail_natural_key', 'trade_date', 'ts_code', 'name', unique=True),)
     
     id = Column(Integer, primary_key=True)
     trade_date = Column(String(10), nullable=False)
@@ -110,9 +127,11 @@ class HmDetail(Base):
     orgs = Column(String(200), nullable=False)
     net_amount = Column(Float)
     updated_date = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    row_hash = Column(String(16))  # content hash of the fetched fields, for skipping unchanged rewrites
 
 class BalanceSheet(Base):
     __tablename__ = 'balance_sheets'
+    __table_args__ = (Index('uq_balance_sheets_natural_key', 'ts_code', 'end_date', 'report_type', 'ann_date', 'f_ann_date', 'update_flag', unique=True),)
     
     id = Column(Integer, primary_key=True)
     ts_code = Column(String(20), ForeignKey('tickers.ts_code'), nullable=False)  # TS股票代码
@@ -239,12 +258,14 @@ class BalanceSheet(Base):
     oth_assets_flag = Column(Float)
     update_flag = Column(Float)
     updated_date = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    row_hash = Column(String(16))  # content hash of the fetched fields, for skipping unchanged rewrites
     
     # Relationship
     ticker = relationship("Ticker", back_populates="balance_sheets")
 
 class CashFlow(Base):
     __tablename__ = 'cash_flows'
+    __table_args__ = (Index('uq_cash_flows_natural_key', 'ts_code', 'end_date', 'report_type', 'ann_date', 'f_ann_date', 'update_flag', unique=True),)
     
     id = Column(Integer, primary_key=True)
     ts_code = Column(String(20), ForeignKey('tickers.ts_code'), nullable=False)
@@ -344,12 +365,14 @@ class CashFlow(Base):
     beg_bal_cash_equ = Column(Float)
     update_flag = Column(Float)
     updated_date = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    row_hash = Column(String(16))  # content hash of the fetched fields, for skipping unchanged rewrites
     
     # Relationship
     ticker = relationship("Ticker", back_populates="cash_flows")
 
 class IncomeStatement(Base):
     __tablename__ = 'income_statements'
+    __table_args__ = (Index('uq_income_statements_natural_key', 'ts_code', 'end_date', 'report_type', 'ann_date', 'f_ann_date', 'update_flag', unique=True),)
     
     id = Column(Integer, primary_key=True)
     ts_code = Column(String(20), ForeignKey('tickers.ts_code'), nullable=False)
@@ -436,12 +459,14 @@ class IncomeStatement(Base):
     net_profit_attr_m_s_ci_atsopc = Column(Float)
     update_flag = Column(Float)
     updated_date = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    row_hash = Column(String(16))  # content hash of the fetched fields, for skipping unchanged rewrites
     
     # Relationship
     ticker = relationship("Ticker", back_populates="income_statements")
 
 class FinaIndicator(Base):
     __tablename__ = 'fina_indicators'
+    __table_args__ = (Index('uq_fina_indicators_ts_code_end_date', 'ts_code', 'end_date', unique=True),)
     
     id = Column(Integer, primary_key=True)
     ts_code = Column(String(20), ForeignKey('tickers.ts_code'), nullable=False)
@@ -622,12 +647,14 @@ class FinaIndicator(Base):
     q_gr_chg = Column(Float)  # 营业总收入单季度环比增长率
     update_flag = Column(Float)
     updated_date = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    row_hash = Column(String(16))  # content hash of the fetched fields, for skipping unchanged rewrites
     
     # Relationship
     ticker = relationship("Ticker", back_populates="fina_indicators")
 
 class DailyBasic(Base):
     __tablename__ = 'daily_basic'
+    __table_args__ = (Index('uq_daily_basic_ts_code_trade_date', 'ts_code', 'trade_date', unique=True),)
     
     id = Column(Integer, primary_key=True)
     ts_code = Column(String(20), ForeignKey('tickers.ts_code'), nullable=False)
@@ -646,12 +673,14 @@ class DailyBasic(Base):
     close = Column(Float)
     circ_mv = Column(Float)
     updated_date = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    row_hash = Column(String(16))  # content hash of the fetched fields, for skipping unchanged rewrites
     
     # Relationship
     ticker = relationship("Ticker", back_populates="daily_basic")
 
 class ThsHot(Base):
     __tablename__ = 'ths_hot'
+    __table_args__ = (Index('uq_ths_hot_natural_key', 'trade_date', 'data_type', 'ts_code', 'rank_time', unique=True),)
     id = Column(Integer, primary_key=True, autoincrement=True)
     trade_date = Column(String, nullable=False)        # 交易日期
     data_type = Column(String, nullable=False)         # 数据类型
@@ -665,6 +694,7 @@ class ThsHot(Base):
     hot = Column(Float)                                # 热度值
     rank_time = Column(String)                         # 排行榜获取时间
     updated_date = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    row_hash = Column(String(16))  # content hash of the fetched fields, for skipping unchanged rewrites
 
     # Optional: relationship to Ticker
     ticker_id = Column(Integer, ForeignKey('tickers.id'), nullable=True)
@@ -672,6 +702,7 @@ class ThsHot(Base):
 
 class DcHot(Base):
     __tablename__ = 'dc_hot'
+    __table_args__ = (Index('uq_dc_hot_natural_key', 'trade_date', 'data_type', 'ts_code', 'rank_time', unique=True),)
     id = Column(Integer, primary_key=True, autoincrement=True)
     trade_date = Column(String, nullable=False)        # 交易日期
     data_type = Column(String, nullable=False)         # 数据类型
@@ -684,6 +715,7 @@ class DcHot(Base):
     hot = Column(Float)                                # 热度值当前价
     rank_time = Column(String)                         # 排行榜获取时间
     updated_date = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    row_hash = Column(String(16))  # content hash of the fetched fields, for skipping unchanged rewrites
 
     # Optional: relationship to Ticker
     ticker_id = Column(Integer, ForeignKey('tickers.id'), nullable=True)
@@ -697,6 +729,7 @@ class LastDayQuarter(Base):
 
 class Daily(Base):
     __tablename__ = 'daily'
+    __table_args__ = (Index('uq_daily_ts_code_trade_date', 'ts_code', 'trade_date', unique=True),)
     
     id = Column(Integer, primary_key=True)
     ts_code = Column(String(20), ForeignKey('tickers.ts_code'), nullable=False)
@@ -711,20 +744,24 @@ class Daily(Base):
     vol = Column(Float)  # 成交量（手）
     amount = Column(Float)  # 成交额（千元）
     updated_date = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    row_hash = Column(String(16))  # content hash of the fetched fields, for skipping unchanged rewrites
     
     # Relationship
     ticker = relationship("Ticker", back_populates="daily_records")
 
 class AdjFactor(Base):
     __tablename__ = 'adj_factor'
+    __table_args__ = (Index('uq_adj_factor_ts_code_trade_date', 'ts_code', 'trade_date', unique=True),)
     id = Column(Integer, primary_key=True, autoincrement=True)
     ts_code = Column(String(20), index=True, nullable=False)
     trade_date = Column(String(8), index=True, nullable=False)
     adj_factor = Column(Float, nullable=False)
     updated_date = Column(DateTime, default=datetime.utcnow)
+    row_hash = Column(String(16))  # content hash of the fetched fields, for skipping unchanged rewrites
 
 class Dividend(Base):
     __tablename__ = 'dividend'
+    __table_args__ = (Index('uq_dividend_natural_key', 'ts_code', 'end_date', 'ann_date', 'div_proc', unique=True),)
     id = Column(Integer, primary_key=True, autoincrement=True)
     ts_code = Column(String(20), index=True, nullable=False)         # TS代码
     end_date = Column(String(10), nullable=False)                    # 分送年度
@@ -744,9 +781,11 @@ class Dividend(Base):
     base_share = Column(Float)                                       # 实施基准股本（万）
     update_flag = Column(String(5))                                  # 是否变更过（1表示变更）
     updated_date = Column(DateTime, default=datetime.utcnow)   
+    row_hash = Column(String(16))  # content hash of the fetched fields, for skipping unchanged rewrites
     
 class IndexDaily(Base):
     __tablename__ = 'index_daily'
+    __table_args__ = (Index('uq_index_daily_ts_code_trade_date', 'ts_code', 'trade_date', unique=True),)
     id = Column(Integer, primary_key=True, autoincrement=True)
     ts_code = Column(String(20), index=True, nullable=False)         # 指数代码
     trade_date = Column(String(8), index=True, nullable=False)       # 交易日期
@@ -760,64 +799,299 @@ class IndexDaily(Base):
     vol = Column(Float)                                              # 成交量（手）
     amount = Column(Float)                                           # 成交额（千元）
     updated_date = Column(DateTime, default=datetime.utcnow)         # 更新时间
-      # 更新时间
+    row_hash = Column(String(16))  # content hash of the fetched fields, for skipping unchanged rewrites
+
+class SyncWatermark(Base):
+    __tablename__ = 'sync_watermarks'
+    __table_args__ = (Index('uq_sync_watermarks_table_ts_code', 'table_name', 'ts_code', unique=True),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    table_name = Column(String(50), nullable=False)                  # 数据表名
+    ts_code = Column(String(20), nullable=False, default='')         # 股票代码，''表示整表
+    watermark = Column(String(10), nullable=False)                   # 已同步的最新日期
+    updated_date = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SyncWatermark(table_name='{self.table_name}', ts_code='{self.ts_code}', watermark='{self.watermark}')>"
+
+class EtlCheckpoint(Base):
+    __tablename__ = 'etl_checkpoints'
+    __table_args__ = (Index('ix_etl_checkpoints_table_period', 'table_name', 'period'),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    table_name = Column(String(50), nullable=False)                  # 数据表名
+    period = Column(String(40), nullable=False, default='')          # 本次运行的数据区间
+    unit = Column(String(100), nullable=False)                       # 已完成的单元（股票代码/交易日/游资名称）
+    completed_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<EtlCheckpoint(table_name='{self.table_name}', period='{self.period}', unit='{self.unit}')>"
+
+class EtlFailure(Base):
+    __tablename__ = 'etl_failures'
+    __table_args__ = (Index('ix_etl_failures_table_name', 'table_name'),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    table_name = Column(String(50), nullable=False)                  # 数据表名
+    period = Column(String(40), nullable=False, default='')          # 失败运行的数据区间
+    unit = Column(String(100), nullable=False)                       # 失败的单元（股票代码/交易日）
+    api_name = Column(String(50))                                    # 失败的接口
+    error_kind = Column(String(20))                                  # transient / permanent / circuit_open
+    message = Column(Text)                                           # 错误信息
+    attempts = Column(Integer)                                       # 尝试次数
+    failed_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<EtlFailure(table_name='{self.table_name}', unit='{self.unit}', error_kind='{self.error_kind}')>"
+
+class EtlRun(Base):
+    __tablename__ = 'etl_runs'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    started_at = Column(DateTime, nullable=False)                    # 开始时间 (UTC)
+    duration_seconds = Column(Float)                                 # 总耗时（秒）
+    command = Column(Text)                                           # 命令行参数
+    tables = Column(Text)                                            # 更新的数据表，逗号分隔
+    succeeded = Column(Integer)                                      # 成功的表数
+    failed = Column(Integer)                                         # 失败的表数
+    api_calls = Column(Integer)                                      # 接口调用次数
+    throttle_seconds = Column(Float)                                 # 限流等待（秒）
+    peak_rss_mb = Column(Float)                                      # 进程内存峰值 (MB)
+
+    metrics = relationship("EtlRunMetric", back_populates="run")
+
+    def __repr__(self):
+        return f"<EtlRun(id={self.id}, started_at='{self.started_at}', tables='{self.tables}')>"
+
+class EtlRunMetric(Base):
+    __tablename__ = 'etl_run_metrics'
+    __table_args__ = (Index('ix_etl_run_metrics_table_started', 'table_name', 'started_at'),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    run_id = Column(Integer, ForeignKey('etl_runs.id'), nullable=False)
+    table_name = Column(String(50), nullable=False)                  # 数据表名
+    started_at = Column(DateTime, nullable=False)                    # 开始时间 (UTC)
+    duration_seconds = Column(Float)                                 # 耗时（秒）
+    success = Column(Integer)                                        # 1成功 0失败
+    message = Column(Text)                                           # 结果信息
+    api_calls = Column(Integer)                                      # 接口调用次数（含重试）
+    retries = Column(Integer)                                        # 超时/服务端错误重试次数
+    quota_backoffs = Column(Integer)                                 # 超出频率限制的退避次数
+    throttle_seconds = Column(Float)                                 # 限流等待（秒）
+    cache_hits = Column(Integer)                                     # 响应缓存命中次数
+    rows = Column(Integer)                                           # 处理的行数
+    rows_written = Column(Integer)                                   # 写入的行数
+    rows_inserted = Column(Integer)                                  # 新增行数
+    rows_updated = Column(Integer)                                   # 更新行数
+    rows_unchanged = Column(Integer)                                 # 未变化而跳过的行数
+    rows_per_second = Column(Float)                                  # 每秒处理行数
+    peak_rss_mb = Column(Float)                                      # 更新期间的进程内存峰值 (MB)
+    failed_units = Column(Integer)                                   # 重试后仍失败的单元数
+
+    run = relationship("EtlRun", back_populates="metrics")
+
+    def __repr__(self):
+        return f"<EtlRunMetric(table_name='{self.table_name}', started_at='{self.started_at}', duration_seconds={self.duration_seconds})>"
+
+class TickerHolderSummary(Base):
+    __tablename__ = 'ticker_holder_summary'
+    __table_args__ = (Index('uq_ticker_holder_summary_ts_code', 'ts_code', unique=True),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    ts_code = Column(String(20), nullable=False)                     # 股票代码
+    name = Column(String(100))                                       # 股票名称（排序用）
+    latest_end_date = Column(String(10))                             # 最新一期股东报告期
+    holder_count = Column(Integer)                                   # 最新一期股东人数
+    individual_holder_count = Column(Integer)                        # 自然人股东人数（所有报告期）
+    refreshed_at = Column(DateTime)                                  # 刷新时间 (UTC)
+
+    def __repr__(self):
+        return f"<TickerHolderSummary(ts_code='{self.ts_code}', holder_count={self.holder_count}, individual_holder_count={self.individual_holder_count})>"
+
+class HolderTickerCount(Base):
+    __tablename__ = 'holder_ticker_counts'
+    __table_args__ = (Index('uq_holder_ticker_counts_holder_name', 'holder_name', unique=True),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    holder_name = Column(String(100), nullable=False)                # 自然人股东名称
+    ticker_count = Column(Integer)                                   # 持有的股票数
+    refreshed_at = Column(DateTime)                                  # 刷新时间 (UTC)
+
+    def __repr__(self):
+        return f"<HolderTickerCount(holder_name='{self.holder_name}', ticker_count={self.ticker_count})>"
+
+class SchemaVersion(Base):
+    __tablename__ = 'schema_version'
+
+    version = Column(Integer, primary_key=True, autoincrement=False)  # 迁移版本号
+    name = Column(String(100), nullable=False)                       # 迁移说明
+    applied_at = Column(DateTime, default=datetime.utcnow)           # 执行时间 (UTC)
+
+    def __repr__(self):
+        return f"<SchemaVersion(version={self.version}, name='{self.name}')>"
+
+# Tables whose rows are upserted on a natural key by incremental syncs
+NATURAL_KEY_MODELS = [
+    Ticker, TopHolder, HmList, HmDetail, BalanceSheet, CashFlow, IncomeStatement, FinaIndicator,
+    DailyBasic, ThsHot, DcHot, Daily, AdjFactor, Dividend, IndexDaily,
+]
+
+def natural_key(model):
+    """Columns of the model's natural-key unique index, e.g. ('ts_code', 'trade_date')"""
+    for index in model.__table__.indexes:
+        if index.unique and index.name.startswith('uq_'):
+            return tuple(column.name for column in index.columns)
+    return None
+
 # Database setup
+# Seconds a SQLite connection waits for another writer's lock before failing
+SQLITE_BUSY_TIMEOUT = int(os.getenv('SQLITE_BUSY_TIMEOUT', 300))
+
+def _configure_sqlite(dbapi_connection, connection_record):
+    # WAL lets readers proceed while one of the parallel table updates writes
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.close()
+
 def get_engine():
     database_url = os.getenv('DATABASE_URL', 'sqlite:///database/insightofstock.db')
-    engine = create_engine(database_url)
+    if database_url.startswith('sqlite'):
+        engine = create_engine(database_url, connect_args={'timeout': SQLITE_BUSY_TIMEOUT})
+        event.listen(engine, 'connect', _configure_sqlite)
+    else:
+        engine = create_engine(database_url)
     return engine
 
+def _missing_natural_keys(conn):
+    """(table, index) pairs of NATURAL_KEY_MODELS whose unique index the database lacks"""
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for model in NATURAL_KEY_MODELS:
+        table = model.__table__
+        if table.name not in existing_tables:
+            continue
+        existing = {ix['name'] for ix in inspector.get_indexes(table.name)}
+        missing.extend((table, index) for index in table.indexes if index.unique and index.name not in existing)
+    return missing
+
+def _obsolete_natural_keys(conn):
+    """Names of uq_ indexes on NATURAL_KEY_MODELS tables that the models no longer define"""
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    obsolete = []
+    for model in NATURAL_KEY_MODELS:
+        table = model.__table__
+        if table.name not in existing_tables:
+            continue
+        defined = {index.name for index in table.indexes}
+        obsolete.extend(
+            ix['name'] for ix in inspector.get_indexes(table.name)
+            if ix['name'].startswith('uq_') and ix['name'] not in defined
+        )
+    return obsolete
+
+def natural_key_problems(engine=None):
+    """
+    Natural-key indexes the database lacks, and obsolete ones it still has.
+    Loaders cannot upsert until scripts/maintain_db.py has fixed them.
+
+    Returns:
+        list: 'table.index' names, e.g. 'daily.uq_daily_ts_code_trade_date (missing)'
+    """
+    engine = engine or get_engine()
+    with engine.connect() as conn:
+        problems = [f"{table.name}.{index.name} (missing)" for table, index in _missing_natural_keys(conn)]
+        problems.extend(f"{index_name} (obsolete)" for index_name in _obsolete_natural_keys(conn))
+    return problems
+
+def count_duplicates(engine=None):
+    """
+    Rows ensure_natural_keys() would delete, per table still lacking its
+    natural-key index.
+
+    Returns:
+        dict: table name -> number of duplicate rows
+    """
+    engine = engine or get_engine()
+    counts = {}
+    with engine.connect() as conn:
+        for table, index in _missing_natural_keys(conn):
+            key_columns = ', '.join(column.name for column in index.columns)
+            not_null = ' AND '.join(f"{column.name} IS NOT NULL" for column in index.columns)
+            counts[table.name] = conn.execute(text(f"""
+                SELECT COALESCE(SUM(n - 1), 0) FROM (
+                    SELECT COUNT(*) AS n FROM {table.name} WHERE {not_null} GROUP BY {key_columns}
+                ) AS key_groups
+            """)).scalar()
+    return counts
+
+def ensure_natural_keys(engine=None):
+    """
+    Add the natural-key unique indexes of NATURAL_KEY_MODELS to databases
+    created before they existed. Duplicate rows are removed first, keeping
+    the most recently inserted one; as in the index, rows with a NULL key
+    column are never duplicates. Natural-key indexes the models have since
+    replaced are dropped.
+
+    Returns:
+        list: names of the indexes that were created
+    """
+    engine = engine or get_engine()
+    created = []
+    with engine.begin() as conn:
+        for table, index in _missing_natural_keys(conn):
+            key_columns = ', '.join(column.name for column in index.columns)
+            not_null = ' AND '.join(f"{column.name} IS NOT NULL" for column in index.columns)
+            conn.execute(text(f"""
+                DELETE FROM {table.name}
+                WHERE {not_null}
+                AND id NOT IN (SELECT MAX(id) FROM {table.name} WHERE {not_null} GROUP BY {key_columns})
+            """))
+            index.create(conn)
+            created.append(index.name)
+        for index_name in _obsolete_natural_keys(conn):
+            conn.execute(text(f"DROP INDEX {index_name}"))
+    return created
+
+def add_missing_columns(engine=None, dry_run=False):
+    """
+    Add columns defined in the models but missing from existing tables
+    (create_all only creates whole tables). New columns are added as
+    nullable, without their defaults.
+
+    Returns:
+        list: 'table.column' names that were (or with dry_run would be) added
+    """
+    engine = engine or get_engine()
+    added = []
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        existing_tables = set(inspector.get_table_names())
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                added.append(f"{table.name}.{column.name}")
+                if dry_run:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}'))
+    return added
+
 def create_tables():
     engine = get_engine()
     
     # Create all tables
     Base.metadata.create_all(engine)
+    add_missing_columns(engine)
     
-    # Create individual holder tickers view
-    with engine.connect() as conn:
-        conn.execute(text("""
-            CREATE VIEW IF NOT EXISTS individual_holder_tickers AS
-            SELECT 
-                holder_name,
-                COUNT(DISTINCT ts_code) as ticker_count
-            FROM top_holders 
-            WHERE holder_type = '自然人' 
-            GROUP BY holder_name
-            HAVING ticker_count>=2 
-            ORDER BY ticker_count DESC
-        """))
-        
-        # Create tickers with multiple holders view (individual shareholders only)
-        conn.execute(text("""
-            CREATE VIEW IF NOT EXISTS tickers_with_multiple_holders AS
-            SELECT 
-                ts_code, 
-                COUNT(DISTINCT holder_name) as holder_count 
-            FROM top_holders 
-            WHERE holder_type = '自然人' 
-            GROUP BY ts_code
-            HAVING holder_count>=2 
-            ORDER BY holder_count DESC
-        """))
-        conn.execute(text("""
-            CREATE VIEW IF NOT EXISTS recent_hot_stocks AS
-            SELECT 
-                trade_date, 
-                ts_code, 
-                ts_name, 
-                'THS' AS Security_name 
-            FROM ths_hot 
-            WHERE data_type='热股' AND date(substr(trade_date,1,4)||'-'||substr(trade_date,5,2)||'-'||substr(trade_date,7,2))>=date('now','-7 days')
-            UNION
-            SELECT 
-                trade_date, 
-                ts_code,
-                ts_name, 
-                'DC' AS Security_name 
-            FROM dc_hot 
-            WHERE data_type='A股市场' AND date(substr(trade_date,1,4)||'-'||substr(trade_date,5,2)||'-'||substr(trade_date,7,2))>=date('now','-7 days');
-        """))
-        conn.commit()
+    # Query-path indexes, views and the holder aggregates
+    from services.migrations import migrate
+    migrate(engine)
     
     return engine
 
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+ETL throughput benchmark against the offline Tushare stand-in
+
+Runs update_*_data functions from update_data.py on a scratch SQLite
+database with TushareService pointed at FakeProApi, and reports API calls,
+rows, wall time, rows/s and peak RSS per table. No network or quota needed:
+
+    python scripts/benchmark_etl.py --tickers 500 --latency 0.05
+    python scripts/benchmark_etl.py -t daily -t adj_factor --mode date --json bench.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class RssSampler:
+    """Samples RSS on a background thread to find the peak while a table runs"""
+
+    def __init__(self, interval=0.05):
+        from services.memory_guard import current_rss_mb
+        self.current_rss_mb = current_rss_mb
+        self.interval = interval
+        self.peak = 0.0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self.stopped.is_set():
+            self.peak = max(self.peak, self.current_rss_mb())
+            self.stopped.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = self.current_rss_mb()
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.thread.join()
+        self.peak = max(self.peak, self.current_rss_mb())
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark update_data.py loaders against a fake Tushare API')
+    parser.add_argument('--table', '-t', action='append', dest='tables',
+                        help='Table to benchmark (repeatable); default: all, in dependency order')
+    parser.add_argument('--tickers', type=int, default=200, help='Size of the synthetic ticker universe')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds each fake API call takes')
+    parser.add_argument('--quota-error-rate', type=float, default=0.0, help='Probability a call hits the quota error')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Probability a call times out (retried, then recorded as a failed unit)')
+    parser.add_argument('--calls-per-minute', type=int, default=60000,
+                        help='Rate limiter budget per endpoint (500 models the real quota)')
+    parser.add_argument('--concurrency', '-c', type=int, help='Requests in flight for per-ticker tables')
+    parser.add_argument('--workers', '-w', type=int, default=1, help='Fetch processes for per-ticker tables, as update_data.py --workers')
+    parser.add_argument('--mode', '-m', choices=['ticker', 'date'], default='ticker')
+    parser.add_argument('--days', type=int, help='Look-back window for date-ranged tables')
+    parser.add_argument('--incremental', action='store_true', help='Sync from the stored watermarks as update_data.py --incremental')
+    parser.add_argument('--fields', action='append', metavar='[TABLE=]PROFILE',
+                        help="Statement field profile as in update_data.py, e.g. core or balance_sheets=core")
+    parser.add_argument('--stage', metavar='DIR', help='Stage fetched rows as Parquet under DIR, as update_data.py --stage')
+    parser.add_argument('--database', help='SQLite file to load into (default: a temporary file)')
+    parser.add_argument('--http', action='store_true',
+                        help='Serve the fake API over HTTP from a local stub server and use the async client')
+    parser.add_argument('--recordings', help='Response cache directory to replay instead of synthetic data')
+    parser.add_argument('--json', help='Write the results to this file as JSON')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    database = args.database or os.path.join(tempfile.mkdtemp(prefix='etl_bench_'), 'bench.db')
+
+    # Configure before anything reads the environment
+    os.environ['DATABASE_URL'] = f"sqlite:///{database}"
+    os.environ['TUSHARE_API'] = 'fake'
+    os.environ['TUSHARE_FAKE_TICKERS'] = str(args.tickers)
+    # Over --http the stub server adds the latency without holding a thread
+    os.environ['TUSHARE_FAKE_LATENCY'] = '0' if args.http else str(args.latency)
+    os.environ['TUSHARE_FAKE_QUOTA_ERROR_RATE'] = str(args.quota_error_rate)
+    os.environ['TUSHARE_FAKE_ERROR_RATE'] = str(args.error_rate)
+    os.environ['TUSHARE_CALLS_PER_MINUTE'] = str(args.calls_per_minute)
+    os.environ.pop('TUSHARE_CACHE_DIR', None)
+    if args.recordings:
+        os.environ['TUSHARE_FAKE_RECORDINGS'] = args.recordings
+    if args.stage:
+        os.environ['ETL_STAGING_DIR'] = args.stage
+
+    from sqlalchemy import text
+    from models import create_tables, get_session, LastDayQuarter
+    from services.fake_tushare import get_fake_pro_api
+    from services.async_tushare import close_async_pro_api
+    from services.rate_limiter import get_rate_limiter
+    from utils.date_utils import get_latest_quarter_end_date
+    import update_data
+
+    stub = None
+    if args.http:
+        from services.tushare_stub_server import StubServer
+        stub = StubServer(get_fake_pro_api(), latency=args.latency)
+        os.environ['TUSHARE_API'] = 'async'
+        os.environ['TUSHARE_TOKEN'] = 'stub'
+        os.environ['TUSHARE_HTTP_URL'] = stub.start_in_thread()
+
+    update_data.ETL_OPTIONS['mode'] = args.mode
+    update_data.ETL_OPTIONS['days'] = args.days
+    update_data.ETL_OPTIONS['incremental'] = args.incremental
+    update_data.ETL_OPTIONS['stage'] = bool(args.stage)
+    update_data.ETL_OPTIONS['workers'] = max(1, args.workers)
+    update_data.ETL_OPTIONS['fields'] = update_data.parse_field_profiles(args.fields)
+    if args.concurrency:
+        update_data.ETL_OPTIONS['concurrency'] = args.concurrency
+
+    create_tables()
+    session = get_session()
+    session.add(LastDayQuarter(end_date=get_latest_quarter_end_date()))
+    session.commit()
+
+    tables = args.tables or list(update_data.UPDATE_FUNCTIONS)
+    fake = get_fake_pro_api()
+    # Counts the calls of --workers shard processes too, which the in-process fake does not see
+    limiter = get_rate_limiter()
+    print(f"Benchmarking {len(tables)} table(s): {args.tickers} tickers, {args.latency}s latency, "
+          f"{args.calls_per_minute} calls/min, mode={args.mode}, api={'http ' + stub.url if stub else 'in-process'}, "
+          f"database={database}\n")
+
+    results = []
+    for table in tables:
+        calls_before = limiter.calls
+        rows_before = session.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+        with RssSampler() as sampler:
+            started = time.perf_counter()
+            success, message = update_data.UPDATE_FUNCTIONS[table]()
+            wall = time.perf_counter() - started
+        rows = session.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar() - rows_before
+        results.append({
+            'table': table,
+            'success': success,
+            'api_calls': limiter.calls - calls_before,
+            'rows': rows,
+            'wall_seconds': round(wall, 3),
+            'rows_per_second': round(rows / wall, 1) if wall > 0 else 0.0,
+            'peak_rss_mb': round(sampler.peak, 1),
+            'message': message,
+        })
+    session.close()
+
+    print(f"\n{'table':<18} {'calls':>7} {'rows':>9} {'wall s':>8} {'rows/s':>10} {'peak MB':>8}  status")
+    for result in results:
+        status = 'ok' if result['success'] else f"FAILED: {result['message']}"
+        print(f"{result['table']:<18} {result['api_calls']:>7} {result['rows']:>9} {result['wall_seconds']:>8.2f} "
+              f"{result['rows_per_second']:>10.0f} {result['peak_rss_mb']:>8.0f}  {status}")
+    total_wall = sum(result['wall_seconds'] for result in results)
+    total_rows = sum(result['rows'] for result in results)
+    print(f"{'total':<18} {sum(r['api_calls'] for r in results):>7} {total_rows:>9} {total_wall:>8.2f} "
+          f"{(total_rows / total_wall if total_wall else 0):>10.0f}")
+    print(f"\nFake API: {fake.summary()}")
+    close_async_pro_api()
+    if stub:
+        stub.stop_thread()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'settings': vars(args), 'results': results}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+    return all(result['success'] for result in results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Per-table trends of the ETL run metrics that update_data.py records in
+etl_run_metrics, flagging tables whose latest run regressed
+
+    python scripts/etl_report.py                    # last 10 runs of every table
+    python scripts/etl_report.py -t daily --runs 30
+    python scripts/etl_report.py --threshold 2      # flag only 2x slowdowns
+    python scripts/etl_report.py --run-list         # the runs themselves
+"""
+import argparse
+import statistics
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Base, get_engine, get_session, EtlRun, EtlRunMetric
+
+# Previous runs a table needs before its latest run is compared with them
+MIN_BASELINE_RUNS = 3
+
+def table_history(session, table_name, runs):
+    """The table's last `runs` successful runs, oldest first"""
+    rows = (
+        session.query(EtlRunMetric)
+        .filter(EtlRunMetric.table_name == table_name, EtlRunMetric.success == 1)
+        .order_by(EtlRunMetric.started_at.desc())
+        .limit(runs)
+        .all()
+    )
+    return list(reversed(rows))
+
+def regressions(history, threshold):
+    """
+    Ways the latest run is worse than the median of the runs before it:
+    slower by more than `threshold` times, or processing rows more than
+    `threshold` times slower.
+
+    Returns:
+        list: descriptions, empty if there is no regression or too little history
+    """
+    if len(history) <= MIN_BASELINE_RUNS:
+        return []
+    latest, baseline = history[-1], history[:-1]
+    found = []
+    duration = statistics.median(metric.duration_seconds or 0.0 for metric in baseline)
+    if duration > 0 and (latest.duration_seconds or 0.0) > duration * threshold:
+        found.append(f"took {latest.duration_seconds:.1f}s vs median {duration:.1f}s")
+    rate = statistics.median(metric.rows_per_second or 0.0 for metric in baseline)
+    if rate > 0 and (latest.rows_per_second or 0.0) < rate / threshold:
+        found.append(f"{latest.rows_per_second:.0f} rows/s vs median {rate:.0f}")
+    throttle = statistics.median(metric.throttle_seconds or 0.0 for metric in baseline)
+    if (latest.throttle_seconds or 0.0) > max(throttle, 1.0) * threshold:
+        found.append(f"throttled {latest.throttle_seconds:.1f}s vs median {throttle:.1f}s")
+    return found
+
+def print_history(table_name, history):
+    print(f"\n{table_name}")
+    print(f"  {'started (UTC)':<17} {'time':>8} {'calls':>6} {'retry':>5} {'throttle':>8} {'rows':>9} {'changed':>8} {'rows/s':>8} {'RSS MB':>7} {'failed':>6}")
+    for metric in history:
+        changed = (metric.rows_inserted or 0) + (metric.rows_updated or 0)
+        print(
+            f"  {metric.started_at:%Y-%m-%d %H:%M} {metric.duration_seconds:>7.1f}s {metric.api_calls:>6} "
+            f"{metric.retries:>5} {metric.throttle_seconds:>7.1f}s {metric.rows:>9} {changed:>8} "
+            f"{metric.rows_per_second:>8.0f} {metric.peak_rss_mb:>7.0f} {metric.failed_units:>6}"
+        )
+
+def print_runs(session, runs):
+    for run in session.query(EtlRun).order_by(EtlRun.started_at.desc()).limit(runs):
+        print(
+            f"#{run.id:<5} {run.started_at:%Y-%m-%d %H:%M} {run.duration_seconds:>8.1f}s "
+            f"{run.succeeded:>3} ok {run.failed:>3} failed {run.api_calls:>7} calls "
+            f"{run.throttle_seconds:>7.1f}s throttle {run.peak_rss_mb:>6.0f} MB  {run.command or ''}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description='Show ETL run metrics per table and flag regressions')
+    parser.add_argument('--table', '-t', action='append', dest='tables', help='Table to report (repeatable, default all)')
+    parser.add_argument('--runs', '-n', type=int, default=10, help='Runs to show per table')
+    parser.add_argument('--threshold', type=float, default=1.5,
+                        help='Flag the latest run when it is this many times worse than the median of the ones before')
+    parser.add_argument('--run-list', action='store_true', help='List the recent runs instead of per-table history')
+    args = parser.parse_args()
+
+    Base.metadata.create_all(get_engine())
+    session = get_session()
+    try:
+        if args.run_list:
+            print_runs(session, args.runs)
+            return True
+        tables = args.tables or [
+            row[0] for row in session.query(EtlRunMetric.table_name).distinct().order_by(EtlRunMetric.table_name)
+        ]
+        if not tables:
+            print("No run metrics recorded yet; they are saved by every update_data.py run")
+            return True
+        flagged = {}
+        for table_name in tables:
+            history = table_history(session, table_name, args.runs)
+            if not history:
+                continue
+            print_history(table_name, history)
+            found = regressions(history, args.threshold)
+            if found:
+                flagged[table_name] = found
+        print()
+        if not flagged:
+            print(f"✅ No regressions beyond {args.threshold}x the median of previous runs")
+        for table_name, found in flagged.items():
+            print(f"⚠️  {table_name}: latest run {'; '.join(found)}")
+        return not flagged
+    finally:
+        session.close()
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Load tables from the Parquet staging area written by update_data.py --stage,
+without calling Tushare
+
+    python scripts/load_staging.py --list
+    python scripts/load_staging.py -t daily                     # upsert everything staged
+    python scripts/load_staging.py -t daily --from 20250101 --to 20250630 --replace
+    python scripts/load_staging.py --all --replace              # rebuild after a schema change
+    python scripts/load_staging.py -t daily --compact           # merge part files per partition
+"""
+import argparse
+import sys
+import os
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Base, get_engine, get_session, add_missing_columns, natural_key, NATURAL_KEY_MODELS
+from services.bulk_writer import BulkWriter, DEFAULT_CHUNK_SIZE
+from services.staging import get_staging_area, STAGING_PARTITIONS, ALL_PARTITION, EMPTY_PARTITION
+from services.holder_aggregates import refresh_holder_aggregates
+
+MODELS = {model.__tablename__: model for model in NATURAL_KEY_MODELS}
+
+# Rows loaded between commits
+COMMIT_ROWS = 50000
+
+def select_partitions(staging, table_name, start=None, end=None):
+    """Staged partitions of a table within [start, end] (partition values compare as strings)"""
+    return [
+        partition for partition in staging.partitions(table_name)
+        if (not start or partition >= start) and (not end or partition <= end)
+    ]
+
+def delete_partition(session, model, table_name, partition):
+    """Delete the database rows a staged partition covers"""
+    column_name = STAGING_PARTITIONS.get(table_name)
+    query = session.query(model)
+    if column_name and partition != ALL_PARTITION:
+        column = getattr(model, column_name)
+        if partition == EMPTY_PARTITION:
+            query = query.filter((column.is_(None)) | (column == ''))
+        else:
+            query = query.filter(column == partition)
+    return query.delete(synchronize_session=False)
+
+def load_table(staging, table_name, start=None, end=None, replace=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Upsert a table's staged rows into the database, partition by partition,
+    committing about every COMMIT_ROWS rows. Rows update only the columns
+    they were fetched with. With replace each partition's existing rows are
+    deleted first, so the table ends up exactly as staged.
+
+    Returns:
+        tuple: (success, message)
+    """
+    model = MODELS[table_name]
+    partitions = select_partitions(staging, table_name, start, end)
+    if not partitions:
+        return False, f"Nothing staged for {table_name}"
+
+    session = get_session()
+    try:
+        # Replaced partitions are empty, so there are no stored hashes to compare with
+        writer = BulkWriter(session, model, chunk_size, upsert_keys=natural_key(model), skip_unchanged=not replace)
+        deleted = 0
+        committed = 0
+        for partition in partitions:
+            if replace:
+                deleted += delete_partition(session, model, table_name, partition)
+            for rows in staging.read(table_name, [partition]):
+                if rows and writer.buffer and rows[0].keys() != writer.buffer[-1].keys():
+                    # Files fetched with other columns: one executemany takes one set of columns
+                    writer.flush()
+                writer.extend(rows)
+            if writer.processed + len(writer.buffer) - committed >= COMMIT_ROWS:
+                writer.flush()
+                session.commit()
+                committed = writer.processed
+        writer.flush()
+        if table_name == 'top_holders':
+            # Staged rows keep their fetch-time updated_date and --replace deletes rows, so recount everything
+            refresh_holder_aggregates(session.connection(), full=True)
+        session.commit()
+        message = f"Loaded {writer.processed} rows from {len(partitions)} partitions ({writer.changes()})"
+        if replace:
+            message += f", {deleted} rows replaced"
+        return True, message
+    except Exception as e:
+        session.rollback()
+        return False, f"Error loading {table_name}: {e}"
+    finally:
+        session.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Load tables from the Parquet staging area')
+    parser.add_argument('--table', '-t', action='append', dest='tables', choices=sorted(MODELS),
+                        help='Table to load (repeatable)')
+    parser.add_argument('--all', '-a', action='store_true', help='Every table with staged files')
+    parser.add_argument('--from', dest='start', help='First partition (trade_date or end_date) to load')
+    parser.add_argument('--to', dest='end', help='Last partition to load')
+    parser.add_argument('--replace', action='store_true',
+                        help='Delete the rows of each loaded partition first, so the table matches the staged data')
+    parser.add_argument('--compact', action='store_true',
+                        help='Merge each partition into one file, keeping the last version of every key, instead of loading')
+    parser.add_argument('--list', action='store_true', help='Show what is staged and exit')
+    parser.add_argument('--staging-dir', help='Staging root (default: ETL_STAGING_DIR or database/staging)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Rows per bulk insert batch')
+    args = parser.parse_args()
+
+    staging = get_staging_area(args.staging_dir)
+    staged_tables = [table_name for table_name in MODELS if staging.partitions(table_name)]
+
+    if args.list:
+        if not staged_tables:
+            print(f"Nothing staged in {staging.root}")
+        for table_name in staged_tables:
+            partitions, files, rows, size = staging.summary(table_name)
+            print(f"{table_name:<18} {partitions:>6} partitions {files:>7} files {rows:>10} rows {size / 1024 / 1024:>9.1f} MB")
+        return True
+
+    tables = staged_tables if args.all else (args.tables or [])
+    if not tables:
+        parser.error('give --table, --all or --list')
+
+    ok = True
+    if args.compact:
+        for table_name in tables:
+            partitions = select_partitions(staging, table_name, args.start, args.end)
+            compacted, removed = staging.compact(table_name, natural_key(MODELS[table_name]), partitions)
+            print(f"✅ {table_name}: compacted {compacted} partitions ({removed} files merged)")
+        return ok
+
+    Base.metadata.create_all(get_engine())
+    add_missing_columns()
+    for table_name in tables:
+        started = time.perf_counter()
+        success, message = load_table(staging, table_name, args.start, args.end, args.replace, args.chunk_size)
+        if success:
+            print(f"✅ {table_name}: {message} in {time.perf_counter() - started:.1f}s")
+        else:
+            print(f"❌ {table_name}: {message}")
+            ok = False
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Database maintenance: bring an existing database up to the current models
+
+- adds columns defined in models.py but missing from existing tables
+- removes duplicate rows (keeping the most recently inserted one) and adds
+  the natural-key unique indexes every loader upserts on
+
+    python scripts/maintain_db.py --dry-run   # report only
+    python scripts/maintain_db.py --vacuum    # also reclaim space (SQLite)
+"""
+import argparse
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from models import get_engine, add_missing_columns, count_duplicates, ensure_natural_keys
+
+def maintain_database(dry_run=False, vacuum=False):
+    """Report, and unless dry_run fix, missing columns and duplicate natural keys"""
+    try:
+        engine = get_engine()
+        columns = add_missing_columns(engine, dry_run=True)
+        duplicates = count_duplicates(engine)
+
+        print(f"Missing columns: {', '.join(columns) if columns else 'none'}")
+        if duplicates:
+            for table_name, count in duplicates.items():
+                print(f"{table_name}: no natural-key index, {count} duplicate rows")
+        else:
+            print("All natural-key indexes present")
+
+        if dry_run:
+            print("Dry run: nothing changed")
+            return True
+
+        for column_name in add_missing_columns(engine):
+            print(f"✅ Added column {column_name}")
+        for index_name in ensure_natural_keys(engine):
+            print(f"✅ Created unique index {index_name}")
+        removed = sum(duplicates.values())
+        if removed:
+            print(f"✅ Removed {removed} duplicate rows")
+
+        if vacuum and engine.dialect.name == 'sqlite':
+            with engine.connect() as conn:
+                conn.execution_options(isolation_level='AUTOCOMMIT').execute(text("VACUUM"))
+            print("✅ Database vacuumed")
+
+    except Exception as e:
+        print(f"❌ Error maintaining database: {e}")
+        return False
+
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Add missing columns, remove duplicates and add natural-key indexes')
+    parser.add_argument('--dry-run', action='store_true', help='Only report what would change')
+    parser.add_argument('--vacuum', action='store_true', help='Run VACUUM afterwards to reclaim space (SQLite)')
+    args = parser.parse_args()
+    sys.exit(0 if maintain_database(args.dry_run, args.vacuum) else 1)
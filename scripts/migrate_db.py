@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Apply the versioned schema migrations (query-path indexes and views) to an
+existing database in place, and check that the web app's queries use them
+
+    python scripts/migrate_db.py              # apply pending migrations
+    python scripts/migrate_db.py --status     # applied and pending versions
+    python scripts/migrate_db.py --dry-run    # list what would be applied
+    python scripts/migrate_db.py --explain    # verify the hot query plans
+"""
+import argparse
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import get_engine
+from services.migrations import migrate, schema_status, check_query_plans
+
+def print_status(engine):
+    for version, name, applied_at in schema_status(engine):
+        state = f"applied {applied_at}" if applied_at else "pending"
+        print(f"{version:>4}  {name:<62} {state}")
+
+def explain(engine, verbose=False):
+    """Print each hot query's plan check; returns whether all use their index"""
+    if engine.dialect.name != 'sqlite':
+        print("❌ Query plan checks use SQLite's EXPLAIN QUERY PLAN")
+        return False
+    ok = True
+    for label, index_name, uses_index, plan in check_query_plans(engine):
+        if uses_index:
+            print(f"✅ {label}: {index_name}")
+        else:
+            print(f"❌ {label}: expected {index_name}")
+            ok = False
+        if verbose or not uses_index:
+            for line in plan:
+                print(f"     {line}")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply schema migrations and verify query plans')
+    parser.add_argument('--status', action='store_true', help='Show applied and pending migrations')
+    parser.add_argument('--dry-run', action='store_true', help='Only list the pending migrations')
+    parser.add_argument('--explain', action='store_true', help='Check that the hot queries use their indexes')
+    parser.add_argument('--verbose', '-v', action='store_true', help='With --explain, print every plan')
+    args = parser.parse_args()
+
+    try:
+        engine = get_engine()
+        if args.status:
+            print_status(engine)
+            return True
+        if args.explain:
+            return explain(engine, args.verbose)
+
+        applied = migrate(engine, dry_run=args.dry_run)
+        if not applied:
+            print("✅ Schema is up to date")
+        for migration in applied:
+            prefix = "Would apply" if args.dry_run else "✅ Applied"
+            print(f"{prefix} migration {migration.version}: {migration.name}")
+        return True
+    except Exception as e:
+        print(f"❌ Error migrating database: {e}")
+        return False
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,180 @@
+"""
+Asyncio client for the Tushare HTTP API over a pooled keep-alive session (TUSHARE_API=async)
+"""
+import asyncio
+import atexit
+import os
+import threading
+from functools import partial
+
+import pandas as pd
+
+from services.rate_limiter import parse_rate_limits
+
+try:
+    import aiohttp
+except ImportError:  # only needed with TUSHARE_API=async
+    aiohttp = None
+
+DEFAULT_HTTP_URL = 'http://api.waditu.com/dataapi'
+
+DEFAULT_TIMEOUT = 30
+
+# Connections kept open to the API host
+DEFAULT_MAX_CONNECTIONS = 32
+
+# Requests in flight per endpoint unless TUSHARE_ENDPOINT_LIMITS says otherwise
+DEFAULT_ENDPOINT_LIMIT = 16
+
+# Seconds an idle pooled connection is kept alive
+KEEPALIVE_SECONDS = 60
+
+
+class TushareApiError(Exception):
+    """A Tushare response with a non-zero code; the message is Tushare's msg"""
+
+    def __init__(self, code, msg):
+        super().__init__(msg)
+        self.code = code
+
+
+class AsyncTushareClient:
+    """
+    Tushare's HTTP protocol (one JSON POST per call to <url>/<api_name>)
+    over a single aiohttp session. Its connector keeps up to max_connections
+    connections alive and reuses them, and a semaphore per endpoint bounds
+    the requests in flight to that endpoint, so thousands of queries can be
+    awaited together on one event loop. Cancelling a task awaiting query()
+    aborts its request and releases its slots.
+
+    Usage:
+        async with AsyncTushareClient(token) as client:
+            frames = await asyncio.gather(*(client.query('daily', ts_code=code) for code in codes))
+    """
+
+    def __init__(self, token, url=DEFAULT_HTTP_URL, timeout=DEFAULT_TIMEOUT, max_connections=DEFAULT_MAX_CONNECTIONS,
+                 endpoint_limits=None, default_endpoint_limit=DEFAULT_ENDPOINT_LIMIT):
+        if aiohttp is None:
+            raise RuntimeError("The async Tushare client needs aiohttp: pip install aiohttp")
+        self.token = token
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.endpoint_limits = endpoint_limits or {}
+        self.default_endpoint_limit = default_endpoint_limit
+        self.session = None
+        self.semaphores = {}
+        self.requests = 0
+
+    def _semaphore(self, api_name):
+        if api_name not in self.semaphores:
+            self.semaphores[api_name] = asyncio.Semaphore(self.endpoint_limits.get(api_name, self.default_endpoint_limit))
+        return self.semaphores[api_name]
+
+    def _session(self):
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=KEEPALIVE_SECONDS)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self.session
+
+    async def query(self, api_name, fields='', **params):
+        """Call one endpoint and return its rows as a DataFrame, like pro_api().query()"""
+        payload = {'api_name': api_name, 'token': self.token, 'params': params, 'fields': fields}
+        async with self._semaphore(api_name):
+            self.requests += 1
+            async with self._session().post(f"{self.url}/{api_name}", json=payload) as response:
+                response.raise_for_status()
+                result = await response.json(content_type=None)
+        if result['code'] != 0:
+            raise TushareApiError(result['code'], result['msg'])
+        data = result.get('data') or {}
+        return pd.DataFrame(data.get('items') or [], columns=data.get('fields') or [])
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+class AsyncProApi:
+    """
+    pro_api-compatible facade over an AsyncTushareClient running on its own
+    event loop thread. TushareService calls `pro.daily(**params)` from its
+    fetch threads as before; each call only parks the calling thread while
+    the request is multiplexed with all others over the shared connection
+    pool. If the waiting thread is interrupted the request is cancelled.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='tushare-async', daemon=True)
+        self.thread.start()
+
+    def query(self, api_name, fields='', **params):
+        future = asyncio.run_coroutine_threadsafe(self.client.query(api_name, fields, **params), self.loop)
+        try:
+            return future.result()
+        except BaseException:
+            future.cancel()
+            raise
+
+    def __getattr__(self, api_name):
+        if api_name.startswith('_'):
+            raise AttributeError(api_name)
+        return partial(self.query, api_name)
+
+    def close(self):
+        """Close the pooled connections and stop the loop thread"""
+        if not self.thread.is_alive():
+            return
+        asyncio.run_coroutine_threadsafe(self.client.close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+_shared_api = None
+_shared_lock = threading.Lock()
+
+
+def get_async_pro_api(token):
+    """
+    Return the process-wide AsyncProApi, so every TushareService shares one
+    connection pool. Configured from the environment:
+
+        TUSHARE_HTTP_URL              API base URL (http://api.waditu.com/dataapi)
+        TUSHARE_HTTP_TIMEOUT          seconds per request (30)
+        TUSHARE_HTTP_CONNECTIONS      pooled keep-alive connections (32)
+        TUSHARE_ENDPOINT_CONCURRENCY  requests in flight per endpoint (16)
+        TUSHARE_ENDPOINT_LIMITS       overrides, e.g. "daily=8,hm_detail=2"
+
+    It is closed by close_async_pro_api(), or at interpreter exit.
+    """
+    global _shared_api
+    with _shared_lock:
+        if _shared_api is None:
+            _shared_api = AsyncProApi(AsyncTushareClient(
+                token,
+                url=os.getenv('TUSHARE_HTTP_URL', DEFAULT_HTTP_URL),
+                timeout=float(os.getenv('TUSHARE_HTTP_TIMEOUT', DEFAULT_TIMEOUT)),
+                max_connections=int(os.getenv('TUSHARE_HTTP_CONNECTIONS', DEFAULT_MAX_CONNECTIONS)),
+                endpoint_limits=parse_rate_limits(os.getenv('TUSHARE_ENDPOINT_LIMITS', '')),
+                default_endpoint_limit=int(os.getenv('TUSHARE_ENDPOINT_CONCURRENCY', DEFAULT_ENDPOINT_LIMIT))
+            ))
+            atexit.register(close_async_pro_api)
+        return _shared_api
+
+
+def close_async_pro_api():
+    """Close the process-wide AsyncProApi, if one was created; the next get_async_pro_api() opens a new one"""
+    global _shared_api
+    with _shared_lock:
+        api, _shared_api = _shared_api, None
+    if api is not None:
+        api.close()
@@ -0,0 +1,181 @@
+"""
+Bulk insert of plain dict rows, bypassing the ORM unit of work
+"""
+import hashlib
+import time
+
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+
+from services.memory_guard import check_memory
+
+# Dialects whose INSERT supports ON CONFLICT DO UPDATE
+UPSERT_INSERTS = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert,
+}
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# Columns left out of a row's content hash: bookkeeping, not fetched data
+HASH_EXCLUDED_COLUMNS = ('id', 'updated_date', 'row_hash')
+
+# Natural keys looked up per query when comparing hashes (bounded by SQLite's bound-parameter limit)
+HASH_LOOKUP_BATCH = 1000
+
+
+def row_hash(row):
+    """
+    Content hash of a row's fetched fields, stored in its row_hash column.
+    NULL fields are left out, so a row read back from staging, which has
+    every column, hashes like the fetched row it came from.
+    """
+    content = sorted(
+        (key, value) for key, value in row.items() if value is not None and key not in HASH_EXCLUDED_COLUMNS
+    )
+    return hashlib.blake2b(repr(content).encode('utf-8'), digest_size=8).hexdigest()
+
+
+class BulkWriter:
+    """
+    Buffer rows for one table and insert them with a Core executemany in
+    fixed-size chunks. Writes go through the caller's session, so they share
+    its transaction with any deletes and are committed with session.commit().
+
+    Usage:
+        writer = BulkWriter(session, Daily)
+        writer.extend(rows)
+        writer.flush()
+        session.commit()
+
+    With upsert_keys, e.g. ('ts_code', 'trade_date'), rows are written with
+    INSERT ... ON CONFLICT DO UPDATE against the unique index on those
+    columns, so re-fetched rows overwrite the stored ones instead of
+    duplicating them.
+
+    With skip_unchanged as well, each row gets a content hash (row_hash)
+    and every chunk's hashes are compared with the stored ones in a few
+    keyed lookups; only new and changed rows are written. Refreshes that
+    mostly re-fetch what is stored then cost reads instead of writes, and
+    updated_date tells when a row last changed. Rows with a NULL key column
+    never conflict, so they are always inserted.
+    """
+
+    def __init__(self, session, model, chunk_size=DEFAULT_CHUNK_SIZE, upsert_keys=None, skip_unchanged=False):
+        self.session = session
+        self.table = model.__table__
+        self.columns = set(self.table.columns.keys())
+        self.chunk_size = chunk_size
+        self.upsert_keys = list(upsert_keys) if upsert_keys else None
+        self.skip_unchanged = bool(skip_unchanged and self.upsert_keys and 'row_hash' in self.columns)
+        self.buffer = []
+        # Rows written, and rows handled including the unchanged ones skipped
+        self.count = 0
+        self.processed = 0
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.dropped_keys = set()
+        self.started = time.perf_counter()
+
+    def add(self, row):
+        self.buffer.append(row)
+        if len(self.buffer) >= self.chunk_size:
+            self.flush()
+
+    def extend(self, rows):
+        for row in rows:
+            self.add(row)
+
+    def flush(self):
+        """Insert everything buffered so far"""
+        if not self.buffer:
+            return
+        rows = [self._clean(row) for row in self.buffer]
+        self.processed += len(rows)
+        if self.skip_unchanged:
+            rows = self._changed(rows)
+        if rows:
+            self.session.execute(self._statement(rows), rows)
+        self.count += len(rows)
+        self.buffer = []
+        check_memory()
+
+    def _changed(self, rows):
+        """Hash the rows and keep the new and changed ones; a key repeated in the chunk keeps its last row"""
+        latest = {}
+        unkeyed = []
+        for row in rows:
+            row['row_hash'] = row_hash(row)
+            key = tuple(row.get(column) for column in self.upsert_keys)
+            if None in key:
+                unkeyed.append(row)
+            else:
+                latest[key] = row
+        stored = self._stored_hashes(list(latest))
+        changed = []
+        for key, row in latest.items():
+            if key not in stored:
+                self.inserted += 1
+            elif stored[key] == row['row_hash']:
+                self.unchanged += 1
+                continue
+            else:
+                self.updated += 1
+            changed.append(row)
+        self.inserted += len(unkeyed)
+        return changed + unkeyed
+
+    def _stored_hashes(self, keys):
+        """natural key -> stored row_hash for the keys that exist (NULL for rows written before hashing)"""
+        key_columns = [self.table.c[column] for column in self.upsert_keys]
+        stored = {}
+        for start in range(0, len(keys), HASH_LOOKUP_BATCH):
+            batch = keys[start:start + HASH_LOOKUP_BATCH]
+            query = select(*key_columns, self.table.c.row_hash).where(tuple_(*key_columns).in_(batch))
+            for *key, stored_hash in self.session.execute(query):
+                stored[tuple(key)] = stored_hash
+        return stored
+
+    def _statement(self, rows):
+        if not self.upsert_keys:
+            return insert(self.table)
+        dialect = self.session.get_bind().dialect.name
+        if dialect not in UPSERT_INSERTS:
+            raise ValueError(f"Upsert is not supported on {dialect}")
+        statement = UPSERT_INSERTS[dialect](self.table)
+        update_columns = set(rows[0]) - set(self.upsert_keys) - {'id'}
+        return statement.on_conflict_do_update(
+            index_elements=self.upsert_keys,
+            set_={column: statement.excluded[column] for column in update_columns}
+        )
+
+    def _clean(self, row):
+        """Drop keys that have no column in the table (warns once per key)"""
+        extra = row.keys() - self.columns
+        if not extra:
+            return row
+        new_keys = extra - self.dropped_keys
+        if new_keys:
+            print(f"Ignoring fields without a column in {self.table.name}: {', '.join(sorted(new_keys))}")
+            self.dropped_keys |= new_keys
+        return {key: value for key, value in row.items() if key in self.columns}
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def rows_per_second(self):
+        """Rows handled per second, counting the unchanged rows that were skipped"""
+        elapsed = self.elapsed()
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+    def changes(self):
+        """e.g. '120 inserted, 35 updated, 9845 unchanged, 2571 rows/s' ('... rows/s' alone without skip_unchanged)"""
+        rate = f"{self.rows_per_second():.0f} rows/s"
+        if not self.skip_unchanged:
+            return rate
+        return f"{self.inserted} inserted, {self.updated} updated, {self.unchanged} unchanged, {rate}"
+
+    def summary(self):
+        """e.g. '5400 rows in 2.1s, 2571 rows/s'"""
+        return f"{self.count} rows in {self.elapsed():.1f}s, {self.rows_per_second():.0f} rows/s"
@@ -0,0 +1,130 @@
+"""
+Checkpoint ledger that makes long per-ticker ETL runs resumable
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import insert
+
+from models import EtlCheckpoint
+from services.failed_units import FailedUnits, failed_run
+
+# Units (tickers, trading days, players) between intermediate commits
+DEFAULT_COMMIT_EVERY = 200
+
+
+class Checkpoint:
+    """
+    Record which units of a table's run are finished and commit them in
+    chunks together with their rows, so an interrupted run loses at most
+    commit_every units of work.
+
+    A run is identified by (table_name, period), where period is whatever
+    fixes the run's scope, e.g. the report end_date or the trade_date
+    window. With resume=True the units already recorded for the same
+    period are skipped; otherwise (or when the period changed) the table's
+    ledger is cleared and the run starts from scratch, so a caller whose
+    period depends on today's date resumes with ledger_period() instead.
+    finish() clears the ledger once the run is complete. After each
+    intermediate commit the session is expunged, so nothing accumulates in
+    its identity map over a long run.
+
+    Units whose fetch failed are collected in checkpoint.failures instead of
+    being recorded. If there are any, finish() saves them to etl_failures
+    and keeps the ledger. With retry=True only the units recorded in
+    etl_failures for the same period are pending, so update_data.py
+    --retry-failed fetches exactly the failed units, without reloading what
+    did load; the caller passes the stored period, not today's.
+
+    Usage:
+        checkpoint = Checkpoint(session, writer, 'daily', period, resume)
+        for ts_code, rows in fetch_concurrently(checkpoint.pending(ts_codes), ..., failures=checkpoint.failures):
+            checkpoint.record(ts_code)
+            writer.extend(rows)
+        checkpoint.finish()
+    """
+
+    def __init__(self, session, writer, table_name, period='', resume=False, commit_every=DEFAULT_COMMIT_EVERY, retry=False):
+        self.session = session
+        self.writer = writer
+        self.table_name = table_name
+        self.period = period
+        self.commit_every = commit_every
+        self.recorded = 0
+        self.unflushed = []
+        self.failures = FailedUnits(session, table_name, period)
+        self.retry_units = None
+        if retry:
+            failed_period, units = failed_run(session, table_name)
+            self.retry_units = set(units) if failed_period == period else set()
+
+        ledger = self.session.query(EtlCheckpoint).filter(EtlCheckpoint.table_name == table_name)
+        self.done = {row.unit for row in ledger.filter(EtlCheckpoint.period == period)} if resume or retry else set()
+        if not self.done:
+            ledger.delete()
+
+    @property
+    def resuming(self):
+        """True when continuing a run that already committed work"""
+        return bool(self.done)
+
+    def pending(self, units):
+        """Units not finished by the interrupted run (or, retrying, the failed ones), in their original order"""
+        if self.retry_units is not None:
+            print(f"Retrying {self.table_name}: {len(self.retry_units)} units failed in {self.period or 'the previous run'}")
+            return [unit for unit in units if str(unit) in self.retry_units]
+        if self.done:
+            print(f"Resuming {self.table_name}: skipping {len(self.done)} units finished by the previous run")
+        return [unit for unit in units if unit not in self.done]
+
+    def record(self, unit):
+        """
+        Mark unit as finished in the current transaction. Call it before
+        adding the unit's rows: every commit_every units the work recorded
+        so far is flushed and committed, before this unit is added, so a
+        unit's ledger entry is always committed together with its rows.
+        Anything else the unit changes, such as deleting its stored rows
+        before a replace, must also come after record() and be limited to
+        the unit, so no commit publishes it ahead of the unit's rows.
+        """
+        if self.recorded and self.recorded % self.commit_every == 0:
+            self.commit()
+        self.unflushed.append({
+            'table_name': self.table_name,
+            'period': self.period,
+            'unit': str(unit),
+            'completed_at': datetime.now(timezone.utc),
+        })
+        self.recorded += 1
+
+    def commit(self):
+        """Write the buffered rows and ledger entries and commit them together"""
+        self.writer.flush()
+        if self.unflushed:
+            self.session.execute(insert(EtlCheckpoint.__table__), self.unflushed)
+            self.unflushed = []
+        self.session.commit()
+        self.session.expunge_all()
+
+    def finish(self):
+        """
+        Flush the remaining rows and commit the run. The ledger is cleared,
+        unless some units failed: then it is committed with the failures, to
+        be resumed.
+        """
+        self.failures.save()
+        if self.failures:
+            self.commit()
+            return
+        self.writer.flush()
+        self.unflushed = []
+        self.session.query(EtlCheckpoint).filter(EtlCheckpoint.table_name == self.table_name).delete()
+        self.session.commit()
+
+
+def ledger_period(session, table_name):
+    """
+    Period of the run a table's ledger belongs to, or None if it has none;
+    a Checkpoint clears the entries of other periods, so there is one
+    """
+    row = session.query(EtlCheckpoint.period).filter(EtlCheckpoint.table_name == table_name).first()
+    return row.period if row else None
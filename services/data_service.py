@@ -15,6 +15,9 @@ load_dotenv()
 # This assumes the database file is located at /Users/admin_gu/insightofstock/database/insightofstock.db
 os.environ['DATABASE_URL'] = 'sqlite:///database/insightofstock.db'
 
+# Holder pages list tickers with at least this many individual holders, and holders of at least this many tickers
+MIN_MULTIPLE_HOLDERS = 2
+
 app = Flask(__name__)
 
 # Handle subdirectory deployment
@@ -370,21 +373,21 @@ class DataService:
     def get_tickers_with_multiple_holders(self, min_holders, limit, offset):
         query = text("""
             SELECT 
-                tmh.ts_code,
+                s.ts_code,
                 t.symbol,
                 t.name,
                 t.area,
                 t.industry,
                 t.list_date,
-                tmh.holder_count
-            FROM tickers_with_multiple_holders tmh
-            JOIN tickers t ON tmh.ts_code = t.ts_code
-            WHERE tmh.holder_count >= :min_holders
-            ORDER BY tmh.holder_count DESC, t.name ASC
+                s.individual_holder_count
+            FROM ticker_holder_summary s
+            JOIN tickers t ON s.ts_code = t.ts_code
+            WHERE s.individual_holder_count >= :min_holders
+            ORDER BY s.individual_holder_count DESC, s.name ASC
             LIMIT :limit OFFSET :offset
         """)
         result = self.session.execute(query, {
-            'min_holders': min_holders,
+            'min_holders': max(min_holders, MIN_MULTIPLE_HOLDERS),
             'limit': limit,
             'offset': offset
         })
@@ -405,10 +408,10 @@ class DataService:
     def count_tickers_with_multiple_holders(self, min_holders):
         query = text("""
             SELECT COUNT(*) 
-            FROM tickers_with_multiple_holders
-            WHERE holder_count >= :min_holders
+            FROM ticker_holder_summary
+            WHERE individual_holder_count >= :min_holders
         """)
-        return self.session.execute(query, {'min_holders': min_holders}).scalar()
+        return self.session.execute(query, {'min_holders': max(min_holders, MIN_MULTIPLE_HOLDERS)}).scalar()
 
     def get_all_tickers_paginated(self, limit, offset):
         query = text("""
@@ -419,16 +422,10 @@ class DataService:
                 t.area,
                 t.industry,
                 t.list_date,
-                COUNT(DISTINCT h.holder_name) as holder_count,
-                MAX(h.end_date) as latest_holder_date
+                COALESCE(s.holder_count, 0) as holder_count,
+                s.latest_end_date as latest_holder_date
             FROM tickers t
-            LEFT JOIN top_holders h ON t.ts_code = h.ts_code 
-                AND h.end_date = (
-                    SELECT MAX(end_date) 
-                    FROM top_holders 
-                    WHERE ts_code = t.ts_code
-                )
-            GROUP BY t.ts_code, t.symbol, t.name, t.area, t.industry, t.list_date
+            LEFT JOIN ticker_holder_summary s ON t.ts_code = s.ts_code
             ORDER BY holder_count DESC, t.name ASC
             LIMIT :limit OFFSET :offset
         """)
@@ -582,20 +579,21 @@ class DataService:
     def count_individual_holder_tickers(self):
         count_query = text("""
             SELECT COUNT(*) 
-            FROM individual_holder_tickers
-            WHERE ticker_count >= 2
+            FROM holder_ticker_counts
+            WHERE ticker_count >= :min_tickers
         """)
-        return self.session.execute(count_query).scalar()
+        return self.session.execute(count_query, {'min_tickers': MIN_MULTIPLE_HOLDERS}).scalar()
 
     def get_individual_holder_tickers_paginated(self, limit, offset):
         query = text("""
             SELECT holder_name, ticker_count
-            FROM individual_holder_tickers
-            WHERE ticker_count >= 2
+            FROM holder_ticker_counts
+            WHERE ticker_count >= :min_tickers
             ORDER BY ticker_count DESC, holder_name ASC
             LIMIT :limit OFFSET :offset
         """)
         result = self.session.execute(query, {
+            'min_tickers': MIN_MULTIPLE_HOLDERS,
             'limit': limit,
             'offset': offset
         })
@@ -0,0 +1,116 @@
+"""
+Ledger of the units whose Tushare fetch failed, for reporting and re-driving them
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import func, insert
+
+from models import EtlFailure
+
+
+class FailedUnits:
+    """
+    Units (tickers, trading days) of one table's run whose fetch still failed
+    after the retries in TushareService. The loader carries on with the
+    other units; save() then replaces the table's entries in etl_failures
+    with this run's, so the ledger always lists what is still missing, and
+    an empty run clears it. Entries are written through the caller's
+    session, in the same commit as the rows that did load.
+
+    Usage:
+        failures = FailedUnits(session, 'daily', period)
+        for ts_code, rows in fetch_concurrently(ts_codes, fetch, failures=failures):
+            ...
+        failures.save()
+        session.commit()
+    """
+
+    def __init__(self, session, table_name, period=''):
+        self.session = session
+        self.table_name = table_name
+        self.period = period
+        self.entries = []
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __bool__(self):
+        return bool(self.entries)
+
+    @property
+    def units(self):
+        return [entry['unit'] for entry in self.entries]
+
+    def record(self, unit, error):
+        """Note a unit whose fetch raised a TushareError"""
+        self.entries.append({
+            'table_name': self.table_name,
+            'period': self.period,
+            'unit': str(unit),
+            'api_name': getattr(error, 'api_name', None),
+            'error_kind': getattr(error, 'kind', None),
+            'message': str(error)[:500],
+            'attempts': getattr(error, 'attempts', None),
+            'failed_at': datetime.now(timezone.utc),
+        })
+        print(f"Failed to fetch {self.table_name} for {unit}: {error}")
+
+    def earliest(self):
+        """Smallest failed unit, e.g. the first failed trading day"""
+        return min(self.units) if self.entries else None
+
+    def save(self):
+        """Replace the table's ledger entries with this run's failures; the caller commits"""
+        self.session.query(EtlFailure).filter(EtlFailure.table_name == self.table_name).delete()
+        if self.entries:
+            self.session.execute(insert(EtlFailure.__table__), self.entries)
+
+
+def failed_tables(session):
+    """Names of the tables with failed units on record"""
+    return [row[0] for row in session.query(EtlFailure.table_name).distinct().order_by(EtlFailure.table_name)]
+
+
+def failed_run(session, table_name):
+    """
+    Period and units of a table's failed units on record, for re-driving
+    them with update_data.py --retry-failed; save() keeps a single run's
+    entries per table, so there is one period.
+
+    Returns:
+        tuple: (period, units), or (None, []) if the table has no failures
+    """
+    entries = session.query(EtlFailure.period, EtlFailure.unit).filter(EtlFailure.table_name == table_name).order_by(EtlFailure.id).all()
+    if not entries:
+        return None, []
+    return entries[0].period, [entry.unit for entry in entries]
+
+
+def failure_report(session):
+    """
+    Failed units per table, for update_data.py --failures.
+
+    Returns:
+        list: dicts with table_name, period, count, error kinds, last failure time and a few sample units
+    """
+    report = []
+    grouped = (
+        session.query(EtlFailure.table_name, EtlFailure.period, func.count(EtlFailure.id), func.max(EtlFailure.failed_at))
+        .group_by(EtlFailure.table_name, EtlFailure.period)
+        .order_by(EtlFailure.table_name)
+    )
+    for table_name, period, count, failed_at in grouped:
+        entries = session.query(EtlFailure).filter(EtlFailure.table_name == table_name, EtlFailure.period == period)
+        kinds = {}
+        for entry in entries:
+            kinds[entry.error_kind] = kinds.get(entry.error_kind, 0) + 1
+        samples = entries.order_by(EtlFailure.unit).limit(5).all()
+        report.append({
+            'table_name': table_name,
+            'period': period,
+            'count': count,
+            'kinds': kinds,
+            'failed_at': failed_at,
+            'samples': [(entry.unit, entry.message) for entry in samples],
+        })
+    return report
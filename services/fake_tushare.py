@@ -0,0 +1,435 @@
+"""
+Offline stand-in for tushare's pro_api, for benchmarks and runs without network
+
+Set TUSHARE_API=fake and TushareService talks to FakeProApi instead of
+Tushare. Every endpoint the service uses returns synthetic but consistent
+frames built from the requested `fields`: the same ticker universe, weekdays
+as trading days, quarter ends as report periods. Responses recorded with the
+response cache (TUSHARE_CACHE_DIR during a live run) can be replayed instead.
+"""
+import hashlib
+import os
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from services.rate_limiter import QUOTA_ERROR_MARKER
+from services.response_cache import ResponseCache
+
+DEFAULT_TICKERS = 200
+
+# Quarters of statements and indicators kept per ticker
+HISTORY_QUARTERS = 20
+
+# One ticker in this many is reported by stock_basic as delisted
+DELISTED_EVERY = 50
+
+# Days of quotes returned when a ranged call gives no start_date
+DEFAULT_HISTORY_DAYS = 720
+
+TEXT_FIELDS = {
+    'ts_code', 'symbol', 'name', 'area', 'industry', 'holder_name', 'holder_type',
+    'desc', 'orgs', 'ts_name', 'hm_name', 'hm_orgs', 'data_type', 'concept',
+    'rank_reason', 'rank_time', 'report_type', 'comp_type', 'end_type', 'div_proc',
+    'update_flag', 'exchange', 'is_open', 'list_status',
+}
+INT_FIELDS = {'rank'}
+
+AREAS = ['深圳', '上海', '北京', '浙江', '江苏', '广东']
+INDUSTRIES = ['银行', '软件服务', '半导体', '白酒', '医药', '汽车配件']
+HOLDER_TYPES = ['自然人', '自然人', '投资公司', '证券投资基金', '一般企业']
+
+
+def _parse_date(value):
+    return datetime.strptime(value, '%Y%m%d')
+
+
+def _format_date(value):
+    return value.strftime('%Y%m%d')
+
+
+def _weekdays(start_date, end_date):
+    day, end = _parse_date(start_date), _parse_date(end_date)
+    days = []
+    while day <= end:
+        if day.weekday() < 5:
+            days.append(_format_date(day))
+        day += timedelta(days=1)
+    return days
+
+
+def _quarter_ends(count, until=None):
+    """The last `count` quarter ends on or before `until` (today), ascending"""
+    until = _parse_date(until) if until else datetime.now()
+    year, quarter = until.year, (until.month - 1) // 3 + 1
+    ends = []
+    while len(ends) < count:
+        month = quarter * 3
+        last_day = (datetime(year + month // 12, month % 12 + 1, 1) - timedelta(days=1))
+        if last_day <= until:
+            ends.append(_format_date(last_day))
+        quarter -= 1
+        if quarter == 0:
+            year, quarter = year - 1, 4
+    return list(reversed(ends))
+
+
+class FakeQuotaError(Exception):
+    """Same message shape as Tushare's per-minute quota rejection"""
+
+
+class FakeTimeoutError(TimeoutError):
+    """Stands in for a dropped connection or read timeout"""
+
+
+class FakeProApi:
+    """
+    Drop-in for tushare.pro_api(): attribute access returns a callable per
+    endpoint, called with the same keyword arguments as the real client.
+
+    Args:
+        tickers (int): size of the synthetic A-share universe
+        latency (float): seconds each call sleeps, to model network time
+        quota_error_rate (float): probability that a call raises the quota error
+        error_rate (float): probability that a call times out (a transient failure)
+        max_rows (int): rows returned per call at most, after offset, like Tushare's caps
+        recordings (str): response cache directory to replay recorded frames from
+        seed (int): seed for reproducible values and injected errors
+    """
+
+    def __init__(self, tickers=DEFAULT_TICKERS, latency=0.0, quota_error_rate=0.0, max_rows=None, recordings=None, seed=0, error_rate=0.0):
+        self.ticker_count = tickers
+        self.latency = latency
+        self.quota_error_rate = quota_error_rate
+        self.error_rate = error_rate
+        self.max_rows = max_rows
+        self.recordings = ResponseCache(recordings, default_ttl=float('inf')) if recordings else None
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = Counter()
+        self.rows = Counter()
+        self.quota_errors = 0
+        self.timeouts = 0
+        self.ts_codes = [
+            f"{600000 + i}.SH" if i % 2 == 0 else f"{i:06d}.SZ"
+            for i in range(tickers)
+        ]
+
+    def __getattr__(self, api_name):
+        if api_name.startswith('_'):
+            raise AttributeError(api_name)
+        return lambda **params: self.query(api_name, **params)
+
+    def query(self, api_name, **params):
+        """Serve one call: record it, apply latency, quota errors and timeouts, build the frame"""
+        with self.lock:
+            self.calls[api_name] += 1
+            quota_error = self.random.random() < self.quota_error_rate
+            if quota_error:
+                self.quota_errors += 1
+            timeout = not quota_error and self.random.random() < self.error_rate
+            if timeout:
+                self.timeouts += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if quota_error:
+            raise FakeQuotaError(f"抱歉，您{QUOTA_ERROR_MARKER}该接口500次")
+        if timeout:
+            raise FakeTimeoutError(f"Read timed out calling {api_name}")
+
+        df = None
+        if self.recordings:
+            df = self.recordings.get(api_name, params)
+        if df is None:
+            build = getattr(self, f"_build_{api_name}", None)
+            if build is None:
+                raise Exception(f"FakeProApi has no data for endpoint {api_name}")
+            df = build(params.get('fields', ''), params)
+            offset = int(params.get('offset') or 0)
+            limit = params.get('limit')
+            df = df.iloc[offset:offset + int(limit)] if limit else df.iloc[offset:]
+            if self.max_rows:
+                df = df.iloc[:self.max_rows]
+            df = df.reset_index(drop=True)
+        with self.lock:
+            self.rows[api_name] += len(df)
+        return df
+
+    def summary(self):
+        """e.g. '1234 calls, 56789 rows, 3 quota errors, 2 timeouts'"""
+        return (f"{sum(self.calls.values())} calls, {sum(self.rows.values())} rows, "
+                f"{self.quota_errors} quota errors, {self.timeouts} timeouts")
+
+    # Frame construction
+
+    def _rng(self, *key):
+        digest = hashlib.md5(repr((self.seed,) + key).encode('utf-8')).hexdigest()
+        return random.Random(int(digest[:16], 16))
+
+    def _frame(self, fields, rows, default_fields):
+        """
+        Build a frame with the requested fields (or default_fields). Values
+        given in `rows` are used as is; other columns are filled with text,
+        dates or numbers depending on the field name, from a generator seeded
+        by the rows themselves so repeated calls return the same frame.
+        """
+        columns = [field for field in (fields or default_fields).split(',') if field]
+        given = pd.DataFrame(rows)
+        count = len(given)
+        key = (len(rows), tuple(rows[0].items()), tuple(rows[-1].items())) if rows else ()
+        rng = np.random.default_rng(int(hashlib.md5(repr((self.seed, key)).encode('utf-8')).hexdigest()[:16], 16))
+        dates = given['end_date'] if 'end_date' in given.columns else given.get('trade_date')
+        data = {}
+        for field in columns:
+            if field in given.columns:
+                data[field] = given[field]
+            elif field in INT_FIELDS:
+                data[field] = rng.integers(1, 101, count)
+            elif field in TEXT_FIELDS:
+                data[field] = [f"{field}_{value}" for value in rng.integers(1, 10, count)]
+            elif field.endswith('date'):
+                data[field] = dates if dates is not None else ['20240101'] * count
+            else:
+                data[field] = rng.uniform(-1e6, 1e7, count).round(2)
+        return pd.DataFrame(data, index=given.index, columns=columns)
+
+    def _codes(self, params):
+        ts_code = params.get('ts_code')
+        if not ts_code:
+            return self.ts_codes
+        return [code for code in ts_code.split(',') if code]
+
+    def _trade_days(self, params):
+        if params.get('trade_date'):
+            trade_date = params['trade_date']
+            return [trade_date] if _parse_date(trade_date).weekday() < 5 else []
+        end_date = params.get('end_date') or _format_date(datetime.now())
+        start_date = params.get('start_date') or _format_date(_parse_date(end_date) - timedelta(days=DEFAULT_HISTORY_DAYS))
+        return _weekdays(start_date, end_date)
+
+    def _build_stock_basic(self, fields, params):
+        list_status = params.get('list_status') or 'L'
+        rows = []
+        for i, ts_code in enumerate(self._codes(params)):
+            # Every DELISTED_EVERY-th ticker of the universe has been delisted
+            status = 'D' if i % DELISTED_EVERY == DELISTED_EVERY - 1 else 'L'
+            if status != list_status:
+                continue
+            rows.append({
+                'ts_code': ts_code,
+                'symbol': ts_code[:6],
+                'name': f"股票{ts_code[:6]}",
+                'area': AREAS[i % len(AREAS)],
+                'industry': INDUSTRIES[i % len(INDUSTRIES)],
+                'list_date': '20100104',
+                'list_status': status,
+                'delist_date': '20200630' if status == 'D' else None,
+            })
+        return self._frame(fields, rows, 'ts_code,symbol,name,area,industry,list_date')
+
+    def _build_trade_cal(self, fields, params):
+        day, end = _parse_date(params['start_date']), _parse_date(params['end_date'])
+        rows = []
+        while day <= end:
+            is_open = 1 if day.weekday() < 5 else 0
+            if params.get('is_open') in (None, '', str(is_open), is_open):
+                rows.append({'exchange': 'SSE', 'cal_date': _format_date(day), 'is_open': is_open})
+            day += timedelta(days=1)
+        return self._frame(fields, rows, 'exchange,cal_date,is_open')
+
+    def _build_quotes(self, fields, params, default_fields):
+        rows = []
+        for trade_date in self._trade_days(params):
+            for ts_code in self._codes(params):
+                rows.append({'ts_code': ts_code, 'trade_date': trade_date})
+        return self._frame(fields, rows, default_fields)
+
+    def _build_daily(self, fields, params):
+        return self._build_quotes(fields, params, 'ts_code,trade_date,open,high,low,close,pre_close,change,pct_chg,vol,amount')
+
+    def _build_daily_basic(self, fields, params):
+        return self._build_quotes(fields, params, 'ts_code,trade_date,close,turnover_rate,volume_ratio,pe,pb,total_mv,circ_mv')
+
+    def _build_adj_factor(self, fields, params):
+        df = self._build_quotes(fields, params, 'ts_code,trade_date,adj_factor')
+        if 'adj_factor' in df.columns:
+            df['adj_factor'] = df['adj_factor'].abs() / 1e6 + 1
+        return df
+
+    def _build_index_daily(self, fields, params):
+        params = dict(params, ts_code=params.get('ts_code') or '000300.SH')
+        return self._build_quotes(fields, params, 'ts_code,trade_date,close,open,high,low,pre_close,change,pct_chg,vol,amount')
+
+    def _disclosure_date(self, ts_code, end_date):
+        """Day ts_code publishes its report for period end_date: 20 to 110 days after it"""
+        offset = self._rng('disclosure', ts_code, end_date).randint(20, 110)
+        return _format_date(_parse_date(end_date) + timedelta(days=offset))
+
+    def _build_disclosure_date(self, fields, params):
+        end_date = params.get('end_date') or _quarter_ends(1)[0]
+        today = _format_date(datetime.now())
+        rows = []
+        for ts_code in self._codes(params):
+            pre_date = self._disclosure_date(ts_code, end_date)
+            rows.append({
+                'ts_code': ts_code,
+                'ann_date': _format_date(_parse_date(end_date) + timedelta(days=10)),
+                'end_date': end_date,
+                'pre_date': pre_date,
+                'actual_date': pre_date if pre_date <= today else None,
+                'modify_date': None,
+            })
+        return self._frame(fields, rows, 'ts_code,ann_date,end_date,pre_date,actual_date')
+
+    def _build_top10_floatholders(self, fields, params):
+        until = params.get('end_date') or _format_date(datetime.now())
+        rows = []
+        for ts_code in self._codes(params):
+            # Holders appear once the period's report is published
+            published = [end_date for end_date in _quarter_ends(4, until) if self._disclosure_date(ts_code, end_date) <= until]
+            for end_date in published[-2:]:
+                for rank in range(10):
+                    rng = self._rng(ts_code, rank)
+                    rows.append({
+                        'ts_code': ts_code,
+                        'ann_date': self._disclosure_date(ts_code, end_date),
+                        'end_date': end_date,
+                        'holder_name': f"股东{rng.randint(1, self.ticker_count * 3)}",
+                        'holder_type': HOLDER_TYPES[rng.randint(0, len(HOLDER_TYPES) - 1)],
+                    })
+        return self._frame(fields, rows, 'ts_code,ann_date,end_date,holder_name,hold_amount,hold_ratio,holder_type,hold_change')
+
+    def _player_names(self):
+        return [f"游资{i:02d}" for i in range(max(5, self.ticker_count // 10))]
+
+    def _build_hm_list(self, fields, params):
+        names = [params['name']] if params.get('name') else self._player_names()
+        rows = [{'name': name, 'desc': f"{name}简介", 'orgs': f"{name}营业部"} for name in names]
+        return self._frame(fields, rows, 'name,desc,orgs')
+
+    def _build_hm_detail(self, fields, params):
+        names = [params['name']] if params.get('name') else self._player_names()
+        end_date = params.get('end_date') or _format_date(datetime.now())
+        start_date = params.get('start_date') or _format_date(_parse_date(end_date) - timedelta(days=30))
+        days = _weekdays(start_date, end_date)
+        rows = []
+        for name in names:
+            for trade_date in days:
+                # Seeded per player and day, so overlapping windows return the same trades
+                rng = self._rng('hm_detail', name, trade_date)
+                if rng.random() < 0.2:
+                    ts_code = self.ts_codes[rng.randint(0, len(self.ts_codes) - 1)]
+                    rows.append({'trade_date': trade_date, 'ts_code': ts_code, 'ts_name': f"股票{ts_code[:6]}", 'hm_name': name, 'hm_orgs': f"{name}营业部"})
+        return self._frame(fields, rows, 'trade_date,ts_code,ts_name,buy_amount,sell_amount,hm_name,hm_orgs,net_amount')
+
+    def _build_statement(self, fields, params):
+        periods = _quarter_ends(HISTORY_QUARTERS)
+        if params.get('period'):
+            periods = [params['period']]
+        rows = []
+        for ts_code in self._codes(params):
+            for end_date in periods:
+                ann_date = _format_date(_parse_date(end_date) + timedelta(days=30))
+                if params.get('start_date') and ann_date < params['start_date']:
+                    continue
+                if params.get('end_date') and ann_date > params['end_date']:
+                    continue
+                rows.append({
+                    'ts_code': ts_code,
+                    'ann_date': ann_date,
+                    'f_ann_date': ann_date,
+                    'end_date': end_date,
+                    'report_type': '1',
+                    'comp_type': '1',
+                    'end_type': str((_parse_date(end_date).month) // 3),
+                    'update_flag': '1',
+                })
+        return self._frame(fields, rows, 'ts_code,ann_date,f_ann_date,end_date,report_type,comp_type,total_assets')
+
+    _build_balancesheet = _build_statement
+    _build_cashflow = _build_statement
+    _build_income = _build_statement
+    _build_fina_indicator = _build_statement
+    _build_fina_indicator_vip = _build_statement
+    _build_balancesheet_vip = _build_statement
+    _build_cashflow_vip = _build_statement
+    _build_income_vip = _build_statement
+
+    def _build_hot(self, fields, params, data_type):
+        trade_date = params.get('trade_date') or _format_date(datetime.now())
+        rows = [{
+            'trade_date': trade_date,
+            'data_type': data_type,
+            'ts_code': ts_code,
+            'ts_name': f"股票{ts_code[:6]}",
+            'rank': rank + 1,
+            'rank_time': f"{trade_date} 15:00:00",
+        } for rank, ts_code in enumerate(self.ts_codes[:100])]
+        return self._frame(fields, rows, 'trade_date,data_type,ts_code,ts_name,rank,pct_change,current_price,hot')
+
+    def _build_ths_hot(self, fields, params):
+        return self._build_hot(fields, params, '热股')
+
+    def _build_dc_hot(self, fields, params):
+        return self._build_hot(fields, params, 'A股市场')
+
+    def _build_dividend(self, fields, params):
+        rows = []
+        for ts_code in self._codes(params):
+            for year_end in _quarter_ends(12):
+                if not year_end.endswith('1231'):
+                    continue
+                rng = self._rng('dividend', ts_code, year_end)
+                ex_date = _format_date(_parse_date(year_end) + timedelta(days=150 + rng.randint(0, 60)))
+                if params.get('ex_date') and ex_date != params['ex_date']:
+                    continue
+                if params.get('ann_date'):
+                    continue
+                rows.append({
+                    'ts_code': ts_code,
+                    'end_date': year_end,
+                    'ann_date': _format_date(_parse_date(year_end) + timedelta(days=90)),
+                    'div_proc': params.get('div_proc') or '实施',
+                    'ex_date': ex_date,
+                    'record_date': ex_date,
+                    'pay_date': ex_date,
+                    'update_flag': '0',
+                })
+        return self._frame(fields, rows, 'ts_code,end_date,ann_date,div_proc,stk_div,cash_div,ex_date')
+
+
+_shared_fake = None
+_shared_lock = threading.Lock()
+
+
+def get_fake_pro_api():
+    """
+    Return the process-wide FakeProApi, so call counts cover every
+    TushareService instance. Configured from the environment:
+
+        TUSHARE_FAKE_TICKERS           universe size (200)
+        TUSHARE_FAKE_LATENCY           seconds per call (0)
+        TUSHARE_FAKE_QUOTA_ERROR_RATE  probability of a quota error per call (0)
+        TUSHARE_FAKE_ERROR_RATE        probability of a timeout per call (0)
+        TUSHARE_FAKE_MAX_ROWS          row cap per call (none)
+        TUSHARE_FAKE_RECORDINGS        response cache directory to replay
+    """
+    global _shared_fake
+    with _shared_lock:
+        if _shared_fake is None:
+            max_rows = os.getenv('TUSHARE_FAKE_MAX_ROWS')
+            _shared_fake = FakeProApi(
+                tickers=int(os.getenv('TUSHARE_FAKE_TICKERS', DEFAULT_TICKERS)),
+                latency=float(os.getenv('TUSHARE_FAKE_LATENCY', 0)),
+                quota_error_rate=float(os.getenv('TUSHARE_FAKE_QUOTA_ERROR_RATE', 0)),
+                max_rows=int(max_rows) if max_rows else None,
+                recordings=os.getenv('TUSHARE_FAKE_RECORDINGS') or None,
+                error_rate=float(os.getenv('TUSHARE_FAKE_ERROR_RATE', 0))
+            )
+        return _shared_fake
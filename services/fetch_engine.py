@@ -0,0 +1,79 @@
+"""
+Bounded concurrent fetch stage for per-ticker Tushare loops
+"""
+import contextvars
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from services.resilience import TushareError
+
+DEFAULT_CONCURRENCY = int(os.getenv('TUSHARE_CONCURRENCY', 8))
+
+
+def fetch_concurrently(items, fetch, concurrency=DEFAULT_CONCURRENCY, failures=None):
+    """
+    Fan items out across a pool of worker threads and yield (item, result)
+    pairs back in the calling thread, in input order.
+
+    Only the fetch runs on the workers; the caller consumes the results and
+    stays the single writer that owns the database session. At most
+    2 * concurrency fetches are in flight or buffered at any time, and the
+    shared rate limiter inside TushareService keeps the pool within the
+    API quota, so throughput is bounded by the quota rather than latency.
+    Fetches run in a copy of the caller's context, so their calls count
+    towards the caller's table metrics (services/run_metrics.py).
+
+    Args:
+        items: iterable of work items (e.g. ts_codes)
+        fetch: callable taking one item and returning its result
+        concurrency (int): number of requests in flight
+        failures (FailedUnits): if given, an item whose fetch raises a
+            TushareError is recorded there and not yielded, so one failing
+            ticker does not abort the whole table; otherwise the error propagates
+
+    Yields:
+        tuple: (item, result)
+    """
+    if failures is None:
+        yield from _fetch_in_order(items, fetch, concurrency)
+        return
+    for item, (result, error) in _fetch_in_order(items, _capture_errors(fetch), concurrency):
+        if error is None:
+            yield item, result
+        else:
+            failures.record(item, error)
+
+
+def _capture_errors(fetch):
+    """Wrap fetch to return (result, None), or (None, error) if it raised a TushareError"""
+    def guarded(item):
+        try:
+            return fetch(item), None
+        except TushareError as e:
+            return None, e
+    return guarded
+
+
+def _fetch_in_order(items, fetch, concurrency):
+    if concurrency <= 1:
+        for item in items:
+            yield item, fetch(item)
+        return
+
+    window = concurrency * 2
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        try:
+            for item in items:
+                pending.append((item, executor.submit(contextvars.copy_context().run, fetch, item)))
+                if len(pending) >= window:
+                    done_item, future = pending.popleft()
+                    yield done_item, future.result()
+            while pending:
+                done_item, future = pending.popleft()
+                yield done_item, future.result()
+        finally:
+            # Stop queued fetches if the consumer bails out early
+            for _, future in pending:
+                future.cancel()
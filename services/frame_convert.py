@@ -0,0 +1,126 @@
+"""
+Column-spec driven conversion of Tushare DataFrames into record dicts
+
+Each getter in TushareService describes its output as a list of
+(key, column, kind) tuples. convert_frame renames, fills NaNs and casts
+whole columns at once and emits plain dicts with to_dict('records'),
+instead of walking the frame with iterrows() and converting cell by cell.
+Frames of only a few rows (a per-ticker statement is one row of 100+
+columns) skip the column operations, whose fixed pandas overhead per column
+would outweigh the work, and convert the native values row by row.
+"""
+import numpy as np
+import pandas as pd
+
+# Conversion kinds
+STR = 'str'                      # str(value), missing -> ''
+TEXT = 'text'                    # value unchanged, missing -> ''
+FLOAT = 'float'                  # float(value), missing -> 0.0
+FLOAT_OR_NONE = 'float_or_none'  # float(value), missing -> None
+INT_OR_NONE = 'int_or_none'      # int(value), missing -> None
+RAW = 'raw'                      # value unchanged, missing -> None
+
+# Frames shorter than this are converted value by value
+SMALL_FRAME_ROWS = 64
+
+
+def _convert(series, kind):
+    present = series.notna()
+    if kind == STR:
+        return series.astype(str).where(present, '')
+    if kind == TEXT:
+        return series.astype(object).where(present, '')
+    if kind == RAW:
+        return series.astype(object).where(present, None)
+
+    numbers = pd.to_numeric(series, errors='coerce')
+    if kind == FLOAT:
+        return numbers.fillna(0.0).astype(float)
+    if kind == FLOAT_OR_NONE:
+        return numbers.astype(object).where(numbers.notna(), None)
+    if kind == INT_OR_NONE:
+        # Truncated like int() on the small-frame path; Int64 refuses to cast non-integral floats
+        if numbers.dtype.kind == 'f':
+            numbers = np.trunc(numbers)
+        return numbers.astype('Int64').astype(object).where(numbers.notna(), None)
+    raise ValueError(f"Unknown conversion kind: {kind}")
+
+
+def _to_float(value, default):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _convert_value(value, kind):
+    if pd.isna(value):
+        return {STR: '', TEXT: '', FLOAT: 0.0}.get(kind)
+    if kind == STR:
+        return str(value)
+    if kind == FLOAT:
+        return _to_float(value, 0.0)
+    if kind == FLOAT_OR_NONE:
+        return _to_float(value, None)
+    if kind == INT_OR_NONE:
+        number = _to_float(value, None)
+        return int(number) if number is not None else None
+    if kind in (TEXT, RAW):
+        return value
+    raise ValueError(f"Unknown conversion kind: {kind}")
+
+
+def _convert_rows(df, spec):
+    # to_numpy().tolist() yields native Python values and, unlike
+    # to_dict('records'), costs next to nothing on wide frames
+    positions = {column: i for i, column in enumerate(df.columns)}
+    lookups = [(key, positions.get(column), kind) for key, column, kind in spec]
+    return [
+        {key: _convert_value(values[i] if i is not None else None, kind) for key, i, kind in lookups}
+        for values in df.to_numpy().tolist()
+    ]
+
+
+def convert_frame(df, spec):
+    """
+    Convert a DataFrame to a list of dicts following a column spec.
+
+    Args:
+        df (DataFrame): frame returned by a Tushare endpoint
+        spec (list): (key, column, kind) tuples; key is the output field,
+            column the DataFrame column it is read from. Columns missing
+            from the frame are treated as all-missing.
+
+    Returns:
+        list: one dict per row
+    """
+    if df is None or df.empty:
+        return []
+    if len(df) < SMALL_FRAME_ROWS:
+        return _convert_rows(df, spec)
+    columns = {}
+    for key, column, kind in spec:
+        if column in df.columns:
+            series = df[column]
+        else:
+            series = pd.Series(None, index=df.index, dtype=object)
+        columns[key] = _convert(series, kind)
+    return pd.DataFrame(columns, index=df.index).to_dict('records')
+
+
+def field_spec(fields, kinds=None, default=FLOAT, rename=None):
+    """
+    Build a spec from a comma-separated Tushare field list.
+
+    Args:
+        fields (str): e.g. 'ts_code,ann_date,end_date,total_assets'
+        kinds (dict): field -> kind for fields that are not `default`
+        default (str): kind for every other field
+        rename (dict): field -> output key, where the column name differs
+    """
+    kinds = kinds or {}
+    rename = rename or {}
+    return [
+        (rename.get(field, field), field, kinds.get(field, default))
+        for field in fields.split(',')
+    ]
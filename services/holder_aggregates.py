@@ -0,0 +1,122 @@
+"""
+Holder counts behind the web app's holder pages, materialized from
+top_holders into ticker_holder_summary and holder_ticker_counts
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, bindparam, delete, func, select, text
+
+from models import TopHolder, TickerHolderSummary, HolderTickerCount
+
+# Holder type of the individual (natural person) shareholders the holder pages count
+INDIVIDUAL_HOLDER_TYPE = '自然人'
+
+# Tickers or holders recounted per statement by an incremental refresh
+REFRESH_BATCH = 500
+
+_TICKER_SUMMARY_INSERT = """
+    INSERT INTO ticker_holder_summary (ts_code, name, latest_end_date, holder_count, individual_holder_count, refreshed_at)
+    SELECT
+        h.ts_code,
+        t.name,
+        h.latest_end_date,
+        (SELECT COUNT(DISTINCT l.holder_name) FROM top_holders l
+         WHERE l.ts_code = h.ts_code AND l.end_date = h.latest_end_date),
+        h.individual_holder_count,
+        :refreshed_at
+    FROM (
+        SELECT
+            ts_code,
+            MAX(end_date) AS latest_end_date,
+            COUNT(DISTINCT CASE WHEN holder_type = :individual THEN holder_name END) AS individual_holder_count
+        FROM top_holders
+        {where}
+        GROUP BY ts_code
+    ) h
+    LEFT JOIN tickers t ON t.ts_code = h.ts_code
+"""
+
+_HOLDER_COUNTS_INSERT = """
+    INSERT INTO holder_ticker_counts (holder_name, ticker_count, refreshed_at)
+    SELECT holder_name, COUNT(DISTINCT ts_code), :refreshed_at
+    FROM top_holders
+    WHERE holder_type = :individual AND holder_name IS NOT NULL {where}
+    GROUP BY holder_name
+"""
+
+# Keeps the summary's sort column in step with renamed tickers
+_SYNC_TICKER_NAMES = """
+    UPDATE ticker_holder_summary
+    SET name = (SELECT t.name FROM tickers t WHERE t.ts_code = ticker_holder_summary.ts_code)
+    WHERE name IS NOT (SELECT t.name FROM tickers t WHERE t.ts_code = ticker_holder_summary.ts_code)
+"""
+
+
+def _statement(sql, where='', expanding=None):
+    statement = text(sql.format(where=where)).bindparams(bindparam('refreshed_at', type_=DateTime))
+    if expanding:
+        statement = statement.bindparams(bindparam(expanding, expanding=True))
+    return statement
+
+
+def _batches(values):
+    values = list(values)
+    for start in range(0, len(values), REFRESH_BATCH):
+        yield values[start:start + REFRESH_BATCH]
+
+
+def rebuild_holder_aggregates(conn):
+    """
+    Recompute both aggregate tables from all of top_holders.
+
+    Returns:
+        tuple: (tickers counted, holders counted)
+    """
+    params = {'refreshed_at': datetime.now(timezone.utc), 'individual': INDIVIDUAL_HOLDER_TYPE}
+    conn.execute(delete(TickerHolderSummary))
+    conn.execute(delete(HolderTickerCount))
+    tickers = conn.execute(_statement(_TICKER_SUMMARY_INSERT), params).rowcount
+    holders = conn.execute(_statement(_HOLDER_COUNTS_INSERT), params).rowcount
+    return tickers, holders
+
+
+def refresh_holder_aggregates(conn, full=False):
+    """
+    Bring the aggregate tables up to date with top_holders; the caller commits.
+
+    Only the tickers with top_holders rows written since the last refresh
+    are recounted, with every holder appearing in them. Rows rewritten
+    unchanged keep their updated_date, so a reload that changes nothing
+    recounts nothing, and rows committed by an interrupted run are picked
+    up by the next refresh. The first refresh, or full=True (e.g. after
+    rows were deleted), recomputes everything.
+
+    Returns:
+        tuple: (tickers recounted, holders recounted)
+    """
+    since = conn.execute(select(func.max(TickerHolderSummary.refreshed_at))).scalar()
+    if full or since is None:
+        return rebuild_holder_aggregates(conn)
+
+    params = {'refreshed_at': datetime.now(timezone.utc), 'individual': INDIVIDUAL_HOLDER_TYPE}
+    # Deduplicated here: with DISTINCT, SQLite prefers scanning the natural key over the updated_date range
+    ts_codes = sorted(set(conn.execute(select(TopHolder.ts_code).where(TopHolder.updated_date >= since)).scalars()))
+    holder_names = set()
+    for batch in _batches(ts_codes):
+        holder_names.update(
+            conn.execute(select(TopHolder.holder_name).where(TopHolder.ts_code.in_(batch)).distinct()).scalars()
+        )
+        conn.execute(delete(TickerHolderSummary).where(TickerHolderSummary.ts_code.in_(batch)))
+        conn.execute(
+            _statement(_TICKER_SUMMARY_INSERT, 'WHERE ts_code IN :ts_codes', 'ts_codes'),
+            {**params, 'ts_codes': batch}
+        )
+    holder_names.discard(None)
+    for batch in _batches(sorted(holder_names)):
+        conn.execute(delete(HolderTickerCount).where(HolderTickerCount.holder_name.in_(batch)))
+        conn.execute(
+            _statement(_HOLDER_COUNTS_INSERT, 'AND holder_name IN :holder_names', 'holder_names'),
+            {**params, 'holder_names': batch}
+        )
+    conn.execute(text(_SYNC_TICKER_NAMES))
+    return len(ts_codes), len(holder_names)
@@ -0,0 +1,58 @@
+"""
+Resident memory checks for long-running loaders (--max-memory)
+"""
+import gc
+import os
+import sys
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_limit_mb = None
+
+
+class MemoryLimitExceeded(RuntimeError):
+    """Raised when the process stays above the --max-memory limit after a collection"""
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    """Highest resident set size this process has reached, in MB"""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def set_memory_limit(limit_mb):
+    """Set the process-wide RSS limit checked by check_memory(); None disables it"""
+    global _limit_mb
+    _limit_mb = limit_mb
+
+
+def check_memory():
+    """
+    Raise MemoryLimitExceeded if RSS is over the limit even after a garbage
+    collection. Loaders call it once per written chunk, so a run stops
+    cleanly between chunks and can be continued with --resume.
+    """
+    if not _limit_mb:
+        return
+    if current_rss_mb() <= _limit_mb:
+        return
+    gc.collect()
+    rss = current_rss_mb()
+    if rss > _limit_mb:
+        raise MemoryLimitExceeded(f"RSS {rss:.0f} MB is over the --max-memory limit of {_limit_mb} MB; re-run with --resume to continue")
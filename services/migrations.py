@@ -0,0 +1,230 @@
+"""
+Versioned schema migrations for the indexes and views behind the web app's
+queries, recorded in schema_version
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import inspect, insert, text
+
+from models import Base, SchemaVersion, get_engine
+from services.holder_aggregates import rebuild_holder_aggregates
+
+
+class Migration:
+    """
+    One schema change: statements applied together, in one transaction
+    with their schema_version row. A statement is SQL, or a function of the
+    connection for data changes. Statements must be safe on databases that
+    already have part of the change (CREATE INDEX IF NOT EXISTS, DROP ... IF
+    EXISTS), since create_all and older maintenance scripts may have created
+    some of it already.
+    """
+
+    def __init__(self, version, name, statements):
+        self.version = version
+        self.name = name
+        self.statements = statements
+
+    def __repr__(self):
+        return f"<Migration({self.version}, '{self.name}')>"
+
+
+# Trading days of the last week, compared as YYYYMMDD strings so the
+# trade_date range can use the natural-key indexes of ths_hot and dc_hot
+RECENT_HOT_STOCKS_VIEW = """
+    CREATE VIEW recent_hot_stocks AS
+    SELECT
+        trade_date,
+        ts_code,
+        ts_name,
+        'THS' AS Security_name
+    FROM ths_hot
+    WHERE trade_date >= strftime('%Y%m%d', 'now', '-7 days') AND data_type='热股'
+    UNION
+    SELECT
+        trade_date,
+        ts_code,
+        ts_name,
+        'DC' AS Security_name
+    FROM dc_hot
+    WHERE trade_date >= strftime('%Y%m%d', 'now', '-7 days') AND data_type='A股市场'
+"""
+
+# Append only: a released migration is never edited, a later one changes its result
+MIGRATIONS = [
+    Migration(1, 'top_holders indexes for holder lookups and holder aggregates', [
+        # DataService.get_holder_tickers: WHERE holder_name = ? ORDER BY hold_ratio DESC
+        "CREATE INDEX IF NOT EXISTS ix_top_holders_holder_name_ratio ON top_holders (holder_name, hold_ratio)",
+        # Holder aggregates: each individual holder's tickers, grouped by holder
+        "CREATE INDEX IF NOT EXISTS ix_top_holders_type_holder_ts_code ON top_holders (holder_type, holder_name, ts_code)",
+    ]),
+    Migration(2, 'hm_detail index for a player\'s transactions', [
+        # DataService.get_player_transactions: WHERE name = ? ORDER BY trade_date DESC
+        "CREATE INDEX IF NOT EXISTS ix_hm_detail_name_trade_date ON hm_detail (name, trade_date)",
+    ]),
+    Migration(3, 'update_log index for the latest update', [
+        # DataService.get_latest_update_info: ORDER BY updated_at DESC LIMIT 1, on every API response
+        "CREATE INDEX IF NOT EXISTS ix_update_log_updated_at ON update_log (updated_at)",
+    ]),
+    Migration(4, 'recent_hot_stocks filters trade_date as a range', [
+        "DROP VIEW IF EXISTS recent_hot_stocks",
+        RECENT_HOT_STOCKS_VIEW,
+    ]),
+    Migration(5, 'materialized holder aggregates replace the holder views', [
+        "DROP VIEW IF EXISTS individual_holder_tickers",
+        "DROP VIEW IF EXISTS tickers_with_multiple_holders",
+        # DataService.get_tickers_with_multiple_holders: ORDER BY individual_holder_count DESC, name
+        "CREATE INDEX IF NOT EXISTS ix_ticker_holder_summary_individual ON ticker_holder_summary (individual_holder_count DESC, name)",
+        # DataService.get_individual_holder_tickers_paginated: ORDER BY ticker_count DESC, holder_name
+        "CREATE INDEX IF NOT EXISTS ix_holder_ticker_counts_count ON holder_ticker_counts (ticker_count DESC, holder_name)",
+        # Incremental refresh: tickers with rows written since the last one
+        "CREATE INDEX IF NOT EXISTS ix_top_holders_updated_date ON top_holders (updated_date, ts_code)",
+        rebuild_holder_aggregates,
+    ]),
+]
+
+# Queries of the web app's hot paths, as DataService runs them, and the
+# index each must use; check_query_plans() verifies them with EXPLAIN QUERY PLAN
+QUERY_PLANS = [
+    ('ticker by code', "SELECT ts_code, symbol, name FROM tickers WHERE ts_code = :ts_code",
+     'uq_tickers_ts_code'),
+    ('latest holder period of a ticker', "SELECT MAX(end_date) FROM top_holders WHERE ts_code = :ts_code",
+     'uq_top_holders_natural_key'),
+    ('holders of a ticker', """
+        SELECT holder_name, hold_amount, hold_ratio FROM top_holders
+        WHERE ts_code = :ts_code AND end_date = :end_date ORDER BY hold_ratio DESC
+     """, 'uq_top_holders_natural_key'),
+    ('tickers of a holder', """
+        SELECT t.ts_code, t.name, h.hold_ratio, h.end_date FROM top_holders h
+        JOIN tickers t ON h.ts_code = t.ts_code
+        WHERE h.holder_name = :holder_name ORDER BY h.hold_ratio DESC
+     """, 'ix_top_holders_holder_name_ratio'),
+    ('tickers with multiple individual holders', """
+        SELECT ts_code, name, individual_holder_count FROM ticker_holder_summary
+        WHERE individual_holder_count >= 2 ORDER BY individual_holder_count DESC, name ASC LIMIT 50
+     """, 'ix_ticker_holder_summary_individual'),
+    ('individual holders of multiple tickers', """
+        SELECT holder_name, ticker_count FROM holder_ticker_counts
+        WHERE ticker_count >= 2 ORDER BY ticker_count DESC, holder_name ASC LIMIT 20
+     """, 'ix_holder_ticker_counts_count'),
+    ('holder summary of every ticker', """
+        SELECT t.ts_code, s.holder_count FROM tickers t
+        LEFT JOIN ticker_holder_summary s ON s.ts_code = t.ts_code
+     """, 'uq_ticker_holder_summary_ts_code'),
+    ('top_holders rows changed since the last aggregate refresh', """
+        SELECT ts_code FROM top_holders WHERE updated_date >= :since
+     """, 'ix_top_holders_updated_date'),
+    ('recount of individual holders', """
+        SELECT holder_name, COUNT(DISTINCT ts_code) FROM top_holders
+        WHERE holder_type = '自然人' AND holder_name IS NOT NULL AND holder_name IN ('a', 'b') GROUP BY holder_name
+     """, 'ix_top_holders_type_holder_ts_code'),
+    ('transactions of a market player', """
+        SELECT trade_date, ts_code, net_amount FROM hm_detail WHERE name = :name ORDER BY trade_date DESC
+     """, 'ix_hm_detail_name_trade_date'),
+    ('market players page', 'SELECT id, name, "desc", orgs FROM hm_list ORDER BY name ASC LIMIT 20',
+     'uq_hm_list_name'),
+    ('recent THS hot stocks', """
+        SELECT ts_code, ts_name FROM ths_hot
+        WHERE trade_date >= strftime('%Y%m%d', 'now', '-7 days') AND data_type = '热股'
+     """, 'uq_ths_hot_natural_key'),
+    ('recent DC hot stocks', """
+        SELECT ts_code, ts_name FROM dc_hot
+        WHERE trade_date >= strftime('%Y%m%d', 'now', '-7 days') AND data_type = 'A股市场'
+     """, 'uq_dc_hot_natural_key'),
+    ('latest update', "SELECT * FROM update_log ORDER BY updated_at DESC LIMIT 1",
+     'ix_update_log_updated_at'),
+    ('daily quotes of a ticker', """
+        SELECT trade_date, close FROM daily WHERE ts_code = :ts_code AND trade_date >= :start_date ORDER BY trade_date
+     """, 'uq_daily_ts_code_trade_date'),
+    ('balance sheets of a ticker', """
+        SELECT * FROM balance_sheets WHERE ts_code = :ts_code AND end_date = :end_date
+     """, 'uq_balance_sheets_natural_key'),
+    ('cash flows of a ticker', """
+        SELECT * FROM cash_flows WHERE ts_code = :ts_code AND end_date = :end_date
+     """, 'uq_cash_flows_natural_key'),
+    ('income statements of a ticker', """
+        SELECT * FROM income_statements WHERE ts_code = :ts_code AND end_date = :end_date
+     """, 'uq_income_statements_natural_key'),
+    ('financial indicators of a ticker', """
+        SELECT * FROM fina_indicators WHERE ts_code = :ts_code ORDER BY end_date DESC
+     """, 'uq_fina_indicators_ts_code_end_date'),
+]
+
+
+def applied_versions(conn):
+    """Versions recorded in schema_version (empty if the table does not exist yet)"""
+    if 'schema_version' not in inspect(conn).get_table_names():
+        return set()
+    return {row[0] for row in conn.execute(text("SELECT version FROM schema_version"))}
+
+
+def pending_migrations(engine=None):
+    """MIGRATIONS not yet applied to the database, in version order"""
+    engine = engine or get_engine()
+    with engine.connect() as conn:
+        applied = applied_versions(conn)
+    return [migration for migration in sorted(MIGRATIONS, key=lambda m: m.version) if migration.version not in applied]
+
+
+def migrate(engine=None, dry_run=False):
+    """
+    Apply the pending migrations in version order, each in its own
+    transaction with its schema_version row, so an interrupted run resumes
+    at the first unapplied one. Tables are created first, as the migrations
+    index existing tables.
+
+    Returns:
+        list: the migrations that were (or with dry_run would be) applied
+    """
+    engine = engine or get_engine()
+    pending = pending_migrations(engine)
+    if dry_run or not pending:
+        return pending
+    Base.metadata.create_all(engine)
+    for migration in pending:
+        with engine.begin() as conn:
+            for statement in migration.statements:
+                if callable(statement):
+                    statement(conn)
+                else:
+                    conn.execute(text(statement))
+            conn.execute(insert(SchemaVersion.__table__), {
+                'version': migration.version,
+                'name': migration.name,
+                'applied_at': datetime.now(timezone.utc),
+            })
+    if engine.dialect.name == 'sqlite':
+        # Refresh the planner statistics the new indexes need
+        with engine.connect() as conn:
+            conn.execute(text("PRAGMA optimize"))
+    return pending
+
+
+def schema_status(engine=None):
+    """(version, name, applied_at or None) for every known migration"""
+    engine = engine or get_engine()
+    with engine.connect() as conn:
+        applied = {}
+        if 'schema_version' in inspect(conn).get_table_names():
+            applied = {row[0]: row[1] for row in conn.execute(text("SELECT version, applied_at FROM schema_version"))}
+    return [(migration.version, migration.name, applied.get(migration.version)) for migration in MIGRATIONS]
+
+
+def check_query_plans(engine=None):
+    """
+    Run EXPLAIN QUERY PLAN on every QUERY_PLANS query (SQLite only).
+
+    Returns:
+        list: (label, expected index, uses it, plan lines)
+    """
+    engine = engine or get_engine()
+    results = []
+    with engine.connect() as conn:
+        for label, sql, index_name in QUERY_PLANS:
+            params = {name: '' for name in ('ts_code', 'end_date', 'holder_name', 'name', 'start_date')}
+            # A recent refresh time, so the planner sees a narrow updated_date range as in practice
+            params['since'] = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+            plan = [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params)]
+            uses_index = any(f"INDEX {index_name}" in line for line in plan)
+            results.append((label, index_name, uses_index, plan))
+    return results
@@ -0,0 +1,184 @@
+"""
+Token-bucket rate limiting shared by all Tushare API calls
+"""
+import os
+import threading
+import time
+
+# Tushare rejects calls above the per-minute quota with this message
+QUOTA_ERROR_MARKER = '每分钟最多访问'
+
+DEFAULT_CALLS_PER_MINUTE = 500
+
+# Endpoints whose quota differs from the default (calls per minute)
+ENDPOINT_CALLS_PER_MINUTE = {}
+
+
+def is_quota_error(error):
+    """Return True if the exception is Tushare's per-minute quota rejection"""
+    return QUOTA_ERROR_MARKER in str(error)
+
+
+def parse_rate_limits(spec):
+    """
+    Parse a per-endpoint limit spec such as "daily=500,fina_indicator_vip=200"
+    (calls per minute in TUSHARE_RATE_LIMITS, requests in flight in
+    TUSHARE_ENDPOINT_LIMITS).
+
+    Returns:
+        dict: endpoint name -> limit
+    """
+    limits = {}
+    for part in (spec or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, value = part.partition('=')
+        limits[name.strip()] = int(value)
+    return limits
+
+
+class TokenBucket:
+    """
+    Token bucket for one endpoint.
+
+    Tokens refill continuously so the quota is spent evenly instead of in
+    bursts followed by a fixed sleep. The refill rate leaves room for the
+    burst capacity so any rolling 60-second window stays within the quota.
+    """
+
+    def __init__(self, calls_per_minute, burst=10):
+        self.calls_per_minute = calls_per_minute
+        self.capacity = max(1, min(burst, calls_per_minute // 10))
+        self.max_rate = max(calls_per_minute - self.capacity, 1) / 60.0
+        self.rate = self.max_rate
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.consecutive_errors = 0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def acquire(self):
+        """Block until a call may be made; returns the seconds spent waiting"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    delay = self.paused_until - now
+                else:
+                    self._refill(now)
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return waited
+                    delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def record_success(self):
+        """Let the rate creep back towards the configured quota after a backoff"""
+        with self.lock:
+            self.consecutive_errors = 0
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate * 1.01)
+
+    def backoff(self, min_seconds=15, max_seconds=60):
+        """
+        React to a quota rejection: empty the bucket, pause the endpoint and
+        slow the refill rate. Consecutive rejections double the pause.
+        """
+        with self.lock:
+            self.consecutive_errors += 1
+            pause = min(max_seconds, min_seconds * 2 ** (self.consecutive_errors - 1))
+            now = time.monotonic()
+            self.tokens = 0.0
+            self.updated = now
+            self.paused_until = max(self.paused_until, now + pause)
+            self.rate = max(self.max_rate * 0.5, self.rate * 0.9)
+            return pause
+
+
+class RateLimiter:
+    """Per-endpoint token buckets with a configurable calls-per-minute budget"""
+
+    def __init__(self, default_calls_per_minute=DEFAULT_CALLS_PER_MINUTE, limits=None):
+        self.default_calls_per_minute = default_calls_per_minute
+        self.limits = dict(ENDPOINT_CALLS_PER_MINUTE)
+        self.limits.update(limits or {})
+        self.buckets = {}
+        self.lock = threading.Lock()
+        self.wait_seconds = 0.0
+        self.backoff_count = 0
+        self.calls = 0
+
+    def bucket(self, api_name):
+        with self.lock:
+            bucket = self.buckets.get(api_name)
+            if bucket is None:
+                calls_per_minute = self.limits.get(api_name, self.default_calls_per_minute)
+                bucket = TokenBucket(calls_per_minute)
+                self.buckets[api_name] = bucket
+            return bucket
+
+    def acquire(self, api_name):
+        """Wait for a token for the given endpoint"""
+        waited = self.bucket(api_name).acquire()
+        with self.lock:
+            self.calls += 1
+            self.wait_seconds += waited
+        return waited
+
+    def record_success(self, api_name):
+        self.bucket(api_name).record_success()
+
+    def share(self, parts):
+        """
+        Keep this process to 1/parts of every endpoint's budget, for the shard
+        processes of update_data.py --workers that split one quota between them
+        """
+        with self.lock:
+            self.default_calls_per_minute = max(1, self.default_calls_per_minute // parts)
+            self.limits = {name: max(1, calls // parts) for name, calls in self.limits.items()}
+            self.buckets = {}
+
+    def add_totals(self, calls, wait_seconds, backoff_count):
+        """Count the calls and throttling of a shard process towards this limiter's totals"""
+        with self.lock:
+            self.calls += calls
+            self.wait_seconds += wait_seconds
+            self.backoff_count += backoff_count
+
+    def backoff(self, api_name):
+        """Pause the endpoint after a quota error; returns the pause in seconds"""
+        pause = self.bucket(api_name).backoff()
+        with self.lock:
+            self.backoff_count += 1
+        print(f"Tushare quota reached for {api_name}, backing off {pause:.0f}s")
+        return pause
+
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """
+    Return the process-wide limiter so every TushareService instance draws
+    from the same budget. Configured from the environment:
+
+        TUSHARE_CALLS_PER_MINUTE  default budget per endpoint (500)
+        TUSHARE_RATE_LIMITS       overrides, e.g. "daily=500,fina_indicator_vip=200"
+    """
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            default = int(os.getenv('TUSHARE_CALLS_PER_MINUTE', DEFAULT_CALLS_PER_MINUTE))
+            limits = parse_rate_limits(os.getenv('TUSHARE_RATE_LIMITS', ''))
+            _shared_limiter = RateLimiter(default, limits)
+        return _shared_limiter
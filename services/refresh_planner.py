@@ -0,0 +1,106 @@
+"""
+Pick the tickers whose top holders can have changed, from report disclosure dates
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+from models import TopHolder, BalanceSheet
+from services.resilience import TushareError
+from utils.date_utils import get_quarter_end_dates
+
+# A report scheduled within this many days of today counts as imminent
+IMMINENT_DAYS = 3
+
+# Most recent report periods checked against the stored holder lists
+PLANNED_PERIODS = 2
+
+
+def _shift(date_str, days):
+    return (datetime.strptime(date_str, '%Y%m%d') + timedelta(days=days)).strftime('%Y%m%d')
+
+
+def latest_holder_periods(session):
+    """ts_code -> newest end_date stored in top_holders"""
+    return dict(session.query(TopHolder.ts_code, func.max(TopHolder.end_date)).group_by(TopHolder.ts_code).all())
+
+
+def due_from_disclosures(disclosures, holder_periods, today, imminent_days=IMMINENT_DAYS):
+    """
+    Tickers with a report for a period newer than their stored holders that
+    has been published (actual_date) or is scheduled (pre_date) within
+    imminent_days of today.
+
+    Args:
+        disclosures (list): disclosure_date rows (ts_code, end_date, pre_date, actual_date)
+        holder_periods (dict): ts_code -> newest stored holder end_date
+
+    Returns:
+        dict: ts_code -> reason
+    """
+    window_start, window_end = _shift(today, -imminent_days), _shift(today, imminent_days)
+    due = {}
+    for row in disclosures:
+        ts_code, period = row['ts_code'], row['end_date']
+        if not ts_code or not period or (holder_periods.get(ts_code) or '') >= period:
+            continue
+        if row.get('actual_date') and row['actual_date'] <= today:
+            due.setdefault(ts_code, f"{period} report published {row['actual_date']}")
+        elif row.get('pre_date') and window_start <= row['pre_date'] <= window_end:
+            due.setdefault(ts_code, f"{period} report due {row['pre_date']}")
+    return due
+
+
+def due_from_statements(session, holder_periods, today):
+    """
+    Fallback without disclosure dates: tickers whose stored balance sheets
+    include a period newer than their stored holders.
+
+    Returns:
+        dict: ts_code -> reason
+    """
+    latest = (
+        session.query(BalanceSheet.ts_code, func.max(BalanceSheet.end_date))
+        .filter(BalanceSheet.ann_date <= today)
+        .group_by(BalanceSheet.ts_code)
+    )
+    return {
+        ts_code: f"{period} balance sheet announced"
+        for ts_code, period in latest
+        if period and period > (holder_periods.get(ts_code) or '')
+    }
+
+
+def plan_top_holders_refresh(session, tushare_service, ts_codes, today=None):
+    """
+    Select the tickers whose top holders need refreshing: those with no
+    holders stored, and those with a new or imminent periodic report. Report
+    dates come from Tushare's disclosure_date for the latest PLANNED_PERIODS
+    periods, or, if that returns nothing or fails (e.g. no permission), from
+    the balance sheets already stored.
+
+    Returns:
+        tuple: (dict ts_code -> reason for the tickers to refresh, name of the date source)
+    """
+    today = today or datetime.now().strftime('%Y%m%d')
+    holder_periods = latest_holder_periods(session)
+
+    disclosures = []
+    try:
+        for period in get_quarter_end_dates(PLANNED_PERIODS):
+            disclosures.extend(tushare_service.get_disclosure_dates(period))
+    except TushareError as e:
+        print(f"Disclosure dates unavailable ({e})")
+        disclosures = []
+    if disclosures:
+        found, source = due_from_disclosures(disclosures, holder_periods, today), 'disclosure_date'
+    else:
+        found, source = due_from_statements(session, holder_periods, today), 'stored balance sheets'
+
+    due = {}
+    for ts_code in ts_codes:
+        if ts_code not in holder_periods:
+            due[ts_code] = 'no holders stored'
+        elif ts_code in found:
+            due[ts_code] = found[ts_code]
+    return due, source
@@ -0,0 +1,237 @@
+"""
+Typed Tushare errors, retry backoff with jitter and per-endpoint circuit breakers
+"""
+import json
+import os
+import random
+import threading
+import time
+
+from services.rate_limiter import is_quota_error
+
+# Error kinds returned by classify_error
+QUOTA = 'quota'
+TRANSIENT = 'transient'
+PERMANENT = 'permanent'
+
+# Tushare messages for rejections that retrying cannot fix: no permission for
+# the endpoint, the daily call allowance used up, an invalid token
+PERMANENT_ERROR_MARKERS = ('没有访问该接口的权限', '每天最多访问', 'token不对', '积分不足')
+
+# Retries of a call that failed with a transient error, and their backoff bounds (seconds)
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_BASE_DELAY = 1.0
+DEFAULT_RETRY_MAX_DELAY = 30.0
+
+# Consecutive transient failures that open an endpoint's circuit, and seconds it stays open
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_SECONDS = 60.0
+
+
+class TushareError(Exception):
+    """A Tushare call that failed for good (after any retries)"""
+
+    kind = TRANSIENT
+
+    def __init__(self, api_name, message, attempts=1):
+        super().__init__(f"{api_name}: {message}")
+        self.api_name = api_name
+        self.message = message
+        self.attempts = attempts
+
+    def __reduce__(self):
+        # Rebuilt from its parts when a shard process sends it to the writer
+        return type(self), (self.api_name, self.message, self.attempts)
+
+
+class TransientTushareError(TushareError):
+    """Timeouts, dropped connections, server errors, quota still exceeded: a later run may succeed"""
+
+    kind = TRANSIENT
+
+
+class PermanentTushareError(TushareError):
+    """No permission, daily allowance used up, bad parameters: retrying the same call will fail again"""
+
+    kind = PERMANENT
+
+
+class CircuitOpenError(TransientTushareError):
+    """The endpoint's circuit is open after repeated failures; the call was not attempted"""
+
+    kind = 'circuit_open'
+
+
+def classify_error(error):
+    """
+    Classify an exception raised by a Tushare call.
+
+    Returns:
+        str: QUOTA (back off and retry through the rate limiter), PERMANENT
+            (do not retry) or TRANSIENT (retry with backoff)
+    """
+    if is_quota_error(error):
+        return QUOTA
+    message = str(error)
+    if any(marker in message for marker in PERMANENT_ERROR_MARKERS):
+        return PERMANENT
+    # An HTML or truncated body from a gateway (the SDK and the async client
+    # both json-decode it): a ValueError, but a later attempt may succeed
+    if isinstance(error, json.JSONDecodeError):
+        return TRANSIENT
+    # Programming and parameter errors raised before or after the request
+    if isinstance(error, (TypeError, ValueError, KeyError, AttributeError)):
+        return PERMANENT
+    return TRANSIENT
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter: the n-th retry waits a random time
+    between 0 and min(max_delay, base_delay * 2**n), so workers that failed
+    together do not retry in lockstep.
+    """
+
+    def __init__(self, max_retries=DEFAULT_MAX_RETRIES, base_delay=DEFAULT_RETRY_BASE_DELAY, max_delay=DEFAULT_RETRY_MAX_DELAY):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, retry):
+        """Seconds to wait before retry number `retry` (0-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one endpoint.
+
+    Closed: calls go through and consecutive transient failures are counted.
+    After failure_threshold of them the circuit opens and calls fail at once
+    with CircuitOpenError for reset_seconds, so a failing endpoint is not
+    hammered by every pending unit. Then one trial call is let through
+    (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold=DEFAULT_FAILURE_THRESHOLD, reset_seconds=DEFAULT_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.open_count = 0
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at < self.reset_seconds:
+            return 'open'
+        return 'half-open'
+
+    def before_call(self, api_name):
+        """Raise CircuitOpenError unless a call may be made now"""
+        with self.lock:
+            state = self.state
+            if state == 'closed':
+                return
+            if state == 'half-open' and not self.trial_running:
+                self.trial_running = True
+                return
+            remaining = max(0.0, self.reset_seconds - (time.monotonic() - self.opened_at))
+            raise CircuitOpenError(api_name, f"circuit open after {self.failures} consecutive failures, retry in {remaining:.0f}s", 0)
+
+    def record_success(self):
+        """The endpoint answered with data"""
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def release_trial(self):
+        """
+        The call was rejected for a reason that says nothing about the
+        endpoint's health (quota, permission): the failure count and the
+        open/closed state stay as they are, only a half-open trial slot is
+        freed for the next call.
+        """
+        with self.lock:
+            self.trial_running = False
+
+    def record_failure(self):
+        """A transient failure; returns True if it opened the circuit"""
+        with self.lock:
+            self.failures += 1
+            was_trial = self.trial_running
+            self.trial_running = False
+            if was_trial or (self.opened_at is None and self.failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+                self.open_count += 1
+                return True
+            return False
+
+
+class CircuitBreakers:
+    """One CircuitBreaker per endpoint, created on first use"""
+
+    def __init__(self, failure_threshold=DEFAULT_FAILURE_THRESHOLD, reset_seconds=DEFAULT_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.breakers = {}
+        self.lock = threading.Lock()
+
+    def get(self, api_name):
+        with self.lock:
+            breaker = self.breakers.get(api_name)
+            if breaker is None:
+                breaker = CircuitBreaker(self.failure_threshold, self.reset_seconds)
+                self.breakers[api_name] = breaker
+            return breaker
+
+    def open_counts(self):
+        """endpoint -> times its circuit opened, for endpoints whose circuit ever opened"""
+        with self.lock:
+            return {name: breaker.open_count for name, breaker in self.breakers.items() if breaker.open_count}
+
+
+_shared_policy = None
+_shared_breakers = None
+_shared_lock = threading.Lock()
+
+
+def get_retry_policy():
+    """
+    Return the process-wide retry policy. Configured from the environment:
+
+        TUSHARE_RETRIES            retries of a transiently failed call (3)
+        TUSHARE_RETRY_BASE_DELAY   backoff of the first retry, doubled each time (1.0s)
+        TUSHARE_RETRY_MAX_DELAY    upper bound of one backoff (30s)
+    """
+    global _shared_policy
+    with _shared_lock:
+        if _shared_policy is None:
+            _shared_policy = RetryPolicy(
+                int(os.getenv('TUSHARE_RETRIES', DEFAULT_MAX_RETRIES)),
+                float(os.getenv('TUSHARE_RETRY_BASE_DELAY', DEFAULT_RETRY_BASE_DELAY)),
+                float(os.getenv('TUSHARE_RETRY_MAX_DELAY', DEFAULT_RETRY_MAX_DELAY))
+            )
+        return _shared_policy
+
+
+def get_circuit_breakers():
+    """
+    Return the process-wide circuit breakers, shared like the rate limiter so
+    every loader sees an endpoint's health. Configured from the environment:
+
+        TUSHARE_CIRCUIT_FAILURES   consecutive failures that open a circuit (5)
+        TUSHARE_CIRCUIT_RESET      seconds a circuit stays open (60)
+    """
+    global _shared_breakers
+    with _shared_lock:
+        if _shared_breakers is None:
+            _shared_breakers = CircuitBreakers(
+                int(os.getenv('TUSHARE_CIRCUIT_FAILURES', DEFAULT_FAILURE_THRESHOLD)),
+                float(os.getenv('TUSHARE_CIRCUIT_RESET', DEFAULT_RESET_SECONDS))
+            )
+        return _shared_breakers
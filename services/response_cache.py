@@ -0,0 +1,207 @@
+"""
+Optional on-disk cache of Tushare responses for replays and backfills
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+# Seconds a cached response stays valid when its endpoint has no entry below
+DEFAULT_TTL = 12 * 3600
+
+# Endpoints whose data changes more or less often than the default (seconds)
+ENDPOINT_TTLS = {
+    'trade_cal': 7 * 86400,
+    'stock_basic': 86400,
+    'hm_list': 7 * 86400,
+    'balancesheet': 7 * 86400,
+    'cashflow': 7 * 86400,
+    'income': 7 * 86400,
+    'balancesheet_vip': 7 * 86400,
+    'cashflow_vip': 7 * 86400,
+    'income_vip': 7 * 86400,
+    'fina_indicator_vip': 7 * 86400,
+    'ths_hot': 3600,
+    'dc_hot': 3600,
+}
+
+DEFAULT_MAX_MB = 2048
+
+# Parameters naming a day or report period whose data Tushare publishes
+# later: an empty answer for one only means "not yet", so it is not cached
+PUBLICATION_PARAMS = ('trade_date', 'ann_date', 'ex_date', 'period')
+
+CACHE_SUFFIX = '.pkl.gz'
+
+
+def parse_ttls(spec):
+    """
+    Parse a per-endpoint TTL spec such as "daily=86400,ths_hot=600".
+
+    Returns:
+        dict: endpoint name -> seconds
+    """
+    ttls = {}
+    for part in (spec or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, value = part.partition('=')
+        ttls[name.strip()] = int(value)
+    return ttls
+
+
+def cache_key(api_name, params):
+    """Stable digest of an endpoint call; params include `fields`"""
+    payload = json.dumps({'api': api_name, 'params': params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    Gzip-compressed pickled DataFrames under one directory, one file per
+    (api_name, params) call, grouped in a subdirectory per endpoint.
+
+    A file's mtime is when it was written and decides expiry against the
+    endpoint TTL; its atime is bumped on every hit and decides eviction
+    order, least recently used first, whenever the directory grows past
+    max_bytes. Empty frames are cached too, so tickers without data are not
+    asked for again, except for calls naming a trading day, announcement
+    day or report period (PUBLICATION_PARAMS): those are empty until
+    Tushare publishes, and a cached "not yet" would hide the data until it
+    expired. Only load caches you wrote yourself: entries are pickles.
+    """
+
+    def __init__(self, directory, default_ttl=DEFAULT_TTL, ttls=None, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        self.directory = directory
+        self.default_ttl = default_ttl
+        self.ttls = dict(ENDPOINT_TTLS)
+        self.ttls.update(ttls or {})
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self.size = sum(os.path.getsize(path) for path in self._files())
+
+    def _path(self, api_name, params):
+        return os.path.join(self.directory, api_name, cache_key(api_name, params) + CACHE_SUFFIX)
+
+    def _files(self):
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(CACHE_SUFFIX):
+                    yield os.path.join(root, name)
+
+    def ttl(self, api_name):
+        return self.ttls.get(api_name, self.default_ttl)
+
+    def get(self, api_name, params):
+        """Cached frame for the call, or None if absent or expired"""
+        path = self._path(api_name, params)
+        try:
+            stat = os.stat(path)
+            if time.time() - stat.st_mtime > self.ttl(api_name):
+                self._remove(path)
+                df = None
+            else:
+                df = pd.read_pickle(path, compression='gzip')
+                os.utime(path, (time.time(), stat.st_mtime))
+        except (OSError, EOFError, ValueError):
+            df = None
+        with self.lock:
+            if df is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return df
+
+    def put(self, api_name, params, df):
+        """Store a frame, then evict least recently used entries over max_bytes"""
+        if df is None:
+            return
+        if df.empty and any(params.get(name) for name in PUBLICATION_PARAMS):
+            return
+        path = self._path(api_name, params)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        df.to_pickle(temp_path, compression='gzip')
+        with self.lock:
+            if os.path.exists(path):
+                self.size -= os.path.getsize(path)
+            os.replace(temp_path, path)
+            self.size += os.path.getsize(path)
+            if self.size > self.max_bytes:
+                self._evict()
+
+    def _remove(self, path):
+        with self.lock:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                return
+            self.size -= size
+
+    def _evict(self):
+        """Drop least recently used files until under 90% of max_bytes (lock held)"""
+        entries = []
+        for path in self._files():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_atime, stat.st_size, path))
+        target = self.max_bytes * 0.9
+        for _, size, path in sorted(entries):
+            if self.size <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self.size -= size
+            self.evictions += 1
+
+    def clear(self, api_name=None):
+        """Remove every entry, or only those of one endpoint"""
+        for path in list(self._files()):
+            if api_name is None or os.path.basename(os.path.dirname(path)) == api_name:
+                self._remove(path)
+
+    def summary(self):
+        """e.g. '120 hits, 30 misses, 45.2 MB on disk'"""
+        return f"{self.hits} hits, {self.misses} misses, {self.size / 1024 / 1024:.1f} MB on disk"
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_response_cache():
+    """
+    Return the process-wide cache, or None when caching is off. Configured
+    from the environment:
+
+        TUSHARE_CACHE_DIR     directory of the cache; unset disables caching
+        TUSHARE_CACHE_TTL     default TTL in seconds (43200)
+        TUSHARE_CACHE_TTLS    overrides, e.g. "daily=86400,ths_hot=600"
+        TUSHARE_CACHE_MAX_MB  size bound before LRU eviction (2048)
+    """
+    global _shared_cache
+    directory = os.getenv('TUSHARE_CACHE_DIR')
+    if not directory:
+        return None
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = ResponseCache(
+                directory,
+                default_ttl=int(os.getenv('TUSHARE_CACHE_TTL', DEFAULT_TTL)),
+                ttls=parse_ttls(os.getenv('TUSHARE_CACHE_TTLS', '')),
+                max_bytes=int(os.getenv('TUSHARE_CACHE_MAX_MB', DEFAULT_MAX_MB)) * 1024 * 1024
+            )
+        return _shared_cache
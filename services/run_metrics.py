@@ -0,0 +1,187 @@
+"""
+Per-table ETL metrics, collected while a table updates and kept in
+etl_runs / etl_run_metrics and a JSON-lines log
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from sqlalchemy import func
+
+from models import EtlRun, EtlRunMetric, EtlFailure
+from services.memory_guard import current_rss_mb
+
+DEFAULT_METRICS_LOG = os.path.join('database', 'etl_runs.jsonl')
+
+# Metrics of the table being updated in this context; fetch_concurrently carries it into its worker threads
+_current = contextvars.ContextVar('etl_table_metrics', default=None)
+
+
+class TableMetrics:
+    """
+    Counters of one table's update. TushareService calls and the table's
+    writers report into the instance that is current (track_table) in the
+    thread doing the work, so tables updated in parallel keep separate counts.
+    """
+
+    def __init__(self, table_name):
+        self.table_name = table_name
+        self.started_at = datetime.now(timezone.utc)
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.success = False
+        self.message = ''
+        self.api_calls = 0
+        self.retries = 0
+        self.quota_backoffs = 0
+        self.throttle_seconds = 0.0
+        self.cache_hits = 0
+        self.peak_rss_mb = current_rss_mb()
+        self.writers = []
+        self.lock = threading.Lock()
+
+    def record_call(self, throttle_seconds=0.0):
+        """One attempt of a Tushare call, after waiting throttle_seconds for the rate limiter"""
+        rss = current_rss_mb()
+        with self.lock:
+            self.api_calls += 1
+            self.throttle_seconds += throttle_seconds
+            self.peak_rss_mb = max(self.peak_rss_mb, rss)
+
+    def record_cache_hit(self):
+        with self.lock:
+            self.cache_hits += 1
+
+    def add_totals(self, calls=0, retries=0, quota_backoffs=0, throttle_seconds=0.0):
+        """Counts of work done elsewhere for this table, e.g. by the shard processes of --workers"""
+        with self.lock:
+            self.api_calls += calls
+            self.retries += retries
+            self.quota_backoffs += quota_backoffs
+            self.throttle_seconds += throttle_seconds
+
+    def finish(self, success, message):
+        self.duration = time.perf_counter() - self.started
+        self.success = success
+        self.message = message
+        self.peak_rss_mb = max(self.peak_rss_mb, current_rss_mb())
+
+    def row_counts(self):
+        """(processed, written, inserted, updated, unchanged) over the table's writers"""
+        return tuple(
+            sum(getattr(writer, name, 0) for writer in self.writers)
+            for name in ('processed', 'count', 'inserted', 'updated', 'unchanged')
+        )
+
+    def to_dict(self):
+        rows, written, inserted, updated, unchanged = self.row_counts()
+        return {
+            'table_name': self.table_name,
+            'started_at': self.started_at,
+            'duration_seconds': round(self.duration, 3),
+            'success': int(self.success),
+            'message': self.message[:500],
+            'api_calls': self.api_calls,
+            'retries': self.retries,
+            'quota_backoffs': self.quota_backoffs,
+            'throttle_seconds': round(self.throttle_seconds, 3),
+            'cache_hits': self.cache_hits,
+            'rows': rows,
+            'rows_written': written,
+            'rows_inserted': inserted,
+            'rows_updated': updated,
+            'rows_unchanged': unchanged,
+            'rows_per_second': round(rows / self.duration, 1) if self.duration > 0 else 0.0,
+            'peak_rss_mb': round(self.peak_rss_mb, 1),
+        }
+
+
+def current_metrics():
+    """The TableMetrics of the table being updated in this context, or None"""
+    return _current.get()
+
+
+@contextmanager
+def track_table(table_name):
+    """Make a new TableMetrics current for the duration of one table's update"""
+    metrics = TableMetrics(table_name)
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+def track_writer(writer):
+    """Count a writer's rows towards the current table's metrics; returns the writer"""
+    metrics = current_metrics()
+    if metrics is not None:
+        metrics.writers.append(writer)
+    return writer
+
+
+def save_run(session, started_at, duration, command, table_metrics, failed_units=None):
+    """
+    Store one update_data.py run and its tables' metrics; the caller commits.
+
+    Args:
+        table_metrics (list): TableMetrics of the tables that ran
+        failed_units (dict): table name -> failed units on record after the run
+
+    Returns:
+        tuple: (EtlRun, list of per-table dicts as stored)
+    """
+    failed_units = failed_units if failed_units is not None else failed_unit_counts(session)
+    records = []
+    for metrics in table_metrics:
+        record = metrics.to_dict()
+        record['failed_units'] = failed_units.get(metrics.table_name, 0)
+        records.append(record)
+    run = EtlRun(
+        started_at=started_at,
+        duration_seconds=round(duration, 3),
+        command=command,
+        tables=','.join(record['table_name'] for record in records),
+        succeeded=sum(record['success'] for record in records),
+        failed=sum(1 - record['success'] for record in records),
+        api_calls=sum(record['api_calls'] for record in records),
+        throttle_seconds=round(sum(record['throttle_seconds'] for record in records), 3),
+        peak_rss_mb=max((record['peak_rss_mb'] for record in records), default=current_rss_mb()),
+    )
+    session.add(run)
+    session.flush()
+    session.add_all(EtlRunMetric(run_id=run.id, **record) for record in records)
+    return run, records
+
+
+def failed_unit_counts(session):
+    """table name -> units on record in etl_failures"""
+    return dict(session.query(EtlFailure.table_name, func.count(EtlFailure.id)).group_by(EtlFailure.table_name))
+
+
+def _json_default(value):
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def append_log(run, records, path=None):
+    """
+    Append the run and its tables to the JSON-lines metrics log
+    (ETL_METRICS_LOG, default database/etl_runs.jsonl; empty disables it):
+    one {"event": "run", ...} line, then one {"event": "table", ...} line per table.
+    """
+    path = os.getenv('ETL_METRICS_LOG', DEFAULT_METRICS_LOG) if path is None else path
+    if not path:
+        return None
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    run_fields = {column.name: getattr(run, column.name) for column in EtlRun.__table__.columns}
+    with open(path, 'a', encoding='utf-8') as log:
+        log.write(json.dumps({'event': 'run', **run_fields}, ensure_ascii=False, default=_json_default) + '\n')
+        for record in records:
+            log.write(json.dumps({'event': 'table', 'run_id': run.id, **record}, ensure_ascii=False, default=_json_default) + '\n')
+    return path
@@ -0,0 +1,208 @@
+"""
+Multi-process fetch stage: the ticker universe split into shards fetched and
+converted by worker processes, streamed back to the single writer
+"""
+import multiprocessing
+import queue
+import time
+import traceback
+
+from services.fetch_engine import fetch_concurrently
+from services.rate_limiter import get_rate_limiter
+from services.resilience import TransientTushareError
+from services.run_metrics import current_metrics, track_table
+
+# Rows a shard buffers before sending them to the writer as one batch
+SHARD_BATCH_ROWS = 5000
+
+# Batches that may wait in the queue per shard before shards block (backpressure)
+SHARD_QUEUE_BATCHES = 4
+
+# Seconds the writer waits on the queue before checking that the shards are alive
+SHARD_POLL_SECONDS = 1.0
+
+
+class ShardFailedError(TransientTushareError):
+    """A shard process died (killed, out of memory); its units that were not delivered are recorded as failed"""
+
+    kind = 'shard_failed'
+
+
+class _ShardFailures:
+    """FailedUnits stand-in inside a shard: failed units are sent to the writer, which records them"""
+
+    def __init__(self, results, shard):
+        self.results = results
+        self.shard = shard
+
+    def record(self, item, error):
+        self.results.put(('failed', self.shard, item, error))
+
+
+def _run_shard(shard, items, fetch, concurrency, shards, results):
+    """
+    Body of a shard process: fetch its items with a thread pool, on 1/shards
+    of the per-endpoint API budget, and send (item, rows) batches to the
+    writer, then a 'done' message with the shard's totals.
+    """
+    try:
+        started = time.perf_counter()
+        limiter = get_rate_limiter()
+        limiter.share(shards)
+        failures = _ShardFailures(results, shard)
+        batch = []
+        batch_rows = 0
+        with track_table(f'shard {shard}') as metrics:
+            for item, result in fetch_concurrently(items, fetch, concurrency, failures=failures):
+                batch.append((item, result))
+                batch_rows += max(1, len(result or []))
+                if batch_rows >= SHARD_BATCH_ROWS:
+                    results.put(('rows', shard, batch))
+                    batch = []
+                    batch_rows = 0
+        if batch:
+            results.put(('rows', shard, batch))
+        results.put(('done', shard, {
+            'seconds': time.perf_counter() - started,
+            'calls': limiter.calls,
+            'retries': metrics.retries,
+            'wait_seconds': limiter.wait_seconds,
+            'backoffs': limiter.backoff_count,
+        }))
+    except BaseException:
+        results.put(('crashed', shard, traceback.format_exc()))
+
+
+def split_shards(items, shards):
+    """Deal items round-robin into at most `shards` non-empty lists, so every shard gets a similar mix"""
+    items = list(items)
+    return [part for part in (items[index::shards] for index in range(shards)) if part]
+
+
+def fetch_sharded(items, fetch, workers, concurrency, failures=None):
+    """
+    Fan items out across `workers` processes and yield (item, result) pairs
+    back in the calling thread, in the order the shards deliver them.
+
+    Each process fetches and converts its shard with `concurrency` threads,
+    so the CPU-bound part of a load (parsing responses, building row dicts)
+    runs on several cores, while the caller stays the only process that
+    writes to the database, as SQLite allows a single writer. Shards split
+    the per-endpoint API budget between them. Results arrive in batches of
+    about SHARD_BATCH_ROWS rows through a bounded queue, so a slow writer
+    holds the shards back instead of buffering the whole table.
+
+    fetch is pickled into every process: pass a TushareService method or a
+    functools.partial of one (the service is rebuilt in the shard from the
+    environment), not a lambda.
+
+    Args:
+        items: iterable of work items (e.g. ts_codes)
+        fetch: picklable callable taking one item and returning its result
+        workers (int): number of shard processes
+        concurrency (int): requests in flight per shard
+        failures (FailedUnits): if given, items whose fetch raised a
+            TushareError, and the undelivered items of a shard process that
+            died, are recorded there; otherwise the first such error is
+            raised. Any other exception in a shard stops all of them and is
+            raised as a RuntimeError, as it would propagate from
+            fetch_concurrently.
+
+    Yields:
+        tuple: (item, result)
+    """
+    shards = split_shards(items, workers)
+    if not shards:
+        return
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue(maxsize=SHARD_QUEUE_BATCHES * len(shards))
+    processes = [
+        context.Process(
+            target=_run_shard,
+            args=(shard, shard_items, fetch, concurrency, len(shards), results),
+            name=f'etl-shard-{shard}',
+            daemon=True
+        )
+        for shard, shard_items in enumerate(shards)
+    ]
+    for process in processes:
+        process.start()
+
+    delivered = [set() for _ in shards]
+    totals = {}
+    exited = set()
+    counts = {'units': 0, 'rows': 0, 'failed': 0}
+    try:
+        while len(totals) < len(shards):
+            try:
+                message = results.get(timeout=SHARD_POLL_SECONDS)
+            except queue.Empty:
+                for shard, process in enumerate(processes):
+                    if shard in totals or process.is_alive():
+                        continue
+                    # Give messages sent just before the exit one more poll to arrive
+                    if shard in exited:
+                        counts['failed'] += _shard_lost(shard, shards[shard], delivered[shard], f"exited with code {process.exitcode}", failures)
+                        totals[shard] = None
+                    exited.add(shard)
+                continue
+            kind, shard = message[0], message[1]
+            if kind == 'rows':
+                for item, result in message[2]:
+                    delivered[shard].add(item)
+                    counts['units'] += 1
+                    counts['rows'] += len(result or [])
+                    yield item, result
+            elif kind == 'failed':
+                item, error = message[2], message[3]
+                delivered[shard].add(item)
+                if failures is None:
+                    raise error
+                failures.record(item, error)
+                counts['failed'] += 1
+            elif kind == 'done':
+                totals[shard] = message[2]
+            elif kind == 'crashed':
+                print(f"Shard {shard} failed:\n{message[2]}")
+                raise RuntimeError(f"shard {shard}: {message[2].strip().splitlines()[-1]}")
+    finally:
+        # Stop the shards if the writer bails out early
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+        results.close()
+
+    _report_shards(len(shards), counts, totals)
+
+
+def _shard_lost(shard, items, delivered, reason, failures):
+    """A shard process exited without finishing: its undelivered items failed. Returns how many"""
+    error = ShardFailedError(f'shard {shard}', reason, 0)
+    if failures is None:
+        raise error
+    lost = [item for item in items if item not in delivered]
+    for item in lost:
+        failures.record(item, error)
+    return len(lost)
+
+
+def _report_shards(shard_count, counts, totals):
+    """
+    Print the shards' combined progress and count their API calls and
+    throttling in this process's limiter and the current table's metrics
+    """
+    finished = [stats for stats in totals.values() if stats]
+    calls = sum(stats['calls'] for stats in finished)
+    wait_seconds = sum(stats['wait_seconds'] for stats in finished)
+    backoffs = sum(stats['backoffs'] for stats in finished)
+    get_rate_limiter().add_totals(calls, wait_seconds, backoffs)
+    metrics = current_metrics()
+    if metrics is not None:
+        metrics.add_totals(calls, sum(stats['retries'] for stats in finished), backoffs, wait_seconds)
+    slowest = max((stats['seconds'] for stats in finished), default=0.0)
+    print(
+        f"{shard_count} shards fetched {counts['units']} units ({counts['rows']} rows, {calls} calls, "
+        f"{counts['failed']} failed); slowest shard {slowest:.1f}s, throttle wait {wait_seconds:.1f}s"
+    )
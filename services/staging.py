@@ -0,0 +1,324 @@
+"""
+Partitioned Parquet staging area between Tushare fetches and the database
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, Integer
+
+from models import natural_key
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # only needed with --stage
+    pa = pq = None
+
+DEFAULT_STAGING_DIR = os.path.join('database', 'staging')
+
+# Column each table's files are partitioned by: staging/<table>/<value>/part-*.parquet
+STAGING_PARTITIONS = {
+    'daily': 'trade_date',
+    'adj_factor': 'trade_date',
+    'daily_basic': 'trade_date',
+    'hm_detail': 'trade_date',
+    'ths_hot': 'trade_date',
+    'dc_hot': 'trade_date',
+    'index_daily': 'trade_date',
+    'top_holders': 'end_date',
+    'balance_sheets': 'end_date',
+    'cash_flows': 'end_date',
+    'income_statements': 'end_date',
+    'fina_indicators': 'end_date',
+    'dividend': 'end_date',
+}
+
+# Partition of tables without a partition column, and of rows whose partition value is empty
+ALL_PARTITION = '_all'
+EMPTY_PARTITION = '_none'
+
+# Rows buffered by StagedWriter before they are staged and loaded
+DEFAULT_STAGE_BATCH_ROWS = 50000
+
+# Part files a partition may collect before StagedWriter compacts it
+MAX_PARTITION_FILES = 8
+
+# Part file metadata listing the columns its rows were fetched with; the
+# others are NULL because the run left them out (e.g. --fields core)
+STAGED_COLUMNS_KEY = b'staged_columns'
+
+
+def _arrow_type(column):
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp('us', tz='UTC')
+    return pa.string()
+
+
+# Model columns the database fills in rather than the fetch
+UNSTAGED_COLUMNS = ('id', 'row_hash')
+
+
+def staging_schema(model):
+    """Arrow schema of a model's fetched columns, so every file of a table has the same types"""
+    return pa.schema([
+        (column.name, _arrow_type(column)) for column in model.__table__.columns if column.name not in UNSTAGED_COLUMNS
+    ])
+
+
+def _coerce(value, arrow_type):
+    if value is None:
+        return None
+    if pa.types.is_floating(arrow_type):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+    if pa.types.is_integer(arrow_type):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+    if pa.types.is_timestamp(arrow_type):
+        return value if isinstance(value, datetime) else None
+    return str(value)
+
+
+def staged_columns(schema):
+    """Columns a part file's rows were fetched with, or None for files staged before they were recorded"""
+    metadata = schema.metadata or {}
+    if STAGED_COLUMNS_KEY not in metadata:
+        return None
+    return json.loads(metadata[STAGED_COLUMNS_KEY])
+
+
+def _column_array(values, arrow_type):
+    """Arrow array of one column; values of the wrong type (e.g. numeric strings from RAW fields) are coerced"""
+    try:
+        return pa.array(values, type=arrow_type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError, OverflowError):
+        return pa.array([_coerce(value, arrow_type) for value in values], type=arrow_type)
+
+
+class StagingArea:
+    """
+    Parquet files of fetched rows, one directory per table and partition:
+
+        <root>/daily/20260105/part-20260105T153012-4242-000001.parquet
+        <root>/balance_sheets/20250930/part-....parquet
+        <root>/tickers/_all/part-....parquet
+
+    Every write adds new part files, named so that sorting them by name
+    orders them by write time; a key staged twice is therefore resolved by
+    reading in file order and letting the last version win, as the loaders'
+    upserts do. Files carry the model's column types, so a table directory
+    can be read directly by pandas, pyarrow or DuckDB for analysis. Each
+    file also records which columns its rows were fetched with, and read()
+    returns only those, so reloading rows fetched with a narrow field
+    profile does not overwrite the other stored columns with NULL.
+    """
+
+    def __init__(self, root=DEFAULT_STAGING_DIR):
+        if pa is None:
+            raise RuntimeError("Parquet staging needs pyarrow: pip install pyarrow")
+        self.root = root
+        self.lock = threading.Lock()
+        self.sequence = 0
+        self.run_stamp = datetime.now().strftime('%Y%m%dT%H%M%S')
+
+    def table_dir(self, table_name):
+        return os.path.join(self.root, table_name)
+
+    def partitions(self, table_name):
+        """Partition values staged for a table, ascending"""
+        path = self.table_dir(table_name)
+        if not os.path.isdir(path):
+            return []
+        return sorted(name for name in os.listdir(path) if os.path.isdir(os.path.join(path, name)))
+
+    def files(self, table_name, partitions=None):
+        """Part files of the given partitions (default all), in partition then write order"""
+        found = []
+        for partition in partitions if partitions is not None else self.partitions(table_name):
+            path = os.path.join(self.table_dir(table_name), partition)
+            if os.path.isdir(path):
+                found.extend(os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith('.parquet'))
+        return found
+
+    def _part_name(self):
+        with self.lock:
+            self.sequence += 1
+            return f"part-{self.run_stamp}-{os.getpid()}-{self.sequence:06d}.parquet"
+
+    def write(self, table_name, model, rows):
+        """
+        Stage rows: one new part file per partition they fall into.
+
+        Returns:
+            list: partitions written to
+        """
+        if not rows:
+            return []
+        schema = staging_schema(model)
+        partition_column = STAGING_PARTITIONS.get(table_name)
+        groups = {}
+        for row in rows:
+            partition = str(row.get(partition_column) or EMPTY_PARTITION) if partition_column else ALL_PARTITION
+            groups.setdefault(partition, []).append(row)
+
+        for partition, group in groups.items():
+            fetched = [field.name for field in schema if any(field.name in row for row in group)]
+            table = pa.table(
+                [_column_array([row.get(field.name) for row in group], field.type) for field in schema],
+                schema=schema.with_metadata({STAGED_COLUMNS_KEY: json.dumps(fetched)})
+            )
+            path = os.path.join(self.table_dir(table_name), partition)
+            os.makedirs(path, exist_ok=True)
+            final = os.path.join(path, self._part_name())
+            # Write under a temporary name so readers never see a half-written file
+            pq.write_table(table, final + '.tmp')
+            os.replace(final + '.tmp', final)
+        return list(groups)
+
+    def read(self, table_name, partitions=None, batch_rows=DEFAULT_STAGE_BATCH_ROWS):
+        """
+        Yield the staged rows of the given partitions as lists of dicts, in
+        file order, each with the columns its file was fetched with
+        """
+        for path in self.files(table_name, partitions):
+            parquet_file = pq.ParquetFile(path)
+            columns = staged_columns(parquet_file.schema_arrow)
+            for batch in parquet_file.iter_batches(batch_size=batch_rows, columns=columns):
+                yield batch.to_pylist()
+
+    def compact(self, table_name, keys, partitions=None):
+        """
+        Merge each partition's part files into one, keeping only the last
+        staged version of every key. Files fetched with different columns
+        are not merged with each other: consecutive files with the same
+        columns become one file, in their place in write order.
+
+        Returns:
+            tuple: (partitions compacted, files removed)
+        """
+        compacted = 0
+        removed = 0
+        for partition in partitions if partitions is not None else self.partitions(table_name):
+            runs = []
+            for path in self.files(table_name, [partition]):
+                columns = staged_columns(pq.read_schema(path))
+                if runs and runs[-1][0] == columns:
+                    runs[-1][1].append(path)
+                else:
+                    runs.append((columns, [path]))
+            merged_runs = [(columns, paths) for columns, paths in runs if len(paths) > 1]
+            for columns, paths in merged_runs:
+                self._merge(paths, keys)
+                removed += len(paths)
+            compacted += bool(merged_runs)
+        return compacted, removed
+
+    def _merge(self, paths, keys):
+        """Replace consecutive part files with one, named to sort where the last of them did"""
+        merged = pa.concat_tables([pq.read_table(path) for path in paths], promote_options='permissive')
+        frame = merged.to_pandas()
+        if keys:
+            frame = frame.drop_duplicates(subset=list(keys), keep='last')
+        table = pa.Table.from_pandas(frame, schema=merged.schema, preserve_index=False)
+        final = paths[-1][:-len('.parquet')] + '-c.parquet'
+        pq.write_table(table, final + '.tmp')
+        os.replace(final + '.tmp', final)
+        for path in paths:
+            os.remove(path)
+
+    def summary(self, table_name):
+        """(partitions, files, rows, bytes) staged for a table"""
+        paths = self.files(table_name)
+        rows = sum(pq.ParquetFile(path).metadata.num_rows for path in paths)
+        size = sum(os.path.getsize(path) for path in paths)
+        return len(self.partitions(table_name)), len(paths), rows, size
+
+
+class StagedWriter:
+    """
+    BulkWriter front that stages rows before they reach the database. Rows
+    are buffered; every batch_rows rows, and on flush(), the batch is
+    written to the staging area and then bulk-loaded through the wrapped
+    writer into the caller's session. The staged files are thus a superset
+    of what was committed, and scripts/load_staging.py can rebuild the
+    table from them without calling Tushare. Per-ticker runs add a file to
+    many partitions on every flush, so a partition that collects more than
+    MAX_PARTITION_FILES files is compacted on the spot.
+    """
+
+    def __init__(self, writer, staging, table_name, model, batch_rows=DEFAULT_STAGE_BATCH_ROWS):
+        self.writer = writer
+        self.staging = staging
+        self.table_name = table_name
+        self.model = model
+        self.batch_rows = batch_rows
+        self.buffer = []
+        self.files = 0
+        self.stage_seconds = 0.0
+
+    def add(self, row):
+        self.buffer.append(row)
+        if len(self.buffer) >= self.batch_rows:
+            self.flush()
+
+    def extend(self, rows):
+        for row in rows:
+            self.add(row)
+
+    def flush(self):
+        """Stage the buffered rows, then load them into the database"""
+        if self.buffer:
+            started = time.perf_counter()
+            partitions = self.staging.write(self.table_name, self.model, self.buffer)
+            self.files += len(partitions)
+            crowded = [
+                partition for partition in partitions
+                if len(self.staging.files(self.table_name, [partition])) > MAX_PARTITION_FILES
+            ]
+            if crowded:
+                self.staging.compact(self.table_name, natural_key(self.model), crowded)
+            self.stage_seconds += time.perf_counter() - started
+            self.writer.extend(self.buffer)
+            self.buffer = []
+        self.writer.flush()
+
+    @property
+    def count(self):
+        return self.writer.count
+
+    def rows_per_second(self):
+        return self.writer.rows_per_second()
+
+    def changes(self):
+        return self.writer.changes()
+
+    def summary(self):
+        return f"{self.writer.summary()}, staged in {self.files} files ({self.stage_seconds:.1f}s)"
+
+
+_shared_staging = None
+_shared_lock = threading.Lock()
+
+
+def get_staging_area(root=None):
+    """
+    Return the process-wide staging area, rooted at root, ETL_STAGING_DIR or
+    database/staging
+    """
+    global _shared_staging
+    with _shared_lock:
+        root = root or os.getenv('ETL_STAGING_DIR', DEFAULT_STAGING_DIR)
+        if _shared_staging is None or _shared_staging.root != root:
+            _shared_staging = StagingArea(root)
+        return _shared_staging
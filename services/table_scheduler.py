@@ -0,0 +1,114 @@
+"""
+Dependency-aware parallel scheduling of table update functions
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+class TableRun:
+    """Outcome and timing of one table's update"""
+
+    def __init__(self, table_name):
+        self.table_name = table_name
+        self.success = False
+        self.message = ''
+        self.skipped = False
+        self.started = None
+        self.finished = None
+
+    @property
+    def duration(self):
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+
+def run_table_graph(tables, update_functions, dependencies, max_parallel=1, on_start=None, on_finish=None):
+    """
+    Run the update functions of `tables`, starting each one as soon as the
+    tables it depends on have finished, with at most max_parallel running at
+    once. Dependencies on tables that are not selected are ignored; tables
+    whose dependency failed are skipped. Ready tables start in the order
+    they are listed in `tables`.
+
+    Args:
+        tables (list): table names to update
+        update_functions (dict): table name -> function returning (success, message)
+        dependencies (dict): table name -> table names that must finish first
+        max_parallel (int): number of tables updated concurrently
+        on_start: optional callback(table_name)
+        on_finish: optional callback(TableRun)
+
+    Returns:
+        dict: table name -> TableRun, in completion order
+    """
+    selected = set(tables)
+    waiting_on = {table: [dep for dep in dependencies.get(table, []) if dep in selected] for table in tables}
+    runs = {table: TableRun(table) for table in tables}
+    completed = {}
+    pending = list(tables)
+    origin = time.perf_counter()
+
+    def execute(table):
+        run = runs[table]
+        run.started = time.perf_counter() - origin
+        try:
+            run.success, run.message = update_functions[table]()
+        except Exception as e:
+            run.success, run.message = False, f"Error: {e}"
+        run.finished = time.perf_counter() - origin
+        return run
+
+    def finish(run):
+        completed[run.table_name] = run
+        if on_finish:
+            on_finish(run)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as executor:
+        running = {}
+        while pending or running:
+            for table in list(pending):
+                if len(running) >= max(1, max_parallel):
+                    break
+                deps = waiting_on[table]
+                if any(dep not in completed for dep in deps):
+                    continue
+                pending.remove(table)
+                failed = [dep for dep in deps if not completed[dep].success]
+                if failed:
+                    run = runs[table]
+                    run.skipped = True
+                    run.message = f"Skipped: {', '.join(failed)} failed"
+                    run.started = run.finished = time.perf_counter() - origin
+                    finish(run)
+                    continue
+                if on_start:
+                    on_start(table)
+                running[executor.submit(execute, table)] = table
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                del running[future]
+                finish(future.result())
+    return completed
+
+
+def critical_path(runs, dependencies):
+    """
+    The chain of tables that determined the total wall time: starting from
+    the table that finished last, repeatedly step to the dependency that
+    finished last before it started.
+
+    Returns:
+        list: TableRun objects, earliest first
+    """
+    if not runs:
+        return []
+    path = [max(runs.values(), key=lambda run: run.finished)]
+    while True:
+        deps = [runs[dep] for dep in dependencies.get(path[-1].table_name, []) if dep in runs]
+        if not deps:
+            break
+        path.append(max(deps, key=lambda run: run.finished))
+    return list(reversed(path))
@@ -1,99 +1,330 @@
 import os
+import time
 import tushare as ts
 from datetime import datetime, timedelta
 import pandas as pd
 from dotenv import load_dotenv
 
+from services.rate_limiter import get_rate_limiter
+from services.response_cache import get_response_cache
+from services.fake_tushare import get_fake_pro_api
+from services.async_tushare import get_async_pro_api
+from services.resilience import (
+    get_retry_policy, get_circuit_breakers, classify_error, QUOTA, PERMANENT,
+    TushareError, TransientTushareError, PermanentTushareError
+)
+from services.run_metrics import current_metrics
+from services.frame_convert import convert_frame, field_spec, STR, TEXT, FLOAT, FLOAT_OR_NONE, INT_OR_NONE, RAW
+
 # Load environment variables from .env file in the current directory
 load_dotenv()
 
+# How many times a call rejected for exceeding the quota is retried
+MAX_QUOTA_RETRIES = 5
+
+# Rows asked for per page from whole-market endpoints; Tushare may cap pages lower
+PAGE_SIZE = 5000
+
+# Safety stop for endpoints that ignore offset
+MAX_PAGES = 200
+
+# Fields requested from each endpoint when the caller does not pass `fields`
+TICKER_FIELDS = 'ts_code,symbol,name,area,industry,list_date,list_status,delist_date'
+TOP_HOLDER_FIELDS = 'ts_code,ann_date,end_date,holder_name,hold_amount,hold_ratio,holder_type,hold_change'
+HM_LIST_FIELDS = 'name,desc,orgs'
+HM_DETAIL_FIELDS = 'trade_date,ts_code,ts_name,buy_amount,sell_amount,hm_name,hm_orgs,net_amount'
+BALANCE_SHEET_FIELDS = 'ts_code,ann_date,f_ann_date,end_date,report_type,comp_type,total_share,cap_rese,undist_profit,surplus_rese,special_rese,money_cap,notes_receiv,accounts_receiv,oth_receiv,prepayment,div_receiv,int_receiv,inventories,amor_exp,nca_within_1y,sett_rsrv,loanto_oth_bank_fi,premium_receiv,reinsur_receiv,reinsur_res_receiv,pur_resale_fa,oth_cur_assets,total_cur_assets,fa_avail_for_sale,htm_invest,lt_eqt_invest,invest_real_estate,time_deposits,oth_assets,lt_rec,fix_assets,cip,const_materials,fixed_assets_disp,produc_bio_assets,oil_and_gas_assets,intan_assets,r_and_d,goodwill,lt_amor_exp,defer_tax_assets,decr_in_disbur,oth_nca,total_nca,cash_reser_cb,depos_in_oth_bfi,prec_metals,deriv_assets,rr_reins_une_prem,rr_reins_outstd_cla,rr_reins_lins_liab,rr_reins_lthins_liab,refund_depos,ph_pledge_loans,refund_cap_depos,indep_acct_assets,client_depos,client_prov,transac_seat_fee,invest_as_receiv,total_assets,lt_borr,st_borr,cb_borr,depos_ib_deposits,loan_oth_bank,trading_fl,notes_payable,acct_payable,adv_receipts,sold_for_repur_fa,comm_payable,payroll_payable,taxes_payable,int_payable,div_payable,oth_payable,acc_exp,deferred_inc,st_bonds_payable,payable_to_reinsurer,rsrv_insur_cont,acting_trading_sec,acting_uw_sec,oth_cur_liab,total_cur_liab,bonds_payable,lt_payable,specific_payables,estim_liab,defer_tax_liab,defer_inc_non_cur,oth_ncl,total_ncl,deps_proc_sell_assets,reindebt_payable,policy_div_payable,total_liab,treasury_share,ordin_risk_reser,forex_differ,invest_loss_unconf,minority_int,total_hldr_eqy_exc_min_int,total_hldr_eqy_inc_min_int,total_liab_hldr_eqy,lt_payroll_payable,oth_comp_income,oth_eqt_tools,oth_eqt_tools_p_shr,lending_funds,acc_receivable,st_finl_co_borr,deposit,oth_assets_flag,update_flag'
+CASH_FLOW_FIELDS = 'ts_code,ann_date,f_ann_date,end_date,report_type,comp_type,net_profit,finan_exp,c_fr_sale_sg,recp_tax_rends,n_depos_incr_fi,n_incr_loans_cb,n_inc_borr_oth_fi,prem_fr_orig_contr,n_incr_insured_dep,n_reinsur_prem,n_incr_disp_tfa,ifc_cash_incr,n_incr_disp_faas,n_incr_loans_oth_bank,n_cap_incr_repur,c_fr_oth_operate_a,c_inf_fr_operate_a,c_paid_goods_s,c_paid_to_for_empl,c_paid_for_taxes,n_incr_clt_loan_cb,n_incr_dep_cbob,c_pay_claims_orig_inco,pay_handling_chrg,pay_comm_insur_plcy,oth_cash_pay_oper_act,st_cash_out_act,n_cashflow_act,oth_recp_ral_inv_act,c_disp_withdrwl_invest,c_recp_return_invest,n_recp_disp_fiolta,n_recp_disp_sobu,stot_inflows_inv_act,c_pay_acq_const_fiolta,c_paid_invest,n_disp_subs_oth_biz,oth_pay_ral_inv_act,n_incr_pledge_loan,stot_out_inv_act,n_cashflow_inv_act,c_recp_borrow,proc_issue_bonds,oth_cash_recp_ral_fnc_act,stot_cash_in_fnc_act,free_cashflow,c_prepay_amt_borr,c_pay_dist_dpcp_int_exp,incl_dvd_profit_paid_sc_ms,oth_cashpay_ral_fnc_act,stot_cashout_fnc_act,n_cash_flows_fnc_act,eff_fx_flu_cash,n_incr_cash_cash_equ,c_cash_equ_beg_period,c_cash_equ_end_period,c_recp_cap_contrib,incl_cash_rec_sg,uncon_invest_loss,prov_depr_assets,depr_fa_coga_dpba,amort_intang_assets,lt_amort_deferred_exp,decr_deferred_exp,incr_acc_exp,loss_disp_fiolta,loss_scr_fa,loss_fv_chg,invest_loss,decr_def_inc_tax_assets,incr_def_inc_tax_liab,decr_inventories,decr_oper_payable,incr_oper_payable,others,im_net_cashflow_oper_act,conv_debt_into_cap,conv_copbonds_due_within_1y,fa_fnc_leases,im_n_incr_cash_equ,net_dism_capital_add,net_cash_rece_sec,credit_impa_loss,use_sett_prov,oth_loss_assets,end_bal_cash,beg_bal_cash,end_bal_cash_equ,beg_bal_cash_equ,update_flag'
+INCOME_FIELDS = 'ts_code,ann_date,f_ann_date,end_date,report_type,comp_type,basic_eps,diluted_eps,total_revenue,revenue,int_income,prem_earned,comm_income,n_commis_income,n_oth_income,n_oth_biz_income,prem_income,out_prem,une_prem_reser,reins_income,n_sec_tb_income,n_undwrt_sec_income,n_indemnity_reser,n_ins_rsrv_rec,n_disp_tfa,n_disp_faas,n_disp_oth_assets,n_disp_oth_fa,n_disp_fiolta,n_disp_cip,n_disp_bio_assets,n_disp_mi,n_disp_oth_nca,n_disp_subs_oth_biz,n_oth_fa,n_disp_oth_biz,n_oth_comp_income,n_oth_comp_income_attr_p,n_oth_comp_income_attr_m_s,n_oth_comp_income_atsopc,n_oth_comp_income_attr_m_s_atsopc,n_oth_comp_income_atsop,n_income_attr_p,n_income_attr_m_s,n_income_discontinued,n_income_attr_p_discontinued,n_income_attr_m_s_discontinued,n_income_attr_p_ci,n_income_attr_m_s_ci,n_income,n_income_bef_na,n_income_bef_na_attr_p,n_income_bef_na_attr_m_s,n_income_bef_na_discontinued,n_income_bef_na_attr_p_discontinued,n_income_bef_na_attr_m_s_discontinued,n_income_bef_na_attr_p_ci,n_income_bef_na_attr_m_s_ci,n_income_bef_na_atsopc,n_income_bef_na_attr_p_atsopc,n_income_bef_na_attr_m_s_atsopc,n_income_bef_na_discontinued_atsopc,n_income_bef_na_attr_p_discontinued_atsopc,n_income_bef_na_attr_m_s_discontinued_atsopc,n_income_bef_na_attr_p_ci_atsopc,n_income_bef_na_attr_m_s_ci_atsopc,net_profit,net_profit_attr_p,net_profit_attr_m_s,net_profit_discontinued,net_profit_attr_p_discontinued,net_profit_attr_m_s_discontinued,net_profit_attr_p_ci,net_profit_attr_m_s_ci,net_profit_atsopc,net_profit_attr_p_atsopc,net_profit_attr_m_s_atsopc,net_profit_discontinued_atsopc,net_profit_attr_p_discontinued_atsopc,net_profit_attr_m_s_discontinued_atsopc,net_profit_attr_p_ci_atsopc,net_profit_attr_m_s_ci_atsopc,update_flag'
+FINA_INDICATOR_FIELDS = 'ts_code,ann_date,end_date,eps,dt_eps,total_revenue_ps,revenue_ps,capital_rese_ps,surplus_rese_ps,undist_profit_ps,extra_item,profit_dedt,gross_margin,current_ratio,quick_ratio,cash_ratio,invturn_days,arturn_days,inv_turn,ar_turn,ca_turn,fa_turn,assets_turn,op_income,valuechange_income,interst_income,daa,ebit,ebitda,fcff,fcfe,current_exint,noncurrent_exint,interestdebt,netdebt,tangible_asset,working_capital,networking_capital,invest_capital,retained_earnings,diluted2_eps,bps,ocfps,retainedps,cfps,ebit_ps,fcff_ps,fcfe_ps,netprofit_margin,grossprofit_margin,cogs_of_sales,expense_of_sales,profit_to_gr,saleexp_to_gr,adminexp_of_gr,finaexp_of_gr,impai_ttm,gc_of_gr,op_of_gr,ebit_of_gr,roe,roe_waa,roe_dt,roa,npta,roic,roe_yearly,roa2_yearly,roe_avg,opincome_of_ebt,investincome_of_ebt,n_op_profit_of_ebt,tax_to_ebt,dtprofit_to_profit,salescash_to_or,ocf_to_or,ocf_to_opincome,capitalized_to_da,debt_to_assets,assets_to_eqt,dp_assets_to_eqt,ca_to_assets,nca_to_assets,tbassets_to_total_assets,int_to_talcap,eqt_to_talcapital,currentdebt_to_debt,longdeb_to_debt,ocf_to_shortdebt,debt_to_eqt,eqt_to_debt,eqt_to_interestdebt,tangibleasset_to_debt,tangasset_to_intdebt,tangibleasset_to_netdebt,ocf_to_debt,ocf_to_interestdebt,ocf_to_netdebt,ebit_to_interest,long_debt_to_working_capital,ebitda_to_debt,turn_days,roa_yearly,roa_dp,fixed_assets,profit_prefin_exp,non_op_profit,op_to_ebt,nop_to_ebt,ocf_to_profit,cash_to_liqdebt,cash_to_liqdebt_withinterest,op_to_liqdebt,op_to_debt,roic_yearly,total_fa_trun,profit_to_op,q_opincome,q_investincome,q_dtprofit,q_eps,q_netprofit_margin,q_gsprofit_margin,q_exp_to_sales,q_profit_to_gr,q_saleexp_to_gr,q_adminexp_to_gr,q_finaexp_to_gr,q_impair_to_gr_ttm,q_gc_to_gr,q_op_to_gr,q_roe,q_dt_roe,q_npta,q_opincome_to_ebt,q_investincome_to_ebt,q_dtprofit_to_profit,q_salescash_to_or,q_ocf_to_sales,q_ocf_to_opincome,basic_eps_yoy,dt_eps_yoy,cfps_yoy,op_yoy,ebt_yoy,netprofit_yoy,dt_netprofit_yoy,ocf_yoy,roe_yoy,bps_yoy,assets_yoy,eqt_yoy,tr_yoy,or_yoy,q_gr_yoy,q_gr_qoq,q_sales_yoy,q_sales_qoq,q_op_yoy,q_op_qoq,q_profit_yoy,q_profit_qoq,q_netprofit_yoy,q_netprofit_qoq,equity_yoy,tr_total,profit_total,netprofit_total,netprofit_attr_p_total,or_total,q_sales_chg,q_op_chg,q_netprofit_chg,q_netprofit_attr_p_chg,q_profit_chg,q_gr_chg,update_flag'
+DAILY_BASIC_FIELDS = 'ts_code,trade_date,close,turnover_rate,volume_ratio,pe,pb,total_share,float_share,free_share,total_mv,circ_mv'
+THS_HOT_FIELDS = 'trade_date,data_type,ts_code,ts_name,rank,pct_change,current_price,concept,rank_reason,hot,rank_time'
+DC_HOT_FIELDS = 'trade_date,data_type,ts_code,ts_name,rank,pct_change,current_price,concept,hot,rank_time'
+DAILY_FIELDS = 'ts_code,trade_date,open,high,low,close,pre_close,change,pct_chg,vol,amount'
+ADJ_FACTOR_FIELDS = 'ts_code,trade_date,adj_factor'
+DIVIDEND_FIELDS = 'ts_code,end_date,ann_date,div_proc,stk_div,stk_bo_rate,stk_co_rate,cash_div,cash_div_tax,record_date,ex_date,pay_date,div_listdate,imp_ann_date,base_date,base_share,update_flag'
+INDEX_DAILY_FIELDS = 'ts_code,trade_date,close,open,high,low,pre_close,change,pct_chg,vol,amount'
+DISCLOSURE_FIELDS = 'ts_code,ann_date,end_date,pre_date,actual_date,modify_date'
+
+# Statement fields the web app and the usual screens read ('core' profile)
+CORE_BALANCE_SHEET_FIELDS = 'ts_code,ann_date,f_ann_date,end_date,report_type,comp_type,total_share,money_cap,total_cur_assets,total_nca,total_assets,total_cur_liab,total_ncl,total_liab,minority_int,total_hldr_eqy_exc_min_int,total_hldr_eqy_inc_min_int,total_liab_hldr_eqy,update_flag'
+CORE_CASH_FLOW_FIELDS = 'ts_code,ann_date,f_ann_date,end_date,report_type,comp_type,net_profit,n_cashflow_act,n_cashflow_inv_act,n_cash_flows_fnc_act,free_cashflow,n_incr_cash_cash_equ,c_cash_equ_beg_period,c_cash_equ_end_period,update_flag'
+CORE_INCOME_FIELDS = 'ts_code,ann_date,f_ann_date,end_date,report_type,comp_type,basic_eps,diluted_eps,total_revenue,revenue,n_income,n_income_attr_p,net_profit,update_flag'
+CORE_FINA_INDICATOR_FIELDS = 'ts_code,ann_date,end_date,eps,dt_eps,bps,ocfps,cfps,roe,roe_dt,roa,roic,gross_margin,grossprofit_margin,netprofit_margin,debt_to_assets,current_ratio,quick_ratio,netprofit_yoy,dt_netprofit_yoy,tr_yoy,or_yoy,update_flag'
+
+# Named field lists per statement table, selectable with update_data.py --fields
+FIELD_PROFILES = {
+    'balance_sheets': {'core': CORE_BALANCE_SHEET_FIELDS, 'full': BALANCE_SHEET_FIELDS},
+    'cash_flows': {'core': CORE_CASH_FLOW_FIELDS, 'full': CASH_FLOW_FIELDS},
+    'income_statements': {'core': CORE_INCOME_FIELDS, 'full': INCOME_FIELDS},
+    'fina_indicators': {'core': CORE_FINA_INDICATOR_FIELDS, 'full': FINA_INDICATOR_FIELDS},
+}
+
+DEFAULT_FIELD_PROFILE = 'full'
+
+# Conversion kinds for fields that are not numbers defaulting to 0.0
+STATEMENT_KINDS = {
+    'ts_code': TEXT,
+    'ann_date': STR,
+    'f_ann_date': STR,
+    'end_date': STR,
+    'report_type': TEXT,
+    'comp_type': TEXT,
+}
+QUOTE_KINDS = {
+    'ts_code': RAW,
+    'trade_date': STR,
+}
+HOT_KINDS = {
+    'trade_date': RAW,
+    'data_type': RAW,
+    'ts_code': RAW,
+    'ts_name': TEXT,
+    'rank': INT_OR_NONE,
+    'pct_change': FLOAT_OR_NONE,
+    'current_price': FLOAT_OR_NONE,
+    'concept': TEXT,
+    'rank_reason': TEXT,
+    'hot': FLOAT_OR_NONE,
+    'rank_time': TEXT,
+}
+
+# Tushare field names whose model column is spelled differently
+BALANCE_SHEET_RENAME = {'undist_profit': 'undistr_porfit'}
+HM_DETAIL_RENAME = {'hm_name': 'name', 'hm_orgs': 'orgs'}
+
+TICKER_SPEC = [
+    ('ts_code', 'ts_code', RAW),
+    ('symbol', 'symbol', RAW),
+    ('name', 'name', RAW),
+    ('area', 'area', TEXT),
+    ('industry', 'industry', TEXT),
+    ('list_date', 'list_date', STR),
+    ('list_status', 'list_status', RAW),
+    ('delist_date', 'delist_date', RAW),
+]
+TOP_HOLDER_SPEC = [
+    ('ts_code', 'ts_code', RAW),
+    ('ann_date', 'ann_date', STR),
+    ('end_date', 'end_date', STR),
+    ('holder_name', 'holder_name', TEXT),
+    ('hold_amount', 'hold_amount', FLOAT),
+    ('hold_ratio', 'hold_ratio', FLOAT),
+    ('holder_type', 'holder_type', TEXT),
+    ('hold_change', 'hold_change', FLOAT),
+]
+HM_LIST_SPEC = [
+    ('name', 'name', RAW),
+    ('desc', 'desc', TEXT),
+    ('orgs', 'orgs', TEXT),
+]
+HM_DETAIL_SPEC = field_spec(
+    HM_DETAIL_FIELDS,
+    {'trade_date': STR, 'ts_code': TEXT, 'ts_name': TEXT, 'hm_name': TEXT, 'hm_orgs': TEXT},
+    rename=HM_DETAIL_RENAME
+)
+ADJ_FACTOR_SPEC = field_spec(ADJ_FACTOR_FIELDS, QUOTE_KINDS)
+DIVIDEND_SPEC = field_spec(DIVIDEND_FIELDS, default=RAW)
+INDEX_DAILY_SPEC = field_spec(INDEX_DAILY_FIELDS, {'trade_date': STR}, default=RAW)
+DISCLOSURE_SPEC = field_spec(DISCLOSURE_FIELDS, default=RAW)
+
+def resolve_fields(table_name, profile=DEFAULT_FIELD_PROFILE):
+    """
+    Field list to request for a statement table.
+
+    Args:
+        table_name (str): key of FIELD_PROFILES, e.g. 'balance_sheets'
+        profile (str): 'core', 'full' or a comma-separated custom field list;
+            custom lists must be a subset of the full list and always keep the
+            identifying fields (ts_code, ann_date, end_date, ..., update_flag)
+
+    Returns:
+        str: comma-separated fields
+    """
+    profiles = FIELD_PROFILES[table_name]
+    profile = profile or DEFAULT_FIELD_PROFILE
+    if profile in profiles:
+        return profiles[profile]
+
+    full = profiles['full'].split(',')
+    requested = [field.strip() for field in profile.split(',') if field.strip()]
+    unknown = [field for field in requested if field not in full]
+    if unknown:
+        raise ValueError(f"Unknown {table_name} fields: {', '.join(unknown)}")
+    keys = [field for field in full if field in STATEMENT_KINDS or field == 'update_flag']
+    return ','.join(keys + [field for field in requested if field not in keys])
+
+
 class TushareService:
-    def __init__(self):
-        self.token = os.getenv('TUSHARE_TOKEN')
-        if not self.token:
-            raise ValueError("TUSHARE_TOKEN not found in environment variables")
+    """
+    Getters return converted rows, [] when Tushare has no data, and raise a
+    TushareError (services/resilience.py) when the call failed, so a failed
+    fetch is never mistaken for an empty one.
+    """
+
+    def __init__(self, rate_limiter=None, cache=None, pro=None):
+        if pro is not None:
+            self.pro = pro
+        elif os.getenv('TUSHARE_API') == 'fake':
+            # Offline stand-in for benchmarks and runs without network
+            self.pro = get_fake_pro_api()
+        else:
+            self.token = os.getenv('TUSHARE_TOKEN')
+            if not self.token:
+                raise ValueError("TUSHARE_TOKEN not found in environment variables")
+
+            if os.getenv('TUSHARE_API') == 'async':
+                # One pooled keep-alive session on an event loop, shared by every instance
+                self.pro = get_async_pro_api(self.token)
+            else:
+                # Pass the token directly: set_token() rewrites a shared token file that
+                # pro_api() then re-reads, which races when tables update in parallel
+                self.pro = ts.pro_api(self.token)
+        # Shared by every instance so all loaders draw from one API budget
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        # Optional on-disk response cache (TUSHARE_CACHE_DIR); None when disabled
+        self.cache = cache or get_response_cache()
+        # Transient failures are retried with jittered backoff; endpoints that keep failing are cut off
+        self.retry_policy = get_retry_policy()
+        self.breakers = get_circuit_breakers()
+
+    def __reduce__(self):
+        # Pickled into the shard processes of update_data.py --workers: each
+        # shard builds its own client, limiter share and cache from the environment
+        return TushareService, ()
+
+    def _call(self, api_name, **params):
+        """
+        Call a Tushare endpoint through the rate limiter.
+        Calls rejected with the per-minute quota error are retried after backing off.
+        Other transient failures (timeouts, dropped connections, server errors) are
+        retried with exponential backoff and jitter, and count towards the endpoint's
+        circuit breaker; while it is open calls fail at once.
+        Responses are served from and stored in the response cache when it is enabled.
+        Attempts, retries and throttling are counted in the current table's metrics.
+
+        Raises:
+            PermanentTushareError: the call cannot succeed as made (no permission, bad parameters)
+            TransientTushareError: still failing after the retries, or the circuit is open
+        """
+        metrics = current_metrics()
+        if self.cache:
+            df = self.cache.get(api_name, params)
+            if df is not None:
+                if metrics:
+                    metrics.record_cache_hit()
+                return df
+        breaker = self.breakers.get(api_name)
+        quota_retries = 0
+        retries = 0
+        while True:
+            breaker.before_call(api_name)
+            waited = self.rate_limiter.acquire(api_name)
+            if metrics:
+                metrics.record_call(waited)
+            try:
+                df = getattr(self.pro, api_name)(**params)
+            except Exception as e:
+                attempts = quota_retries + retries + 1
+                kind = classify_error(e)
+                if kind == QUOTA:
+                    breaker.release_trial()
+                    if quota_retries < MAX_QUOTA_RETRIES:
+                        quota_retries += 1
+                        if metrics:
+                            metrics.add_totals(quota_backoffs=1)
+                        self.rate_limiter.backoff(api_name)
+                        continue
+                    raise TransientTushareError(api_name, f"quota still exceeded after {attempts} attempts: {e}", attempts) from e
+                if kind == PERMANENT:
+                    breaker.release_trial()
+                    raise PermanentTushareError(api_name, str(e), attempts) from e
+                if breaker.record_failure():
+                    print(f"Tushare {api_name} failed {breaker.failures} times in a row, pausing it for {breaker.reset_seconds:.0f}s")
+                if retries < self.retry_policy.max_retries:
+                    if metrics:
+                        metrics.add_totals(retries=1)
+                    time.sleep(self.retry_policy.delay(retries))
+                    retries += 1
+                    continue
+                raise TransientTushareError(api_name, f"{type(e).__name__}: {e} (after {attempts} attempts)", attempts) from e
+            breaker.record_success()
+            self.rate_limiter.record_success(api_name)
+            if self.cache:
+                self.cache.put(api_name, params, df)
+            return df
+
+    def _call_paged(self, api_name, page_size=PAGE_SIZE, **params):
+        """
+        Page through an endpoint with limit/offset and return the pages as one frame.
+        Stops at an empty page, or at one shorter than the first page, whose length
+        is taken as the server's page cap.
+        """
+        pages = []
+        offset = 0
+        while len(pages) < MAX_PAGES:
+            df = self._call(api_name, limit=page_size, offset=offset, **params)
+            if df is None or df.empty:
+                break
+            pages.append(df)
+            offset += len(df)
+            if len(df) < len(pages[0]):
+                break
+        if not pages:
+            return pd.DataFrame()
+        return pd.concat(pages, ignore_index=True)
+
+    def _call_statement(self, api_name, ts_code, start_date, end_date, fields, period):
+        """Per-ticker statement call, or the whole market for one period via the paged <api_name>_vip endpoint"""
+        if period and not ts_code:
+            return self._call_paged(f'{api_name}_vip', period=period, fields=fields)
+        params = {'ts_code': ts_code, 'start_date': start_date, 'end_date': end_date, 'fields': fields}
+        if period:
+            params['period'] = period
+        return self._call(api_name, **params)
+
+    def get_all_tickers(self, list_status='L'):
+        """Get all stock tickers from Tushare with the given list_status (L listed, D delisted, P paused)"""
+        # Get all stocks from A-share market
+        df = self._call('stock_basic',
+            exchange='',
+            list_status=list_status,
+            fields=TICKER_FIELDS
+        )
         
-        ts.set_token(self.token)
-        self.pro = ts.pro_api()
-    
-    def get_all_tickers(self):
-        """Get all stock tickers from Tushare"""
-        try:
-            # Get all stocks from A-share market
-            df = self.pro.stock_basic(
-                exchange='',
-                list_status='L',
-                fields='ts_code,symbol,name,area,industry,list_date'
-            )
-            
-            if df.empty:
-                return []
-            
-            # Convert DataFrame to list of dictionaries
-            tickers = []
-            for _, row in df.iterrows():
-                tickers.append({
-                    'ts_code': row['ts_code'],
-                    'symbol': row['symbol'],
-                    'name': row['name'],
-                    'area': row['area'] or '',
-                    'industry': row['industry'] or '',
-                    'list_date': str(row['list_date']) if pd.notna(row['list_date']) else ''
-                })
-            
-            return tickers
-            
-        except Exception as e:
-            print(f"Error fetching tickers: {e}")
-            return []
+        return convert_frame(df, TICKER_SPEC)
     
     def get_top_holders(self, ts_code, limit=10):
         """Get top 10 holders for a specific ticker"""
-        try:
-            # Get the latest report date
-            end_date = datetime.now().strftime('%Y%m%d')
-            start_date = datetime.now() - timedelta(days=365) 
-            
-            start_date = start_date.strftime('%Y%m%d')
-            # Get top 10 individual holders (流通股东)
-            df = self.pro.top10_floatholders(
-                ts_code=ts_code,
-                end_date=end_date,
-                # start_date=start_date,
-                fields='ts_code,ann_date,end_date,holder_name,hold_amount,hold_ratio,holder_type,hold_change'
-            )
-            
-            if df.empty:
-                return []
-            
-            # Sort by end_date desc and take top 10
-            df = df.sort_values('end_date', ascending=False)
-            latest_end_date = df['end_date'].iloc[0]
-            df = df[df['end_date'] == latest_end_date].head(limit)
-            
-            # Convert DataFrame to list of dictionaries
-            holders = []
-            for _, row in df.iterrows():
-                holders.append({
-                    'ts_code': row['ts_code'],
-                    'ann_date': str(row['ann_date']) if pd.notna(row['ann_date']) else '',
-                    'end_date': str(row['end_date']) if pd.notna(row['end_date']) else '',
-                    'holder_name': row['holder_name'] or '',
-                    'hold_amount': float(row['hold_amount']) if pd.notna(row['hold_amount']) else 0.0,
-                    'hold_ratio': float(row['hold_ratio']) if pd.notna(row['hold_ratio']) else 0.0,
-                    'holder_type': row['holder_type'] or '',
-                    'hold_change': float(row['hold_change']) if pd.notna(row['hold_change']) else 0.0
-                })
-            
-            return holders
-            
-        except Exception as e:
-            print(f"Error fetching top holders for {ts_code}: {e}")
+        # Get the latest report date
+        end_date = datetime.now().strftime('%Y%m%d')
+        start_date = datetime.now() - timedelta(days=365) 
+        
+        start_date = start_date.strftime('%Y%m%d')
+        # Get top 10 individual holders (流通股东)
+        df = self._call('top10_floatholders',
+            ts_code=ts_code,
+            end_date=end_date,
+            # start_date=start_date,
+            fields=TOP_HOLDER_FIELDS
+        )
+        
+        if df.empty:
             return []
+        
+        # Sort by end_date desc and take top 10
+        df = df.sort_values('end_date', ascending=False)
+        latest_end_date = df['end_date'].iloc[0]
+        df = df[df['end_date'] == latest_end_date].head(limit)
+        
+        return convert_frame(df, TOP_HOLDER_SPEC)
     
     def update_all_data(self):
         """Update all ticker and holder data"""
-        tickers = self.get_all_tickers()
+        try:
+            tickers = self.get_all_tickers()
+        except TushareError as e:
+            return False, f"Failed to fetch tickers: {e}"
         if not tickers:
             return False, "Failed to fetch tickers"
         
@@ -112,734 +343,130 @@ class TushareService:
         
         return True, results
 
+    def get_disclosure_dates(self, end_date, ts_code=''):
+        """
+        Scheduled (pre_date) and actual (actual_date) publication dates of the
+        periodic report for period end_date; the whole market when ts_code is empty
+        Reference: https://tushare.pro/document/2?doc_id=162
+        """
+        if ts_code:
+            df = self._call('disclosure_date', ts_code=ts_code, end_date=end_date, fields=DISCLOSURE_FIELDS)
+        else:
+            df = self._call_paged('disclosure_date', end_date=end_date, fields=DISCLOSURE_FIELDS)
+        
+        return convert_frame(df, DISCLOSURE_SPEC)
+
     def get_hm_list(self, name='', fields=''):
         """
         Get hm_list data from Tushare
         Reference: https://tushare.pro/document/2?doc_id=311
         """
-        try:
-            # Get hm_list data
-            df = self.pro.hm_list(
-                name=name,
-                fields=fields if fields else 'name,desc,orgs'
-            )
-            
-            if df.empty:
-                return []
-            
-            # Convert DataFrame to list of dictionaries
-            hm_list_data = []
-            for _, row in df.iterrows():
-                hm_list_data.append({
-                    'name': row['name'],
-                    'desc': row['desc'] if 'desc' in row else '',
-                    'orgs': row['orgs'] if 'orgs' in row else ''
-                })
-            
-            return hm_list_data
-            
-        except Exception as e:
-            print(f"Error fetching hm_list: {e}")
-            return []
+        # Get hm_list data
+        df = self._call('hm_list',
+            name=name,
+            fields=fields if fields else HM_LIST_FIELDS
+        )
+        
+        return convert_frame(df, HM_LIST_SPEC)
 
     def get_hm_detail(self, name='', start_date='', end_date='', fields=''):
         """
         Get hm_detail data from Tushare
+        Without name, every player's trades between start_date and end_date
+        are paged through.
         Reference: https://tushare.pro/document/2?doc_id=312
         """
-        try:
-            # Get hm_detail data
-            df = self.pro.hm_detail(
-                name=name,
-                start_date=start_date,
-                end_date=end_date,
-                fields=fields if fields else 'trade_date,ts_code,ts_name,buy_amount,sell_amount,hm_name,hm_orgs,net_amount'
-            )
-            
-            if df.empty:
-                return []
-            
-            # Convert DataFrame to list of dictionaries
-            hm_detail_data = []
-            for _, row in df.iterrows():
-                hm_detail_data.append({
-                    'trade_date': str(row['trade_date']) if pd.notna(row['trade_date']) else '',
-                    'ts_code': row['ts_code'] if 'ts_code' in row else '',
-                    'ts_name': row['ts_name'] if 'ts_name' in row else '',
-                    'buy_amount': float(row['buy_amount']) if pd.notna(row.get('buy_amount')) else 0.0,
-                    'sell_amount': float(row['sell_amount']) if pd.notna(row.get('sell_amount')) else 0.0,
-                    'name': row['hm_name'] if 'hm_name' in row else '',
-                    'orgs': row['hm_orgs'] if 'hm_orgs' in row else '',
-                    'net_amount': float(row['net_amount']) if pd.notna(row.get('net_amount')) else 0.0
-                })
-            
-            return hm_detail_data
-            
-        except Exception as e:
-            print(f"Error fetching hm_detail: {e}")
-            return []
+        # Get hm_detail data
+        fields = fields if fields else HM_DETAIL_FIELDS
+        if name:
+            df = self._call('hm_detail', name=name, start_date=start_date, end_date=end_date, fields=fields)
+        else:
+            df = self._call_paged('hm_detail', start_date=start_date, end_date=end_date, fields=fields)
+        
+        return convert_frame(df, HM_DETAIL_SPEC)
 
-    def get_balance_sheet(self, ts_code, start_date='', end_date='', fields=''):
+    def get_balance_sheet(self, ts_code='', start_date='', end_date='', fields='', period=''):
         """
         Get balance sheet data from Tushare
-        Reference: https://tushare.pro/document/2?doc_id=220
+        Pass period without ts_code to get the whole market for one report period (balancesheet_vip).
+        Reference: https://tushare.pro/document/2?doc_id=36
         """
-        try:
-            # Get balance sheet data
-            df = self.pro.balancesheet(
-                ts_code=ts_code,
-                start_date=start_date,
-                end_date=end_date,
-                fields=fields if fields else 'ts_code,ann_date,f_ann_date,end_date,report_type,comp_type,total_share,cap_rese,undist_profit,surplus_rese,special_rese,money_cap,trad_asset,notes_receiv,accounts_receiv,oth_receiv,prepayment,div_receiv,int_receiv,inventories,amor_exp,nca_within_1y,sett_rsrv,loanto_oth_bank_fi,premium_receiv,reinsur_receiv,reinsur_res_receiv,pur_resale_fa,oth_cur_assets,total_cur_assets,fa_avail_for_sale,htm_invest,lt_eqt_invest,invest_real_estate,time_deposits,oth_assets,lt_rec,fix_assets,cip,const_materials,fixed_assets_disp,produc_bio_assets,oil_and_gas_assets,intan_assets,r_and_d,goodwill,lt_amor_exp,defer_tax_assets,decr_in_disbur,oth_nca,total_nca,cash_reser_cb,depos_in_oth_bfi,prec_metals,deriv_assets,rr_reins_une_prem,rr_reins_outstd_cla,rr_reins_lins_liab,rr_reins_lthins_liab,refund_depos,ph_pledge_loans,refund_cap_depos,indep_acct_assets,client_depos,client_prov,transac_seat_fee,invest_as_receiv,total_assets,lt_borr,st_borr,cb_borr,depos_ib_deposits,loan_oth_bank,trading_fl,notes_payable,acct_payable,adv_receipts,sold_for_repur_fa,comm_payable,payroll_payable,taxes_payable,int_payable,div_payable,oth_payable,acc_exp,deferred_inc,st_bonds_payable,payable_to_reinsurer,rsrv_insur_cont,acting_trading_sec,acting_uw_sec,oth_cur_liab,total_cur_liab,bonds_payable,lt_payable,specific_payables,estim_liab,defer_tax_liab,defer_inc_non_cur,oth_ncl,total_ncl,deps_proc_sell_assets,reindebt_payable,policy_div_payable,total_liab,treasury_share,ordin_risk_reser,forex_differ,invest_loss_unconf,minority_int,total_hldr_eqy_exc_min_int,total_hldr_eqy_inc_min_int,total_liab_hldr_eqy,lt_payroll_payable,oth_comp_income,oth_eqt_tools,oth_eqt_tools_p_shr,lending_funds,acc_receivable,st_finl_co_borr,deposit,oth_assets_flag,update_flag'
-            )
-            
-            if df.empty:
-                return []
-            
-            # Convert DataFrame to list of dictionaries
-            balance_sheet_data = []
-            for _, row in df.iterrows():
-                balance_sheet_data.append({
-                    'ts_code': row['ts_code'] if 'ts_code' in row else '',
-                    'ann_date': str(row['ann_date']) if pd.notna(row.get('ann_date')) else '',
-                    'f_ann_date': str(row['f_ann_date']) if pd.notna(row.get('f_ann_date')) else '',
-                    'end_date': str(row['end_date']) if pd.notna(row.get('end_date')) else '',
-                    'report_type': row['report_type'] if 'report_type' in row else '',
-                    'comp_type': row['comp_type'] if 'comp_type' in row else '',
-                    'total_share': float(row['total_share']) if pd.notna(row.get('total_share')) else 0.0,
-                    'cap_rese': float(row['cap_rese']) if pd.notna(row.get('cap_rese')) else 0.0,
-                    'undist_profit': float(row['undist_profit']) if pd.notna(row.get('undist_profit')) else 0.0,
-                    'surplus_rese': float(row['surplus_rese']) if pd.notna(row.get('surplus_rese')) else 0.0,
-                    'special_rese': float(row['special_rese']) if pd.notna(row.get('special_rese')) else 0.0,
-                    'money_cap': float(row['money_cap']) if pd.notna(row.get('money_cap')) else 0.0,
-                    'trad_asset': float(row['trad_asset']) if pd.notna(row.get('trad_asset')) else 0.0,
-                    'notes_receiv': float(row['notes_receiv']) if pd.notna(row.get('notes_receiv')) else 0.0,
-                    'accounts_receiv': float(row['accounts_receiv']) if pd.notna(row.get('accounts_receiv')) else 0.0,
-                    'oth_receiv': float(row['oth_receiv']) if pd.notna(row.get('oth_receiv')) else 0.0,
-                    'prepayment': float(row['prepayment']) if pd.notna(row.get('prepayment')) else 0.0,
-                    'div_receiv': float(row['div_receiv']) if pd.notna(row.get('div_receiv')) else 0.0,
-                    'int_receiv': float(row['int_receiv']) if pd.notna(row.get('int_receiv')) else 0.0,
-                    'inventories': float(row['inventories']) if pd.notna(row.get('inventories')) else 0.0,
-                    'amor_exp': float(row['amor_exp']) if pd.notna(row.get('amor_exp')) else 0.0,
-                    'nca_within_1y': float(row['nca_within_1y']) if pd.notna(row.get('nca_within_1y')) else 0.0,
-                    'sett_rsrv': float(row['sett_rsrv']) if pd.notna(row.get('sett_rsrv')) else 0.0,
-                    'loanto_oth_bank_fi': float(row['loanto_oth_bank_fi']) if pd.notna(row.get('loanto_oth_bank_fi')) else 0.0,
-                    'premium_receiv': float(row['premium_receiv']) if pd.notna(row.get('premium_receiv')) else 0.0,
-                    'reinsur_receiv': float(row['reinsur_receiv']) if pd.notna(row.get('reinsur_receiv')) else 0.0,
-                    'reinsur_res_receiv': float(row['reinsur_res_receiv']) if pd.notna(row.get('reinsur_res_receiv')) else 0.0,
-                    'pur_resale_fa': float(row['pur_resale_fa']) if pd.notna(row.get('pur_resale_fa')) else 0.0,
-                    'oth_cur_assets': float(row['oth_cur_assets']) if pd.notna(row.get('oth_cur_assets')) else 0.0,
-                    'total_cur_assets': float(row['total_cur_assets']) if pd.notna(row.get('total_cur_assets')) else 0.0,
-                    'fa_avail_for_sale': float(row['fa_avail_for_sale']) if pd.notna(row.get('fa_avail_for_sale')) else 0.0,
-                    'htm_invest': float(row['htm_invest']) if pd.notna(row.get('htm_invest')) else 0.0,
-                    'lt_eqt_invest': float(row['lt_eqt_invest']) if pd.notna(row.get('lt_eqt_invest')) else 0.0,
-                    'invest_real_estate': float(row['invest_real_estate']) if pd.notna(row.get('invest_real_estate')) else 0.0,
-                    'time_deposits': float(row['time_deposits']) if pd.notna(row.get('time_deposits')) else 0.0,
-                    'oth_assets': float(row['oth_assets']) if pd.notna(row.get('oth_assets')) else 0.0,
-                    'lt_rec': float(row['lt_rec']) if pd.notna(row.get('lt_rec')) else 0.0,
-                    'fix_assets': float(row['fix_assets']) if pd.notna(row.get('fix_assets')) else 0.0,
-                    'cip': float(row['cip']) if pd.notna(row.get('cip')) else 0.0,
-                    'const_materials': float(row['const_materials']) if pd.notna(row.get('const_materials')) else 0.0,
-                    'fixed_assets_disp': float(row['fixed_assets_disp']) if pd.notna(row.get('fixed_assets_disp')) else 0.0,
-                    'produc_bio_assets': float(row['produc_bio_assets']) if pd.notna(row.get('produc_bio_assets')) else 0.0,
-                    'oil_and_gas_assets': float(row['oil_and_gas_assets']) if pd.notna(row.get('oil_and_gas_assets')) else 0.0,
-                    'intan_assets': float(row['intan_assets']) if pd.notna(row.get('intan_assets')) else 0.0,
-                    'r_and_d': float(row['r_and_d']) if pd.notna(row.get('r_and_d')) else 0.0,
-                    'goodwill': float(row['goodwill']) if pd.notna(row.get('goodwill')) else 0.0,
-                    'lt_amor_exp': float(row['lt_amor_exp']) if pd.notna(row.get('lt_amor_exp')) else 0.0,
-                    'defer_tax_assets': float(row['defer_tax_assets']) if pd.notna(row.get('defer_tax_assets')) else 0.0,
-                    'decr_in_disbur': float(row['decr_in_disbur']) if pd.notna(row.get('decr_in_disbur')) else 0.0,
-                    'oth_nca': float(row['oth_nca']) if pd.notna(row.get('oth_nca')) else 0.0,
-                    'total_nca': float(row['total_nca']) if pd.notna(row.get('total_nca')) else 0.0,
-                    'cash_reser_cb': float(row['cash_reser_cb']) if pd.notna(row.get('cash_reser_cb')) else 0.0,
-                    'depos_in_oth_bfi': float(row['depos_in_oth_bfi']) if pd.notna(row.get('depos_in_oth_bfi')) else 0.0,
-                    'prec_metals': float(row['prec_metals']) if pd.notna(row.get('prec_metals')) else 0.0,
-                    'deriv_assets': float(row['deriv_assets']) if pd.notna(row.get('deriv_assets')) else 0.0,
-                    'rr_reins_une_prem': float(row['rr_reins_une_prem']) if pd.notna(row.get('rr_reins_une_prem')) else 0.0,
-                    'rr_reins_outstd_cla': float(row['rr_reins_outstd_cla']) if pd.notna(row.get('rr_reins_outstd_cla')) else 0.0,
-                    'rr_reins_lins_liab': float(row['rr_reins_lins_liab']) if pd.notna(row.get('rr_reins_lins_liab')) else 0.0,
-                    'rr_reins_lthins_liab': float(row['rr_reins_lthins_liab']) if pd.notna(row.get('rr_reins_lthins_liab')) else 0.0,
-                    'refund_depos': float(row['refund_depos']) if pd.notna(row.get('refund_depos')) else 0.0,
-                    'ph_pledge_loans': float(row['ph_pledge_loans']) if pd.notna(row.get('ph_pledge_loans')) else 0.0,
-                    'refund_cap_depos': float(row['refund_cap_depos']) if pd.notna(row.get('refund_cap_depos')) else 0.0,
-                    'indep_acct_assets': float(row['indep_acct_assets']) if pd.notna(row.get('indep_acct_assets')) else 0.0,
-                    'client_depos': float(row['client_depos']) if pd.notna(row.get('client_depos')) else 0.0,
-                    'client_prov': float(row['client_prov']) if pd.notna(row.get('client_prov')) else 0.0,
-                    'transac_seat_fee': float(row['transac_seat_fee']) if pd.notna(row.get('transac_seat_fee')) else 0.0,
-                    'invest_as_receiv': float(row['invest_as_receiv']) if pd.notna(row.get('invest_as_receiv')) else 0.0,
-                    'total_assets': float(row['total_assets']) if pd.notna(row.get('total_assets')) else 0.0,
-                    'lt_borr': float(row['lt_borr']) if pd.notna(row.get('lt_borr')) else 0.0,
-                    'st_borr': float(row['st_borr']) if pd.notna(row.get('st_borr')) else 0.0,
-                    'cb_borr': float(row['cb_borr']) if pd.notna(row.get('cb_borr')) else 0.0,
-                    'depos_ib_deposits': float(row['depos_ib_deposits']) if pd.notna(row.get('depos_ib_deposits')) else 0.0,
-                    'loan_oth_bank': float(row['loan_oth_bank']) if pd.notna(row.get('loan_oth_bank')) else 0.0,
-                    'trading_fl': float(row['trading_fl']) if pd.notna(row.get('trading_fl')) else 0.0,
-                    'notes_payable': float(row['notes_payable']) if pd.notna(row.get('notes_payable')) else 0.0,
-                    'acct_payable': float(row['acct_payable']) if pd.notna(row.get('acct_payable')) else 0.0,
-                    'adv_receipts': float(row['adv_receipts']) if pd.notna(row.get('adv_receipts')) else 0.0,
-                    'sold_for_repur_fa': float(row['sold_for_repur_fa']) if pd.notna(row.get('sold_for_repur_fa')) else 0.0,
-                    'comm_payable': float(row['comm_payable']) if pd.notna(row.get('comm_payable')) else 0.0,
-                    'payroll_payable': float(row['payroll_payable']) if pd.notna(row.get('payroll_payable')) else 0.0,
-                    'taxes_payable': float(row['taxes_payable']) if pd.notna(row.get('taxes_payable')) else 0.0,
-                    'int_payable': float(row['int_payable']) if pd.notna(row.get('int_payable')) else 0.0,
-                    'div_payable': float(row['div_payable']) if pd.notna(row.get('div_payable')) else 0.0,
-                    'oth_payable': float(row['oth_payable']) if pd.notna(row.get('oth_payable')) else 0.0,
-                    'acc_exp': float(row['acc_exp']) if pd.notna(row.get('acc_exp')) else 0.0,
-                    'deferred_inc': float(row['deferred_inc']) if pd.notna(row.get('deferred_inc')) else 0.0,
-                    'st_bonds_payable': float(row['st_bonds_payable']) if pd.notna(row.get('st_bonds_payable')) else 0.0,
-                    'payable_to_reinsurer': float(row['payable_to_reinsurer']) if pd.notna(row.get('payable_to_reinsurer')) else 0.0,
-                    'rsrv_insur_cont': float(row['rsrv_insur_cont']) if pd.notna(row.get('rsrv_insur_cont')) else 0.0,
-                    'acting_trading_sec': float(row['acting_trading_sec']) if pd.notna(row.get('acting_trading_sec')) else 0.0,
-                    'acting_uw_sec': float(row['acting_uw_sec']) if pd.notna(row.get('acting_uw_sec')) else 0.0,
-                    'oth_cur_liab': float(row['oth_cur_liab']) if pd.notna(row.get('oth_cur_liab')) else 0.0,
-                    'total_cur_liab': float(row['total_cur_liab']) if pd.notna(row.get('total_cur_liab')) else 0.0,
-                    'bonds_payable': float(row['bonds_payable']) if pd.notna(row.get('bonds_payable')) else 0.0,
-                    'lt_payable': float(row['lt_payable']) if pd.notna(row.get('lt_payable')) else 0.0,
-                    'specific_payables': float(row['specific_payables']) if pd.notna(row.get('specific_payables')) else 0.0,
-                    'estim_liab': float(row['estim_liab']) if pd.notna(row.get('estim_liab')) else 0.0,
-                    'defer_tax_liab': float(row['defer_tax_liab']) if pd.notna(row.get('defer_tax_liab')) else 0.0,
-                    'defer_inc_non_cur': float(row['defer_inc_non_cur']) if pd.notna(row.get('defer_inc_non_cur')) else 0.0,
-                    'oth_ncl': float(row['oth_ncl']) if pd.notna(row.get('oth_ncl')) else 0.0,
-                    'total_ncl': float(row['total_ncl']) if pd.notna(row.get('total_ncl')) else 0.0,
-                    'deps_proc_sell_assets': float(row['deps_proc_sell_assets']) if pd.notna(row.get('deps_proc_sell_assets')) else 0.0,
-                    'reindebt_payable': float(row['reindebt_payable']) if pd.notna(row.get('reindebt_payable')) else 0.0,
-                    'policy_div_payable': float(row['policy_div_payable']) if pd.notna(row.get('policy_div_payable')) else 0.0,
-                    'total_liab': float(row['total_liab']) if pd.notna(row.get('total_liab')) else 0.0,
-                    'treasury_share': float(row['treasury_share']) if pd.notna(row.get('treasury_share')) else 0.0,
-                    'ordin_risk_reser': float(row['ordin_risk_reser']) if pd.notna(row.get('ordin_risk_reser')) else 0.0,
-                    'forex_differ': float(row['forex_differ']) if pd.notna(row.get('forex_differ')) else 0.0,
-                    'invest_loss_unconf': float(row['invest_loss_unconf']) if pd.notna(row.get('invest_loss_unconf')) else 0.0,
-                    'minority_int': float(row['minority_int']) if pd.notna(row.get('minority_int')) else 0.0,
-                    'total_hldr_eqy_exc_min_int': float(row['total_hldr_eqy_exc_min_int']) if pd.notna(row.get('total_hldr_eqy_exc_min_int')) else 0.0,
-                    'total_hldr_eqy_inc_min_int': float(row['total_hldr_eqy_inc_min_int']) if pd.notna(row.get('total_hldr_eqy_inc_min_int')) else 0.0,
-                    'total_liab_hldr_eqy': float(row['total_liab_hldr_eqy']) if pd.notna(row.get('total_liab_hldr_eqy')) else 0.0,
-                    'lt_payroll_payable': float(row['lt_payroll_payable']) if pd.notna(row.get('lt_payroll_payable')) else 0.0,
-                    'oth_comp_income': float(row['oth_comp_income']) if pd.notna(row.get('oth_comp_income')) else 0.0,
-                    'oth_eqt_tools': float(row['oth_eqt_tools']) if pd.notna(row.get('oth_eqt_tools')) else 0.0,
-                    'oth_eqt_tools_p_shr': float(row['oth_eqt_tools_p_shr']) if pd.notna(row.get('oth_eqt_tools_p_shr')) else 0.0,
-                    'lending_funds': float(row['lending_funds']) if pd.notna(row.get('lending_funds')) else 0.0,
-                    'acc_receivable': float(row['acc_receivable']) if pd.notna(row.get('acc_receivable')) else 0.0,
-                    'st_finl_co_borr': float(row['st_finl_co_borr']) if pd.notna(row.get('st_finl_co_borr')) else 0.0,
-                    'deposit': float(row['deposit']) if pd.notna(row.get('deposit')) else 0.0,
-                    'oth_assets_flag': float(row['oth_assets_flag']) if pd.notna(row.get('oth_assets_flag')) else 0.0,
-                    'update_flag': float(row['update_flag']) if pd.notna(row.get('update_flag')) else 0.0
-                })
-            
-            return balance_sheet_data
-            
-        except Exception as e:
-            print(f"Error fetching balance sheet for {ts_code}: {e}")
-            return []
+        fields = fields or BALANCE_SHEET_FIELDS
+        # Get balance sheet data
+        df = self._call_statement('balancesheet', ts_code, start_date, end_date, fields, period)
+        
+        return convert_frame(df, field_spec(fields, STATEMENT_KINDS, rename=BALANCE_SHEET_RENAME))
 
-    def get_cash_flow(self, ts_code, start_date='', end_date='', fields=''):
+    def get_cash_flow(self, ts_code='', start_date='', end_date='', fields='', period=''):
         """
         Get cash flow data from Tushare
-        Reference: https://tushare.pro/document/2?doc_id=221
+        Pass period without ts_code to get the whole market for one report period (cashflow_vip).
+        Reference: https://tushare.pro/document/2?doc_id=44
         """
-        try:
-            # Get cash flow data
-            df = self.pro.cashflow(
-                ts_code=ts_code,
-                start_date=start_date,
-                end_date=end_date,
-                fields=fields if fields else 'ts_code,ann_date,f_ann_date,end_date,report_type,comp_type,net_profit,finan_exp,c_fr_sale_sg,recp_tax_rends,n_depos_incr_fi,n_incr_loans_cb,n_inc_borr_oth_fi,prem_fr_orig_contr,n_incr_insured_dep,n_reinsur_prem,n_incr_disp_tfa,ifc_cash_incr,n_incr_disp_faas,n_incr_loans_oth_bank,n_cap_incr_repur,c_fr_oth_operate_a,c_inf_fr_operate_a,c_paid_goods_s,c_paid_to_for_empl,c_paid_for_taxes,n_incr_clt_loan_cb,n_incr_dep_cbob,c_pay_claims_orig_inco,pay_handling_chrg,pay_comm_insur_plcy,oth_cash_pay_oper_act,st_cash_out_act,n_cashflow_act,oth_recp_ral_inv_act,c_disp_withdrwl_invest,c_recp_return_invest,n_recp_disp_fiolta,n_recp_disp_sobu,stot_inflows_inv_act,c_pay_acq_const_fiolta,c_paid_invest,n_disp_subs_oth_biz,oth_pay_ral_inv_act,n_incr_pledge_loan,stot_out_inv_act,n_cashflow_inv_act,c_recp_borrow,proc_issue_bonds,oth_cash_recp_ral_fnc_act,stot_cash_in_fnc_act,free_cashflow,c_prepay_amt_borr,c_pay_dist_dpcp_int_exp,incl_dvd_profit_paid_sc_ms,oth_cashpay_ral_fnc_act,stot_cashout_fnc_act,n_cash_flows_fnc_act,eff_fx_flu_cash,n_incr_cash_cash_equ,c_cash_equ_beg_period,c_cash_equ_end_period,c_recp_cap_contrib,incl_cash_rec_sg,uncon_invest_loss,prov_depr_assets,depr_fa_coga_dpba,amort_intang_assets,lt_amort_deferred_exp,decr_deferred_exp,incr_acc_exp,loss_disp_fiolta,loss_scr_fa,loss_fv_chg,invest_loss,decr_def_inc_tax_assets,incr_def_inc_tax_liab,decr_inventories,decr_oper_payable,incr_oper_payable,others,im_net_cashflow_oper_act,conv_debt_into_cap,conv_copbonds_due_within_1y,fa_fnc_leases,im_n_incr_cash_equ,net_dism_capital_add,net_cash_rece_sec,credit_impa_loss,use_sett_prov,oth_loss_assets,end_bal_cash,beg_bal_cash,end_bal_cash_equ,beg_bal_cash_equ,update_flag'
-            )
-            
-            if df.empty:
-                return []
-            
-            # Convert DataFrame to list of dictionaries
-            cash_flow_data = []
-            for _, row in df.iterrows():
-                cash_flow_data.append({
-                    'ts_code': row['ts_code'] if 'ts_code' in row else '',
-                    'ann_date': str(row['ann_date']) if pd.notna(row.get('ann_date')) else '',
-                    'f_ann_date': str(row['f_ann_date']) if pd.notna(row.get('f_ann_date')) else '',
-                    'end_date': str(row['end_date']) if pd.notna(row.get('end_date')) else '',
-                    'report_type': row['report_type'] if 'report_type' in row else '',
-                    'comp_type': row['comp_type'] if 'comp_type' in row else '',
-                    'net_profit': float(row['net_profit']) if pd.notna(row.get('net_profit')) else 0.0,
-                    'finan_exp': float(row['finan_exp']) if pd.notna(row.get('finan_exp')) else 0.0,
-                    'c_fr_sale_sg': float(row['c_fr_sale_sg']) if pd.notna(row.get('c_fr_sale_sg')) else 0.0,
-                    'recp_tax_rends': float(row['recp_tax_rends']) if pd.notna(row.get('recp_tax_rends')) else 0.0,
-                    'n_depos_incr_fi': float(row['n_depos_incr_fi']) if pd.notna(row.get('n_depos_incr_fi')) else 0.0,
-                    'n_incr_loans_cb': float(row['n_incr_loans_cb']) if pd.notna(row.get('n_incr_loans_cb')) else 0.0,
-                    'n_inc_borr_oth_fi': float(row['n_inc_borr_oth_fi']) if pd.notna(row.get('n_inc_borr_oth_fi')) else 0.0,
-                    'prem_fr_orig_contr': float(row['prem_fr_orig_contr']) if pd.notna(row.get('prem_fr_orig_contr')) else 0.0,
-                    'n_incr_insured_dep': float(row['n_incr_insured_dep']) if pd.notna(row.get('n_incr_insured_dep')) else 0.0,
-                    'n_reinsur_prem': float(row['n_reinsur_prem']) if pd.notna(row.get('n_reinsur_prem')) else 0.0,
-                    'n_incr_disp_tfa': float(row['n_incr_disp_tfa']) if pd.notna(row.get('n_incr_disp_tfa')) else 0.0,
-                    'ifc_cash_incr': float(row['ifc_cash_incr']) if pd.notna(row.get('ifc_cash_incr')) else 0.0,
-                    'n_incr_disp_faas': float(row['n_incr_disp_faas']) if pd.notna(row.get('n_incr_disp_faas')) else 0.0,
-                    'n_incr_loans_oth_bank': float(row['n_incr_loans_oth_bank']) if pd.notna(row.get('n_incr_loans_oth_bank')) else 0.0,
-                    'n_cap_incr_repur': float(row['n_cap_incr_repur']) if pd.notna(row.get('n_cap_incr_repur')) else 0.0,
-                    'c_fr_oth_operate_a': float(row['c_fr_oth_operate_a']) if pd.notna(row.get('c_fr_oth_operate_a')) else 0.0,
-                    'c_inf_fr_operate_a': float(row['c_inf_fr_operate_a']) if pd.notna(row.get('c_inf_fr_operate_a')) else 0.0,
-                    'c_paid_goods_s': float(row['c_paid_goods_s']) if pd.notna(row.get('c_paid_goods_s')) else 0.0,
-                    'c_paid_to_for_empl': float(row['c_paid_to_for_empl']) if pd.notna(row.get('c_paid_to_for_empl')) else 0.0,
-                    'c_paid_for_taxes': float(row['c_paid_for_taxes']) if pd.notna(row.get('c_paid_for_taxes')) else 0.0,
-                    'n_incr_clt_loan_cb': float(row['n_incr_clt_loan_cb']) if pd.notna(row.get('n_incr_clt_loan_cb')) else 0.0,
-                    'n_incr_dep_cbob': float(row['n_incr_dep_cbob']) if pd.notna(row.get('n_incr_dep_cbob')) else 0.0,
-                    'c_pay_claims_orig_inco': float(row['c_pay_claims_orig_inco']) if pd.notna(row.get('c_pay_claims_orig_inco')) else 0.0,
-                    'pay_handling_chrg': float(row['pay_handling_chrg']) if pd.notna(row.get('pay_handling_chrg')) else 0.0,
-                    'pay_comm_insur_plcy': float(row['pay_comm_insur_plcy']) if pd.notna(row.get('pay_comm_insur_plcy')) else 0.0,
-                    'oth_cash_pay_oper_act': float(row['oth_cash_pay_oper_act']) if pd.notna(row.get('oth_cash_pay_oper_act')) else 0.0,
-                    'st_cash_out_act': float(row['st_cash_out_act']) if pd.notna(row.get('st_cash_out_act')) else 0.0,
-                    'n_cashflow_act': float(row['n_cashflow_act']) if pd.notna(row.get('n_cashflow_act')) else 0.0,
-                    'oth_recp_ral_inv_act': float(row['oth_recp_ral_inv_act']) if pd.notna(row.get('oth_recp_ral_inv_act')) else 0.0,
-                    'c_disp_withdrwl_invest': float(row['c_disp_withdrwl_invest']) if pd.notna(row.get('c_disp_withdrwl_invest')) else 0.0,
-                    'c_recp_return_invest': float(row['c_recp_return_invest']) if pd.notna(row.get('c_recp_return_invest')) else 0.0,
-                    'n_recp_disp_fiolta': float(row['n_recp_disp_fiolta']) if pd.notna(row.get('n_recp_disp_fiolta')) else 0.0,
-                    'n_recp_disp_sobu': float(row['n_recp_disp_sobu']) if pd.notna(row.get('n_recp_disp_sobu')) else 0.0,
-                    'stot_inflows_inv_act': float(row['stot_inflows_inv_act']) if pd.notna(row.get('stot_inflows_inv_act')) else 0.0,
-                    'c_pay_acq_const_fiolta': float(row['c_pay_acq_const_fiolta']) if pd.notna(row.get('c_pay_acq_const_fiolta')) else 0.0,
-                    'c_paid_invest': float(row['c_paid_invest']) if pd.notna(row.get('c_paid_invest')) else 0.0,
-                    'n_disp_subs_oth_biz': float(row['n_disp_subs_oth_biz']) if pd.notna(row.get('n_disp_subs_oth_biz')) else 0.0,
-                    'oth_pay_ral_inv_act': float(row['oth_pay_ral_inv_act']) if pd.notna(row.get('oth_pay_ral_inv_act')) else 0.0,
-                    'n_incr_pledge_loan': float(row['n_incr_pledge_loan']) if pd.notna(row.get('n_incr_pledge_loan')) else 0.0,
-                    'stot_out_inv_act': float(row['stot_out_inv_act']) if pd.notna(row.get('stot_out_inv_act')) else 0.0,
-                    'n_cashflow_inv_act': float(row['n_cashflow_inv_act']) if pd.notna(row.get('n_cashflow_inv_act')) else 0.0,
-                    'c_recp_borrow': float(row['c_recp_borrow']) if pd.notna(row.get('c_recp_borrow')) else 0.0,
-                    'proc_issue_bonds': float(row['proc_issue_bonds']) if pd.notna(row.get('proc_issue_bonds')) else 0.0,
-                    'oth_cash_recp_ral_fnc_act': float(row['oth_cash_recp_ral_fnc_act']) if pd.notna(row.get('oth_cash_recp_ral_fnc_act')) else 0.0,
-                    'stot_cash_in_fnc_act': float(row['stot_cash_in_fnc_act']) if pd.notna(row.get('stot_cash_in_fnc_act')) else 0.0,
-                    'free_cashflow': float(row['free_cashflow']) if pd.notna(row.get('free_cashflow')) else 0.0,
-                    'c_prepay_amt_borr': float(row['c_prepay_amt_borr']) if pd.notna(row.get('c_prepay_amt_borr')) else 0.0,
-                    'c_pay_dist_dpcp_int_exp': float(row['c_pay_dist_dpcp_int_exp']) if pd.notna(row.get('c_pay_dist_dpcp_int_exp')) else 0.0,
-                    'incl_dvd_profit_paid_sc_ms': float(row['incl_dvd_profit_paid_sc_ms']) if pd.notna(row.get('incl_dvd_profit_paid_sc_ms')) else 0.0,
-                    'oth_cashpay_ral_fnc_act': float(row['oth_cashpay_ral_fnc_act']) if pd.notna(row.get('oth_cashpay_ral_fnc_act')) else 0.0,
-                    'stot_cashout_fnc_act': float(row['stot_cashout_fnc_act']) if pd.notna(row.get('stot_cashout_fnc_act')) else 0.0,
-                    'n_cash_flows_fnc_act': float(row['n_cash_flows_fnc_act']) if pd.notna(row.get('n_cash_flows_fnc_act')) else 0.0,
-                    'eff_fx_flu_cash': float(row['eff_fx_flu_cash']) if pd.notna(row.get('eff_fx_flu_cash')) else 0.0,
-                    'n_incr_cash_cash_equ': float(row['n_incr_cash_cash_equ']) if pd.notna(row.get('n_incr_cash_cash_equ')) else 0.0,
-                    'c_cash_equ_beg_period': float(row['c_cash_equ_beg_period']) if pd.notna(row.get('c_cash_equ_beg_period')) else 0.0,
-                    'c_cash_equ_end_period': float(row['c_cash_equ_end_period']) if pd.notna(row.get('c_cash_equ_end_period')) else 0.0,
-                    'c_recp_cap_contrib': float(row['c_recp_cap_contrib']) if pd.notna(row.get('c_recp_cap_contrib')) else 0.0,
-                    'incl_cash_rec_sg': float(row['incl_cash_rec_sg']) if pd.notna(row.get('incl_cash_rec_sg')) else 0.0,
-                    'uncon_invest_loss': float(row['uncon_invest_loss']) if pd.notna(row.get('uncon_invest_loss')) else 0.0,
-                    'prov_depr_assets': float(row['prov_depr_assets']) if pd.notna(row.get('prov_depr_assets')) else 0.0,
-                    'depr_fa_coga_dpba': float(row['depr_fa_coga_dpba']) if pd.notna(row.get('depr_fa_coga_dpba')) else 0.0,
-                    'amort_intang_assets': float(row['amort_intang_assets']) if pd.notna(row.get('amort_intang_assets')) else 0.0,
-                    'lt_amort_deferred_exp': float(row['lt_amort_deferred_exp']) if pd.notna(row.get('lt_amort_deferred_exp')) else 0.0,
-                    'decr_deferred_exp': float(row['decr_deferred_exp']) if pd.notna(row.get('decr_deferred_exp')) else 0.0,
-                    'incr_acc_exp': float(row['incr_acc_exp']) if pd.notna(row.get('incr_acc_exp')) else 0.0,
-                    'loss_disp_fiolta': float(row['loss_disp_fiolta']) if pd.notna(row.get('loss_disp_fiolta')) else 0.0,
-                    'loss_scr_fa': float(row['loss_scr_fa']) if pd.notna(row.get('loss_scr_fa')) else 0.0,
-                    'loss_fv_chg': float(row['loss_fv_chg']) if pd.notna(row.get('loss_fv_chg')) else 0.0,
-                    'invest_loss': float(row['invest_loss']) if pd.notna(row.get('invest_loss')) else 0.0,
-                    'decr_def_inc_tax_assets': float(row['decr_def_inc_tax_assets']) if pd.notna(row.get('decr_def_inc_tax_assets')) else 0.0,
-                    'incr_def_inc_tax_liab': float(row['incr_def_inc_tax_liab']) if pd.notna(row.get('incr_def_inc_tax_liab')) else 0.0,
-                    'decr_inventories': float(row['decr_inventories']) if pd.notna(row.get('decr_inventories')) else 0.0,
-                    'decr_oper_payable': float(row['decr_oper_payable']) if pd.notna(row.get('decr_oper_payable')) else 0.0,
-                    'incr_oper_payable': float(row['incr_oper_payable']) if pd.notna(row.get('incr_oper_payable')) else 0.0,
-                    'others': float(row['others']) if pd.notna(row.get('others')) else 0.0,
-                    'im_net_cashflow_oper_act': float(row['im_net_cashflow_oper_act']) if pd.notna(row.get('im_net_cashflow_oper_act')) else 0.0,
-                    'conv_debt_into_cap': float(row['conv_debt_into_cap']) if pd.notna(row.get('conv_debt_into_cap')) else 0.0,
-                    'conv_copbonds_due_within_1y': float(row['conv_copbonds_due_within_1y']) if pd.notna(row.get('conv_copbonds_due_within_1y')) else 0.0,
-                    'fa_fnc_leases': float(row['fa_fnc_leases']) if pd.notna(row.get('fa_fnc_leases')) else 0.0,
-                    'im_n_incr_cash_equ': float(row['im_n_incr_cash_equ']) if pd.notna(row.get('im_n_incr_cash_equ')) else 0.0,
-                    'net_dism_capital_add': float(row['net_dism_capital_add']) if pd.notna(row.get('net_dism_capital_add')) else 0.0,
-                    'net_cash_rece_sec': float(row['net_cash_rece_sec']) if pd.notna(row.get('net_cash_rece_sec')) else 0.0,
-                    'credit_impa_loss': float(row['credit_impa_loss']) if pd.notna(row.get('credit_impa_loss')) else 0.0,
-                    'use_sett_prov': float(row['use_sett_prov']) if pd.notna(row.get('use_sett_prov')) else 0.0,
-                    'oth_loss_assets': float(row['oth_loss_assets']) if pd.notna(row.get('oth_loss_assets')) else 0.0,
-                    'end_bal_cash': float(row['end_bal_cash']) if pd.notna(row.get('end_bal_cash')) else 0.0,
-                    'beg_bal_cash': float(row['beg_bal_cash']) if pd.notna(row.get('beg_bal_cash')) else 0.0,
-                    'end_bal_cash_equ': float(row['end_bal_cash_equ']) if pd.notna(row.get('end_bal_cash_equ')) else 0.0,
-                    'beg_bal_cash_equ': float(row['beg_bal_cash_equ']) if pd.notna(row.get('beg_bal_cash_equ')) else 0.0,
-                    'update_flag': float(row['update_flag']) if pd.notna(row.get('update_flag')) else 0.0
-                })
-            
-            return cash_flow_data
-            
-        except Exception as e:
-            print(f"Error fetching cash flow for {ts_code}: {e}")
-            return []
+        fields = fields or CASH_FLOW_FIELDS
+        # Get cash flow data
+        df = self._call_statement('cashflow', ts_code, start_date, end_date, fields, period)
+        
+        return convert_frame(df, field_spec(fields, STATEMENT_KINDS))
 
-    def get_income_statement(self, ts_code, start_date='', end_date='', fields=''):
+    def get_income_statement(self, ts_code='', start_date='', end_date='', fields='', period=''):
         """
         Get income statement data from Tushare
-        Reference: https://tushare.pro/document/2?doc_id=219
+        Pass period without ts_code to get the whole market for one report period (income_vip).
+        Reference: https://tushare.pro/document/2?doc_id=33
         """
-        try:
-            # Get income statement data
-            df = self.pro.income(
-                ts_code=ts_code,
-                start_date=start_date,
-                end_date=end_date,
-                fields=fields if fields else 'ts_code,ann_date,f_ann_date,end_date,report_type,comp_type,basic_eps,diluted_eps,total_revenue,revenue,int_income,prem_earned,comm_income,n_commis_income,n_oth_income,n_oth_biz_income,prem_income,out_prem,une_prem_reser,reins_income,n_sec_tb_income,n_undwrt_sec_income,n_indemnity_reser,n_ins_rsrv_rec,n_disp_tfa,n_disp_faas,n_disp_oth_assets,n_disp_oth_fa,n_disp_fiolta,n_disp_cip,n_disp_bio_assets,n_disp_mi,n_disp_oth_nca,n_disp_subs_oth_biz,n_oth_fa,n_disp_oth_biz,n_oth_comp_income,n_oth_comp_income_attr_p,n_oth_comp_income_attr_m_s,n_oth_comp_income_atsopc,n_oth_comp_income_attr_m_s_atsopc,n_oth_comp_income_atsop,n_income_attr_p,n_income_attr_m_s,n_income_discontinued,n_income_attr_p_discontinued,n_income_attr_m_s_discontinued,n_income_attr_p_ci,n_income_attr_m_s_ci,n_income,n_income_bef_na,n_income_bef_na_attr_p,n_income_bef_na_attr_m_s,n_income_bef_na_discontinued,n_income_bef_na_attr_p_discontinued,n_income_bef_na_attr_m_s_discontinued,n_income_bef_na_attr_p_ci,n_income_bef_na_attr_m_s_ci,n_income_bef_na_atsopc,n_income_bef_na_attr_p_atsopc,n_income_bef_na_attr_m_s_atsopc,n_income_bef_na_discontinued_atsopc,n_income_bef_na_attr_p_discontinued_atsopc,n_income_bef_na_attr_m_s_discontinued_atsopc,n_income_bef_na_attr_p_ci_atsopc,n_income_bef_na_attr_m_s_ci_atsopc,net_profit,net_profit_attr_p,net_profit_attr_m_s,net_profit_discontinued,net_profit_attr_p_discontinued,net_profit_attr_m_s_discontinued,net_profit_attr_p_ci,net_profit_attr_m_s_ci,net_profit_atsopc,net_profit_attr_p_atsopc,net_profit_attr_m_s_atsopc,net_profit_discontinued_atsopc,net_profit_attr_p_discontinued_atsopc,net_profit_attr_m_s_discontinued_atsopc,net_profit_attr_p_ci_atsopc,net_profit_attr_m_s_ci_atsopc,update_flag'
-            )
-            
-            if df.empty:
-                return []
-            
-            # Convert DataFrame to list of dictionaries
-            income_statement_data = []
-            for _, row in df.iterrows():
-                income_statement_data.append({
-                    'ts_code': row['ts_code'] if 'ts_code' in row else '',
-                    'ann_date': str(row['ann_date']) if pd.notna(row.get('ann_date')) else '',
-                    'f_ann_date': str(row['f_ann_date']) if pd.notna(row.get('f_ann_date')) else '',
-                    'end_date': str(row['end_date']) if pd.notna(row.get('end_date')) else '',
-                    'report_type': row['report_type'] if 'report_type' in row else '',
-                    'comp_type': row['comp_type'] if 'comp_type' in row else '',
-                    'basic_eps': float(row['basic_eps']) if pd.notna(row.get('basic_eps')) else 0.0,
-                    'diluted_eps': float(row['diluted_eps']) if pd.notna(row.get('diluted_eps')) else 0.0,
-                    'total_revenue': float(row['total_revenue']) if pd.notna(row.get('total_revenue')) else 0.0,
-                    'revenue': float(row['revenue']) if pd.notna(row.get('revenue')) else 0.0,
-                    'int_income': float(row['int_income']) if pd.notna(row.get('int_income')) else 0.0,
-                    'prem_earned': float(row['prem_earned']) if pd.notna(row.get('prem_earned')) else 0.0,
-                    'comm_income': float(row['comm_income']) if pd.notna(row.get('comm_income')) else 0.0,
-                    'n_commis_income': float(row['n_commis_income']) if pd.notna(row.get('n_commis_income')) else 0.0,
-                    'n_oth_income': float(row['n_oth_income']) if pd.notna(row.get('n_oth_income')) else 0.0,
-                    'n_oth_biz_income': float(row['n_oth_biz_income']) if pd.notna(row.get('n_oth_biz_income')) else 0.0,
-                    'prem_income': float(row['prem_income']) if pd.notna(row.get('prem_income')) else 0.0,
-                    'out_prem': float(row['out_prem']) if pd.notna(row.get('out_prem')) else 0.0,
-                    'une_prem_reser': float(row['une_prem_reser']) if pd.notna(row.get('une_prem_reser')) else 0.0,
-                    'reins_income': float(row['reins_income']) if pd.notna(row.get('reins_income')) else 0.0,
-                    'n_sec_tb_income': float(row['n_sec_tb_income']) if pd.notna(row.get('n_sec_tb_income')) else 0.0,
-                    'n_undwrt_sec_income': float(row['n_undwrt_sec_income']) if pd.notna(row.get('n_undwrt_sec_income')) else 0.0,
-                    'n_indemnity_reser': float(row['n_indemnity_reser']) if pd.notna(row.get('n_indemnity_reser')) else 0.0,
-                    'n_ins_rsrv_rec': float(row['n_ins_rsrv_rec']) if pd.notna(row.get('n_ins_rsrv_rec')) else 0.0,
-                    'n_disp_tfa': float(row['n_disp_tfa']) if pd.notna(row.get('n_disp_tfa')) else 0.0,
-                    'n_disp_faas': float(row['n_disp_faas']) if pd.notna(row.get('n_disp_faas')) else 0.0,
-                    'n_disp_oth_assets': float(row['n_disp_oth_assets']) if pd.notna(row.get('n_disp_oth_assets')) else 0.0,
-                    'n_disp_oth_fa': float(row['n_disp_oth_fa']) if pd.notna(row.get('n_disp_oth_fa')) else 0.0,
-                    'n_disp_fiolta': float(row['n_disp_fiolta']) if pd.notna(row.get('n_disp_fiolta')) else 0.0,
-                    'n_disp_cip': float(row['n_disp_cip']) if pd.notna(row.get('n_disp_cip')) else 0.0,
-                    'n_disp_bio_assets': float(row['n_disp_bio_assets']) if pd.notna(row.get('n_disp_bio_assets')) else 0.0,
-                    'n_disp_mi': float(row['n_disp_mi']) if pd.notna(row.get('n_disp_mi')) else 0.0,
-                    'n_disp_oth_nca': float(row['n_disp_oth_nca']) if pd.notna(row.get('n_disp_oth_nca')) else 0.0,
-                    'n_disp_subs_oth_biz': float(row['n_disp_subs_oth_biz']) if pd.notna(row.get('n_disp_subs_oth_biz')) else 0.0,
-                    'n_oth_fa': float(row['n_oth_fa']) if pd.notna(row.get('n_oth_fa')) else 0.0,
-                    'n_disp_oth_biz': float(row['n_disp_oth_biz']) if pd.notna(row.get('n_disp_oth_biz')) else 0.0,
-                    'n_oth_comp_income': float(row['n_oth_comp_income']) if pd.notna(row.get('n_oth_comp_income')) else 0.0,
-                    'n_oth_comp_income_attr_p': float(row['n_oth_comp_income_attr_p']) if pd.notna(row.get('n_oth_comp_income_attr_p')) else 0.0,
-                    'n_oth_comp_income_attr_m_s': float(row['n_oth_comp_income_attr_m_s']) if pd.notna(row.get('n_oth_comp_income_attr_m_s')) else 0.0,
-                    'n_oth_comp_income_atsopc': float(row['n_oth_comp_income_atsopc']) if pd.notna(row.get('n_oth_comp_income_atsopc')) else 0.0,
-                    'n_oth_comp_income_attr_m_s_atsopc': float(row['n_oth_comp_income_attr_m_s_atsopc']) if pd.notna(row.get('n_oth_comp_income_attr_m_s_atsopc')) else 0.0,
-                    'n_oth_comp_income_atsop': float(row['n_oth_comp_income_atsop']) if pd.notna(row.get('n_oth_comp_income_atsop')) else 0.0,
-                    'n_income_attr_p': float(row['n_income_attr_p']) if pd.notna(row.get('n_income_attr_p')) else 0.0,
-                    'n_income_attr_m_s': float(row['n_income_attr_m_s']) if pd.notna(row.get('n_income_attr_m_s')) else 0.0,
-                    'n_income_discontinued': float(row['n_income_discontinued']) if pd.notna(row.get('n_income_discontinued')) else 0.0,
-                    'n_income_attr_p_discontinued': float(row['n_income_attr_p_discontinued']) if pd.notna(row.get('n_income_attr_p_discontinued')) else 0.0,
-                    'n_income_attr_m_s_discontinued': float(row['n_income_attr_m_s_discontinued']) if pd.notna(row.get('n_income_attr_m_s_discontinued')) else 0.0,
-                    'n_income_attr_p_ci': float(row['n_income_attr_p_ci']) if pd.notna(row.get('n_income_attr_p_ci')) else 0.0,
-                    'n_income_attr_m_s_ci': float(row['n_income_attr_m_s_ci']) if pd.notna(row.get('n_income_attr_m_s_ci')) else 0.0,
-                    'n_income': float(row['n_income']) if pd.notna(row.get('n_income')) else 0.0,
-                    'n_income_bef_na': float(row['n_income_bef_na']) if pd.notna(row.get('n_income_bef_na')) else 0.0,
-                    'n_income_bef_na_attr_p': float(row['n_income_bef_na_attr_p']) if pd.notna(row.get('n_income_bef_na_attr_p')) else 0.0,
-                    'n_income_bef_na_attr_m_s': float(row['n_income_bef_na_attr_m_s']) if pd.notna(row.get('n_income_bef_na_attr_m_s')) else 0.0,
-                    'n_income_bef_na_discontinued': float(row['n_income_bef_na_discontinued']) if pd.notna(row.get('n_income_bef_na_discontinued')) else 0.0,
-                    'n_income_bef_na_attr_p_discontinued': float(row['n_income_bef_na_attr_p_discontinued']) if pd.notna(row.get('n_income_bef_na_attr_p_discontinued')) else 0.0,
-                    'n_income_bef_na_attr_m_s_discontinued': float(row['n_income_bef_na_attr_m_s_discontinued']) if pd.notna(row.get('n_income_bef_na_attr_m_s_discontinued')) else 0.0,
-                    'n_income_bef_na_attr_p_ci': float(row['n_income_bef_na_attr_p_ci']) if pd.notna(row.get('n_income_bef_na_attr_p_ci')) else 0.0,
-                    'n_income_bef_na_attr_m_s_ci': float(row['n_income_bef_na_attr_m_s_ci']) if pd.notna(row.get('n_income_bef_na_attr_m_s_ci')) else 0.0,
-                    'n_income_bef_na_atsopc': float(row['n_income_bef_na_atsopc']) if pd.notna(row.get('n_income_bef_na_atsopc')) else 0.0,
-                    'n_income_bef_na_attr_p_atsopc': float(row['n_income_bef_na_attr_p_atsopc']) if pd.notna(row.get('n_income_bef_na_attr_p_atsopc')) else 0.0,
-                    'n_income_bef_na_attr_m_s_atsopc': float(row['n_income_bef_na_attr_m_s_atsopc']) if pd.notna(row.get('n_income_bef_na_attr_m_s_atsopc')) else 0.0,
-                    'n_income_bef_na_discontinued_atsopc': float(row['n_income_bef_na_discontinued_atsopc']) if pd.notna(row.get('n_income_bef_na_discontinued_atsopc')) else 0.0,
-                    'n_income_bef_na_attr_p_discontinued_atsopc': float(row['n_income_bef_na_attr_p_discontinued_atsopc']) if pd.notna(row.get('n_income_bef_na_attr_p_discontinued_atsopc')) else 0.0,
-                    'n_income_bef_na_attr_m_s_discontinued_atsopc': float(row['n_income_bef_na_attr_m_s_discontinued_atsopc']) if pd.notna(row.get('n_income_bef_na_attr_m_s_discontinued_atsopc')) else 0.0,
-                    'n_income_bef_na_attr_p_ci_atsopc': float(row['n_income_bef_na_attr_p_ci_atsopc']) if pd.notna(row.get('n_income_bef_na_attr_p_ci_atsopc')) else 0.0,
-                    'n_income_bef_na_attr_m_s_ci_atsopc': float(row['n_income_bef_na_attr_m_s_ci_atsopc']) if pd.notna(row.get('n_income_bef_na_attr_m_s_ci_atsopc')) else 0.0,
-                    'net_profit': float(row['net_profit']) if pd.notna(row.get('net_profit')) else 0.0,
-                    'net_profit_attr_p': float(row['net_profit_attr_p']) if pd.notna(row.get('net_profit_attr_p')) else 0.0,
-                    'net_profit_attr_m_s': float(row['net_profit_attr_m_s']) if pd.notna(row.get('net_profit_attr_m_s')) else 0.0,
-                    'net_profit_discontinued': float(row['net_profit_discontinued']) if pd.notna(row.get('net_profit_discontinued')) else 0.0,
-                    'net_profit_attr_p_discontinued': float(row['net_profit_attr_p_discontinued']) if pd.notna(row.get('net_profit_attr_p_discontinued')) else 0.0,
-                    'net_profit_attr_m_s_discontinued': float(row['net_profit_attr_m_s_discontinued']) if pd.notna(row.get('net_profit_attr_m_s_discontinued')) else 0.0,
-                    'net_profit_attr_p_ci': float(row['net_profit_attr_p_ci']) if pd.notna(row.get('net_profit_attr_p_ci')) else 0.0,
-                    'net_profit_attr_m_s_ci': float(row['net_profit_attr_m_s_ci']) if pd.notna(row.get('net_profit_attr_m_s_ci')) else 0.0,
-                    'net_profit_atsopc': float(row['net_profit_atsopc']) if pd.notna(row.get('net_profit_atsopc')) else 0.0,
-                    'net_profit_attr_p_atsopc': float(row['net_profit_attr_p_atsopc']) if pd.notna(row.get('net_profit_attr_p_atsopc')) else 0.0,
-                    'net_profit_attr_m_s_atsopc': float(row['net_profit_attr_m_s_atsopc']) if pd.notna(row.get('net_profit_attr_m_s_atsopc')) else 0.0,
-                    'net_profit_discontinued_atsopc': float(row['net_profit_discontinued_atsopc']) if pd.notna(row.get('net_profit_discontinued_atsopc')) else 0.0,
-                    'net_profit_attr_p_discontinued_atsopc': float(row['net_profit_attr_p_discontinued_atsopc']) if pd.notna(row.get('net_profit_attr_p_discontinued_atsopc')) else 0.0,
-                    'net_profit_attr_m_s_discontinued_atsopc': float(row['net_profit_attr_m_s_discontinued_atsopc']) if pd.notna(row.get('net_profit_attr_m_s_discontinued_atsopc')) else 0.0,
-                    'net_profit_attr_p_ci_atsopc': float(row['net_profit_attr_p_ci_atsopc']) if pd.notna(row.get('net_profit_attr_p_ci_atsopc')) else 0.0,
-                    'net_profit_attr_m_s_ci_atsopc': float(row['net_profit_attr_m_s_ci_atsopc']) if pd.notna(row.get('net_profit_attr_m_s_ci_atsopc')) else 0.0,
-                    'update_flag': float(row['update_flag']) if pd.notna(row.get('update_flag')) else 0.0
-                })
-            
-            return income_statement_data
-            
-        except Exception as e:
-            print(f"Error fetching income statement for {ts_code}: {e}")
-            return []
+        fields = fields or INCOME_FIELDS
+        # Get income statement data
+        df = self._call_statement('income', ts_code, start_date, end_date, fields, period)
+        
+        return convert_frame(df, field_spec(fields, STATEMENT_KINDS))
 
-    def get_fina_indicator(self, ts_code, start_date='', end_date='', fields=''):
+    def get_fina_indicator(self, ts_code='', start_date='', end_date='', fields='', period=''):
         """
         Get financial indicator data from Tushare
+        start_date/end_date bound the announcement date (ann_date). Without
+        ts_code the whole market is paged through, e.g. everything announced
+        since the last sync.
         Reference: https://tushare.pro/document/2?doc_id=79
         """
-        try:
-            # Get financial indicator data
-            df = self.pro.fina_indicator_vip(
-                ts_code=ts_code,
-                start_date=start_date,
-                end_date=end_date,
-                fields=fields if fields else 'ts_code,ann_date,end_date,eps,dt_eps,total_revenue_ps,revenue_ps,capital_rese_ps,surplus_rese_ps,undist_profit_ps,extra_item,profit_dedt,gross_margin,current_ratio,quick_ratio,cash_ratio,invturn_days,arturn_days,inv_turn,ar_turn,ca_turn,fa_turn,assets_turn,op_income,valuechange_income,interst_income,daa,ebit,ebitda,fcff,fcfe,current_exint,noncurrent_exint,interestdebt,netdebt,tangible_asset,working_capital,networking_capital,invest_capital,retained_earnings,diluted2_eps,bps,ocfps,retainedps,cfps,ebit_ps,fcff_ps,fcfe_ps,netprofit_margin,grossprofit_margin,cogs_of_sales,expense_of_sales,profit_to_gr,saleexp_to_gr,adminexp_of_gr,finaexp_of_gr,impai_ttm,gc_of_gr,op_of_gr,ebit_of_gr,roe,roe_waa,roe_dt,roa,npta,roic,roe_yearly,roa2_yearly,roe_avg,opincome_of_ebt,investincome_of_ebt,n_op_profit_of_ebt,tax_to_ebt,dtprofit_to_profit,salescash_to_or,ocf_to_or,ocf_to_opincome,capitalized_to_da,debt_to_assets,assets_to_eqt,dp_assets_to_eqt,ca_to_assets,nca_to_assets,tbassets_to_total_assets,int_to_talcap,eqt_to_talcapital,currentdebt_to_debt,longdeb_to_debt,ocf_to_shortdebt,debt_to_eqt,eqt_to_debt,eqt_to_interestdebt,tangibleasset_to_debt,tangasset_to_intdebt,tangibleasset_to_netdebt,ocf_to_debt,ocf_to_interestdebt,ocf_to_netdebt,ebit_to_interest,long_debt_to_working_capital,ebitda_to_debt,turn_days,roa_yearly,roa_dp,fixed_assets,profit_prefin_exp,non_op_profit,op_to_ebt,nop_to_ebt,ocf_to_profit,cash_to_liqdebt,cash_to_liqdebt_withinterest,op_to_liqdebt,op_to_debt,roic_yearly,total_fa_trun,profit_to_op,q_opincome,q_investincome,q_dtprofit,q_eps,q_netprofit_margin,q_gsprofit_margin,q_exp_to_sales,q_profit_to_gr,q_saleexp_to_gr,q_adminexp_to_gr,q_finaexp_to_gr,q_impair_to_gr,q_gc_to_gr,q_op_to_gr,q_roe,q_dt_roe,q_npta,q_opincome_to_ebt,q_investincome_to_ebt,q_dtprofit_to_profit,q_salescash_to_or,q_ocf_to_sales,q_ocf_to_opincome,basic_eps_yoy,dt_eps_yoy,cfps_yoy,op_yoy,ebt_yoy,netprofit_yoy,dt_netprofit_yoy,ocf_yoy,roe_yoy,bps_yoy,assets_yoy,eqt_yoy,tr_yoy,or_yoy,q_gr_yoy,q_gr_qoq,q_sales_yoy,q_sales_qoq,q_op_yoy,q_op_qoq,q_profit_yoy,q_profit_qoq,q_netprofit_yoy,q_netprofit_qoq,equity_yoy,tr_total,profit_total,netprofit_total,netprofit_attr_p_total,or_total,q_sales_chg,q_op_chg,q_netprofit_chg,q_netprofit_attr_p_chg,q_profit_chg,q_gr_chg,update_flag'
-            )
-            
-            if df.empty:
-                return []
-            
-            # Convert DataFrame to list of dictionaries
-            fina_indicator_data = []
-            for _, row in df.iterrows():
-                fina_indicator_data.append({
-                    'ts_code': row['ts_code'] if 'ts_code' in row else '',
-                    'ann_date': str(row['ann_date']) if pd.notna(row.get('ann_date')) else '',
-                    'end_date': str(row['end_date']) if pd.notna(row.get('end_date')) else '',
-                    'eps': float(row['eps']) if pd.notna(row.get('eps')) else 0.0,
-                    'dt_eps': float(row['dt_eps']) if pd.notna(row.get('dt_eps')) else 0.0,
-                    'total_revenue_ps': float(row['total_revenue_ps']) if pd.notna(row.get('total_revenue_ps')) else 0.0,
-                    'revenue_ps': float(row['revenue_ps']) if pd.notna(row.get('revenue_ps')) else 0.0,
-                    'capital_rese_ps': float(row['capital_rese_ps']) if pd.notna(row.get('capital_rese_ps')) else 0.0,
-                    'surplus_rese_ps': float(row['surplus_rese_ps']) if pd.notna(row.get('surplus_rese_ps')) else 0.0,
-                    'undist_profit_ps': float(row['undist_profit_ps']) if pd.notna(row.get('undist_profit_ps')) else 0.0,
-                    'extra_item': float(row['extra_item']) if pd.notna(row.get('extra_item')) else 0.0,
-                    'profit_dedt': float(row['profit_dedt']) if pd.notna(row.get('profit_dedt')) else 0.0,
-                    'gross_margin': float(row['gross_margin']) if pd.notna(row.get('gross_margin')) else 0.0,
-                    'current_ratio': float(row['current_ratio']) if pd.notna(row.get('current_ratio')) else 0.0,
-                    'quick_ratio': float(row['quick_ratio']) if pd.notna(row.get('quick_ratio')) else 0.0,
-                    'cash_ratio': float(row['cash_ratio']) if pd.notna(row.get('cash_ratio')) else 0.0,
-                    'invturn_days': float(row['invturn_days']) if pd.notna(row.get('invturn_days')) else 0.0,
-                    'arturn_days': float(row['arturn_days']) if pd.notna(row.get('arturn_days')) else 0.0,
-                    'inv_turn': float(row['inv_turn']) if pd.notna(row.get('inv_turn')) else 0.0,
-                    'ar_turn': float(row['ar_turn']) if pd.notna(row.get('ar_turn')) else 0.0,
-                    'ca_turn': float(row['ca_turn']) if pd.notna(row.get('ca_turn')) else 0.0,
-                    'fa_turn': float(row['fa_turn']) if pd.notna(row.get('fa_turn')) else 0.0,
-                    'assets_turn': float(row['assets_turn']) if pd.notna(row.get('assets_turn')) else 0.0,
-                    'op_income': float(row['op_income']) if pd.notna(row.get('op_income')) else 0.0,
-                    'valuechange_income': float(row['valuechange_income']) if pd.notna(row.get('valuechange_income')) else 0.0,
-                    'interst_income': float(row['interst_income']) if pd.notna(row.get('interst_income')) else 0.0,
-                    'daa': float(row['daa']) if pd.notna(row.get('daa')) else 0.0,
-                    'ebit': float(row['ebit']) if pd.notna(row.get('ebit')) else 0.0,
-                    'ebitda': float(row['ebitda']) if pd.notna(row.get('ebitda')) else 0.0,
-                    'fcff': float(row['fcff']) if pd.notna(row.get('fcff')) else 0.0,
-                    'fcfe': float(row['fcfe']) if pd.notna(row.get('fcfe')) else 0.0,
-                    'current_exint': float(row['current_exint']) if pd.notna(row.get('current_exint')) else 0.0,
-                    'noncurrent_exint': float(row['noncurrent_exint']) if pd.notna(row.get('noncurrent_exint')) else 0.0,
-                    'interestdebt': float(row['interestdebt']) if pd.notna(row.get('interestdebt')) else 0.0,
-                    'netdebt': float(row['netdebt']) if pd.notna(row.get('netdebt')) else 0.0,
-                    'tangible_asset': float(row['tangible_asset']) if pd.notna(row.get('tangible_asset')) else 0.0,
-                    'working_capital': float(row['working_capital']) if pd.notna(row.get('working_capital')) else 0.0,
-                    'networking_capital': float(row['networking_capital']) if pd.notna(row.get('networking_capital')) else 0.0,
-                    'invest_capital': float(row['invest_capital']) if pd.notna(row.get('invest_capital')) else 0.0,
-                    'retained_earnings': float(row['retained_earnings']) if pd.notna(row.get('retained_earnings')) else 0.0,
-                    'diluted2_eps': float(row['diluted2_eps']) if pd.notna(row.get('diluted2_eps')) else 0.0,
-                    'bps': float(row['bps']) if pd.notna(row.get('bps')) else 0.0,
-                    'ocfps': float(row['ocfps']) if pd.notna(row.get('ocfps')) else 0.0,
-                    'retainedps': float(row['retainedps']) if pd.notna(row.get('retainedps')) else 0.0,
-                    'cfps': float(row['cfps']) if pd.notna(row.get('cfps')) else 0.0,
-                    'ebit_ps': float(row['ebit_ps']) if pd.notna(row.get('ebit_ps')) else 0.0,
-                    'fcff_ps': float(row['fcff_ps']) if pd.notna(row.get('fcff_ps')) else 0.0,
-                    'fcfe_ps': float(row['fcfe_ps']) if pd.notna(row.get('fcfe_ps')) else 0.0,
-                    'netprofit_margin': float(row['netprofit_margin']) if pd.notna(row.get('netprofit_margin')) else 0.0,
-                    'grossprofit_margin': float(row['grossprofit_margin']) if pd.notna(row.get('grossprofit_margin')) else 0.0,
-                    'cogs_of_sales': float(row['cogs_of_sales']) if pd.notna(row.get('cogs_of_sales')) else 0.0,
-                    'expense_of_sales': float(row['expense_of_sales']) if pd.notna(row.get('expense_of_sales')) else 0.0,
-                    'profit_to_gr': float(row['profit_to_gr']) if pd.notna(row.get('profit_to_gr')) else 0.0,
-                    'saleexp_to_gr': float(row['saleexp_to_gr']) if pd.notna(row.get('saleexp_to_gr')) else 0.0,
-                    'adminexp_of_gr': float(row['adminexp_of_gr']) if pd.notna(row.get('adminexp_of_gr')) else 0.0,
-                    'finaexp_of_gr': float(row['finaexp_of_gr']) if pd.notna(row.get('finaexp_of_gr')) else 0.0,
-                    'impai_ttm': float(row['impai_ttm']) if pd.notna(row.get('impai_ttm')) else 0.0,
-                    'gc_of_gr': float(row['gc_of_gr']) if pd.notna(row.get('gc_of_gr')) else 0.0,
-                    'op_of_gr': float(row['op_of_gr']) if pd.notna(row.get('op_of_gr')) else 0.0,
-                    'ebit_of_gr': float(row['ebit_of_gr']) if pd.notna(row.get('ebit_of_gr')) else 0.0,
-                    'roe': float(row['roe']) if pd.notna(row.get('roe')) else 0.0,
-                    'roe_waa': float(row['roe_waa']) if pd.notna(row.get('roe_waa')) else 0.0,
-                    'roe_dt': float(row['roe_dt']) if pd.notna(row.get('roe_dt')) else 0.0,
-                    'roa': float(row['roa']) if pd.notna(row.get('roa')) else 0.0,
-                    'npta': float(row['npta']) if pd.notna(row.get('npta')) else 0.0,
-                    'roic': float(row['roic']) if pd.notna(row.get('roic')) else 0.0,
-                    'roe_yearly': float(row['roe_yearly']) if pd.notna(row.get('roe_yearly')) else 0.0,
-                    'roa2_yearly': float(row['roa2_yearly']) if pd.notna(row.get('roa2_yearly')) else 0.0,
-                    'roe_avg': float(row['roe_avg']) if pd.notna(row.get('roe_avg')) else 0.0,
-                    'opincome_of_ebt': float(row['opincome_of_ebt']) if pd.notna(row.get('opincome_of_ebt')) else 0.0,
-                    'investincome_of_ebt': float(row['investincome_of_ebt']) if pd.notna(row.get('investincome_of_ebt')) else 0.0,
-                    'n_op_profit_of_ebt': float(row['n_op_profit_of_ebt']) if pd.notna(row.get('n_op_profit_of_ebt')) else 0.0,
-                    'tax_to_ebt': float(row['tax_to_ebt']) if pd.notna(row.get('tax_to_ebt')) else 0.0,
-                    'dtprofit_to_profit': float(row['dtprofit_to_profit']) if pd.notna(row.get('dtprofit_to_profit')) else 0.0,
-                    'salescash_to_or': float(row['salescash_to_or']) if pd.notna(row.get('salescash_to_or')) else 0.0,
-                    'ocf_to_or': float(row['ocf_to_or']) if pd.notna(row.get('ocf_to_or')) else 0.0,
-                    'ocf_to_opincome': float(row['ocf_to_opincome']) if pd.notna(row.get('ocf_to_opincome')) else 0.0,
-                    'capitalized_to_da': float(row['capitalized_to_da']) if pd.notna(row.get('capitalized_to_da')) else 0.0,
-                    'debt_to_assets': float(row['debt_to_assets']) if pd.notna(row.get('debt_to_assets')) else 0.0,
-                    'assets_to_eqt': float(row['assets_to_eqt']) if pd.notna(row.get('assets_to_eqt')) else 0.0,
-                    'dp_assets_to_eqt': float(row['dp_assets_to_eqt']) if pd.notna(row.get('dp_assets_to_eqt')) else 0.0,
-                    'ca_to_assets': float(row['ca_to_assets']) if pd.notna(row.get('ca_to_assets')) else 0.0,
-                    'nca_to_assets': float(row['nca_to_assets']) if pd.notna(row.get('nca_to_assets')) else 0.0,
-                    'tbassets_to_total_assets': float(row['tbassets_to_total_assets']) if pd.notna(row.get('tbassets_to_total_assets')) else 0.0,
-                    'int_to_talcap': float(row['int_to_talcap']) if pd.notna(row.get('int_to_talcap')) else 0.0,
-                    'eqt_to_talcapital': float(row['eqt_to_talcapital']) if pd.notna(row.get('eqt_to_talcapital')) else 0.0,
-                    'currentdebt_to_debt': float(row['currentdebt_to_debt']) if pd.notna(row.get('currentdebt_to_debt')) else 0.0,
-                    'longdeb_to_debt': float(row['longdeb_to_debt']) if pd.notna(row.get('longdeb_to_debt')) else 0.0,
-                    'ocf_to_shortdebt': float(row['ocf_to_shortdebt']) if pd.notna(row.get('ocf_to_shortdebt')) else 0.0,
-                    'debt_to_eqt': float(row['debt_to_eqt']) if pd.notna(row.get('debt_to_eqt')) else 0.0,
-                    'eqt_to_debt': float(row['eqt_to_debt']) if pd.notna(row.get('eqt_to_debt')) else 0.0,
-                    'eqt_to_interestdebt': float(row['eqt_to_interestdebt']) if pd.notna(row.get('eqt_to_interestdebt')) else 0.0,
-                    'tangibleasset_to_debt': float(row['tangibleasset_to_debt']) if pd.notna(row.get('tangibleasset_to_debt')) else 0.0,
-                    'tangasset_to_intdebt': float(row['tangasset_to_intdebt']) if pd.notna(row.get('tangasset_to_intdebt')) else 0.0,
-                    'tangibleasset_to_netdebt': float(row['tangibleasset_to_netdebt']) if pd.notna(row.get('tangibleasset_to_netdebt')) else 0.0,
-                    'ocf_to_debt': float(row['ocf_to_debt']) if pd.notna(row.get('ocf_to_debt')) else 0.0,
-                    'ocf_to_interestdebt': float(row['ocf_to_interestdebt']) if pd.notna(row.get('ocf_to_interestdebt')) else 0.0,
-                    'ocf_to_netdebt': float(row['ocf_to_netdebt']) if pd.notna(row.get('ocf_to_netdebt')) else 0.0,
-                    'ebit_to_interest': float(row['ebit_to_interest']) if pd.notna(row.get('ebit_to_interest')) else 0.0,
-                    'long_debt_to_working_capital': float(row['long_debt_to_working_capital']) if pd.notna(row.get('long_debt_to_working_capital')) else 0.0,
-                    'ebitda_to_debt': float(row['ebitda_to_debt']) if pd.notna(row.get('ebitda_to_debt')) else 0.0,
-                    'turn_days': float(row['turn_days']) if pd.notna(row.get('turn_days')) else 0.0,
-                    'roa_yearly': float(row['roa_yearly']) if pd.notna(row.get('roa_yearly')) else 0.0,
-                    'roa_dp': float(row['roa_dp']) if pd.notna(row.get('roa_dp')) else 0.0,
-                    'fixed_assets': float(row['fixed_assets']) if pd.notna(row.get('fixed_assets')) else 0.0,
-                    'profit_prefin_exp': float(row['profit_prefin_exp']) if pd.notna(row.get('profit_prefin_exp')) else 0.0,
-                    'non_op_profit': float(row['non_op_profit']) if pd.notna(row.get('non_op_profit')) else 0.0,
-                    'op_to_ebt': float(row['op_to_ebt']) if pd.notna(row.get('op_to_ebt')) else 0.0,
-                    'nop_to_ebt': float(row['nop_to_ebt']) if pd.notna(row.get('nop_to_ebt')) else 0.0,
-                    'ocf_to_profit': float(row['ocf_to_profit']) if pd.notna(row.get('ocf_to_profit')) else 0.0,
-                    'cash_to_liqdebt': float(row['cash_to_liqdebt']) if pd.notna(row.get('cash_to_liqdebt')) else 0.0,
-                    'cash_to_liqdebt_withinterest': float(row['cash_to_liqdebt_withinterest']) if pd.notna(row.get('cash_to_liqdebt_withinterest')) else 0.0,
-                    'op_to_liqdebt': float(row['op_to_liqdebt']) if pd.notna(row.get('op_to_liqdebt')) else 0.0,
-                    'op_to_debt': float(row['op_to_debt']) if pd.notna(row.get('op_to_debt')) else 0.0,
-                    'roic_yearly': float(row['roic_yearly']) if pd.notna(row.get('roic_yearly')) else 0.0,
-                    'total_fa_trun': float(row['total_fa_trun']) if pd.notna(row.get('total_fa_trun')) else 0.0,
-                    'profit_to_op': float(row['profit_to_op']) if pd.notna(row.get('profit_to_op')) else 0.0,
-                    'q_opincome': float(row['q_opincome']) if pd.notna(row.get('q_opincome')) else 0.0,
-                    'q_investincome': float(row['q_investincome']) if pd.notna(row.get('q_investincome')) else 0.0,
-                    'q_dtprofit': float(row['q_dtprofit']) if pd.notna(row.get('q_dtprofit')) else 0.0,
-                    'q_eps': float(row['q_eps']) if pd.notna(row.get('q_eps')) else 0.0,
-                    'q_netprofit_margin': float(row['q_netprofit_margin']) if pd.notna(row.get('q_netprofit_margin')) else 0.0,
-                    'q_gsprofit_margin': float(row['q_gsprofit_margin']) if pd.notna(row.get('q_gsprofit_margin')) else 0.0,
-                    'q_exp_to_sales': float(row['q_exp_to_sales']) if pd.notna(row.get('q_exp_to_sales')) else 0.0,
-                    'q_profit_to_gr': float(row['q_profit_to_gr']) if pd.notna(row.get('q_profit_to_gr')) else 0.0,
-                    'q_saleexp_to_gr': float(row['q_saleexp_to_gr']) if pd.notna(row.get('q_saleexp_to_gr')) else 0.0,
-                    'q_adminexp_to_gr': float(row['q_adminexp_to_gr']) if pd.notna(row.get('q_adminexp_to_gr')) else 0.0,
-                    'q_finaexp_to_gr': float(row['q_finaexp_to_gr']) if pd.notna(row.get('q_finaexp_to_gr')) else 0.0,
-                    'q_impair_to_gr': float(row['q_impair_to_gr']) if pd.notna(row.get('q_impair_to_gr')) else 0.0,
-                    'q_gc_to_gr': float(row['q_gc_to_gr']) if pd.notna(row.get('q_gc_to_gr')) else 0.0,
-                    'q_op_to_gr': float(row['q_op_to_gr']) if pd.notna(row.get('q_op_to_gr')) else 0.0,
-                    'q_roe': float(row['q_roe']) if pd.notna(row.get('q_roe')) else 0.0,
-                    'q_dt_roe': float(row['q_dt_roe']) if pd.notna(row.get('q_dt_roe')) else 0.0,
-                    'q_npta': float(row['q_npta']) if pd.notna(row.get('q_npta')) else 0.0,
-                    'q_opincome_to_ebt': float(row['q_opincome_to_ebt']) if pd.notna(row.get('q_opincome_to_ebt')) else 0.0,
-                    'q_investincome_to_ebt': float(row['q_investincome_to_ebt']) if pd.notna(row.get('q_investincome_to_ebt')) else 0.0,
-                    'q_dtprofit_to_profit': float(row['q_dtprofit_to_profit']) if pd.notna(row.get('q_dtprofit_to_profit')) else 0.0,
-                    'q_salescash_to_or': float(row['q_salescash_to_or']) if pd.notna(row.get('q_salescash_to_or')) else 0.0,
-                    'q_ocf_to_sales': float(row['q_ocf_to_sales']) if pd.notna(row.get('q_ocf_to_sales')) else 0.0,
-                    'q_ocf_to_opincome': float(row['q_ocf_to_opincome']) if pd.notna(row.get('q_ocf_to_opincome')) else 0.0,
-                    'basic_eps_yoy': float(row['basic_eps_yoy']) if pd.notna(row.get('basic_eps_yoy')) else 0.0,
-                    'dt_eps_yoy': float(row['dt_eps_yoy']) if pd.notna(row.get('dt_eps_yoy')) else 0.0,
-                    'cfps_yoy': float(row['cfps_yoy']) if pd.notna(row.get('cfps_yoy')) else 0.0,
-                    'op_yoy': float(row['op_yoy']) if pd.notna(row.get('op_yoy')) else 0.0,
-                    'ebt_yoy': float(row['ebt_yoy']) if pd.notna(row.get('ebt_yoy')) else 0.0,
-                    'netprofit_yoy': float(row['netprofit_yoy']) if pd.notna(row.get('netprofit_yoy')) else 0.0,
-                    'dt_netprofit_yoy': float(row['dt_netprofit_yoy']) if pd.notna(row.get('dt_netprofit_yoy')) else 0.0,
-                    'ocf_yoy': float(row['ocf_yoy']) if pd.notna(row.get('ocf_yoy')) else 0.0,
-                    'roe_yoy': float(row['roe_yoy']) if pd.notna(row.get('roe_yoy')) else 0.0,
-                    'bps_yoy': float(row['bps_yoy']) if pd.notna(row.get('bps_yoy')) else 0.0,
-                    'assets_yoy': float(row['assets_yoy']) if pd.notna(row.get('assets_yoy')) else 0.0,
-                    'eqt_yoy': float(row['eqt_yoy']) if pd.notna(row.get('eqt_yoy')) else 0.0,
-                    'tr_yoy': float(row['tr_yoy']) if pd.notna(row.get('tr_yoy')) else 0.0,
-                    'or_yoy': float(row['or_yoy']) if pd.notna(row.get('or_yoy')) else 0.0,
-                    'q_gr_yoy': float(row['q_gr_yoy']) if pd.notna(row.get('q_gr_yoy')) else 0.0,
-                    'q_gr_qoq': float(row['q_gr_qoq']) if pd.notna(row.get('q_gr_qoq')) else 0.0,
-                    'q_sales_yoy': float(row['q_sales_yoy']) if pd.notna(row.get('q_sales_yoy')) else 0.0,
-                    'q_sales_qoq': float(row['q_sales_qoq']) if pd.notna(row.get('q_sales_qoq')) else 0.0,
-                    'q_op_yoy': float(row['q_op_yoy']) if pd.notna(row.get('q_op_yoy')) else 0.0,
-                    'q_op_qoq': float(row['q_op_qoq']) if pd.notna(row.get('q_op_qoq')) else 0.0,
-                    'q_profit_yoy': float(row['q_profit_yoy']) if pd.notna(row.get('q_profit_yoy')) else 0.0,
-                    'q_profit_qoq': float(row['q_profit_qoq']) if pd.notna(row.get('q_profit_qoq')) else 0.0,
-                    'q_netprofit_yoy': float(row['q_netprofit_yoy']) if pd.notna(row.get('q_netprofit_yoy')) else 0.0,
-                    'q_netprofit_qoq': float(row['q_netprofit_qoq']) if pd.notna(row.get('q_netprofit_qoq')) else 0.0,
-                    'equity_yoy': float(row['equity_yoy']) if pd.notna(row.get('equity_yoy')) else 0.0,
-                    'tr_total': float(row['tr_total']) if pd.notna(row.get('tr_total')) else 0.0,
-                    'profit_total': float(row['profit_total']) if pd.notna(row.get('profit_total')) else 0.0,
-                    'netprofit_total': float(row['netprofit_total']) if pd.notna(row.get('netprofit_total')) else 0.0,
-                    'netprofit_attr_p_total': float(row['netprofit_attr_p_total']) if pd.notna(row.get('netprofit_attr_p_total')) else 0.0,
-                    'or_total': float(row['or_total']) if pd.notna(row.get('or_total')) else 0.0,
-                    'q_sales_chg': float(row['q_sales_chg']) if pd.notna(row.get('q_sales_chg')) else 0.0,
-                    'q_op_chg': float(row['q_op_chg']) if pd.notna(row.get('q_op_chg')) else 0.0,
-                    'q_netprofit_chg': float(row['q_netprofit_chg']) if pd.notna(row.get('q_netprofit_chg')) else 0.0,
-                    'q_netprofit_attr_p_chg': float(row['q_netprofit_attr_p_chg']) if pd.notna(row.get('q_netprofit_attr_p_chg')) else 0.0,
-                    'q_profit_chg': float(row['q_profit_chg']) if pd.notna(row.get('q_profit_chg')) else 0.0,
-                    'q_gr_chg': float(row['q_gr_chg']) if pd.notna(row.get('q_gr_chg')) else 0.0,
-                    'update_flag': float(row['update_flag']) if pd.notna(row.get('update_flag')) else 0.0
-                })
-            
-            return fina_indicator_data
-            
-        except Exception as e:
-            print(f"Error fetching financial indicator for {ts_code}: {e}")
-            return []
+        fields = fields or FINA_INDICATOR_FIELDS
+        # Get financial indicator data
+        params = {'start_date': start_date, 'end_date': end_date, 'fields': fields}
+        if period:
+            params['period'] = period
+        if ts_code:
+            df = self._call('fina_indicator_vip', ts_code=ts_code, **params)
+        else:
+            df = self._call_paged('fina_indicator_vip', **params)
+        
+        return convert_frame(df, field_spec(fields, STATEMENT_KINDS))
 
-    def get_daily_basic(self, ts_code='', start_date='', end_date='', fields=''):
+    def get_daily_basic(self, ts_code='', start_date='', end_date='', fields='', trade_date=''):
         """
         Get daily_basic data from Tushare
+        Pass trade_date without ts_code to get the whole market for one day.
         Reference: https://tushare.pro/document/2?doc_id=32
         """
-        try:
-            df = self.pro.daily_basic(
-                ts_code=ts_code,
-                start_date = start_date,
-                end_date=end_date,
-                fields=fields if fields else 'ts_code,trade_date,close,turnover_rate,volume_ratio,pe,pb,total_share,float_share,free_share,total_mv,circ_mv'
-            )
-            if df.empty:
-                return []
-            daily_basic_data = []
-            for _, row in df.iterrows():
-                daily_basic_data.append({
-                    'ts_code': row['ts_code'],
-                    'trade_date': str(row['trade_date']) if pd.notna(row['trade_date']) else '',
-                    'close': float(row['close']) if pd.notna(row.get('close')) else 0.0,
-                    'turnover_rate': float(row['turnover_rate']) if pd.notna(row.get('turnover_rate')) else 0.0,
-                    'volume_ratio': float(row['volume_ratio']) if pd.notna(row.get('volume_ratio')) else 0.0,
-                    'pe': float(row['pe']) if pd.notna(row.get('pe')) else 0.0,
-                    'pb': float(row['pb']) if pd.notna(row.get('pb')) else 0.0,
-                    'total_share': float(row['total_share']) if pd.notna(row.get('total_share')) else 0.0,
-                    'float_share': float(row['float_share']) if pd.notna(row.get('float_share')) else 0.0,
-                    'free_share': float(row['free_share']) if pd.notna(row.get('free_share')) else 0.0,
-                    'total_mv': float(row['total_mv']) if pd.notna(row.get('total_mv')) else 0.0,
-                    'circ_mv': float(row['circ_mv']) if pd.notna(row.get('circ_mv')) else 0.0
-                })
-            return daily_basic_data
-        except Exception as e:
-            print(f"Error fetching daily_basic: {e}")
-            return []
+        fields = fields or DAILY_BASIC_FIELDS
+        df = self._call('daily_basic',
+            ts_code=ts_code,
+            trade_date=trade_date,
+            start_date = start_date,
+            end_date=end_date,
+            fields=fields
+        )
+        return convert_frame(df, field_spec(fields, QUOTE_KINDS))
 
     def get_ths_hot(self, trade_date=''):
         """
         Fetch ths_hot (同花顺热点) data from Tushare.
         API: https://tushare.pro/document/2?doc_id=320
         """
-        try:
-            df = self.pro.ths_hot(
-                trade_date=trade_date,
-                fields="trade_date,data_type,ts_code,ts_name,rank,pct_change,current_price,concept,rank_reason,hot,rank_time"
-            )
-            if df.empty:
-                return []
-            ths_hot_data = []
-            for _, row in df.iterrows():
-                ths_hot_data.append({
-                    'trade_date': row['trade_date'],
-                    'data_type': row['data_type'],
-                    'ts_code': row['ts_code'],
-                    'ts_name': row['ts_name'] if 'ts_name' in row else '',
-                    'rank': int(row['rank']) if pd.notna(row.get('rank')) else None,
-                    'pct_change': float(row['pct_change']) if pd.notna(row.get('pct_change')) else None,
-                    'current_price': float(row['current_price']) if pd.notna(row.get('current_price')) else None,
-                    'concept': row['concept'] if 'concept' in row else '',
-                    'rank_reason': row['rank_reason'] if 'rank_reason' in row else '',
-                    'hot': float(row['hot']) if pd.notna(row.get('hot')) else None,
-                    'rank_time': row['rank_time'] if 'rank_time' in row else ''
-                })
-            return ths_hot_data
-        except Exception as e:
-            print(f"Error fetching ths_hot: {e}")
-            return []
+        df = self._call('ths_hot',
+            trade_date=trade_date,
+            fields=THS_HOT_FIELDS
+        )
+        return convert_frame(df, field_spec(THS_HOT_FIELDS, HOT_KINDS))
 
     def get_dc_hot(self, trade_date=''):
         """
@@ -847,166 +474,89 @@ class TushareService:
         API: https://tushare.pro/document/2?doc_id=321
         kwargs can include params like ts_code, in_date, out_date, etc.
         """
-        try:
-            df = self.pro.dc_hot(
-                trade_date=trade_date,
-                fields="trade_date,data_type,ts_code,ts_name,rank,pct_change,current_price,concept,hot,rank_time"
-            )
-            if df.empty:
-                return []
-            dc_hot_data = []
-            for _, row in df.iterrows():
-                dc_hot_data.append({
-                    'trade_date': row['trade_date'],
-                    'data_type': row['data_type'],
-                    'ts_code': row['ts_code'],
-                    'ts_name': row['ts_name'] if 'ts_name' in row else '',
-                    'rank': int(row['rank']) if pd.notna(row.get('rank')) else None,
-                    'pct_change': float(row['pct_change']) if pd.notna(row.get('pct_change')) else None,
-                    'current_price': float(row['current_price']) if pd.notna(row.get('current_price')) else None,
-                    'concept': row['concept'] if 'concept' in row else '',
-                    'hot': float(row['hot']) if pd.notna(row.get('hot')) else None,
-                    'rank_time': row['rank_time'] if 'rank_time' in row else ''
-                })
-            return dc_hot_data
-        except Exception as e:
-            print(f"Error fetching dc_hot: {e}")
-            return []
+        df = self._call('dc_hot',
+            trade_date=trade_date,
+            fields=DC_HOT_FIELDS
+        )
+        return convert_frame(df, field_spec(DC_HOT_FIELDS, HOT_KINDS))
         
-    def get_daily(self, ts_code='', start_date='', end_date='', fields=''):
+    def get_daily(self, ts_code='', start_date='', end_date='', fields='', trade_date=''):
         """
         Get daily quotes data from Tushare
+        Pass trade_date without ts_code to get the whole market for one day.
         Reference: https://tushare.pro/document/2?doc_id=27
         """
-        try:
-            df = self.pro.daily(
-                ts_code=ts_code,
-                start_date=start_date,
-                end_date=end_date,
-                fields=fields if fields else 'ts_code,trade_date,open,high,low,close,pre_close,change,pct_chg,vol,amount'
-            )
-            if df.empty:
-                return []
-            
-            daily_data = []
-            for _, row in df.iterrows():
-                daily_data.append({
-                    'ts_code': row['ts_code'],
-                    'trade_date': str(row['trade_date']) if pd.notna(row['trade_date']) else '',
-                    'open': float(row['open']) if pd.notna(row.get('open')) else 0.0,
-                    'high': float(row['high']) if pd.notna(row.get('high')) else 0.0,
-                    'low': float(row['low']) if pd.notna(row.get('low')) else 0.0,
-                    'close': float(row['close']) if pd.notna(row.get('close')) else 0.0,
-                    'pre_close': float(row['pre_close']) if pd.notna(row.get('pre_close')) else 0.0,
-                    'change': float(row['change']) if pd.notna(row.get('change')) else 0.0,
-                    'pct_chg': float(row['pct_chg']) if pd.notna(row.get('pct_chg')) else 0.0,
-                    'vol': float(row['vol']) if pd.notna(row.get('vol')) else 0.0,
-                    'amount': float(row['amount']) if pd.notna(row.get('amount')) else 0.0
-                })
-            return daily_data
-        except Exception as e:
-            print(f"Error fetching daily data: {e}")
-            return []
+        fields = fields or DAILY_FIELDS
+        df = self._call('daily',
+            ts_code=ts_code,
+            trade_date=trade_date,
+            start_date=start_date,
+            end_date=end_date,
+            fields=fields
+        )
+        return convert_frame(df, field_spec(fields, QUOTE_KINDS))
     
-    def get_adj_factor(self, ts_code='', trade_date=''):
+    def get_adj_factor(self, ts_code='', trade_date='', start_date='', end_date=''):
         """
             Get adjustment factor data from Tushare
+            Pass trade_date without ts_code to get the whole market for one day.
             Reference: https://tushare.pro/document/2?doc_id=28
         """
-        try:
-            df = self.pro.adj_factor(
-                ts_code=ts_code,
-                trade_date=trade_date,
-                fields='ts_code,trade_date,adj_factor'
-            )
-            if df.empty:
-                return []
-            adj_factor_data = []
-            for _, row in df.iterrows():
-                adj_factor_data.append({
-                    'ts_code': row['ts_code'],
-                    'trade_date': str(row['trade_date']) if pd.notna(row['trade_date']) else '',
-                    'adj_factor': float(row['adj_factor']) if pd.notna(row.get('adj_factor')) else 0.0
-                })
-            return adj_factor_data
-        except Exception as e:
-            print(f"Error fetching adj_factor: {e}")
-            return []
+        df = self._call('adj_factor',
+            ts_code=ts_code,
+            trade_date=trade_date,
+            start_date=start_date,
+            end_date=end_date,
+            fields=ADJ_FACTOR_FIELDS
+        )
+        return convert_frame(df, ADJ_FACTOR_SPEC)
 
-    def get_dividend(self, ts_code='', start_date='', end_date=''):
+    def get_dividend(self, ts_code='', start_date='', end_date='', ann_date='', ex_date=''):
         """
         Get dividend data from Tushare
-        Reference: https://tushare.pro/document/2?doc_id=27
+        Pass ann_date or ex_date without ts_code to get the whole market for one day.
+        Reference: https://tushare.pro/document/2?doc_id=103
         """
-        try:
-            df = self.pro.dividend(
-                ts_code=ts_code,
-                start_date=start_date,
-                end_date=end_date,
-                div_proc='实施',
-                fields='ts_code,end_date,ann_date,div_proc,stk_div,stk_bo_rate,stk_co_rate,cash_div,cash_div_tax,record_date,ex_date,pay_date,div_listdate,imp_ann_date,base_date,base_share,update_flag'
-            )
-            if df.empty:
-                return []
-            dividend_data = []
-            for _, row in df.iterrows():
-                dividend_data.append({
-                    'ts_code': row['ts_code'],
-                    'end_date': row['end_date'],
-                    'ann_date': row.get('ann_date'),
-                    'div_proc': row.get('div_proc'),
-                    'stk_div': row.get('stk_div'),
-                    'stk_bo_rate': row.get('stk_bo_rate'),
-                    'stk_co_rate': row.get('stk_co_rate'),
-                    'cash_div': row.get('cash_div'),
-                    'cash_div_tax': row.get('cash_div_tax'),
-                    'record_date': row.get('record_date'),
-                    'ex_date': row.get('ex_date'),
-                    'pay_date': row.get('pay_date'),
-                    'div_listdate': row.get('div_listdate'),
-                    'imp_ann_date': row.get('imp_ann_date'),
-                    'base_date': row.get('base_date'),
-                    'base_share': row.get('base_share'),
-                    'update_flag': row.get('update_flag')
-                })
-            return dividend_data
-        except Exception as e:
-            print(f"Error fetching dividend: {e}")
+        df = self._call('dividend',
+            ts_code=ts_code,
+            ann_date=ann_date,
+            ex_date=ex_date,
+            start_date=start_date,
+            end_date=end_date,
+            div_proc='实施',
+            fields=DIVIDEND_FIELDS
+        )
+        return convert_frame(df, DIVIDEND_SPEC)
+
+    def get_trade_dates(self, start_date, end_date, exchange='SSE'):
+        """
+        Get open trading days between start_date and end_date (inclusive), ascending
+        Reference: https://tushare.pro/document/2?doc_id=26
+        """
+        df = self._call('trade_cal',
+            exchange=exchange,
+            start_date=start_date,
+            end_date=end_date,
+            is_open='1',
+            fields='cal_date,is_open'
+        )
+        if df.empty:
             return []
+        df = df[df['is_open'].astype(int) == 1]
+        return sorted(str(cal_date) for cal_date in df['cal_date'])
 
     def get_index_daily(self, ts_code='000300.SH', start_date='', end_date=''):
         """
         Get daily index data from Tushare for benchmark index (recent 360 days)
         Reference: https://tushare.pro/document/2?doc_id=95
         """
-        try:
-            df = self.pro.index_daily(
-                ts_code=ts_code,
-                start_date=start_date,
-                end_date=end_date,
-                fields='ts_code,trade_date,close,open,high,low,pre_close,change,pct_chg,vol,amount'
-            )
-            if df.empty:
-                return []
-            index_daily_data = []
-            for _, row in df.iterrows():
-                index_daily_data.append({
-                    'ts_code': row['ts_code'],
-                    'trade_date': str(row['trade_date']),
-                    'close': row.get('close'),
-                    'open': row.get('open'),
-                    'high': row.get('high'),
-                    'low': row.get('low'),
-                    'pre_close': row.get('pre_close'),
-                    'change': row.get('change'),
-                    'pct_chg': row.get('pct_chg'),
-                    'vol': row.get('vol'),
-                    'amount': row.get('amount')
-                })
-            return index_daily_data
-        except Exception as e:
-            print(f"Error fetching index_daily: {e}")
-            return []
+        df = self._call('index_daily',
+            ts_code=ts_code,
+            start_date=start_date,
+            end_date=end_date,
+            fields=INDEX_DAILY_FIELDS
+        )
+        return convert_frame(df, INDEX_DAILY_SPEC)
 
 
 if __name__ == "__main__":
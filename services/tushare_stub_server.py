@@ -0,0 +1,119 @@
+"""
+Local Tushare HTTP endpoint serving FakeProApi data, for testing the async client
+
+Speaks the same protocol as the real API (POST <url>/<api_name> with
+{"api_name", "token", "params", "fields"}, answering {"code", "msg", "data":
+{"fields", "items"}}), so TushareService can run with TUSHARE_API=async
+against it without network or quota:
+
+    python -m services.tushare_stub_server --port 8765 --latency 0.05
+    TUSHARE_API=async TUSHARE_TOKEN=stub TUSHARE_HTTP_URL=http://127.0.0.1:8765 python update_data.py -t daily
+"""
+import argparse
+import asyncio
+import json
+import threading
+
+from aiohttp import web
+
+from services.fake_tushare import FakeProApi, FakeQuotaError, get_fake_pro_api
+
+# Code Tushare answers a call over the per-minute quota with
+QUOTA_ERROR_CODE = 40203
+
+
+def _json_default(value):
+    # numpy scalars left in object columns
+    return value.item() if hasattr(value, 'item') else str(value)
+
+
+def _dumps(payload):
+    return json.dumps(payload, ensure_ascii=False, default=_json_default)
+
+
+class StubServer:
+    """
+    aiohttp application answering Tushare calls from a FakeProApi. Latency
+    is simulated with asyncio.sleep, so concurrent requests overlap the way
+    they do against the real API; frames are built on the default executor.
+    """
+
+    def __init__(self, fake=None, latency=0.0, host='127.0.0.1', port=0):
+        self.fake = fake or FakeProApi()
+        self.latency = latency
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self.loop = None
+        self.runner = None
+        self.thread = None
+
+    async def handle(self, request):
+        body = await request.json()
+        api_name = request.match_info.get('api_name') or body.get('api_name', '')
+        params = dict(body.get('params') or {})
+        params['fields'] = body.get('fields') or ''
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        try:
+            df = await asyncio.get_running_loop().run_in_executor(None, lambda: self.fake.query(api_name, **params))
+        except FakeQuotaError as e:
+            return web.json_response({'code': QUOTA_ERROR_CODE, 'msg': str(e), 'data': None}, dumps=_dumps)
+        except Exception as e:
+            return web.json_response({'code': -1, 'msg': str(e), 'data': None}, dumps=_dumps)
+        items = df.astype(object).where(df.notna(), None).values.tolist()
+        return web.json_response({'code': 0, 'msg': '', 'data': {'fields': list(df.columns), 'items': items}}, dumps=_dumps)
+
+    def application(self):
+        app = web.Application()
+        app.router.add_post('/', self.handle)
+        app.router.add_post('/{api_name}', self.handle)
+        return app
+
+    async def start(self):
+        """Start listening; returns the base URL (port 0 picks a free port)"""
+        self.runner = web.AppRunner(self.application())
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self.url
+
+    async def stop(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def start_in_thread(self):
+        """Run the server on a background event loop thread; returns the base URL"""
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='tushare-stub', daemon=True)
+        self.thread.start()
+        return asyncio.run_coroutine_threadsafe(self.start(), self.loop).result()
+
+    def stop_thread(self):
+        asyncio.run_coroutine_threadsafe(self.stop(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve fake Tushare data over the Tushare HTTP protocol')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds each call takes')
+    args = parser.parse_args()
+
+    # Universe size, quota errors, row caps and recordings come from TUSHARE_FAKE_* as usual
+    server = StubServer(get_fake_pro_api(), latency=args.latency, host=args.host, port=args.port)
+    print(f"Serving fake Tushare API on http://{args.host}:{args.port}")
+    web.run_app(server.application(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
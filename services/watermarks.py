@@ -0,0 +1,109 @@
+"""
+Per-table and per-ticker high-water marks for incremental syncs
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import func
+
+from models import SyncWatermark
+from utils.date_utils import get_next_date, get_previous_date
+
+# ts_code under which the table-wide watermark is stored
+TABLE_WIDE = ''
+
+
+class Watermarks:
+    """
+    The newest date already loaded into a table, overall and per ticker.
+
+    Marks are read from sync_watermarks. A table with no stored marks yet is
+    seeded from MAX(date_column) of its own rows, so switching an existing
+    database to incremental syncs does not trigger a full reload. Marks are
+    written back through the caller's session, in the same transaction as
+    the rows they describe. With per_ticker=False only the table-wide mark
+    is kept, for tables loaded by date rather than by ticker.
+
+    Usage:
+        marks = Watermarks(session, 'daily', Daily)
+        start = marks.start_date(ts_code, default_start)
+        ...
+        marks.observe(rows)
+        marks.save()
+        session.commit()
+    """
+
+    def __init__(self, session, table_name, model, date_column='trade_date', per_ticker=True):
+        self.session = session
+        self.table_name = table_name
+        self.model = model
+        self.date_column = date_column
+        self.per_ticker = per_ticker
+        stored = session.query(SyncWatermark).filter(SyncWatermark.table_name == table_name)
+        if not per_ticker:
+            stored = stored.filter(SyncWatermark.ts_code == TABLE_WIDE)
+        self.marks = {row.ts_code: row.watermark for row in stored}
+        if not self.marks:
+            self._seed()
+        self.changed = set()
+
+    def _seed(self):
+        column = getattr(self.model, self.date_column)
+        if not self.per_ticker:
+            latest = self.session.query(func.max(column)).scalar()
+            if latest:
+                self.marks[TABLE_WIDE] = latest
+            return
+        for ts_code, latest in self.session.query(self.model.ts_code, func.max(column)).group_by(self.model.ts_code):
+            if latest:
+                self.marks[ts_code] = latest
+        if self.marks:
+            self.marks[TABLE_WIDE] = max(self.marks.values())
+
+    def get(self, ts_code=TABLE_WIDE):
+        return self.marks.get(ts_code)
+
+    def start_date(self, ts_code=TABLE_WIDE, default=''):
+        """First date still to fetch: the day after the watermark, or `default` if there is none"""
+        watermark = self.get(ts_code)
+        return get_next_date(watermark) if watermark else default
+
+    def advance(self, ts_code, date):
+        if date and date > self.marks.get(ts_code, ''):
+            self.marks[ts_code] = date
+            self.changed.add(ts_code)
+
+    def observe(self, rows):
+        """Advance the marks of every ticker in rows (if kept), and the table-wide mark"""
+        for row in rows:
+            date = row.get(self.date_column)
+            if self.per_ticker:
+                self.advance(row.get('ts_code') or TABLE_WIDE, date)
+            self.advance(TABLE_WIDE, date)
+
+    def hold_before(self, date):
+        """
+        Pull every mark advanced in this run back to the day before date (a
+        trading day whose fetch failed), so the next sync starts there again
+        """
+        limit = get_previous_date(date)
+        for ts_code in self.changed:
+            if self.marks[ts_code] > limit:
+                self.marks[ts_code] = limit
+
+    def save(self):
+        """Write changed marks to sync_watermarks; the caller commits"""
+        if not self.changed:
+            return
+        existing = {
+            row.ts_code: row
+            for row in self.session.query(SyncWatermark).filter(SyncWatermark.table_name == self.table_name)
+        }
+        now = datetime.now(timezone.utc)
+        for ts_code in self.changed:
+            row = existing.get(ts_code)
+            if row is None:
+                self.session.add(SyncWatermark(table_name=self.table_name, ts_code=ts_code, watermark=self.marks[ts_code], updated_date=now))
+            else:
+                row.watermark = self.marks[ts_code]
+                row.updated_date = now
+        self.changed = set()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""The asyncio client against StubServer loads what the in-process client does"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import update_data
+from models import get_session, Daily
+from services.async_tushare import close_async_pro_api
+from services.tushare_stub_server import StubServer
+
+
+def test_async_client_loads_the_same_rows_over_http(tickers, fake_api, monkeypatch):
+    update_data.update_daily_data()
+    session = get_session()
+    in_process = {(row.ts_code, row.trade_date, row.close) for row in session.query(Daily.ts_code, Daily.trade_date, Daily.close)}
+    session.query(Daily).delete()
+    session.commit()
+    session.close()
+
+    stub = StubServer(fake_api)
+    monkeypatch.setenv('TUSHARE_HTTP_URL', stub.start_in_thread())
+    monkeypatch.setenv('TUSHARE_API', 'async')
+    monkeypatch.setenv('TUSHARE_TOKEN', 'stub')
+    try:
+        success, message = update_data.update_daily_data()
+    finally:
+        close_async_pro_api()
+        stub.stop_thread()
+    assert success, message
+    assert stub.requests == len(tickers)
+    session = get_session()
+    try:
+        over_http = {(row.ts_code, row.trade_date, row.close) for row in session.query(Daily.ts_code, Daily.trade_date, Daily.close)}
+        assert over_http == in_process
+    finally:
+        session.close()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Resume ledger: interrupted runs resume, a new period starts over"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import update_data
+from models import get_session, natural_key, Daily, EtlCheckpoint
+from services.bulk_writer import BulkWriter
+from services.checkpoint import Checkpoint
+
+
+def daily_row(ts_code, trade_date='20260105'):
+    return {'ts_code': ts_code, 'trade_date': trade_date, 'close': 10.0}
+
+
+def test_interrupted_run_resumes_after_last_commit(database):
+    session = get_session()
+    try:
+        writer = BulkWriter(session, Daily, upsert_keys=natural_key(Daily))
+        checkpoint = Checkpoint(session, writer, 'daily', 'ticker:20260101-20260131', commit_every=2)
+        for ts_code in ['A', 'B', 'C']:
+            checkpoint.record(ts_code)
+            writer.add(daily_row(ts_code))
+        # Interrupted: C was recorded after the last commit and is lost with its row
+        session.rollback()
+
+        writer = BulkWriter(session, Daily, upsert_keys=natural_key(Daily))
+        resumed = Checkpoint(session, writer, 'daily', 'ticker:20260101-20260131', resume=True)
+        assert resumed.resuming
+        assert resumed.pending(['A', 'B', 'C', 'D']) == ['C', 'D']
+        assert session.query(Daily).count() == 2
+
+        for ts_code in resumed.pending(['A', 'B', 'C', 'D']):
+            resumed.record(ts_code)
+            writer.add(daily_row(ts_code))
+        resumed.finish()
+        assert session.query(Daily).count() == 4
+        assert session.query(EtlCheckpoint).count() == 0
+    finally:
+        session.close()
+
+
+def test_new_period_starts_from_scratch(database):
+    session = get_session()
+    try:
+        writer = BulkWriter(session, Daily)
+        checkpoint = Checkpoint(session, writer, 'daily', 'ticker:20260101-20260131', commit_every=1)
+        checkpoint.record('A')
+        checkpoint.record('B')
+        session.rollback()
+
+        restarted = Checkpoint(session, writer, 'daily', 'ticker:20260201-20260228', resume=True)
+        assert not restarted.resuming
+        assert restarted.pending(['A', 'B']) == ['A', 'B']
+        assert session.query(EtlCheckpoint).count() == 0
+    finally:
+        session.close()
+
+
+def test_resume_on_a_later_day_continues_the_stored_window(tickers, fake_api):
+    # A run started a few days ago, interrupted after its first ticker
+    start_date, end_date = update_data.get_date_n_days_ago(40), update_data.get_date_n_days_ago(5)
+    session = get_session()
+    writer = BulkWriter(session, Daily, upsert_keys=natural_key(Daily))
+    checkpoint = Checkpoint(session, writer, 'daily', f"ticker:{start_date}-{end_date}")
+    checkpoint.record(tickers[0])
+    checkpoint.commit()
+    session.close()
+
+    update_data.ETL_OPTIONS['resume'] = True
+    success, message = update_data.update_daily_data()
+    assert success, message
+    assert fake_api.calls['daily'] == len(tickers) - 1
+    assert f"from {start_date} to {end_date}" in message
+
+    session = get_session()
+    try:
+        dates = {row.trade_date for row in session.query(Daily.trade_date)}
+        assert start_date <= min(dates) and max(dates) <= end_date
+        assert session.query(EtlCheckpoint).count() == 0
+    finally:
+        session.close()
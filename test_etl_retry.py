@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Failed units: kept on the ledger and re-driven with --retry-failed"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import update_data
+from models import get_session, Daily, EtlCheckpoint, EtlFailure
+
+
+def test_failed_units_keep_the_ledger(tickers, fake_api):
+    fake_api.failing = {tickers[0], tickers[1]}
+    success, message = update_data.update_daily_data()
+    assert not success
+    assert '2 units failed' in message
+
+    session = get_session()
+    try:
+        failures = session.query(EtlFailure).all()
+        assert sorted(failure.unit for failure in failures) == sorted(tickers[:2])
+        assert {failure.period for failure in failures} == {failures[0].period}
+        assert failures[0].period.startswith('ticker:')
+        # Everything that did load is on the ledger, so a retry skips it
+        assert session.query(EtlCheckpoint).count() == len(tickers) - 2
+        assert session.query(Daily.ts_code).distinct().count() == len(tickers) - 2
+    finally:
+        session.close()
+
+
+def test_retry_fetches_failed_units_in_their_window(tickers, fake_api):
+    fake_api.failing = {tickers[0]}
+    update_data.update_daily_data()
+
+    # A later run computes a shorter window; the retry must use the stored one
+    fake_api.failing = set()
+    fake_api.calls.clear()
+    update_data.ETL_OPTIONS.update(retry_failed=True, days=10)
+    success, message = update_data.update_daily_data()
+    assert success, message
+    assert fake_api.calls['daily'] == 1
+
+    session = get_session()
+
+    def trade_dates(ts_code):
+        return {row.trade_date for row in session.query(Daily.trade_date).filter(Daily.ts_code == ts_code)}
+
+    try:
+        assert session.query(EtlFailure).count() == 0
+        assert session.query(EtlCheckpoint).count() == 0
+        assert trade_dates(tickers[0]) == trade_dates(tickers[1])
+    finally:
+        session.close()
+
+
+def test_retry_options_follow_the_failed_period():
+    assert update_data.retry_options('date:20260101-20260131', ['20260105']) == ('date', False)
+    assert update_data.retry_options('incremental:ticker', ['000001.SZ']) == ('ticker', True)
+    assert update_data.retry_options('20251231', [update_data.STATEMENT_PERIOD_UNIT]) == ('date', False)
+    assert update_data.retry_options('20251231', ['000001.SZ']) == ('ticker', False)
+    assert update_data.retry_options('', ['000001.SZ']) == (None, False)
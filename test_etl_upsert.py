@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Full reloads upsert on the natural key; --replace drops what Tushare no longer returns"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta
+
+import update_data
+from models import get_session, Daily, AdjFactor
+
+
+def test_reload_upserts_without_deleting(tickers, fake_api):
+    success, message = update_data.update_daily_data()
+    assert success, message
+    session = get_session()
+    loaded = session.query(Daily).count()
+    session.close()
+    assert loaded > 0
+
+    success, message = update_data.update_daily_data()
+    assert success, message
+    assert f"(0 inserted, 0 updated, {loaded} unchanged" in message
+    session = get_session()
+    try:
+        assert session.query(Daily).count() == loaded
+    finally:
+        session.close()
+
+
+def stored_dates(ts_code):
+    session = get_session()
+    try:
+        return {row.trade_date for row in session.query(Daily.trade_date).filter(Daily.ts_code == ts_code)}
+    finally:
+        session.close()
+
+
+def test_replace_deletes_rows_tushare_dropped(tickers, fake_api):
+    update_data.update_daily_data()
+    # The fake API trades on weekdays: a Saturday row in the window is one Tushare no longer returns
+    saturday = datetime.now() - timedelta(days=(datetime.now().weekday() - 5) % 7 or 7)
+    dropped = saturday.strftime('%Y%m%d')
+    session = get_session()
+    session.add(Daily(ts_code=tickers[0], trade_date=dropped, close=1.0))
+    session.add(Daily(ts_code=tickers[0], trade_date='20000103', close=1.0))
+    session.commit()
+    session.close()
+
+    update_data.update_daily_data()
+    assert dropped in stored_dates(tickers[0])
+
+    update_data.ETL_OPTIONS['replace'] = True
+    success, message = update_data.update_daily_data()
+    assert success, message
+    dates = stored_dates(tickers[0])
+    assert dropped not in dates
+    # Rows outside the window are left alone
+    assert '20000103' in dates
+    assert dates - {'20000103'} == stored_dates(tickers[1])
+
+
+def test_adj_factor_ticker_mode_fetches_only_the_window(tickers, fake_api):
+    success, message = update_data.update_adj_factor_data()
+    assert success, message
+    session = get_session()
+    try:
+        start_date = update_data.get_date_n_days_ago(30)
+        assert session.query(AdjFactor.ts_code).distinct().count() == len(tickers)
+        assert min(row.trade_date for row in session.query(AdjFactor.trade_date)) >= start_date
+    finally:
+        session.close()
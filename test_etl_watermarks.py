@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Incremental syncs: watermarks advance with the rows and hold on failures"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import update_data
+from models import get_session, Daily, SyncWatermark
+from services.watermarks import TABLE_WIDE
+from utils.date_utils import get_previous_date
+
+
+def stored_marks(table_name='daily'):
+    session = get_session()
+    try:
+        return {row.ts_code: row.watermark for row in session.query(SyncWatermark).filter(SyncWatermark.table_name == table_name)}
+    finally:
+        session.close()
+
+
+def latest_dates():
+    session = get_session()
+    try:
+        rows = session.query(Daily.ts_code, Daily.trade_date).all()
+    finally:
+        session.close()
+    latest = {}
+    for ts_code, trade_date in rows:
+        latest[ts_code] = max(latest.get(ts_code, ''), trade_date)
+    return latest
+
+
+def test_watermarks_advance_with_the_rows(tickers, fake_api):
+    update_data.ETL_OPTIONS['incremental'] = True
+    success, message = update_data.update_daily_data()
+    assert success, message
+
+    marks = stored_marks()
+    latest = latest_dates()
+    assert set(latest) == set(tickers)
+    assert marks == dict(latest, **{TABLE_WIDE: max(latest.values())})
+
+    # Nothing newer than the marks: the next sync upserts nothing and leaves them alone
+    success, message = update_data.update_daily_data()
+    assert success, message
+    assert message.startswith('Upserted 0 daily stock quotes')
+    assert stored_marks() == marks
+
+
+def test_failed_ticker_keeps_its_watermark(tickers, fake_api):
+    update_data.ETL_OPTIONS['incremental'] = True
+    fake_api.failing = {tickers[0]}
+    success, message = update_data.update_daily_data()
+    assert not success
+    assert tickers[0] not in stored_marks()
+
+    fake_api.failing = set()
+    success, message = update_data.update_daily_data()
+    assert success, message
+    marks = stored_marks()
+    assert marks[tickers[0]] == marks[tickers[1]]
+    # The failed ticker is fetched from the start of the window, like a first load
+    assert len(latest_dates()) == len(tickers)
+
+
+def test_failed_day_holds_the_table_wide_watermark(tickers, fake_api):
+    update_data.ETL_OPTIONS.update(incremental=True, mode='date')
+    update_data.update_daily_data()
+    session = get_session()
+    trade_dates = sorted({row.trade_date for row in session.query(Daily.trade_date)})
+    # Start over, so the run below loads the whole window again
+    session.query(Daily).delete()
+    session.query(SyncWatermark).delete()
+    session.commit()
+    session.close()
+
+    failed_day = trade_dates[len(trade_dates) // 2]
+    fake_api.failing = {failed_day}
+    success, message = update_data.update_daily_data()
+    assert not success
+    assert stored_marks()[TABLE_WIDE] == get_previous_date(failed_day)
+
+    # The next sync starts again at the failed day and catches up
+    fake_api.failing = set()
+    fake_api.calls.clear()
+    success, message = update_data.update_daily_data()
+    assert success, message
+    assert fake_api.calls['daily'] == len([day for day in trade_dates if day >= failed_day])
+    assert stored_marks()[TABLE_WIDE] == trade_dates[-1]
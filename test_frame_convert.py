@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""convert_frame gives the same records on the small-frame and column paths"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+
+from services.frame_convert import (
+    SMALL_FRAME_ROWS, STR, FLOAT, FLOAT_OR_NONE, INT_OR_NONE, convert_frame, field_spec
+)
+
+SPEC = field_spec('ts_code,close,pe,update_flag', {'ts_code': STR, 'pe': FLOAT_OR_NONE, 'update_flag': INT_OR_NONE})
+
+FRAME = pd.DataFrame({
+    'ts_code': ['000001.SZ', '000002.SZ', None, '600000.SH', '600001.SH'],
+    'close': [10.0, np.nan, 8.5, '9.1', 'n/a'],
+    'pe': [12.5, np.nan, 3.0, 4.0, 5.0],
+    'update_flag': [1.0, -2.7, np.nan, 3.0, 7.9],
+})
+
+
+def test_small_and_large_frames_convert_alike():
+    small = convert_frame(FRAME, SPEC)
+    repeats = SMALL_FRAME_ROWS // len(FRAME) + 1
+    large = convert_frame(pd.concat([FRAME] * repeats, ignore_index=True), SPEC)
+    assert large == small * repeats
+    assert [row['update_flag'] for row in small] == [1, -2, None, 3, 7]
+    assert [row['close'] for row in small] == [10.0, 0.0, 8.5, 9.1, 0.0]
+    assert small[2]['ts_code'] == '' and small[1]['pe'] is None
+
+
+def test_missing_columns_are_all_missing():
+    assert convert_frame(FRAME[['ts_code']], SPEC)[0] == {'ts_code': '000001.SZ', 'close': 0.0, 'pe': None, 'update_flag': None}
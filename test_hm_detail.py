@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""hm_detail: loaded by trade-date window from a table-wide watermark"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import update_data
+from models import get_session, HmDetail, SyncWatermark
+from services.watermarks import TABLE_WIDE
+
+
+def test_next_run_fetches_the_watermark_day_again(fake_api):
+    update_data.ETL_OPTIONS['days'] = None
+    success, message = update_data.update_hm_detail_data()
+    assert success, message
+
+    session = get_session()
+    try:
+        marks = {row.ts_code: row.watermark for row in session.query(SyncWatermark).filter(SyncWatermark.table_name == 'hm_detail')}
+        last_day = session.query(HmDetail.trade_date).order_by(HmDetail.trade_date.desc()).first()[0]
+        assert marks == {TABLE_WIDE: last_day}
+        # Trades of the last day that Tushare only publishes after this run
+        late = session.query(HmDetail).filter(HmDetail.trade_date == last_day).count()
+        session.query(HmDetail).filter(HmDetail.trade_date == last_day).delete()
+        session.commit()
+    finally:
+        session.close()
+    assert late > 0
+
+    success, message = update_data.update_hm_detail_data()
+    assert success, message
+    assert f"from {last_day} to" in message
+    session = get_session()
+    try:
+        assert session.query(HmDetail).filter(HmDetail.trade_date == last_day).count() == late
+    finally:
+        session.close()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Materialized holder counts: incremental refreshes match a full rebuild"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timezone
+
+import update_data
+from models import get_session, TopHolder, TickerHolderSummary, HolderTickerCount
+from services.holder_aggregates import INDIVIDUAL_HOLDER_TYPE, rebuild_holder_aggregates, refresh_holder_aggregates
+
+
+def aggregates(session):
+    summaries = {
+        (row.ts_code, row.name, row.latest_end_date, row.holder_count, row.individual_holder_count)
+        for row in session.query(TickerHolderSummary)
+    }
+    counts = {(row.holder_name, row.ticker_count) for row in session.query(HolderTickerCount)}
+    return summaries, counts
+
+
+def rebuilt(session):
+    """The aggregates a full rebuild gives, leaving the session's tables as they were"""
+    session.commit()
+    rebuild_holder_aggregates(session.connection())
+    result = aggregates(session)
+    session.rollback()
+    return result
+
+
+def test_load_counts_individual_holders(tickers, fake_api):
+    success, message = update_data.update_top_holders_data()
+    assert success, message
+    session = get_session()
+    try:
+        assert session.query(TickerHolderSummary).count() == len(tickers)
+        summary = session.query(TickerHolderSummary).filter(TickerHolderSummary.ts_code == tickers[0]).one()
+        latest = session.query(TopHolder).filter(TopHolder.ts_code == tickers[0], TopHolder.end_date == summary.latest_end_date)
+        assert summary.holder_count == len({row.holder_name for row in latest})
+        individual_tickers = {}
+        for row in session.query(TopHolder).filter(TopHolder.holder_type == INDIVIDUAL_HOLDER_TYPE):
+            individual_tickers.setdefault(row.holder_name, set()).add(row.ts_code)
+        assert aggregates(session)[1] == {(name, len(codes)) for name, codes in individual_tickers.items()}
+    finally:
+        session.close()
+
+
+def test_incremental_refresh_matches_a_rebuild(tickers, fake_api):
+    update_data.update_top_holders_data()
+    session = get_session()
+    try:
+        # One ticker's holders change: a new individual holder who also holds another ticker
+        held = {row.holder_name for row in session.query(TopHolder.holder_name).filter(TopHolder.ts_code == tickers[0])}
+        holder_name = next(
+            row.holder_name for row in session.query(TopHolder.holder_name).filter(
+                TopHolder.ts_code == tickers[1], TopHolder.holder_type == INDIVIDUAL_HOLDER_TYPE
+            ) if row.holder_name not in held
+        )
+        latest = session.query(TopHolder).filter(TopHolder.ts_code == tickers[0]).order_by(TopHolder.end_date.desc()).first()
+        session.add(TopHolder(
+            ts_code=tickers[0], ann_date=latest.ann_date, end_date=latest.end_date, holder_name=holder_name,
+            hold_ratio=0.5, holder_type=INDIVIDUAL_HOLDER_TYPE, updated_date=datetime.now(timezone.utc)
+        ))
+        session.commit()
+
+        assert refresh_holder_aggregates(session.connection())[0] == 1
+        assert aggregates(session) == rebuilt(session)
+    finally:
+        session.close()
+
+
+def test_refresh_without_changes_recounts_nothing(tickers, fake_api):
+    update_data.update_top_holders_data()
+    session = get_session()
+    try:
+        before = aggregates(session)
+        assert refresh_holder_aggregates(session.connection()) == (0, 0)
+        assert aggregates(session) == before
+    finally:
+        session.close()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""Schema migrations: idempotent, resumable and giving the planned indexes"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, inspect, text
+
+from models import Base
+from services.migrations import MIGRATIONS, migrate, pending_migrations, schema_status, check_query_plans
+
+
+def test_migrate_twice_applies_nothing_the_second_time(database):
+    assert pending_migrations(database) == []
+    assert migrate(database) == []
+    with database.connect() as conn:
+        versions = [row[0] for row in conn.execute(text("SELECT version FROM schema_version ORDER BY version"))]
+    assert versions == [migration.version for migration in MIGRATIONS]
+    assert all(applied_at for _, _, applied_at in schema_status(database))
+
+
+def test_dry_run_applies_nothing(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    assert migrate(engine, dry_run=True) == MIGRATIONS
+    assert 'schema_version' not in inspect(engine).get_table_names()
+
+
+def test_migrate_tolerates_indexes_that_already_exist(tmp_path):
+    # A database indexed by an older maintenance script
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE INDEX ix_hm_detail_name_trade_date ON hm_detail (name, trade_date)"))
+
+    assert [migration.version for migration in migrate(engine)] == [migration.version for migration in MIGRATIONS]
+    assert pending_migrations(engine) == []
+    assert 'ix_hm_detail_name_trade_date' in {index['name'] for index in inspect(engine).get_indexes('hm_detail')}
+
+
+def test_hot_path_queries_use_their_indexes(database):
+    unindexed = [label for label, _, uses_index, _ in check_query_plans(database) if not uses_index]
+    assert unindexed == []
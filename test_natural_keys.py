@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""Natural keys: re-runs upsert in place, and missing keys are reported"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import text
+
+import update_data
+from models import get_session, natural_key, natural_key_problems, Daily, Ticker
+
+
+def test_every_data_table_has_a_natural_key(database):
+    assert natural_key(Daily) == ('ts_code', 'trade_date')
+    assert natural_key(Ticker) == ('ts_code',)
+    assert natural_key_problems(database) == []
+
+
+def test_ticker_master_upserts_in_place(tickers, fake_api):
+    session = get_session()
+    count = session.query(Ticker).count()
+    session.close()
+
+    success, message = update_data.update_tickers_data()
+    assert success, message
+    session = get_session()
+    try:
+        assert session.query(Ticker).count() == count
+        assert session.query(Ticker).filter(Ticker.list_status == 'L').count() == len(tickers)
+    finally:
+        session.close()
+
+
+def test_missing_natural_key_is_reported(database):
+    with database.begin() as conn:
+        conn.execute(text("DROP INDEX uq_daily_ts_code_trade_date"))
+    assert natural_key_problems(database) == ['daily.uq_daily_ts_code_trade_date (missing)']
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Error classes: what is retried, what fails at once"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import json
+
+import pandas as pd
+import pytest
+
+from services import resilience
+from services.rate_limiter import RateLimiter
+from services.resilience import (
+    PERMANENT, TRANSIENT, QUOTA, RetryPolicy, CircuitBreakers, PermanentTushareError, classify_error
+)
+from services.tushare_service import TushareService
+
+
+def undecodable_body():
+    try:
+        json.loads('<html><body>502 Bad Gateway</body></html>')
+    except json.JSONDecodeError as e:
+        return e
+
+
+class GatewayProApi:
+    """pro_api whose daily calls get an HTML error page the first `bad_responses` times"""
+
+    def __init__(self, bad_responses):
+        self.bad_responses = bad_responses
+        self.calls = 0
+
+    def daily(self, **params):
+        self.calls += 1
+        if self.calls <= self.bad_responses:
+            raise undecodable_body()
+        return pd.DataFrame([{'ts_code': params['ts_code'], 'trade_date': '20260105', 'close': 10.0}])
+
+    def stock_basic(self, **params):
+        raise ValueError('fields must be a string')
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.delenv('TUSHARE_CACHE_DIR', raising=False)
+    monkeypatch.setattr(resilience, '_shared_policy', RetryPolicy(max_retries=2, base_delay=0.0))
+    monkeypatch.setattr(resilience, '_shared_breakers', CircuitBreakers())
+
+    def build(pro):
+        return TushareService(rate_limiter=RateLimiter(1_000_000), pro=pro)
+    return build
+
+
+def test_classify_error():
+    assert classify_error(undecodable_body()) == TRANSIENT
+    assert classify_error(TimeoutError('Read timed out')) == TRANSIENT
+    assert classify_error(ValueError('bad parameter')) == PERMANENT
+    assert classify_error(Exception('抱歉，您没有访问该接口的权限')) == PERMANENT
+    assert classify_error(Exception('抱歉，您每分钟最多访问该接口500次')) == QUOTA
+
+
+def test_undecodable_response_is_retried(service):
+    pro = GatewayProApi(bad_responses=1)
+    df = service(pro)._call('daily', ts_code='000001.SZ')
+    assert pro.calls == 2
+    assert len(df) == 1
+    assert resilience.get_circuit_breakers().get('daily').failures == 0
+
+
+def test_parameter_error_is_not_retried(service):
+    pro = GatewayProApi(bad_responses=0)
+    with pytest.raises(PermanentTushareError):
+        service(pro)._call('stock_basic', fields=1)
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""Response cache: hits, expiry, and empty answers for unpublished days"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+
+from services.response_cache import ResponseCache
+
+QUOTES = pd.DataFrame([{'ts_code': '000001.SZ', 'trade_date': '20260105', 'close': 10.0}])
+
+
+def test_cached_frame_is_served_until_it_expires(tmp_path):
+    cache = ResponseCache(str(tmp_path), default_ttl=3600)
+    cache.put('adj_factor', {'ts_code': '000001.SZ'}, QUOTES)
+    cache.put('daily', {'ts_code': '000001.SZ'}, QUOTES)
+    assert cache.get('adj_factor', {'ts_code': '000001.SZ'}).equals(QUOTES)
+    assert cache.get('adj_factor', {'ts_code': '000002.SZ'}) is None
+    # Written long ago
+    os.utime(cache._path('daily', {'ts_code': '000001.SZ'}), (0, 0))
+    assert cache.get('daily', {'ts_code': '000001.SZ'}) is None
+
+
+def test_empty_answer_for_a_day_is_not_cached(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    # Before Tushare publishes the day: asked again on the next run
+    cache.put('daily', {'trade_date': '20260105'}, pd.DataFrame())
+    cache.put('dividend', {'ex_date': '20260105'}, pd.DataFrame())
+    cache.put('income_vip', {'period': '20251231', 'fields': 'ts_code'}, pd.DataFrame())
+    assert cache.get('daily', {'trade_date': '20260105'}) is None
+    assert cache.get('dividend', {'ex_date': '20260105'}) is None
+    assert cache.get('income_vip', {'period': '20251231', 'fields': 'ts_code'}) is None
+
+    # A ticker without data stays cached
+    cache.put('daily', {'ts_code': '000001.SZ', 'start_date': '20260101'}, pd.DataFrame())
+    assert cache.get('daily', {'ts_code': '000001.SZ', 'start_date': '20260101'}).empty
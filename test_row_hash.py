@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Row hashes: unchanged rows are counted and not rewritten"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import get_session, natural_key, Daily
+from services.bulk_writer import BulkWriter, row_hash
+
+
+def write(rows, skip_unchanged=True):
+    """Upsert rows into daily; returns the writer with its counts"""
+    session = get_session()
+    try:
+        writer = BulkWriter(session, Daily, upsert_keys=natural_key(Daily), skip_unchanged=skip_unchanged)
+        writer.extend([dict(row) for row in rows])
+        writer.flush()
+        session.commit()
+        return writer
+    finally:
+        session.close()
+
+
+def quotes(close=10.0):
+    return [
+        {'ts_code': '000001.SZ', 'trade_date': '20260105', 'close': close},
+        {'ts_code': '000001.SZ', 'trade_date': '20260106', 'close': 10.5},
+        {'ts_code': '600000.SH', 'trade_date': '20260105', 'close': 8.0},
+    ]
+
+
+def test_row_hash_ignores_bookkeeping_and_null_fields():
+    row = {'ts_code': '000001.SZ', 'trade_date': '20260105', 'close': 10.0}
+    assert row_hash(row) == row_hash(dict(row, id=7, updated_date='2026-01-05', open=None))
+    assert row_hash(row) != row_hash(dict(row, close=10.1))
+
+
+def test_upsert_counts_inserted_updated_unchanged(database):
+    first = write(quotes())
+    assert (first.inserted, first.updated, first.unchanged) == (3, 0, 0)
+
+    again = write(quotes())
+    assert (again.inserted, again.updated, again.unchanged, again.count) == (0, 0, 3, 0)
+
+    changed = write(quotes(close=11.0))
+    assert (changed.inserted, changed.updated, changed.unchanged, changed.count) == (0, 1, 2, 1)
+
+    session = get_session()
+    try:
+        assert session.query(Daily).count() == 3
+        assert session.query(Daily.close).filter(Daily.trade_date == '20260105', Daily.ts_code == '000001.SZ').scalar() == 11.0
+    finally:
+        session.close()
+
+
+def test_write_unchanged_rewrites_every_row(database):
+    write(quotes())
+    rewritten = write(quotes(), skip_unchanged=False)
+    assert rewritten.count == 3
+    assert rewritten.changes().endswith('rows/s')
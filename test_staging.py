@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Staging: reloads update only the columns a batch was fetched with"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import get_session, Daily
+from scripts.load_staging import load_table
+from services.staging import StagingArea
+
+FULL = [
+    {'ts_code': '000001.SZ', 'trade_date': '20260105', 'open': 9.8, 'close': 10.0, 'vol': 1200.0},
+    {'ts_code': '600000.SH', 'trade_date': '20260105', 'open': 7.9, 'close': 8.0, 'vol': 800.0},
+]
+# The same day fetched again with a narrower field list
+CORE = [
+    {'ts_code': '000001.SZ', 'trade_date': '20260105', 'close': 10.5},
+    {'ts_code': '600000.SH', 'trade_date': '20260105', 'close': 8.2},
+]
+
+
+def stored():
+    session = get_session()
+    try:
+        return {row.ts_code: (row.open, row.close, row.vol) for row in session.query(Daily)}
+    finally:
+        session.close()
+
+
+def test_rows_read_back_with_their_fetched_columns(tmp_path):
+    staging = StagingArea(str(tmp_path))
+    staging.write('daily', Daily, FULL)
+    staging.write('daily', Daily, CORE)
+    full, core = [rows for rows in staging.read('daily')]
+    assert set(full[0]) == set(FULL[0])
+    assert set(core[0]) == {'ts_code', 'trade_date', 'close'}
+
+
+def test_narrow_batch_leaves_other_columns_alone(database, tmp_path):
+    staging = StagingArea(str(tmp_path))
+    staging.write('daily', Daily, FULL)
+    staging.write('daily', Daily, CORE)
+    success, message = load_table(staging, 'daily')
+    assert success, message
+    assert stored() == {'000001.SZ': (9.8, 10.5, 1200.0), '600000.SH': (7.9, 8.2, 800.0)}
+
+
+def test_compact_keeps_column_sets_apart(database, tmp_path):
+    staging = StagingArea(str(tmp_path))
+    for rows in (FULL, FULL, CORE, CORE):
+        staging.write('daily', Daily, rows)
+    assert staging.compact('daily', ('ts_code', 'trade_date')) == (1, 4)
+    assert len(staging.files('daily')) == 2
+    assert staging.summary('daily')[2] == 4
+
+    success, message = load_table(staging, 'daily')
+    assert success, message
+    assert stored() == {'000001.SZ': (9.8, 10.5, 1200.0), '600000.SH': (7.9, 8.2, 800.0)}
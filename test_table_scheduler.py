@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""Table scheduler: dependency order, skips, and the SQLite default"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import update_data
+from services.table_scheduler import run_table_graph
+
+
+def test_one_table_at_a_time_on_sqlite(database):
+    assert update_data.default_parallel_tables() == update_data.SQLITE_PARALLEL_TABLES == 1
+
+
+def test_dependents_wait_and_skip_on_failure():
+    started = []
+
+    def table(name, success=True):
+        def update():
+            started.append(name)
+            return success, name
+        return update
+
+    functions = {'tickers': table('tickers'), 'daily': table('daily', success=False), 'adj_factor': table('adj_factor'), 'index': table('index')}
+    dependencies = {'daily': ['tickers'], 'adj_factor': ['daily']}
+    runs = run_table_graph(['daily', 'adj_factor', 'tickers', 'index'], functions, dependencies, max_parallel=1)
+
+    assert started.index('tickers') < started.index('daily')
+    assert 'adj_factor' not in started
+    assert runs['adj_factor'].skipped and runs['adj_factor'].message == 'Skipped: daily failed'
+    assert runs['index'].success
@@ -5,11 +5,31 @@ from datetime import datetime, timezone
 import argparse
 import time
 import sqlite3
+from functools import partial
+
+from sqlalchemy import or_
 
 # Import necessary models
-from models import get_session, Ticker, TopHolder, UpdateLog, HmList, HmDetail, BalanceSheet, CashFlow, IncomeStatement, FinaIndicator, DailyBasic, ThsHot, DcHot, LastDayQuarter, Daily, AdjFactor, Dividend, IndexDaily
-from services.tushare_service import TushareService
-from utils.date_utils import get_date_n_days_ago
+from models import Base, get_engine, get_session, natural_key_problems, add_missing_columns, natural_key, Ticker, TopHolder, UpdateLog, HmList, HmDetail, BalanceSheet, CashFlow, IncomeStatement, FinaIndicator, DailyBasic, ThsHot, DcHot, LastDayQuarter, Daily, AdjFactor, Dividend, IndexDaily
+from services.tushare_service import TushareService, FIELD_PROFILES, DEFAULT_FIELD_PROFILE, resolve_fields
+from services.rate_limiter import get_rate_limiter
+from services.response_cache import get_response_cache
+from services.async_tushare import close_async_pro_api
+from services.fetch_engine import fetch_concurrently, DEFAULT_CONCURRENCY
+from services.shard_pool import fetch_sharded
+from services.bulk_writer import BulkWriter, DEFAULT_CHUNK_SIZE
+from services.watermarks import Watermarks, TABLE_WIDE
+from services.checkpoint import Checkpoint, ledger_period
+from services.staging import StagedWriter, get_staging_area
+from services.failed_units import FailedUnits, failed_tables, failed_run, failure_report
+from services.run_metrics import track_table, track_writer, save_run, append_log
+from services.migrations import migrate
+from services.holder_aggregates import refresh_holder_aggregates
+from services.resilience import get_circuit_breakers
+from services.memory_guard import set_memory_limit, peak_rss_mb
+from services.table_scheduler import run_table_graph, critical_path
+from services.refresh_planner import plan_top_holders_refresh
+from utils.date_utils import get_date_n_days_ago, get_date_windows
 # Color codes for terminal output
 class Colors:
     HEADER = '\033[95m'
@@ -20,6 +40,45 @@ class Colors:
     ENDC = '\033[0m'
     BOLD = '\033[1m'
 
+# Run-wide settings, overridden from the command line in main()
+ETL_OPTIONS = {
+    'concurrency': DEFAULT_CONCURRENCY,
+    # 'ticker' calls Tushare once per ticker; 'date' once per trading day for the whole market
+    'mode': 'ticker',
+    # Overrides each table's default look-back window (in days)
+    'days': None,
+    # Rows per executemany batch in the bulk writer
+    'chunk_size': DEFAULT_CHUNK_SIZE,
+    # Fetch only rows newer than each table's watermark and upsert them
+    'incremental': False,
+    # Skip the units an interrupted run already committed
+    'resume': False,
+    # Fetch only the units on record in etl_failures, in the period they failed in
+    'retry_failed': False,
+    # Fetch top holders for every ticker instead of only those with a new or imminent report
+    'refresh_all': False,
+    # Field profile per statement table ('core', 'full' or a custom list); missing tables use 'full'
+    'fields': {},
+    # Write every fetched batch to the Parquet staging area (ETL_STAGING_DIR) before loading it
+    'stage': False,
+    # Processes the ticker universe is split across for per-ticker loads; 1 fetches in this process
+    'workers': 1,
+    # Compare content hashes with the stored rows and write only new or changed ones
+    'skip_unchanged': True,
+    # Full loads delete each fetched unit's stored rows before writing it, instead of upserting over them
+    'replace': False,
+}
+
+# Days of hm_detail history loaded into an empty table, and days per paged hm_detail request
+HM_DETAIL_DAYS = 180
+HM_DETAIL_WINDOW_DAYS = 30
+
+# stock_basic list statuses synced into tickers: listed, delisted, paused
+TICKER_LIST_STATUSES = ('L', 'D', 'P')
+
+# Checkpoint unit of a statement table loaded for the whole market in --mode date
+STATEMENT_PERIOD_UNIT = 'market'
+
 # Table descriptions
 TABLE_DESCRIPTIONS = {
     'tickers': 'Stock ticker information and basic company details',
@@ -119,33 +178,381 @@ def confirm_table_selection(tables):
         print(f"\n{Colors.WARNING}Operation cancelled by user.{Colors.ENDC}")
         return False
 
+def lookback_days(default):
+    """Days of history to refresh: --days if given, otherwise the table's default window"""
+    return ETL_OPTIONS['days'] or default
+
+def table_writer(session, model):
+    """
+    Bulk writer that upserts on the model's natural key, so re-fetched rows
+    overwrite instead of colliding, and skips rows whose content hash matches
+    the stored one; with --stage each batch is written to the Parquet staging
+    area first
+    """
+    writer = track_writer(BulkWriter(
+        session, model, ETL_OPTIONS['chunk_size'],
+        upsert_keys=natural_key(model), skip_unchanged=ETL_OPTIONS['skip_unchanged']
+    ))
+    if ETL_OPTIONS['stage']:
+        return StagedWriter(writer, get_staging_area(), model.__tablename__, model)
+    return writer
+
+def listed_tickers(session):
+    """ts_code rows of the tickers per-ticker loaders fetch: everything not delisted"""
+    return session.query(Ticker.ts_code).filter(
+        or_(Ticker.list_status.is_(None), Ticker.list_status != 'D')
+    ).all()
+
+def table_fields(table_name):
+    """Tushare fields to request for a statement table under the selected --fields profile"""
+    return resolve_fields(table_name, ETL_OPTIONS['fields'].get(table_name, DEFAULT_FIELD_PROFILE))
+
+def parse_field_profiles(values):
+    """
+    Parse --fields values of the form [TABLE=]PROFILE; without a table the
+    profile applies to every statement table.
+
+    Returns:
+        dict: table name -> profile
+    """
+    profiles = {}
+    for value in values or []:
+        table_name, sep, profile = value.partition('=')
+        if not sep:
+            profiles.update({name: value for name in FIELD_PROFILES})
+            continue
+        if table_name not in FIELD_PROFILES:
+            raise ValueError(f"--fields: {table_name} has no field profiles (choose from {', '.join(FIELD_PROFILES)})")
+        profiles[table_name] = profile
+    for table_name, profile in profiles.items():
+        resolve_fields(table_name, profile)
+    return profiles
+
+def loader_result(message, failures):
+    """A loader's (success, message): units that failed after retries fail the table and name the way to re-drive them"""
+    if failures:
+        return False, f"{message}; {len(failures)} units failed after retries (re-drive with --retry-failed)"
+    return True, message
+
+def replace_unit(session, model, *criteria):
+    """
+    With --replace, delete the stored rows of one unit (a ticker's window, a
+    trading day, a report period) before its fetched rows are added, so rows
+    Tushare no longer returns disappear. Call it after checkpoint.record():
+    the delete is then committed together with the unit's new rows, never
+    ahead of them.
+
+    Returns:
+        int: rows deleted
+    """
+    if not ETL_OPTIONS['replace']:
+        return 0
+    return session.query(model).filter(*criteria).delete(synchronize_session=False)
+
+def start_checkpoint(session, writer, table_name, period=''):
+    """
+    Checkpoint ledger for one table's run, resuming the previous run if
+    --resume was given, or limited to its failed units with --retry-failed
+    """
+    return Checkpoint(session, writer, table_name, period, ETL_OPTIONS['resume'], retry=ETL_OPTIONS['retry_failed'])
+
+def stored_period(session, table_name):
+    """
+    Period of the run to continue rather than the one today's date gives:
+    with --retry-failed the one the failed units were recorded under, with
+    --resume the interrupted run's, read from the ledger unless it was a
+    run in the other --mode. None otherwise.
+    """
+    if ETL_OPTIONS['retry_failed']:
+        period, _ = failed_run(session, table_name)
+        return period
+    if ETL_OPTIONS['resume']:
+        period = ledger_period(session, table_name)
+        if period and (':' not in period or period.startswith(f"{ETL_OPTIONS['mode']}:")):
+            return period
+    return None
+
+def run_window(session, table_name, start_date, end_date):
+    """
+    start_date and end_date of a windowed full load. With --retry-failed or
+    --resume they come from the stored 'mode:start-end' period, so a retry
+    or resume on a later day fetches the window of the run it continues,
+    not today's, and the ledger of that run still applies.
+    """
+    period = stored_period(session, table_name)
+    if period and ':' in period:
+        window = period.split(':', 1)[1]
+        if '-' in window:
+            start_date, end_date = window.split('-', 1)
+    return start_date, end_date
+
+def retry_options(period, units):
+    """
+    --mode and --incremental that failed units must be re-driven with, read
+    from the period they were recorded under.
+
+    Returns:
+        tuple: (mode, or None if either will do, incremental)
+    """
+    if period.startswith('incremental:'):
+        return period.split(':', 1)[1], True
+    if ':' in period:
+        return period.split(':', 1)[0], False
+    if units == [STATEMENT_PERIOD_UNIT]:
+        return 'date', False
+    if period:
+        # A statement report period, loaded per ticker
+        return 'ticker', False
+    return None, False
+
+def fetch_tickers(ts_codes, fetch, failures):
+    """
+    Per-ticker fetch stage of the full loads: --concurrency threads in this
+    process, or with --workers the tickers split into shards fetched by
+    separate processes, each with --concurrency threads. Either way rows
+    come back to this thread, the only database writer. fetch must be
+    picklable: a TushareService method or a functools.partial of one.
+    """
+    if ETL_OPTIONS['workers'] > 1:
+        return fetch_sharded(ts_codes, fetch, ETL_OPTIONS['workers'], ETL_OPTIONS['concurrency'], failures=failures)
+    return fetch_concurrently(ts_codes, fetch, ETL_OPTIONS['concurrency'], failures=failures)
+
+def load_by_trade_date(writer, tushare_service, fetch, start_date, end_date, watermarks=None, checkpoint=None, failures=None, replace=None):
+    """
+    Whole-market ingestion: one Tushare call per trading day between
+    start_date and end_date instead of one call per ticker. Days whose fetch
+    fails are collected in failures (the checkpoint's by default), and the
+    watermarks are held before the first of them. replace(trade_date), if
+    given, is called before each fetched day's rows are added.
+
+    Returns:
+        tuple: (records written, trading days fetched)
+    """
+    trade_dates = tushare_service.get_trade_dates(start_date, end_date)
+    if checkpoint:
+        trade_dates = checkpoint.pending(trade_dates)
+    print(f"{Colors.OKBLUE}Fetching {len(trade_dates)} trading days from {start_date} to {end_date}{Colors.ENDC}")
+
+    if failures is None and checkpoint:
+        failures = checkpoint.failures
+    total_records = 0
+    day_count = 0
+    fetched = fetch_concurrently(trade_dates, fetch, ETL_OPTIONS['concurrency'], failures=failures)
+    for trade_date, rows in fetched:
+        day_count += 1
+        if checkpoint:
+            checkpoint.record(trade_date)
+        if replace:
+            replace(trade_date)
+        for data in rows:
+            data['updated_date'] = datetime.now(timezone.utc)
+            writer.add(data)
+            total_records += 1
+        if watermarks:
+            watermarks.observe(rows)
+        if day_count % 50 == 0:
+            print(f"{Colors.OKBLUE}Processed {day_count} trading days, {total_records} records so far{Colors.ENDC}")
+    if watermarks and failures:
+        watermarks.hold_before(failures.earliest())
+    return total_records, day_count
+
+def load_statement_period(writer, checkpoint, fetch, replace=None):
+    """
+    Whole-market statement ingestion: one report period paged through the
+    *_vip endpoint instead of one call per ticker. The checkpoint unit is
+    the whole period, so --resume skips it once committed. replace(), if
+    given, is called before the fetched rows are added.
+
+    Returns:
+        int: records written
+    """
+    if not checkpoint.pending([STATEMENT_PERIOD_UNIT]):
+        return 0
+    rows = fetch() or []
+    checkpoint.record(STATEMENT_PERIOD_UNIT)
+    if replace:
+        replace()
+    for data in rows:
+        data['updated_date'] = datetime.now(timezone.utc)
+        writer.add(data)
+    return len(rows)
+
+def sync_incremental(session, writer, tushare_service, table_name, model, fetch_range, fetch_day, default_start, end_date):
+    """
+    Incremental sync of a (ts_code, trade_date) table: fetch only what is
+    newer than the stored watermarks and upsert it, instead of deleting and
+    re-downloading the whole look-back window.
+
+    In ticker mode each ticker is fetched from the day after its own
+    watermark (or default_start for tickers never loaded), and tickers that
+    are already up to date are skipped without an API call. In date mode
+    the whole market is fetched for the trading days after the table-wide
+    watermark. Watermarks are saved in the same commit as the rows. Failed
+    tickers keep their watermark (failed days hold the table-wide one), so
+    the next sync fetches them again.
+
+    Args:
+        fetch_range: callable (ts_code, start_date, end_date) -> rows
+        fetch_day: callable (trade_date) -> rows for the whole market
+
+    Returns:
+        tuple: (records upserted, tickers or trading days fetched, FailedUnits)
+    """
+    watermarks = Watermarks(session, table_name, model)
+    failures = FailedUnits(session, table_name, f"incremental:{ETL_OPTIONS['mode']}")
+
+    if ETL_OPTIONS['mode'] == 'date':
+        start_date = watermarks.start_date(TABLE_WIDE, default_start)
+        if start_date > end_date:
+            print(f"{Colors.OKGREEN}{table_name} is up to date (watermark {watermarks.get()}){Colors.ENDC}")
+            return 0, 0, failures
+        total_records, day_count = load_by_trade_date(writer, tushare_service, fetch_day, start_date, end_date, watermarks, failures=failures)
+        writer.flush()
+        watermarks.save()
+        failures.save()
+        session.commit()
+        return total_records, day_count, failures
+
+    ts_codes = [ticker.ts_code for ticker in listed_tickers(session)]
+    start_dates = {ts_code: watermarks.start_date(ts_code, default_start) for ts_code in ts_codes}
+    stale_codes = [ts_code for ts_code in ts_codes if start_dates[ts_code] <= end_date]
+    print(f"{Colors.OKBLUE}{len(stale_codes)} of {len(ts_codes)} tickers have {table_name} rows to fetch{Colors.ENDC}")
+
+    total_records = 0
+    ticker_count = 0
+    fetched = fetch_concurrently(
+        stale_codes,
+        lambda ts_code: fetch_range(ts_code, start_dates[ts_code], end_date),
+        ETL_OPTIONS['concurrency'],
+        failures=failures
+    )
+    for ts_code, rows in fetched:
+        ticker_count += 1
+        for data in rows:
+            data['updated_date'] = datetime.now(timezone.utc)
+            writer.add(data)
+            total_records += 1
+        watermarks.observe(rows)
+        if ticker_count % 500 == 0:
+            writer.flush()
+            watermarks.save()
+            session.commit()
+            print(f"{Colors.OKBLUE}Committed after {ticker_count} tickers, {total_records} {table_name} records so far{Colors.ENDC}")
+
+    writer.flush()
+    watermarks.save()
+    failures.save()
+    session.commit()
+    return total_records, ticker_count, failures
+
+def newest_last(rows):
+    """Rows in announcement order, so the latest version of a report wins its natural-key upsert"""
+    return sorted(rows, key=lambda row: (row.get('ann_date') or '', row.get('update_flag') or 0))
+
+def sync_by_ann_date(session, writer, table_name, model, fetch_range, fetch_market, end_date):
+    """
+    Incremental sync of an announcement-dated table (fina_indicators): fetch
+    only what was announced since the stored ann_date watermarks and upsert
+    it on the table's natural key.
+
+    In date mode one paged whole-market call covers the announcements after
+    the table-wide watermark; in ticker mode each ticker is fetched from its
+    own watermark, or in full if it has none. The watermark day itself is
+    fetched again, as more may have been announced on it after the last
+    run. Watermarks are saved in the same commit as the rows; failed
+    tickers keep theirs.
+
+    Args:
+        fetch_range: callable (ts_code, start_date, end_date) -> rows
+        fetch_market: callable (start_date, end_date) -> rows for the whole market
+
+    Returns:
+        tuple: (records upserted, tickers or announcement windows fetched, FailedUnits)
+    """
+    watermarks = Watermarks(session, table_name, model, date_column='ann_date')
+    failures = FailedUnits(session, table_name, f"incremental:{ETL_OPTIONS['mode']}")
+
+    if ETL_OPTIONS['mode'] == 'date':
+        start_date = watermarks.get(TABLE_WIDE) or ''
+        print(f"{Colors.OKBLUE}Fetching {table_name} announced from {start_date or 'the first report'} to {end_date}{Colors.ENDC}")
+        rows = newest_last(fetch_market(start_date, end_date))
+        for data in rows:
+            data['updated_date'] = datetime.now(timezone.utc)
+            writer.add(data)
+        watermarks.observe(rows)
+        writer.flush()
+        watermarks.save()
+        failures.save()
+        session.commit()
+        return len(rows), 1, failures
+
+    ts_codes = [ticker.ts_code for ticker in listed_tickers(session)]
+    total_records = 0
+    ticker_count = 0
+    fetched = fetch_concurrently(
+        ts_codes,
+        lambda ts_code: fetch_range(ts_code, watermarks.get(ts_code) or '', end_date),
+        ETL_OPTIONS['concurrency'],
+        failures=failures
+    )
+    for ts_code, rows in fetched:
+        ticker_count += 1
+        for data in newest_last(rows):
+            data['updated_date'] = datetime.now(timezone.utc)
+            writer.add(data)
+            total_records += 1
+        watermarks.observe(rows)
+        if ticker_count % 500 == 0:
+            writer.flush()
+            watermarks.save()
+            session.commit()
+            print(f"{Colors.OKBLUE}Committed after {ticker_count} tickers, {total_records} {table_name} records so far{Colors.ENDC}")
+
+    writer.flush()
+    watermarks.save()
+    failures.save()
+    session.commit()
+    return total_records, ticker_count, failures
+
 # Update functions for each table type
 def update_tickers_data():
-    """Update ticker information - insert all data directly"""
+    """Sync the ticker master: upsert listed, delisted and paused tickers on ts_code"""
     session = get_session()
     tushare_service = TushareService()
+    writer = table_writer(session, Ticker)
     
     try:
         print(f"{Colors.OKBLUE}Fetching tickers from Tushare...{Colors.ENDC}")
-        tickers_data = tushare_service.get_all_tickers()
+        previous_status = dict(session.query(Ticker.ts_code, Ticker.list_status).all())
         
-        if not tickers_data:
-            return False, "No ticker data fetched"
+        counts = {}
+        newly_delisted = []
+        for list_status in TICKER_LIST_STATUSES:
+            for ticker_data in tushare_service.get_all_tickers(list_status):
+                if not ticker_data.get('ts_code'):
+                    continue
+                ts_code = ticker_data['ts_code']
+                ticker_data['list_status'] = ticker_data.get('list_status') or list_status
+                if ticker_data['list_status'] == 'D' and previous_status.get(ts_code, 'D') != 'D':
+                    newly_delisted.append(ts_code)
+                
+                # Add updated_date to track when this data was loaded
+                ticker_data['updated_date'] = datetime.now(timezone.utc)
+                writer.add(ticker_data)
+                counts[list_status] = counts.get(list_status, 0) + 1
         
-        count = 0
-        for ticker_data in tickers_data:
-            if not ticker_data.get('ts_code'):
-                continue
-            
-            # Add updated_date to track when this data was loaded
-            ticker_data['updated_date'] = datetime.now(timezone.utc)
-            new_ticker = Ticker(**ticker_data)
-            session.add(new_ticker)
-            count += 1
+        if not counts.get('L'):
+            session.rollback()
+            return False, "No ticker data fetched"
         
+        writer.flush()
         session.commit()
+        if newly_delisted:
+            print(f"{Colors.WARNING}{len(newly_delisted)} tickers delisted since the last sync: {', '.join(newly_delisted[:20])}{Colors.ENDC}")
+        count = sum(counts.values())
         log_update(session, 'tickers', count)
-        return True, f"Inserted {count} tickers"
+        status_counts = ', '.join(f"{counts.get(status, 0)} {status}" for status in TICKER_LIST_STATUSES)
+        return True, f"Upserted {count} tickers ({status_counts}; {len(newly_delisted)} newly delisted) ({writer.changes()})"
         
     except Exception as e:
         session.rollback()
@@ -157,36 +564,49 @@ def update_top_holders_data():
     """Update top holders data"""
     session = get_session()
     tushare_service = TushareService()
+    writer = table_writer(session, TopHolder)
     
     try:
         print(f"{Colors.OKBLUE}Fetching top holders data...{Colors.ENDC}")
-        all_tickers = session.query(Ticker).all()
+        all_tickers = listed_tickers(session)
         
         if not all_tickers:
             return False, "No tickers found"
         
         total_records = 0
         ticker_count = 0
-        for ticker in all_tickers:
+        ts_codes = [ticker.ts_code for ticker in all_tickers]
+        if not ETL_OPTIONS['refresh_all']:
+            # Holder lists only change with a periodic report
+            due, source = plan_top_holders_refresh(session, tushare_service, ts_codes)
+            print(f"{Colors.OKBLUE}{len(due)} of {len(ts_codes)} tickers have no holders or a new or imminent report (from {source}); skipping the rest{Colors.ENDC}")
+            ts_codes = [ts_code for ts_code in ts_codes if ts_code in due]
+        checkpoint = start_checkpoint(session, writer, 'top_holders')
+        ts_codes = checkpoint.pending(ts_codes)
+        fetched = fetch_tickers(ts_codes, tushare_service.get_top_holders, checkpoint.failures)
+        for ts_code, holders_data in fetched:
             ticker_count += 1
-            holders_data = tushare_service.get_top_holders(ticker.ts_code)
+            checkpoint.record(ts_code)
             if not holders_data:
                 continue
             
             for holder_data in holders_data:
                 holder_data['updated_date'] = datetime.now(timezone.utc)
-                new_holder = TopHolder(**holder_data)
-                session.add(new_holder)
+                writer.add(holder_data)
                 total_records += 1
-            # Pause for 50 seconds after every 500 tickers。There is limitation of 500 Tushare API calling/every minute. 
             if ticker_count % 500 == 0:
-                print(f"{Colors.WARNING}Processed {ticker_count} tickers. Pausing for 50 seconds to prevent API rate limiting...{Colors.ENDC}")
-                time.sleep(60)
-                print(f"{Colors.OKGREEN}Resuming data fetch...{Colors.ENDC}")
+                print(f"{Colors.OKBLUE}Processed {ticker_count} tickers, {total_records} holders so far{Colors.ENDC}")
         
+        checkpoint.finish()
+        # The holder pages read these aggregates; only tickers with changed rows are recounted
+        aggregate_tickers, aggregate_holders = refresh_holder_aggregates(session.connection())
         session.commit()
         log_update(session, 'top_holders', total_records)
-        return True, f"Inserted {total_records} holders"
+        return loader_result(
+            f"Upserted {total_records} holders for {ticker_count} tickers ({writer.changes()}); "
+            f"holder counts refreshed for {aggregate_tickers} tickers and {aggregate_holders} holders",
+            checkpoint.failures
+        )
         
     except Exception as e:
         session.rollback()
@@ -198,6 +618,7 @@ def update_hm_list_data():
     """Update market players list"""
     session = get_session()
     tushare_service = TushareService()
+    writer = table_writer(session, HmList)
     
     try:
         print(f"{Colors.OKBLUE}Fetching market players data...{Colors.ENDC}")
@@ -209,13 +630,13 @@ def update_hm_list_data():
         count = 0
         for data in hm_list_data:
             data['updated_date'] = datetime.now(timezone.utc)
-            new_hm = HmList(**data)
-            session.add(new_hm)
+            writer.add(data)
             count += 1
         
+        writer.flush()
         session.commit()
         log_update(session, 'hm_list', count)
-        return True, f"Inserted {count} market players"
+        return True, f"Upserted {count} market players ({writer.changes()})"
         
     except Exception as e:
         session.rollback()
@@ -224,33 +645,42 @@ def update_hm_list_data():
         session.close()
 
 def update_hm_detail_data():
-    """Update market player transaction details"""
+    """
+    Update market player transaction details by trade_date window: every
+    player's trades from the last loaded trade_date on (or the --days
+    window), upserted on (trade_date, ts_code, name). The last loaded day
+    is fetched again, for trades Tushare published after the last run.
+    """
     session = get_session()
     tushare_service = TushareService()
+    writer = table_writer(session, HmDetail)
     
     try:
         print(f"{Colors.OKBLUE}Fetching market player details...{Colors.ENDC}")
-        all_players = session.query(HmList).all()
-        
-        if not all_players:
-            return False, "No market players found"
+        end_date = datetime.now().strftime("%Y%m%d")
+        watermarks = Watermarks(session, 'hm_detail', HmDetail, per_ticker=False)
+        if ETL_OPTIONS['days']:
+            start_date = get_date_n_days_ago(ETL_OPTIONS['days'])
+        else:
+            start_date = watermarks.get(TABLE_WIDE) or get_date_n_days_ago(HM_DETAIL_DAYS)
         
         total_records = 0
-        
-        for player in all_players:
-            details_data = tushare_service.get_hm_detail(player.name)
-            if not details_data:
-                continue
-            
+        windows = get_date_windows(start_date, end_date, HM_DETAIL_WINDOW_DAYS)
+        print(f"{Colors.OKBLUE}Fetching player trades from {start_date} to {end_date} in {len(windows)} window(s){Colors.ENDC}")
+        for window_start, window_end in windows:
+            details_data = tushare_service.get_hm_detail(start_date=window_start, end_date=window_end)
             for detail_data in details_data:
                 detail_data['updated_date'] = datetime.now(timezone.utc)
-                new_detail = HmDetail(**detail_data)
-                session.add(new_detail)
+                writer.add(detail_data)
                 total_records += 1
+            watermarks.observe(details_data)
+            # Each window commits with its watermark, so an interrupted backfill continues from there
+            writer.flush()
+            watermarks.save()
+            session.commit()
         
-        session.commit()
         log_update(session, 'hm_detail', total_records)
-        return True, f"Inserted {total_records} player details"
+        return True, f"Upserted {total_records} player details from {start_date} to {end_date} ({writer.changes()})"
         
     except Exception as e:
         session.rollback()
@@ -262,45 +692,54 @@ def update_balance_sheets_data():
     """Update balance sheets data"""
     session = get_session()
     tushare_service = TushareService()
+    writer = table_writer(session, BalanceSheet)
     
     try:
         print(f"{Colors.OKBLUE}Fetching balance sheets...{Colors.ENDC}")
-        all_tickers = session.query(Ticker).all()
+        all_tickers = listed_tickers(session)
         last_day = session.query(LastDayQuarter).first()
         if not all_tickers or not last_day:
             return False, "No tickers found or no defined end_date"
         
         total_records = 0
         ticker_count = 0
-        end_date = last_day.end_date
+        end_date = stored_period(session, 'balance_sheets') or last_day.end_date
 
-        # Delete existing records with end_date = last_day
-        deleted_count = session.query(BalanceSheet).filter(BalanceSheet.end_date == end_date).delete()
-        print(f"{Colors.WARNING}Deleted {deleted_count} existing balance sheet records with end_date={end_date}{Colors.ENDC}")
-        
+        fields = table_fields('balance_sheets')
+        checkpoint = start_checkpoint(session, writer, 'balance_sheets', end_date)
+
+        if ETL_OPTIONS['mode'] == 'date':
+            total_records = load_statement_period(
+                writer, checkpoint, lambda: tushare_service.get_balance_sheet(period=end_date, fields=fields),
+                replace=lambda: replace_unit(session, BalanceSheet, BalanceSheet.end_date == end_date)
+            )
+            checkpoint.finish()
+            log_update(session, 'balance_sheets', total_records)
+            return loader_result(f"Upserted {total_records} balance sheets for period {end_date} ({writer.changes()})", checkpoint.failures)
 
-        for ticker in all_tickers:
+        ts_codes = checkpoint.pending([ticker.ts_code for ticker in all_tickers])
+        fetched = fetch_tickers(
+            ts_codes,
+            partial(tushare_service.get_balance_sheet, start_date=end_date, fields=fields),
+            checkpoint.failures
+        )
+        for ts_code, balance_data in fetched:
             ticker_count += 1
-            # Pause for 50 seconds after every 500 tickers。There is limitation of 500 Tushare API calling/every minute. 
+            checkpoint.record(ts_code)
+            replace_unit(session, BalanceSheet, BalanceSheet.ts_code == ts_code, BalanceSheet.end_date == end_date)
             if ticker_count % 500 == 0:
-                print(f"{Colors.WARNING}Processed {ticker_count} tickers with end_date{end_date}. Pausing for 50 seconds to prevent API rate limiting...{Colors.ENDC}")
-                time.sleep(60)
-                print(f"{Colors.OKGREEN}Resuming data fetch...{Colors.ENDC}")
-            balance_data = tushare_service.get_balance_sheet(ticker.ts_code, end_date)
+                print(f"{Colors.OKBLUE}Processed {ticker_count} tickers with end_date={end_date}{Colors.ENDC}")
             if not balance_data:
                 continue
             
             for data in balance_data:
                 data['updated_date'] = datetime.now(timezone.utc)
-                new_balance = BalanceSheet(**data)
-                session.add(new_balance)
+                writer.add(data)
                 total_records += 1
-            
-            
-            
-        session.commit()
+        
+        checkpoint.finish()
         log_update(session, 'balance_sheets', total_records)
-        return True, f"Inserted {total_records} balance sheets"
+        return loader_result(f"Upserted {total_records} balance sheets ({writer.changes()})", checkpoint.failures)
         
     except Exception as e:
         session.rollback()
@@ -312,43 +751,55 @@ def update_cash_flows_data():
     """Update cash flow statements"""
     session = get_session()
     tushare_service = TushareService()
+    writer = table_writer(session, CashFlow)
     
     try:
         print(f"{Colors.OKBLUE}Fetching cash flow statements...{Colors.ENDC}")
-        all_tickers = session.query(Ticker).all()
+        all_tickers = listed_tickers(session)
         last_day = session.query(LastDayQuarter).first()
         if not all_tickers or not last_day:
             return False, "No tickers found or no defined end_date"
         
         total_records = 0
         ticker_count = 0
-        end_date = last_day.end_date
+        end_date = stored_period(session, 'cash_flows') or last_day.end_date
 
-        # Delete existing records with end_date = last_day
-        deleted_count = session.query(CashFlow).filter(CashFlow.end_date == end_date).delete()
-        print(f"{Colors.WARNING}Deleted {deleted_count} existing cash flow records with end_date={end_date}{Colors.ENDC}")
+        fields = table_fields('cash_flows')
+        checkpoint = start_checkpoint(session, writer, 'cash_flows', end_date)
 
-        for ticker in all_tickers:
+        if ETL_OPTIONS['mode'] == 'date':
+            total_records = load_statement_period(
+                writer, checkpoint, lambda: tushare_service.get_cash_flow(period=end_date, fields=fields),
+                replace=lambda: replace_unit(session, CashFlow, CashFlow.end_date == end_date)
+            )
+            checkpoint.finish()
+            log_update(session, 'cash_flows', total_records)
+            return loader_result(f"Upserted {total_records} cash flow statements for period {end_date} ({writer.changes()})", checkpoint.failures)
+
+        ts_codes = checkpoint.pending([ticker.ts_code for ticker in all_tickers])
+        fetched = fetch_tickers(
+            ts_codes,
+            partial(tushare_service.get_cash_flow, start_date=end_date, fields=fields),
+            checkpoint.failures
+        )
+        for ts_code, cash_flow_data in fetched:
             ticker_count += 1
-            # Pause for 50 seconds after every 500 tickers。There is limitation of 500 Tushare API calling/every minute. 
+            checkpoint.record(ts_code)
+            replace_unit(session, CashFlow, CashFlow.ts_code == ts_code, CashFlow.end_date == end_date)
             if ticker_count % 500 == 0:
-                print(f"{Colors.WARNING}Processed {ticker_count} tickers with end_date={end_date}. Pausing for 50 seconds to prevent API rate limiting...{Colors.ENDC}")
-                time.sleep(60)
-                print(f"{Colors.OKGREEN}Resuming data fetch...{Colors.ENDC}")
-            
-            cash_flow_data = tushare_service.get_cash_flow(ticker.ts_code, end_date)
+                print(f"{Colors.OKBLUE}Processed {ticker_count} tickers with end_date={end_date}{Colors.ENDC}")
+
             if not cash_flow_data:
                 continue
             
             for data in cash_flow_data:
                 data['updated_date'] = datetime.now(timezone.utc)
-                new_cash_flow = CashFlow(**data)
-                session.add(new_cash_flow)
+                writer.add(data)
                 total_records += 1
         
-        session.commit()
+        checkpoint.finish()
         log_update(session, 'cash_flows', total_records)
-        return True, f"Inserted {total_records} cash flow statements"
+        return loader_result(f"Upserted {total_records} cash flow statements ({writer.changes()})", checkpoint.failures)
         
     except Exception as e:
         session.rollback()
@@ -360,43 +811,55 @@ def update_income_statements_data():
     """Update income statements"""
     session = get_session()
     tushare_service = TushareService()
+    writer = table_writer(session, IncomeStatement)
     
     try:
         print(f"{Colors.OKBLUE}Fetching income statements...{Colors.ENDC}")
-        all_tickers = session.query(Ticker).all()
+        all_tickers = listed_tickers(session)
         last_day = session.query(LastDayQuarter).first()
         if not all_tickers or not last_day:
             return False, "No tickers found or no defined end_date"
         
         total_records = 0
         ticker_count = 0
-        end_date = last_day.end_date
+        end_date = stored_period(session, 'income_statements') or last_day.end_date
 
-        # Delete existing records with end_date = last_day
-        deleted_count = session.query(IncomeStatement).filter(IncomeStatement.end_date == end_date).delete()
-        print(f"{Colors.WARNING}Deleted {deleted_count} existing income statement records with end_date={end_date}{Colors.ENDC}")
+        fields = table_fields('income_statements')
+        checkpoint = start_checkpoint(session, writer, 'income_statements', end_date)
 
-        for ticker in all_tickers:
+        if ETL_OPTIONS['mode'] == 'date':
+            total_records = load_statement_period(
+                writer, checkpoint, lambda: tushare_service.get_income_statement(period=end_date, fields=fields),
+                replace=lambda: replace_unit(session, IncomeStatement, IncomeStatement.end_date == end_date)
+            )
+            checkpoint.finish()
+            log_update(session, 'income_statements', total_records)
+            return loader_result(f"Upserted {total_records} income statements for period {end_date} ({writer.changes()})", checkpoint.failures)
+
+        ts_codes = checkpoint.pending([ticker.ts_code for ticker in all_tickers])
+        fetched = fetch_tickers(
+            ts_codes,
+            partial(tushare_service.get_income_statement, start_date=end_date, fields=fields),
+            checkpoint.failures
+        )
+        for ts_code, income_data in fetched:
             ticker_count += 1
-            # Pause for 50 seconds after every 500 tickers。There is limitation of 500 Tushare API calling/every minute. 
+            checkpoint.record(ts_code)
+            replace_unit(session, IncomeStatement, IncomeStatement.ts_code == ts_code, IncomeStatement.end_date == end_date)
             if ticker_count % 500 == 0:
-                print(f"{Colors.WARNING}Processed {ticker_count} tickers with end_date={end_date}. Pausing for 50 seconds to prevent API rate limiting...{Colors.ENDC}")
-                time.sleep(60)
-                print(f"{Colors.OKGREEN}Resuming data fetch...{Colors.ENDC}")
-            
-            income_data = tushare_service.get_income_statement(ticker.ts_code, end_date)
+                print(f"{Colors.OKBLUE}Processed {ticker_count} tickers with end_date={end_date}{Colors.ENDC}")
+
             if not income_data:
                 continue
             
             for data in income_data:
                 data['updated_date'] = datetime.now(timezone.utc)
-                new_income = IncomeStatement(**data)
-                session.add(new_income)
+                writer.add(data)
                 total_records += 1
         
-        session.commit()
+        checkpoint.finish()
         log_update(session, 'income_statements', total_records)
-        return True, f"Inserted {total_records} income statements"
+        return loader_result(f"Upserted {total_records} income statements ({writer.changes()})", checkpoint.failures)
         
     except Exception as e:
         session.rollback()
@@ -408,29 +871,47 @@ def update_fina_indicators_data():
     """Update financial indicators"""
     session = get_session()
     tushare_service = TushareService()
+    writer = table_writer(session, FinaIndicator)
     
     try:
         print(f"{Colors.OKBLUE}Fetching financial indicators...{Colors.ENDC}")
-        all_tickers = session.query(Ticker).all()
+        all_tickers = listed_tickers(session)
         
         if not all_tickers:
             return False, "No tickers found"
         
         total_records = 0
-        for ticker in all_tickers:
-            indicators_data = tushare_service.get_fina_indicator(ticker.ts_code)
+        fields = table_fields('fina_indicators')
+        if ETL_OPTIONS['incremental']:
+            total_records, unit_count, failures = sync_by_ann_date(
+                session, writer, 'fina_indicators', FinaIndicator,
+                lambda ts_code, start, end: tushare_service.get_fina_indicator(ts_code, start_date=start, end_date=end, fields=fields),
+                lambda start, end: tushare_service.get_fina_indicator(start_date=start, end_date=end, fields=fields),
+                datetime.now().strftime("%Y%m%d")
+            )
+            log_update(session, 'fina_indicators', total_records)
+            return loader_result(f"Upserted {total_records} financial indicators from {unit_count} incremental fetches ({writer.changes()})", failures)
+
+        checkpoint = start_checkpoint(session, writer, 'fina_indicators')
+        ts_codes = checkpoint.pending([ticker.ts_code for ticker in all_tickers])
+        fetched = fetch_tickers(
+            ts_codes,
+            partial(tushare_service.get_fina_indicator, fields=fields),
+            checkpoint.failures
+        )
+        for ts_code, indicators_data in fetched:
+            checkpoint.record(ts_code)
             if not indicators_data:
                 continue
             
-            for data in indicators_data:
+            for data in newest_last(indicators_data):
                 data['updated_date'] = datetime.now(timezone.utc)
-                new_indicator = FinaIndicator(**data)
-                session.add(new_indicator)
+                writer.add(data)
                 total_records += 1
         
-        session.commit()
+        checkpoint.finish()
         log_update(session, 'fina_indicators', total_records)
-        return True, f"Inserted {total_records} financial indicators"
+        return loader_result(f"Upserted {total_records} financial indicators ({writer.changes()})", checkpoint.failures)
         
     except Exception as e:
         session.rollback()
@@ -442,44 +923,71 @@ def update_daily_basic_data():
     """Update daily basic market data"""
     session = get_session()
     tushare_service = TushareService()
+    writer = table_writer(session, DailyBasic)
     
     try:
         print(f"{Colors.OKBLUE}Fetching daily basic data...{Colors.ENDC}")
-        all_tickers = session.query(Ticker).all()
+        total_records = 0
+        ticker_count = 0
+        trade_date = datetime.now().strftime("%Y%m%d")     # as end_date
+        start_date = get_date_n_days_ago(lookback_days(5))
+
+        if ETL_OPTIONS['incremental']:
+            total_records, unit_count, failures = sync_incremental(
+                session, writer, tushare_service, 'daily_basic', DailyBasic,
+                lambda ts_code, start, end: tushare_service.get_daily_basic(ts_code, start_date=start, end_date=end),
+                lambda day: tushare_service.get_daily_basic(trade_date=day),
+                start_date, trade_date
+            )
+            log_update(session, 'daily_basic', total_records)
+            return loader_result(f"Upserted {total_records} daily basic records from {unit_count} incremental fetches ({writer.changes()})", failures)
+
+        start_date, trade_date = run_window(session, 'daily_basic', start_date, trade_date)
+        checkpoint = start_checkpoint(session, writer, 'daily_basic', f"{ETL_OPTIONS['mode']}:{start_date}-{trade_date}")
+        if ETL_OPTIONS['mode'] == 'date':
+            total_records, day_count = load_by_trade_date(
+                writer, tushare_service,
+                lambda day: tushare_service.get_daily_basic(trade_date=day),
+                start_date, trade_date, checkpoint=checkpoint,
+                replace=lambda day: replace_unit(session, DailyBasic, DailyBasic.trade_date == day)
+            )
+            checkpoint.finish()
+            log_update(session, 'daily_basic', total_records)
+            return loader_result(f"Upserted {total_records} daily basic records for {day_count} trading days ({writer.changes()})", checkpoint.failures)
+
+        all_tickers = listed_tickers(session)
         
         if not all_tickers:
             return False, "No tickers found"
         
-        total_records = 0
-        ticker_count = 0
-        trade_date = datetime.now().strftime("%Y%m%d")     # as end_date
-        start_date = get_date_n_days_ago(5)  
-        deleted_count = session.query(DailyBasic).filter(DailyBasic.trade_date >= start_date).delete()
-        print(f"{Colors.WARNING}Deleted {deleted_count} existing daily basic records with trade_date={trade_date}{Colors.ENDC}")
-
-        for ticker in all_tickers:
-            # Pause for 50 seconds after every 700 tickers。There is limitation of 700 Tushare API calling/every minute. 
-          
-            daily_data = tushare_service.get_daily_basic(ticker.ts_code, start_date=start_date, end_date=trade_date)
+        ts_codes = checkpoint.pending([ticker.ts_code for ticker in all_tickers])
+        fetched = fetch_tickers(
+            ts_codes,
+            partial(tushare_service.get_daily_basic, start_date=start_date, end_date=trade_date),
+            checkpoint.failures
+        )
+        for ts_code, daily_data in fetched:
+            checkpoint.record(ts_code)
+            replace_unit(
+                session, DailyBasic,
+                DailyBasic.ts_code == ts_code, DailyBasic.trade_date >= start_date, DailyBasic.trade_date <= trade_date
+            )
             if not daily_data:
                 continue
             
             for data in daily_data:
                 data['updated_date'] = datetime.now(timezone.utc)
-                new_daily = DailyBasic(**data)
-                session.add(new_daily)
+                writer.add(data)
                 total_records += 1
                 if total_records % 500 == 0:
                     print(f"{Colors.WARNING}Processed {total_records} records.{Colors.ENDC}")
             ticker_count +=1
             if ticker_count % 500 == 0:
-                print(f"{Colors.WARNING}Processed {ticker_count} tickers with start_date={start_date} and end_date={trade_date}. Pausing for 50 seconds to prevent API rate limiting...{Colors.ENDC}")
-                time.sleep(55)
-                print(f"{Colors.OKGREEN}Resuming data fetch...{Colors.ENDC}")                      
+                print(f"{Colors.OKBLUE}Processed {ticker_count} tickers with start_date={start_date} and end_date={trade_date}{Colors.ENDC}")
         
-        session.commit()
+        checkpoint.finish()
         log_update(session, 'daily_basic', total_records)
-        return True, f"Inserted {total_records} daily basic records"
+        return loader_result(f"Upserted {total_records} daily basic records ({writer.changes()})", checkpoint.failures)
         
     except Exception as e:
         session.rollback()
@@ -491,6 +999,7 @@ def update_ths_hot_data():
     """Update THS hot concept data"""
     session = get_session()
     tushare_service = TushareService()
+    writer = table_writer(session, ThsHot)
     trade_date=datetime.now().strftime("%Y%m%d") 
     try:
         print(f"{Colors.OKBLUE}Fetching THS hot concept data...{Colors.ENDC}")
@@ -502,13 +1011,13 @@ def update_ths_hot_data():
         total_records = 0
         for data in ths_data:
             data['updated_date'] = datetime.now(timezone.utc)
-            new_ths = ThsHot(**data)
-            session.add(new_ths)
+            writer.add(data)
             total_records += 1
         
+        writer.flush()
         session.commit()
         log_update(session, 'ths_hot', total_records)
-        return True, f"Inserted {total_records} 同花顺 hot records for trade_date = {trade_date}"
+        return True, f"Upserted {total_records} 同花顺 hot records for trade_date = {trade_date} ({writer.changes()})"
         
     except Exception as e:
         session.rollback()
@@ -520,6 +1029,7 @@ def update_dc_hot_data():
     """Update DC hot concept data"""
     session = get_session()
     tushare_service = TushareService()
+    writer = table_writer(session, DcHot)
     trade_date=datetime.now().strftime("%Y%m%d") 
     try:
         print(f"{Colors.OKBLUE}Fetching DC hot concept data...{Colors.ENDC}")
@@ -531,13 +1041,13 @@ def update_dc_hot_data():
         count = 0
         for data in dc_data:
             data['updated_date'] = datetime.now(timezone.utc)
-            new_dc = DcHot(**data)
-            session.add(new_dc)
+            writer.add(data)
             count += 1
         
+        writer.flush()
         session.commit()
         log_update(session, 'dc_hot', count)
-        return True, f"Inserted {count} 东方财富 hot records for trade_date = {trade_date}"
+        return True, f"Upserted {count} 东方财富 hot records for trade_date = {trade_date} ({writer.changes()})"
         
     except Exception as e:
         session.rollback()
@@ -549,56 +1059,74 @@ def update_daily_data():
     """Update daily stock quotes and trading data for recent 360 days"""
     session = get_session()
     tushare_service = TushareService()
+    writer = table_writer(session, Daily)
     
     try:
         print(f"{Colors.OKBLUE}Fetching daily stock quotes...{Colors.ENDC}")
-        all_tickers = session.query(Ticker).all()
-        
-        if not all_tickers:
-            return False, "No tickers found"
-        
         total_records = 0
         ticker_count = 0
         
         # Get recent 360 days of data
+        days = lookback_days(360)
         end_date = datetime.now().strftime("%Y%m%d")
-        start_date = get_date_n_days_ago(360)
+        start_date = get_date_n_days_ago(days)
+
+        if ETL_OPTIONS['incremental']:
+            total_records, unit_count, failures = sync_incremental(
+                session, writer, tushare_service, 'daily', Daily,
+                lambda ts_code, start, end: tushare_service.get_daily(ts_code, start_date=start, end_date=end),
+                lambda day: tushare_service.get_daily(trade_date=day),
+                start_date, end_date
+            )
+            log_update(session, 'daily_data', total_records)
+            return loader_result(f"Upserted {total_records} daily stock quotes from {unit_count} incremental fetches ({writer.changes()})", failures)
+
+        all_tickers = []
+        if ETL_OPTIONS['mode'] != 'date':
+            all_tickers = listed_tickers(session)
+            if not all_tickers:
+                return False, "No tickers found"
         
-        # Delete existing records in the date range to avoid duplicates
-        deleted_count = session.query(Daily).filter(
-            Daily.trade_date >= start_date,
-            Daily.trade_date <= end_date
-        ).delete()
-        print(f"{Colors.WARNING}Deleted {deleted_count} existing daily records for date range {start_date} to {end_date}{Colors.ENDC}")
+        start_date, end_date = run_window(session, 'daily', start_date, end_date)
+        checkpoint = start_checkpoint(session, writer, 'daily', f"{ETL_OPTIONS['mode']}:{start_date}-{end_date}")
+
+        if ETL_OPTIONS['mode'] == 'date':
+            total_records, day_count = load_by_trade_date(
+                writer, tushare_service,
+                lambda day: tushare_service.get_daily(trade_date=day),
+                start_date, end_date, checkpoint=checkpoint,
+                replace=lambda day: replace_unit(session, Daily, Daily.trade_date == day)
+            )
+            checkpoint.finish()
+            log_update(session, 'daily_data', total_records)
+            return loader_result(f"Upserted {total_records} daily stock quotes for {day_count} trading days ({writer.changes()})", checkpoint.failures)
 
-        for ticker in all_tickers:
+        ts_codes = checkpoint.pending([ticker.ts_code for ticker in all_tickers])
+        fetched = fetch_tickers(
+            ts_codes,
+            partial(tushare_service.get_daily, start_date=start_date, end_date=end_date),
+            checkpoint.failures
+        )
+        for ts_code, daily_data in fetched:
             ticker_count += 1
-            
-            # Fetch daily data for this ticker
-            daily_data = tushare_service.get_daily(ticker.ts_code, start_date=start_date, end_date=end_date)
+            checkpoint.record(ts_code)
+            replace_unit(session, Daily, Daily.ts_code == ts_code, Daily.trade_date >= start_date, Daily.trade_date <= end_date)
             if not daily_data:
                 continue
             
             # Insert new records
             for data in daily_data:
                 data['updated_date'] = datetime.now(timezone.utc)
-                new_daily = Daily(**data)
-                session.add(new_daily)
+                writer.add(data)
                 total_records += 1
             
             # Progress reporting
             if ticker_count % 100 == 0:
-                print(f"{Colors.OKBLUE}Processed {ticker_count} tickers, inserted {total_records} daily records{Colors.ENDC}")
-            
-            # Rate limiting - pause every 500 tickers
-            if ticker_count % 500 == 0:
-                print(f"{Colors.WARNING}Processed {ticker_count} tickers. Pausing for 60 seconds to prevent API rate limiting...{Colors.ENDC}")
-                time.sleep(60)
-                print(f"{Colors.OKGREEN}Resuming data fetch...{Colors.ENDC}")
+                print(f"{Colors.OKBLUE}Processed {ticker_count} tickers, {total_records} daily records so far{Colors.ENDC}")
         
-        session.commit()
+        checkpoint.finish()
         log_update(session, 'daily_data', total_records)
-        return True, f"Inserted {total_records} daily stock quotes for recent 360 days"
+        return loader_result(f"Upserted {total_records} daily stock quotes from {start_date} to {end_date} ({writer.changes()})", checkpoint.failures)
         
     except Exception as e:
         session.rollback()
@@ -609,41 +1137,62 @@ def update_adj_factor_data():
     """Update adjustment factor data for all tickers for recent 360 days"""
     session = get_session()
     tushare_service = TushareService()
+    writer = table_writer(session, AdjFactor)
     try:
         print(f"{Colors.OKBLUE}Fetching adj_factor data...{Colors.ENDC}")
-        all_tickers = session.query(Ticker).all()
-        if not all_tickers:
-            return False, "No tickers found"
+        days = lookback_days(360)
+        end_date = datetime.now().strftime("%Y%m%d")
+        start_date = get_date_n_days_ago(days)
+        if ETL_OPTIONS['incremental']:
+            total_records, unit_count, failures = sync_incremental(
+                session, writer, tushare_service, 'adj_factor', AdjFactor,
+                lambda ts_code, start, end: tushare_service.get_adj_factor(ts_code, start_date=start, end_date=end),
+                lambda day: tushare_service.get_adj_factor(trade_date=day),
+                start_date, end_date
+            )
+            log_update(session, 'adj_factor', total_records)
+            return loader_result(f"Upserted {total_records} adj_factor records from {unit_count} incremental fetches ({writer.changes()})", failures)
+        all_tickers = []
+        if ETL_OPTIONS['mode'] != 'date':
+            all_tickers = listed_tickers(session)
+            if not all_tickers:
+                return False, "No tickers found"
         total_records = 0
         ticker_count = 0
-        end_date = datetime.now().strftime("%Y%m%d")
-        start_date = get_date_n_days_ago(360)
-        deleted_count = session.query(AdjFactor).filter(
-            AdjFactor.trade_date >= start_date,
-            AdjFactor.trade_date <= end_date
-        ).delete()
-        print(f"{Colors.WARNING}Deleted {deleted_count} existing adj_factor records for date range {start_date} to {end_date}{Colors.ENDC}")
-        for ticker in all_tickers:
+        start_date, end_date = run_window(session, 'adj_factor', start_date, end_date)
+        checkpoint = start_checkpoint(session, writer, 'adj_factor', f"{ETL_OPTIONS['mode']}:{start_date}-{end_date}")
+        if ETL_OPTIONS['mode'] == 'date':
+            total_records, day_count = load_by_trade_date(
+                writer, tushare_service,
+                lambda day: tushare_service.get_adj_factor(trade_date=day),
+                start_date, end_date, checkpoint=checkpoint,
+                replace=lambda day: replace_unit(session, AdjFactor, AdjFactor.trade_date == day)
+            )
+            checkpoint.finish()
+            log_update(session, 'adj_factor', total_records)
+            return loader_result(f"Upserted {total_records} adj_factor records for {day_count} trading days ({writer.changes()})", checkpoint.failures)
+        ts_codes = checkpoint.pending([ticker.ts_code for ticker in all_tickers])
+        fetched = fetch_tickers(
+            ts_codes,
+            partial(tushare_service.get_adj_factor, start_date=start_date, end_date=end_date),
+            checkpoint.failures
+        )
+        for ts_code, adj_data in fetched:
             ticker_count += 1
-            adj_data = tushare_service.get_adj_factor(ticker.ts_code, trade_date='')
+            checkpoint.record(ts_code)
+            replace_unit(session, AdjFactor, AdjFactor.ts_code == ts_code, AdjFactor.trade_date >= start_date, AdjFactor.trade_date <= end_date)
             if not adj_data:
                 continue
             for data in adj_data:
                 data['updated_date'] = datetime.now(timezone.utc)
-                new_adj = AdjFactor(**data)
-                session.add(new_adj)
+                writer.add(data)
                 total_records += 1
             if ticker_count % 500 == 0:
-                session.commit()
-                print(f"{Colors.OKBLUE}Committed after {ticker_count} tickers, total {total_records} adj_factor records so far.{Colors.ENDC}")
-                # Optional: pause to avoid rate limiting
-                print(f"{Colors.WARNING}Pausing for 60 seconds to prevent API rate limiting...{Colors.ENDC}")
-                time.sleep(60)
-                print(f"{Colors.OKGREEN}Resuming data fetch...{Colors.ENDC}")
+                print(f"{Colors.OKBLUE}Processed {ticker_count} tickers, total {total_records} adj_factor records so far.{Colors.ENDC}")
 
-        session.commit()
+        checkpoint.finish()
         log_update(session, 'adj_factor', total_records)
-        return True, f"Inserted {total_records} adj_factor records for recent 360 days"
+        return loader_result(f"Upserted {total_records} adj_factor records from {start_date} to {end_date} ({writer.changes()})", checkpoint.failures)
     except Exception as e:
         session.rollback()
         return False, f"Error: {e}"
@@ -654,32 +1203,49 @@ def update_dividend_data():
     """Update dividend data for all tickers"""
     session = get_session()
     tushare_service = TushareService()
+    writer = table_writer(session, Dividend)
     try:
         print(f"{Colors.OKBLUE}Fetching dividend data...{Colors.ENDC}")
-        all_tickers = session.query(Ticker).all()
+        end_date = datetime.now().strftime("%Y%m%d")
+        start_date, end_date = run_window(session, 'dividend', get_date_n_days_ago(lookback_days(360)), end_date)
+        checkpoint = start_checkpoint(session, writer, 'dividend', f"{ETL_OPTIONS['mode']}:{start_date}-{end_date}")
+        if ETL_OPTIONS['mode'] == 'date':
+            # Whole market by ex-dividend date, one call per trading day
+            total_records, day_count = load_by_trade_date(
+                writer, tushare_service,
+                lambda day: tushare_service.get_dividend(ex_date=day),
+                start_date, end_date, checkpoint=checkpoint,
+                replace=lambda day: replace_unit(session, Dividend, Dividend.ex_date == day)
+            )
+            checkpoint.finish()
+            log_update(session, 'dividend', total_records)
+            return loader_result(f"Upserted {total_records} dividend records for {day_count} ex-dates ({writer.changes()})", checkpoint.failures)
+        all_tickers = listed_tickers(session)
         if not all_tickers:
             return False, "No tickers found"
         total_records = 0
         ticker_count = 0
-        for ticker in all_tickers:
+        ts_codes = checkpoint.pending([ticker.ts_code for ticker in all_tickers])
+        fetched = fetch_tickers(
+            ts_codes,
+            partial(tushare_service.get_dividend, start_date=start_date, end_date=end_date),
+            checkpoint.failures
+        )
+        for ts_code, dividend_data in fetched:
             ticker_count += 1
-            dividend_data = tushare_service.get_dividend(ts_code=ticker.ts_code)
+            checkpoint.record(ts_code)
+            replace_unit(session, Dividend, Dividend.ts_code == ts_code, Dividend.ex_date >= start_date, Dividend.ex_date <= end_date)
             if not dividend_data:
                 continue
             for data in dividend_data:
                 data['updated_date'] = datetime.now(timezone.utc)
-                new_div = Dividend(**data)
-                session.add(new_div)
+                writer.add(data)
                 total_records += 1
             if ticker_count % 500 == 0:
-                session.commit()
-                print(f"{Colors.OKBLUE}Committed after {ticker_count} tickers, total {total_records} dividend records so far.{Colors.ENDC}")
-                print(f"{Colors.WARNING}Pausing for 60 seconds to prevent API rate limiting...{Colors.ENDC}")
-                time.sleep(60)
-                print(f"{Colors.OKGREEN}Resuming data fetch...{Colors.ENDC}")
-        session.commit()
+                print(f"{Colors.OKBLUE}Processed {ticker_count} tickers, total {total_records} dividend records so far.{Colors.ENDC}")
+        checkpoint.finish()
         log_update(session, 'dividend', total_records)
-        return True, f"Inserted {total_records} dividend records"
+        return loader_result(f"Upserted {total_records} dividend records ({writer.changes()})", checkpoint.failures)
     except Exception as e:
         session.rollback()
         return False, f"Error: {e}"
@@ -692,26 +1258,25 @@ def update_index_daily_data():
     """Update benchmark index daily data for 000300.SH for recent 360 days"""
     session = get_session()
     tushare_service = TushareService()
+    writer = table_writer(session, IndexDaily)
     try:
         print(f"{Colors.OKBLUE}Fetching index daily data for 000300.SH...{Colors.ENDC}")
         end_date = datetime.now().strftime("%Y%m%d")
         start_date = get_date_n_days_ago(360)
-        deleted_count = session.query(IndexDaily).filter(
-            IndexDaily.ts_code == '000300.SH',
-            IndexDaily.trade_date >= start_date,
-            IndexDaily.trade_date <= end_date
-        ).delete()
-        print(f"{Colors.WARNING}Deleted {deleted_count} existing index daily records for date range {start_date} to {end_date}{Colors.ENDC}")
         index_data = tushare_service.get_index_daily(ts_code='000300.SH', start_date=start_date, end_date=end_date)
+        replace_unit(
+            session, IndexDaily,
+            IndexDaily.ts_code == '000300.SH', IndexDaily.trade_date >= start_date, IndexDaily.trade_date <= end_date
+        )
         total_records = 0
         for data in index_data:
             data['updated_date'] = datetime.now(timezone.utc)
-            new_index = IndexDaily(**data)
-            session.add(new_index)
+            writer.add(data)
             total_records += 1
+        writer.flush()
         session.commit()
         log_update(session, 'index_daily', total_records)
-        return True, f"Inserted {total_records} index daily records for 000300.SH"
+        return True, f"Upserted {total_records} index daily records for 000300.SH ({writer.changes()})"
     except Exception as e:
         session.rollback()
         return False, f"Error: {e}"
@@ -737,6 +1302,87 @@ UPDATE_FUNCTIONS = {
     'index_daily': update_index_daily_data
 }
 
+# Tables each table reads while updating; only enforced among the selected tables
+TABLE_DEPENDENCIES = {
+    'top_holders': ['tickers'],
+    'balance_sheets': ['tickers'],
+    'cash_flows': ['tickers'],
+    'income_statements': ['tickers'],
+    'fina_indicators': ['tickers'],
+    'daily_basic': ['tickers'],
+    'daily': ['tickers'],
+    'adj_factor': ['tickers'],
+    'dividend': ['tickers'],
+}
+
+# Tables updated at once by --all. On SQLite the loaders share one write
+# lock, and each holds it across fetches until its next checkpoint commit,
+# so there tables run one after another unless --parallel says otherwise
+DEFAULT_PARALLEL_TABLES = 4
+SQLITE_PARALLEL_TABLES = 1
+
+def default_parallel_tables():
+    """--parallel when not given: one table at a time on SQLite, DEFAULT_PARALLEL_TABLES elsewhere"""
+    return SQLITE_PARALLEL_TABLES if get_engine().dialect.name == 'sqlite' else DEFAULT_PARALLEL_TABLES
+
+def tracked(table_name, update_function, collected):
+    """Wrap an update function so its API calls, throttling, rows and RSS are collected as TableMetrics"""
+    def run():
+        with track_table(table_name) as metrics:
+            try:
+                success, message = update_function()
+            except Exception as e:
+                success, message = False, f"Error: {e}"
+            metrics.finish(success, message)
+        collected.append(metrics)
+        return success, message
+    return run
+
+def record_run_metrics(started_at, duration, table_metrics):
+    """Store the run's metrics in etl_runs / etl_run_metrics and append them to the JSON-lines log"""
+    session = get_session()
+    try:
+        run, records = save_run(session, started_at, duration, ' '.join(sys.argv[1:]), table_metrics)
+        session.commit()
+        path = append_log(run, records)
+        print(f"Run metrics saved as etl_runs #{run.id}" + (f" and in {path}" if path else ''))
+    except Exception as e:
+        session.rollback()
+        print(f"{Colors.WARNING}Could not save run metrics: {e}{Colors.ENDC}")
+    finally:
+        session.close()
+
+def print_timing_summary(runs):
+    """Per-table timings and the dependency chain that bounded the wall time"""
+    if not runs:
+        return
+    wall = max(run.finished for run in runs.values())
+    print(f"\n{Colors.BOLD}Table timings (start +s, duration):{Colors.ENDC}")
+    for run in sorted(runs.values(), key=lambda run: run.started):
+        status = 'skipped' if run.skipped else ('ok' if run.success else 'failed')
+        print(f"  {run.table_name:<18} +{run.started:7.1f}s {run.duration:8.1f}s  {status}")
+    path = critical_path(runs, TABLE_DEPENDENCIES)
+    chain = ' -> '.join(f"{run.table_name} ({run.duration:.1f}s)" for run in path)
+    print(f"Critical path: {chain}; wall time {wall:.1f}s")
+
+def print_failure_report(tables=None):
+    """Units still missing after retries, per table (update_data.py --failures)"""
+    session = get_session()
+    try:
+        report = [entry for entry in failure_report(session) if tables is None or entry['table_name'] in tables]
+    finally:
+        session.close()
+    if not report:
+        print(f"{Colors.OKGREEN}No failed units on record{Colors.ENDC}")
+        return
+    print(f"\n{Colors.BOLD}Failed units (re-drive with --retry-failed):{Colors.ENDC}")
+    for entry in report:
+        kinds = ', '.join(f"{count} {kind}" for kind, count in sorted(entry['kinds'].items()))
+        period = f" [{entry['period']}]" if entry['period'] else ''
+        print(f"  {Colors.FAIL}{entry['table_name']}{period}: {entry['count']} units ({kinds}), last failed {entry['failed_at']:%Y-%m-%d %H:%M}{Colors.ENDC}")
+        for unit, message in entry['samples']:
+            print(f"    {unit}: {message}")
+
 def main():
     """Main function to handle command line arguments and execute updates"""
     parser = argparse.ArgumentParser(description='Update stock market data from Tushare')
@@ -746,8 +1392,67 @@ def main():
                        help='Update all tables')
     parser.add_argument('--interactive', '-i', action='store_true', 
                        help='Interactive mode to select tables')
+    parser.add_argument('--concurrency', '-c', type=int, default=DEFAULT_CONCURRENCY,
+                       help='Number of Tushare requests in flight for per-ticker tables')
+    
+    parser.add_argument('--mode', '-m', choices=['ticker', 'date'], default='ticker',
+                       help="Fetch daily/daily_basic/adj_factor/dividend per ticker or per trading day, and statements per ticker or per report period (whole market)")
+    parser.add_argument('--days', type=int,
+                       help='Look-back window in days for date-ranged tables (e.g. 1 for the nightly increment)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                       help='Rows per bulk insert batch')
+    parser.add_argument('--parallel', '-p', type=int,
+                       help='Number of tables updated at once; dependent tables wait for the ones they read '
+                            f'(default {SQLITE_PARALLEL_TABLES} on SQLite, {DEFAULT_PARALLEL_TABLES} on other databases)')
+    parser.add_argument('--resume', action='store_true',
+                       help='Continue an interrupted run, skipping the tickers/days it already committed')
+    parser.add_argument('--max-memory', type=int, metavar='MB',
+                       help='Stop a loader cleanly (resumable with --resume) if the process RSS exceeds this many MB')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Fetch only rows newer than the stored watermarks and upsert them (daily, daily_basic, adj_factor; fina_indicators by announcement date)')
+    parser.add_argument('--refresh-all', action='store_true',
+                       help='Fetch top_holders for every ticker, not only those with a new or imminent report')
+    parser.add_argument('--stage', action='store_true',
+                       help='Stage fetched rows as Parquet (ETL_STAGING_DIR, default database/staging) and load the database from them')
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                       help='Split the tickers of full per-ticker loads across this many fetch processes; this process stays the only database writer')
+    parser.add_argument('--replace', action='store_true',
+                       help="Delete each fetched ticker's/day's stored rows in the window before writing it, so rows Tushare dropped disappear (full loads only)")
+    parser.add_argument('--write-unchanged', action='store_true',
+                       help='Rewrite rows whose content hash matches the stored row (refreshes updated_date)')
+    parser.add_argument('--retry-failed', action='store_true',
+                       help='Re-drive only the tickers/days that failed in the previous run (all tables with failures, or those given)')
+    parser.add_argument('--failures', action='store_true',
+                       help='Show the failed units on record and exit')
+    parser.add_argument('--fields', action='append', metavar='[TABLE=]PROFILE',
+                       help="Statement fields to fetch: 'core', 'full' (default) or a comma-separated list, "
+                            "for one table (balance_sheets=core) or all statement tables; repeatable")
     
     args = parser.parse_args()
+    ETL_OPTIONS['concurrency'] = args.concurrency
+    ETL_OPTIONS['mode'] = args.mode
+    ETL_OPTIONS['days'] = args.days
+    ETL_OPTIONS['chunk_size'] = args.chunk_size
+    ETL_OPTIONS['incremental'] = args.incremental
+    ETL_OPTIONS['resume'] = args.resume
+    ETL_OPTIONS['retry_failed'] = args.retry_failed
+    ETL_OPTIONS['refresh_all'] = args.refresh_all
+    ETL_OPTIONS['stage'] = args.stage
+    ETL_OPTIONS['workers'] = max(1, args.workers)
+    ETL_OPTIONS['skip_unchanged'] = not args.write_unchanged
+    ETL_OPTIONS['replace'] = args.replace
+    try:
+        ETL_OPTIONS['fields'] = parse_field_profiles(args.fields)
+    except ValueError as e:
+        print(f"{Colors.FAIL}{e}{Colors.ENDC}")
+        return
+    set_memory_limit(args.max_memory)
+    # Tables added since the database was created (sync_watermarks, etl_failures, ...)
+    Base.metadata.create_all(get_engine())
+    
+    if args.failures:
+        print_failure_report()
+        return
     
     print(f"{Colors.HEADER}=== Stock Market Data Updater ==={Colors.ENDC}")
     print(f"{Colors.OKBLUE}Current time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}{Colors.ENDC}\n")
@@ -755,7 +1460,26 @@ def main():
     # Determine which tables to update
     tables_to_update = []
     
-    if args.interactive:
+    if args.retry_failed:
+        session = get_session()
+        try:
+            failed = {table: failed_run(session, table) for table in failed_tables(session)}
+        finally:
+            session.close()
+        for table, (period, units) in failed.items():
+            if table not in UPDATE_FUNCTIONS or (args.table and not args.all and table != args.table):
+                continue
+            # Units are only found again under the options that produced their period
+            mode, incremental = retry_options(period, units)
+            if (mode and mode != args.mode) or incremental != args.incremental:
+                options = f"--mode {mode or args.mode}" + (' --incremental' if incremental else '')
+                print(f"{Colors.WARNING}Skipping {table}: its {len(units)} failed units are re-driven with {options}{Colors.ENDC}")
+                continue
+            tables_to_update.append(table)
+        if not tables_to_update:
+            print(f"{Colors.OKGREEN}No failed units to re-drive.{Colors.ENDC}")
+            return
+    elif args.interactive:
         tables_to_update = interactive_table_selection()
         if tables_to_update is None:
             print(f"{Colors.WARNING}No tables selected. Exiting.{Colors.ENDC}")
@@ -775,34 +1499,66 @@ def main():
         print(f"{Colors.WARNING}Update cancelled by user.{Colors.ENDC}")
         return
     
+    # Upserts need the natural-key unique indexes and columns, which older databases lack
+    for column_name in add_missing_columns():
+        print(f"{Colors.WARNING}Added column {column_name}{Colors.ENDC}")
+    # Adding an index may mean deleting duplicate rows, which is left to the maintenance script
+    problems = natural_key_problems()
+    if problems:
+        print(f"{Colors.FAIL}Natural-key indexes out of date: {', '.join(problems)}{Colors.ENDC}")
+        print(f"{Colors.FAIL}Run python scripts/maintain_db.py --dry-run to review the duplicate rows, "
+              f"then python scripts/maintain_db.py to fix them.{Colors.ENDC}")
+        return
+    for migration in migrate():
+        print(f"{Colors.WARNING}Applied schema migration {migration.version}: {migration.name}{Colors.ENDC}")
+
     # Execute updates
     print(f"\n{Colors.HEADER}=== Starting Updates ==={Colors.ENDC}")
     
-    success_count = 0
     total_tables = len(tables_to_update)
-    
-    for i, table_name in enumerate(tables_to_update, 1):
-        print(f"\n{Colors.OKBLUE}[{i}/{total_tables}] Updating {table_name}...{Colors.ENDC}")
-        
-        update_func = UPDATE_FUNCTIONS[table_name]
-        success, message = update_func()
-        
-        if success:
-            print(f"{Colors.OKGREEN}✓ {message}{Colors.ENDC}")
-            success_count += 1
+    started = []
+
+    def on_start(table_name):
+        started.append(table_name)
+        print(f"\n{Colors.OKBLUE}[{len(started)}/{total_tables}] Updating {table_name}...{Colors.ENDC}")
+
+    def on_finish(run):
+        if run.success:
+            print(f"{Colors.OKGREEN}✓ {run.table_name}: {run.message}{Colors.ENDC}")
         else:
-            print(f"{Colors.FAIL}✗ {message}{Colors.ENDC}")
+            print(f"{Colors.FAIL}✗ {run.table_name}: {run.message}{Colors.ENDC}")
+
+    table_metrics = []
+    update_functions = {table: tracked(table, function, table_metrics) for table, function in UPDATE_FUNCTIONS.items()}
+    run_started_at = datetime.now(timezone.utc)
+    run_started = time.perf_counter()
+    runs = run_table_graph(tables_to_update, update_functions, TABLE_DEPENDENCIES, args.parallel or default_parallel_tables(), on_start, on_finish)
+    success_count = sum(1 for run in runs.values() if run.success)
     
     # Summary
     print(f"\n{Colors.HEADER}=== Update Summary ==={Colors.ENDC}")
     print(f"Total tables: {total_tables}")
     print(f"Successful: {Colors.OKGREEN}{success_count}{Colors.ENDC}")
     print(f"Failed: {Colors.FAIL}{total_tables - success_count}{Colors.ENDC}")
+    print_timing_summary(runs)
+    limiter = get_rate_limiter()
+    print(f"API throttle wait: {limiter.wait_seconds:.1f}s ({limiter.backoff_count} quota backoffs)")
+    opened = get_circuit_breakers().open_counts()
+    if opened:
+        print(f"{Colors.WARNING}Circuit opened: {', '.join(f'{name} x{count}' for name, count in opened.items())}{Colors.ENDC}")
+    print(f"Peak RSS: {peak_rss_mb():.0f} MB")
+    cache = get_response_cache()
+    if cache:
+        print(f"Response cache: {cache.summary()}")
+    record_run_metrics(run_started_at, time.perf_counter() - run_started, table_metrics)
+    # Pooled connections of TUSHARE_API=async
+    close_async_pro_api()
     
     if success_count == total_tables:
         print(f"{Colors.OKGREEN}All updates completed successfully!{Colors.ENDC}")
     else:
         print(f"{Colors.WARNING}Some updates failed. Check the logs above.{Colors.ENDC}")
+        print_failure_report(tables_to_update)
 
 if __name__ == "__main__":
     main()
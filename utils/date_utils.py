@@ -75,6 +75,53 @@ def get_date_n_days_ago(n):
     date = datetime.now() - timedelta(days=n)
     return date.strftime('%Y%m%d')
 
+def get_next_date(date_str):
+    """
+    Get the day after the given date.
+    
+    Args:
+        date_str (str): Date in format YYYYMMDD
+        
+    Returns:
+        str: Date in format YYYYMMDD
+    """
+    date = datetime.strptime(date_str, '%Y%m%d') + timedelta(days=1)
+    return date.strftime('%Y%m%d')
+
+def get_previous_date(date_str):
+    """
+    Get the day before the given date.
+    
+    Args:
+        date_str (str): Date in format YYYYMMDD
+        
+    Returns:
+        str: Date in format YYYYMMDD
+    """
+    date = datetime.strptime(date_str, '%Y%m%d') - timedelta(days=1)
+    return date.strftime('%Y%m%d')
+
+def get_date_windows(start_date, end_date, days):
+    """
+    Split a date range into consecutive windows of at most `days` days.
+    
+    Args:
+        start_date (str): First date in format YYYYMMDD
+        end_date (str): Last date in format YYYYMMDD
+        days (int): Maximum length of a window in days
+        
+    Returns:
+        list: (window_start, window_end) tuples in format YYYYMMDD, oldest first
+    """
+    windows = []
+    current = datetime.strptime(start_date, '%Y%m%d')
+    last = datetime.strptime(end_date, '%Y%m%d')
+    while current <= last:
+        window_end = min(current + timedelta(days=days - 1), last)
+        windows.append((current.strftime('%Y%m%d'), window_end.strftime('%Y%m%d')))
+        current = window_end + timedelta(days=1)
+    return windows
+
 if __name__ == "__main__":
     # Test the functions
     print(f"Latest quarter end date: {get_latest_quarter_end_date()}")